@@ -21,6 +21,8 @@ from datetime import datetime, timezone
 from lib.env_loader import load_env_safely
 load_env_safely()
 
+from lib.circuit_breaker import get_circuit_breaker
+
 logger = logging.getLogger(__name__)
 
 # Global instance for connection pooling
@@ -31,9 +33,13 @@ async def with_mongodb_retry(func, max_retries=2, operation_name="mongodb_operat
     """Retry MongoDB operations during replica set elections"""
     start_time = time.time()
 
+    breaker = get_circuit_breaker("mongodb")
+
     for attempt in range(max_retries + 1):
         try:
-            result = await func()
+            # Raises CircuitOpenError (not retried) while Atlas is failing
+            async with breaker.guard():
+                result = await func()
             elapsed = time.time() - start_time
 
             # Log successful operation analytics
@@ -11,6 +11,9 @@ from motor.motor_asyncio import AsyncIOMotorClient
 from collections import OrderedDict
 from pymongo.errors import OperationFailure
 
+from lib.circuit_breaker import get_circuit_breaker
+from lib.instrumentation import get_query_metrics
+
 logger = logging.getLogger(__name__)
 
 # Global instance to reuse connections
@@ -132,7 +135,10 @@ class MongoVectorSearchHandler:
 
             # Execute search
             try:
-                results = await collection.aggregate(pipeline).to_list(limit)
+                async with get_circuit_breaker("mongodb").guard():
+                    async with get_query_metrics().track("mongodb", "vector_search") as timer:
+                        results = await collection.aggregate(pipeline).to_list(limit)
+                        timer.rows = len(results)
             except Exception:
                 logger.exception("[VECTOR_SEARCH] Mongo aggregate failed")
                 return []
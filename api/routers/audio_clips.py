@@ -14,6 +14,9 @@ from pymongo import MongoClient
 import time
 import json
 
+from lib.circuit_breaker import CircuitOpenError, get_circuit_breaker
+from lib.instrumentation import get_query_metrics
+
 # Configure logging
 logger = logging.getLogger(__name__)
 
@@ -157,12 +160,16 @@ async def get_audio_clip(
         if LAMBDA_API_KEY:
             headers["x-api-key"] = LAMBDA_API_KEY
 
-        async with httpx.AsyncClient(timeout=25.0) as client:
-            response = await client.post(
-                LAMBDA_FUNCTION_URL,
-                json=lambda_payload,
-                headers=headers
-            )
+        async with get_circuit_breaker("lambda").guard() as call, \
+                get_query_metrics().track("lambda", "audio_clip") as timer:
+            async with httpx.AsyncClient(timeout=25.0) as client:
+                response = await client.post(
+                    LAMBDA_FUNCTION_URL,
+                    json=lambda_payload,
+                    headers=headers
+                )
+            timer.error = response.status_code != 200
+            call.failed = response.status_code >= 500
 
         if response.status_code != 200:
             logger.error(f"Lambda returned {response.status_code}: {response.text}")
@@ -190,6 +197,13 @@ async def get_audio_clip(
 
     except HTTPException:
         raise
+    except CircuitOpenError as e:
+        logger.warning(f"Audio Lambda circuit open: {e}")
+        raise HTTPException(
+            status_code=503,
+            detail="Audio generation temporarily unavailable",
+            headers={"Retry-After": str(max(int(e.retry_after), 1))}
+        )
     except httpx.TimeoutException:
         logger.error("Lambda timeout after 25 seconds")
         raise HTTPException(status_code=504, detail="Audio generation timed out")
@@ -4,13 +4,24 @@ Provides AI-generated briefs and insights from podcast episodes
 """
 import os
 import logging
-from fastapi import APIRouter, HTTPException, Path, Query
+import asyncio
+from fastapi import APIRouter, HTTPException, Path, Query, Request, Response
 from typing import List, Dict, Optional, Any
 from datetime import datetime, timezone
 from pydantic import BaseModel, Field
-from pymongo import MongoClient
+from motor.motor_asyncio import AsyncIOMotorClient
 from bson import ObjectId
 
+from lib.relevance_scoring import get_relevance_scorer
+from lib.etag import make_etag, etag_matches, not_modified, set_etag
+from lib.brief_loader import (
+    BriefInputs,
+    load_brief_inputs,
+    load_brief_inputs_bulk,
+    get_podcast_authority,
+    SUMMARY_CHARS
+)
+
 # Import authentication middleware (temporarily disabled)
 # TODO: Re-enable when auth system is implemented
 # from .middleware.auth import require_auth, get_current_user
@@ -22,22 +33,26 @@ logger = logging.getLogger(__name__)
 # Create router
 router = APIRouter(prefix="/api/intelligence", tags=["intelligence"])
 
-# MongoDB connection (using synchronous client for serverless reliability)
-_mongodb_client = None
-_db = None
+# MongoDB connection (async Motor client, one per event loop)
+# Motor runs driver I/O off the event loop, so a slow dashboard query no longer
+# stalls unrelated requests (e.g. /api/search) served by the same worker.
+_mongodb_client_per_loop = {}
+
+async def get_mongodb():
+    """Get MongoDB database bound to the current event loop"""
+    mongodb_uri = os.getenv("MONGODB_URI")
+    if not mongodb_uri:
+        raise ValueError("MONGODB_URI not configured")
 
-def get_mongodb():
-    """Get MongoDB connection (synchronous for serverless)"""
-    global _mongodb_client, _db
+    # Get database name from env or use default
+    db_name = os.getenv("MONGODB_DATABASE", "podinsight")
 
-    if _mongodb_client is None:
-        mongodb_uri = os.getenv("MONGODB_URI")
-        if not mongodb_uri:
-            raise ValueError("MONGODB_URI not configured")
+    loop_id = id(asyncio.get_running_loop())
+    client = _mongodb_client_per_loop.get(loop_id)
 
+    if client is None:
         try:
-            # Use synchronous PyMongo client for serverless reliability
-            _mongodb_client = MongoClient(
+            client = AsyncIOMotorClient(
                 mongodb_uri,
                 serverSelectionTimeoutMS=10000,
                 connectTimeoutMS=10000,
@@ -45,20 +60,19 @@ def get_mongodb():
                 maxPoolSize=10,
                 retryWrites=True
             )
-            # Get database name from env or use default
-            db_name = os.getenv("MONGODB_DATABASE", "podinsight")
-            _db = _mongodb_client[db_name]
 
             # Test connection
-            _db.command('ping')
-            logger.info(f"MongoDB connected successfully to database: {db_name}")
+            await client[db_name].command('ping')
+            _mongodb_client_per_loop[loop_id] = client
+            logger.info(f"MongoDB connected successfully to database: {db_name} (event loop {loop_id})")
         except Exception as e:
             logger.error(f"MongoDB connection failed: {str(e)}")
-            _mongodb_client = None
-            _db = None
+            if client is not None:
+                client.close()
             raise
 
-    return _db
+    # Never cache the database handle - it inherits the loop from its client
+    return client[db_name]
 
 # Pydantic models
 class Signal(BaseModel):
@@ -79,6 +93,20 @@ class EpisodeBrief(BaseModel):
     key_insights: List[str]
     audio_url: Optional[str] = None
 
+class BulkBriefRequest(BaseModel):
+    episode_ids: List[str] = Field(..., min_length=1, max_length=50, description="Episode IDs (MongoDB ObjectId or GUID, may be mixed)")
+
+class BulkBriefItem(BaseModel):
+    requested_id: str
+    found: bool
+    brief: Optional[EpisodeBrief] = None
+    error: Optional[str] = None
+
+class BulkBriefResponse(BaseModel):
+    briefs: List[BulkBriefItem]
+    found_count: int
+    not_found_count: int
+
 class DashboardResponse(BaseModel):
     episodes: List[EpisodeBrief]
     total_episodes: int
@@ -146,73 +174,77 @@ def extract_key_insights(signals: List[Signal]) -> List[str]:
 
     return insights[:3]  # Return top 3
 
-def get_episode_signals(db, episode_id: str) -> List[Signal]:
+def build_signals(intelligence_doc: Dict, episode_id: str) -> List[Signal]:
+    """Convert an episode_intelligence document's signals into API signals"""
+    signals = []
+    signal_data = intelligence_doc.get("signals", {})
+
+    # Process each signal type
+    for signal_type in ["investable", "competitive", "portfolio", "soundbites"]:
+        if signal_type in signal_data:
+            logger.info(f"Processing {len(signal_data[signal_type])} {signal_type} signals")
+            for signal_item in signal_data[signal_type]:
+                # Map soundbites to sound_bite for consistency
+                display_type = "sound_bite" if signal_type == "soundbites" else signal_type
+
+                # Extract content - try 'content' field first, then 'signal_text'
+                content = signal_item.get("content") or signal_item.get("signal_text") or ""
+
+                if not content:
+                    logger.warning(f"Signal item has no content or signal_text field: {signal_item}")
+
+                # Handle timestamp - convert dict to string if needed
+                timestamp_raw = signal_item.get("timestamp")
+                timestamp = None
+                if timestamp_raw:
+                    if isinstance(timestamp_raw, dict):
+                        # Convert dict with start/end to a string format
+                        start = timestamp_raw.get("start", 0)
+                        timestamp = f"{int(start // 60):02d}:{int(start % 60):02d}"
+                    elif isinstance(timestamp_raw, str):
+                        timestamp = timestamp_raw
+                    elif isinstance(timestamp_raw, (int, float)):
+                        # Convert seconds to MM:SS format
+                        timestamp = f"{int(timestamp_raw // 60):02d}:{int(timestamp_raw % 60):02d}"
+
+                signal = Signal(
+                    type=display_type,
+                    content=content,
+                    confidence=signal_item.get("confidence", 0.8),
+                    timestamp=timestamp
+                )
+                signals.append(signal)
+
+    logger.info(f"Found {len(signals)} signals for episode {episode_id}")
+    return signals
+
+async def get_episode_signals(db, episode_id: str) -> List[Signal]:
     """Get signals for a specific episode from MongoDB"""
     try:
         # Query the episode_intelligence collection for real signals
         intelligence_collection = db.get_collection("episode_intelligence")
 
         # Find the intelligence data for this episode
-        intelligence_doc = intelligence_collection.find_one({"episode_id": episode_id})
+        intelligence_doc = await intelligence_collection.find_one({"episode_id": episode_id})
 
         if not intelligence_doc:
             logger.info(f"No intelligence data found for episode {episode_id}")
             return []
 
-        # Extract signals from the document
-        signals = []
-        signal_data = intelligence_doc.get("signals", {})
-
-        # Process each signal type
-        for signal_type in ["investable", "competitive", "portfolio", "soundbites"]:
-            if signal_type in signal_data:
-                logger.info(f"Processing {len(signal_data[signal_type])} {signal_type} signals")
-                for signal_item in signal_data[signal_type]:
-                    # Map soundbites to sound_bite for consistency
-                    display_type = "sound_bite" if signal_type == "soundbites" else signal_type
-
-                    # Extract content - try 'content' field first, then 'signal_text'
-                    content = signal_item.get("content") or signal_item.get("signal_text") or ""
-
-                    if not content:
-                        logger.warning(f"Signal item has no content or signal_text field: {signal_item}")
-
-                    # Handle timestamp - convert dict to string if needed
-                    timestamp_raw = signal_item.get("timestamp")
-                    timestamp = None
-                    if timestamp_raw:
-                        if isinstance(timestamp_raw, dict):
-                            # Convert dict with start/end to a string format
-                            start = timestamp_raw.get("start", 0)
-                            timestamp = f"{int(start // 60):02d}:{int(start % 60):02d}"
-                        elif isinstance(timestamp_raw, str):
-                            timestamp = timestamp_raw
-                        elif isinstance(timestamp_raw, (int, float)):
-                            # Convert seconds to MM:SS format
-                            timestamp = f"{int(timestamp_raw // 60):02d}:{int(timestamp_raw % 60):02d}"
-
-                    signal = Signal(
-                        type=display_type,
-                        content=content,
-                        confidence=signal_item.get("confidence", 0.8),
-                        timestamp=timestamp
-                    )
-                    signals.append(signal)
-
-        logger.info(f"Found {len(signals)} signals for episode {episode_id}")
-        return signals
+        return build_signals(intelligence_doc, episode_id)
 
     except Exception as e:
         logger.error(f"Error fetching signals for episode {episode_id}: {str(e)}")
         return []
 
-def calculate_relevance_score(db, episode_id: str, user_preferences: Dict) -> float:
-    """Calculate relevance score based on user preferences and episode content"""
+def score_relevance(
+    episode_id: str,
+    intelligence_doc: Optional[Dict],
+    authority_doc: Optional[Dict],
+    user_prefs_doc: Optional[Dict]
+) -> float:
+    """Relevance score from already-loaded documents (no database access)"""
     try:
-        # First check if episode_intelligence collection has a relevance score
-        intelligence_collection = db.get_collection("episode_intelligence")
-        intelligence_doc = intelligence_collection.find_one({"episode_id": episode_id})
-
         if intelligence_doc and "relevance_score" in intelligence_doc:
             # Use the pre-calculated relevance score from Story 2
             base_score = intelligence_doc["relevance_score"] / 100.0  # Convert to 0-1 range
@@ -220,62 +252,28 @@ def calculate_relevance_score(db, episode_id: str, user_preferences: Dict) -> fl
             # Fallback to calculating based on signals and authority
             base_score = 0.5
 
-            # Get podcast authority score (try episode_id first, then guid)
-            episode_metadata = db.get_collection("episode_metadata").find_one({"episode_id": episode_id})
-            if not episode_metadata:
-                # Fallback to guid field
-                episode_metadata = db.get_collection("episode_metadata").find_one({"guid": episode_id})
-            if episode_metadata:
-                raw_entry = episode_metadata.get("raw_entry_original_feed", {})
-                podcast_name = raw_entry.get("podcast_title", "")
-
-                # Look up podcast authority
-                authority_collection = db.get_collection("podcast_authority")
-                authority_doc = authority_collection.find_one({"podcast_name": podcast_name})
-
-                if authority_doc:
-                    # Higher tier = lower number (tier 1 is best)
-                    tier = authority_doc.get("tier", 5)
-                    authority_score = authority_doc.get("authority_score", 50)
+            if authority_doc:
+                # Higher tier = lower number (tier 1 is best)
+                tier = authority_doc.get("tier", 5)
+                authority_score = authority_doc.get("authority_score", 50)
 
-                    # Boost score based on tier and authority
-                    tier_boost = (6 - tier) * 0.05  # 0.25 for tier 1, down to 0.05 for tier 5
-                    authority_boost = (authority_score / 100.0) * 0.1
+                # Boost score based on tier and authority
+                tier_boost = (6 - tier) * 0.05  # 0.25 for tier 1, down to 0.05 for tier 5
+                authority_boost = (authority_score / 100.0) * 0.1
 
-                    base_score += tier_boost + authority_boost
+                base_score += tier_boost + authority_boost
 
         # Apply user preference boosts
-        user_prefs_collection = db.get_collection("user_intelligence_prefs")
-        user_prefs_doc = user_prefs_collection.find_one({"user_id": user_preferences.get("user_id", "demo-user")})
-
         if user_prefs_doc and intelligence_doc:
             prefs = user_prefs_doc.get("preferences", {})
 
-            # Check if episode signals match user's interests
-            portfolio_companies = prefs.get("portfolio_companies", [])
-            interest_topics = prefs.get("topics", [])
-            keywords = prefs.get("keywords", [])
-
-            # Check signals for matches
-            signals = intelligence_doc.get("signals", {})
-            all_signal_text = []
-
-            for signal_type in signals.values():
-                for signal in signal_type:
-                    all_signal_text.append(signal.get("signal_text", "").lower())
-
-            combined_text = " ".join(all_signal_text)
-
-            # Boost for portfolio company mentions
-            for company in portfolio_companies:
-                if company.lower() in combined_text:
-                    base_score += 0.15
-                    break
-
-            # Boost for topic/keyword matches
-            for topic in interest_topics + keywords:
-                if topic.lower() in combined_text:
-                    base_score += 0.05
+            # Check if episode signals match user's interests (topics and keywords boost alike)
+            scorer = get_relevance_scorer()
+            matcher = scorer.matcher_for(
+                prefs.get("portfolio_companies", []),
+                prefs.get("topics", []) + prefs.get("keywords", [])
+            )
+            base_score = scorer.score(base_score, matcher, intelligence_doc)
 
         return min(base_score, 1.0)
 
@@ -284,6 +282,95 @@ def calculate_relevance_score(db, episode_id: str, user_preferences: Dict) -> fl
         # Return a default score on error
         return 0.7
 
+async def calculate_relevance_score(db, episode_id: str, user_preferences: Dict) -> float:
+    """Calculate relevance score based on user preferences and episode content"""
+    try:
+        # Fetch all scoring inputs concurrently (authority table is process cached)
+        intelligence_doc, episode_metadata, user_prefs_doc, authority = await asyncio.gather(
+            db.get_collection("episode_intelligence").find_one({"episode_id": episode_id}),
+            db.get_collection("episode_metadata").find_one(
+                {"$or": [{"episode_id": episode_id}, {"guid": episode_id}]}
+            ),
+            db.get_collection("user_intelligence_prefs").find_one(
+                {"user_id": user_preferences.get("user_id", "demo-user")}
+            ),
+            get_podcast_authority(db)
+        )
+    except Exception as e:
+        logger.error(f"Error calculating relevance score for episode {episode_id}: {str(e)}")
+        # Return a default score on error
+        return 0.7
+
+    authority_doc = None
+    if episode_metadata:
+        raw_entry = episode_metadata.get("raw_entry_original_feed", {})
+        authority_doc = authority.get(raw_entry.get("podcast_title", ""))
+
+    return score_relevance(episode_id, intelligence_doc, authority_doc, user_prefs_doc)
+
+def build_brief(inputs: BriefInputs) -> EpisodeBrief:
+    """Assemble an EpisodeBrief from loaded brief inputs (no database access)"""
+    episode_doc = inputs.episode_doc
+
+    # Get the episode_id for intelligence lookups (now contains GUID value)
+    episode_guid = inputs.episode_guid
+    if not (episode_doc.get("episode_id") or episode_doc.get("guid")):
+        logger.warning(f"Episode {episode_doc.get('_id')} has no episode_id or guid field, using {inputs.requested_id}")
+
+    # Score and build signals from the same intelligence document
+    relevance_score = score_relevance(
+        episode_guid, inputs.intelligence_doc, inputs.authority_doc, inputs.intelligence_prefs_doc
+    )
+    signals = build_signals(inputs.intelligence_doc, episode_guid) if inputs.intelligence_doc else []
+
+    summary = episode_doc.get("summary", "")
+    if not summary and inputs.transcript_doc:
+        # Extract first 500 chars as summary
+        full_text = inputs.transcript_doc.get("full_text", "")
+        summary = full_text[:SUMMARY_CHARS] + "..." if len(full_text) > SUMMARY_CHARS else full_text
+
+    # Extract episode data
+    raw_entry = episode_doc.get("raw_entry_original_feed", {})
+
+    return EpisodeBrief(
+        episode_id=str(episode_doc["_id"]),
+        title=raw_entry.get("episode_title", "Untitled Episode"),
+        podcast_name=raw_entry.get("podcast_title", "Unknown Podcast"),  # Fixed field name
+        published_at=raw_entry.get("published_date_iso", datetime.now(timezone.utc).isoformat()),
+        duration_seconds=raw_entry.get("duration", 0),  # Fixed field name
+        relevance_score=relevance_score,
+        signals=signals,
+        summary=summary or "Episode summary not available",
+        key_insights=extract_key_insights(signals),
+        audio_url=episode_doc.get("s3_audio_path")
+    )
+
+async def get_dashboard_version(db, user_id: str) -> Optional[List[Any]]:
+    """
+    Version stamps for the dashboard: intelligence/metadata counts, newest
+    intelligence timestamps and the user's preferences (they change scores)
+    """
+    intelligence_collection = db.get_collection("episode_intelligence")
+    try:
+        newest_updated, newest_created, intel_count, episode_count, prefs_doc = await asyncio.gather(
+            intelligence_collection.find_one({}, {"updated_at": 1}, sort=[("updated_at", -1)]),
+            intelligence_collection.find_one({}, {"created_at": 1}, sort=[("created_at", -1)]),
+            intelligence_collection.estimated_document_count(),
+            db.get_collection("episode_metadata").estimated_document_count(),
+            db.get_collection("user_preferences").find_one({"user_id": user_id}, {"updated_at": 1})
+        )
+    except Exception as e:
+        logger.warning(f"Dashboard version lookup failed, serving without ETag: {str(e)}")
+        return None
+
+    return [
+        (newest_updated or {}).get("updated_at"),
+        (newest_created or {}).get("created_at"),
+        intel_count,
+        episode_count,
+        (prefs_doc or {}).get("updated_at")
+    ]
+
 # API Endpoints
 @router.get("/dashboard-debug")
 async def get_intelligence_dashboard_debug(limit: int = 8):
@@ -291,20 +378,20 @@ async def get_intelligence_dashboard_debug(limit: int = 8):
     debug_logs = []
 
     try:
-        db = get_mongodb()
+        db = await get_mongodb()
         debug_logs.append(f"MongoDB connected, database: {db.name}")
 
         # Get user preferences (using demo user for now)
         user_id = "demo-user"
         preferences_collection = db.get_collection("user_preferences")
-        user_prefs = preferences_collection.find_one({"user_id": user_id}) or {}
+        user_prefs = await preferences_collection.find_one({"user_id": user_id}) or {}
         debug_logs.append(f"User preferences: {user_prefs}")
 
         # Get recent episodes with metadata
         episodes_collection = db.get_collection("episode_metadata")
 
         # First, let's check if we have any episodes at all
-        total_episodes = episodes_collection.count_documents({})
+        total_episodes = await episodes_collection.count_documents({})
         debug_logs.append(f"Total episodes in collection: {total_episodes}")
 
         episodes = []
@@ -314,11 +401,11 @@ async def get_intelligence_dashboard_debug(limit: int = 8):
 
         # First, let's check which episodes have intelligence data
         intelligence_collection = db.get_collection("episode_intelligence")
-        intel_count = intelligence_collection.count_documents({})
+        intel_count = await intelligence_collection.count_documents({})
         debug_logs.append(f"Total episode_intelligence documents: {intel_count}")
 
         # Get a sample of episode IDs that have intelligence
-        sample_intel = list(intelligence_collection.find({}, {"episode_id": 1}).limit(5))
+        sample_intel = await intelligence_collection.find({}, {"episode_id": 1}).limit(5).to_list(None)
         debug_logs.append(f"Sample intelligence episode_ids: {[doc.get('episode_id') for doc in sample_intel]}")
 
         cursor = episodes_collection.find().limit(20)  # Limit to 20 for debug
@@ -327,7 +414,7 @@ async def get_intelligence_dashboard_debug(limit: int = 8):
         episodes_with_signals = 0
         first_10_checks = []
 
-        for episode_doc in cursor:
+        async for episode_doc in cursor:
             episode_count += 1
 
             # Try multiple ID fields for episode_intelligence lookups
@@ -346,14 +433,14 @@ async def get_intelligence_dashboard_debug(limit: int = 8):
                 })
 
             # Try to find signals using different ID formats
-            signals = get_episode_signals(db, episode_guid)
+            signals = await get_episode_signals(db, episode_guid)
 
             # If no signals found with GUID, try ObjectId
             if not signals:
                 object_id_str = str(episode_doc.get("_id"))
                 if episode_count <= 10:
                     debug_logs.append(f"Episode {episode_count}: No signals found with ID {episode_guid}, trying ObjectId {object_id_str}")
-                signals = get_episode_signals(db, object_id_str)
+                signals = await get_episode_signals(db, object_id_str)
 
             # Skip episodes without signals
             if not signals:
@@ -377,6 +464,8 @@ async def get_intelligence_dashboard_debug(limit: int = 8):
 
 @router.get("/dashboard", response_model=DashboardResponse)
 async def get_intelligence_dashboard(
+    request: Request,
+    response: Response,
     limit: int = 8
 ) -> DashboardResponse:
     """
@@ -388,21 +477,37 @@ async def get_intelligence_dashboard(
     - Recency
     """
     try:
-        db = get_mongodb()
+        db = await get_mongodb()
         logger.info(f"MongoDB connected, database: {db.name}")
 
         # TODO: Re-add authentication when auth system is implemented
         # Get user preferences (using demo user for now)
         user_id = "demo-user"
+
+        # Answer unchanged polls before loading every intelligence document
+        etag = None
+        version = await get_dashboard_version(db, user_id)
+        if version is not None:
+            etag = make_etag("dashboard", version, user_id, limit)
+            if etag_matches(request.headers.get("if-none-match"), etag):
+                return not_modified(etag)
+
         preferences_collection = db.get_collection("user_preferences")
-        user_prefs = preferences_collection.find_one({"user_id": user_id}) or {}
+        user_prefs = await preferences_collection.find_one({"user_id": user_id}) or {}
         logger.info(f"User preferences: {user_prefs}")
 
+        # Compile preferences once for the whole request
+        scorer = get_relevance_scorer()
+        matcher = scorer.matcher_for(
+            user_prefs.get("portfolio_companies", []),
+            user_prefs.get("interest_topics", [])
+        ) if user_prefs else None
+
         # Get recent episodes with metadata
         episodes_collection = db.get_collection("episode_metadata")
 
         # First, let's check if we have any episodes at all
-        total_episodes = episodes_collection.count_documents({})
+        total_episodes = await episodes_collection.count_documents({})
         logger.info(f"Total episodes in collection: {total_episodes}")
 
         episodes = []
@@ -413,11 +518,11 @@ async def get_intelligence_dashboard(
 
             # Get episode_intelligence collection
             intelligence_collection = db.get_collection("episode_intelligence")
-            intel_count = intelligence_collection.count_documents({})
+            intel_count = await intelligence_collection.count_documents({})
             logger.info(f"Total episode_intelligence documents: {intel_count}")
 
             # Get ALL episodes with intelligence data
-            intelligence_docs = list(intelligence_collection.find())
+            intelligence_docs = await intelligence_collection.find().to_list(None)
             logger.info(f"Found {len(intelligence_docs)} episodes with intelligence data")
 
             # Quick check - if no docs, return early
@@ -437,7 +542,7 @@ async def get_intelligence_dashboard(
                 episode_id_from_intel = intel_doc.get("episode_id")
 
                 # Find corresponding metadata
-                episode_doc = episodes_collection.find_one({
+                episode_doc = await episodes_collection.find_one({
                     "$or": [
                         {"episode_id": episode_id_from_intel},
                         {"guid": episode_id_from_intel}
@@ -490,21 +595,7 @@ async def get_intelligence_dashboard(
                     relevance_score = relevance_score / 100.0
 
                 # Apply user preference boosts
-                if user_prefs:
-                    portfolio_companies = user_prefs.get("portfolio_companies", [])
-                    interest_topics = user_prefs.get("interest_topics", [])
-
-                    # Check signals for matches
-                    all_signal_text = " ".join([s.content.lower() for s in signals])
-
-                    for company in portfolio_companies:
-                        if company.lower() in all_signal_text:
-                            relevance_score = min(relevance_score + 0.15, 1.0)
-                            break
-
-                    for topic in interest_topics:
-                        if topic.lower() in all_signal_text:
-                            relevance_score = min(relevance_score + 0.05, 1.0)
+                relevance_score = scorer.score(relevance_score, matcher, intel_doc)
 
                 # Extract episode data
                 raw_entry = episode_doc.get("raw_entry_original_feed", {})
@@ -539,13 +630,14 @@ async def get_intelligence_dashboard(
         if not episodes:
             logger.warning("No episodes found with intelligence data")
             # Check collection counts for debugging
-            intelligence_count = db.get_collection("episode_intelligence").count_documents({})
+            intelligence_count = await db.get_collection("episode_intelligence").count_documents({})
             logger.info(f"Total episode_intelligence documents: {intelligence_count}")
 
         # Sort by relevance score and take top N
         episodes.sort(key=lambda x: x.relevance_score, reverse=True)
         episodes = episodes[:limit]
 
+        set_etag(response, etag)
         return DashboardResponse(
             episodes=episodes,
             total_episodes=len(episodes),
@@ -577,12 +669,19 @@ async def get_intelligence_episodes(
     Returns all 50 episodes with intelligence data (not just top 8 like dashboard)
     """
     try:
-        db = get_mongodb()
+        db = await get_mongodb()
 
         # Get user preferences
         user_id = "demo-user"
         preferences_collection = db.get_collection("user_preferences")
-        user_prefs = preferences_collection.find_one({"user_id": user_id}) or {}
+        user_prefs = await preferences_collection.find_one({"user_id": user_id}) or {}
+
+        # Compile preferences once for the whole request
+        scorer = get_relevance_scorer()
+        matcher = scorer.matcher_for(
+            user_prefs.get("portfolio_companies", []),
+            user_prefs.get("interest_topics", [])
+        ) if user_prefs else None
 
         # Start with intelligence collection
         intelligence_collection = db.get_collection("episode_intelligence")
@@ -592,7 +691,7 @@ async def get_intelligence_episodes(
         query = {}
 
         # Get ALL intelligence documents first to enable search
-        all_intelligence_docs = list(intelligence_collection.find(query))
+        all_intelligence_docs = await intelligence_collection.find(query).to_list(None)
 
         # Process all episodes first, then filter and paginate
         all_episodes = []
@@ -600,7 +699,7 @@ async def get_intelligence_episodes(
             episode_id_from_intel = intel_doc.get("episode_id")
 
             # Find corresponding metadata
-            episode_doc = episodes_collection.find_one({
+            episode_doc = await episodes_collection.find_one({
                 "$or": [
                     {"episode_id": episode_id_from_intel},
                     {"guid": episode_id_from_intel}
@@ -646,20 +745,7 @@ async def get_intelligence_episodes(
                 relevance_score = relevance_score / 100.0
 
             # Apply user preference boosts
-            if user_prefs:
-                portfolio_companies = user_prefs.get("portfolio_companies", [])
-                interest_topics = user_prefs.get("interest_topics", [])
-
-                all_signal_text = " ".join([s.content.lower() for s in signals])
-
-                for company in portfolio_companies:
-                    if company.lower() in all_signal_text:
-                        relevance_score = min(relevance_score + 0.15, 1.0)
-                        break
-
-                for topic in interest_topics:
-                    if topic.lower() in all_signal_text:
-                        relevance_score = min(relevance_score + 0.05, 1.0)
+            relevance_score = scorer.score(relevance_score, matcher, intel_doc)
 
             # Extract episode data
             raw_entry = episode_doc.get("raw_entry_original_feed", {})
@@ -738,19 +824,13 @@ async def get_intelligence_brief(
     - Audio URL when available
     """
     try:
-        db = get_mongodb()
-
-        # Get episode metadata
-        episodes_collection = db.get_collection("episode_metadata")
+        db = await get_mongodb()
 
-        # Try to find by ObjectId first, then by GUID
-        episode_doc = None
-        try:
-            # Try as ObjectId
-            episode_doc = episodes_collection.find_one({"_id": ObjectId(episode_id)})
-        except:
-            # Try as GUID in episode_id field
-            episode_doc = episodes_collection.find_one({"episode_id": episode_id})
+        # TODO: Re-add authentication when auth system is implemented
+        # Load metadata (by ObjectId, else GUID), intelligence, transcript head,
+        # preferences and podcast authority in one round trip (demo user for now)
+        inputs = await load_brief_inputs(db, episode_id, user_id="demo-user")
+        episode_doc = inputs.episode_doc
 
         if not episode_doc:
             raise HTTPException(
@@ -758,53 +838,7 @@ async def get_intelligence_brief(
                 detail=f"Episode {episode_id} not found"
             )
 
-        # TODO: Re-add authentication when auth system is implemented
-        # Get user preferences for relevance scoring (using demo user for now)
-        user_id = "demo-user"
-        preferences_collection = db.get_collection("user_preferences")
-        user_prefs = preferences_collection.find_one({"user_id": user_id}) or {}
-
-        # Get the episode_id for intelligence lookups (now contains GUID value)
-        episode_guid = episode_doc.get("episode_id")
-        if not episode_guid:
-            # Fallback to guid field if episode_id not present
-            episode_guid = episode_doc.get("guid")
-            if not episode_guid:
-                # If neither field exists, try to use the episode_id parameter as guid
-                episode_guid = episode_id
-                logger.warning(f"Episode {episode_doc.get('_id')} has no episode_id or guid field, using {episode_id}")
-
-        # Calculate relevance score using guid
-        relevance_score = calculate_relevance_score(db, episode_guid, user_prefs)
-
-        # Get signals using guid
-        signals = get_episode_signals(db, episode_guid)
-
-        # Get transcript for summary if available
-        transcripts_collection = db.get_collection("episode_transcripts")
-        transcript_doc = transcripts_collection.find_one({"episode_id": str(episode_doc["_id"])})
-
-        summary = episode_doc.get("summary", "")
-        if not summary and transcript_doc:
-            # Extract first 500 chars as summary
-            full_text = transcript_doc.get("full_text", "")
-            summary = full_text[:500] + "..." if len(full_text) > 500 else full_text
-
-        # Extract episode data
-        raw_entry = episode_doc.get("raw_entry_original_feed", {})
-
-        return EpisodeBrief(
-            episode_id=str(episode_doc["_id"]),
-            title=raw_entry.get("episode_title", "Untitled Episode"),
-            podcast_name=raw_entry.get("podcast_title", "Unknown Podcast"),  # Fixed field name
-            published_at=raw_entry.get("published_date_iso", datetime.now(timezone.utc).isoformat()),
-            duration_seconds=raw_entry.get("duration", 0),  # Fixed field name
-            relevance_score=relevance_score,
-            signals=signals,
-            summary=summary or "Episode summary not available",
-            key_insights=extract_key_insights(signals),
-            audio_url=episode_doc.get("s3_audio_path")
-        )
+        return build_brief(inputs)
 
     except HTTPException:
         raise
@@ -815,6 +849,50 @@ async def get_intelligence_brief(
             detail=f"Failed to generate brief: {str(e)}"
         )
 
+@router.post("/briefs", response_model=BulkBriefResponse)
+async def get_intelligence_briefs(request: BulkBriefRequest) -> BulkBriefResponse:
+    """
+    Get intelligence briefs for several episodes in one call
+
+    - Accepts a mix of MongoDB ObjectIds and GUIDs (max 50)
+    - Metadata, intelligence and transcripts are fetched with $in queries
+    - Briefs are returned in request order; unknown IDs get found=false
+    """
+    try:
+        db = await get_mongodb()
+
+        # TODO: Re-add authentication when auth system is implemented
+        all_inputs = await load_brief_inputs_bulk(db, request.episode_ids, user_id="demo-user")
+
+        items = []
+        for inputs in all_inputs:
+            if not inputs.episode_doc:
+                items.append(BulkBriefItem(
+                    requested_id=inputs.requested_id,
+                    found=False,
+                    error=f"Episode {inputs.requested_id} not found"
+                ))
+                continue
+            items.append(BulkBriefItem(
+                requested_id=inputs.requested_id,
+                found=True,
+                brief=build_brief(inputs)
+            ))
+
+        found_count = sum(1 for item in items if item.found)
+        return BulkBriefResponse(
+            briefs=items,
+            found_count=found_count,
+            not_found_count=len(items) - found_count
+        )
+
+    except Exception as e:
+        logger.error(f"Bulk brief error for {len(request.episode_ids)} episodes: {str(e)}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to generate briefs: {str(e)}"
+        )
+
 @router.post("/share", response_model=ShareResponse)
 async def share_intelligence(
     request: ShareRequest
@@ -836,15 +914,15 @@ async def share_intelligence(
             )
 
         # Get episode brief
-        db = get_mongodb()
+        db = await get_mongodb()
         episodes_collection = db.get_collection("episode_metadata")
 
         # Find episode
         episode_doc = None
         try:
-            episode_doc = episodes_collection.find_one({"_id": ObjectId(request.episode_id)})
+            episode_doc = await episodes_collection.find_one({"_id": ObjectId(request.episode_id)})
         except:
-            episode_doc = episodes_collection.find_one({"episode_id": request.episode_id})
+            episode_doc = await episodes_collection.find_one({"episode_id": request.episode_id})
 
         if not episode_doc:
             raise HTTPException(
@@ -866,7 +944,7 @@ async def share_intelligence(
         # Log share activity (using demo user for now)
         user_id = "demo-user"
         shares_collection = db.get_collection("share_history")
-        shares_collection.insert_one({
+        await shares_collection.insert_one({
             "user_id": user_id,
             "episode_id": request.episode_id,
             "method": request.method,
@@ -905,7 +983,7 @@ async def update_preferences(
     """
     try:
         # TODO: Re-add authentication when auth system is implemented
-        db = get_mongodb()
+        db = await get_mongodb()
         preferences_collection = db.get_collection("user_preferences")
 
         # Using demo user for now
@@ -923,7 +1001,7 @@ async def update_preferences(
         }
 
         # Upsert preferences
-        preferences_collection.replace_one(
+        await preferences_collection.replace_one(
             {"user_id": user_id},
             update_doc,
             upsert=True
@@ -947,18 +1025,18 @@ async def update_preferences(
 async def test_dashboard():
     """Test endpoint to verify dashboard logic"""
     try:
-        db = get_mongodb()
+        db = await get_mongodb()
         intelligence_collection = db.get_collection("episode_intelligence")
         metadata_collection = db.get_collection("episode_metadata")
 
         # Get first intelligence doc
-        intel_doc = intelligence_collection.find_one({})
+        intel_doc = await intelligence_collection.find_one({})
         if not intel_doc:
             return {"error": "No intelligence docs found"}
 
         # Try to find metadata
         episode_id = intel_doc.get("episode_id")
-        metadata = metadata_collection.find_one({
+        metadata = await metadata_collection.find_one({
             "$or": [
                 {"episode_id": episode_id},
                 {"guid": episode_id}
@@ -982,18 +1060,18 @@ async def test_dashboard():
 async def health_check():
     """Health check for intelligence API"""
     try:
-        db = get_mongodb()
+        db = await get_mongodb()
 
         # Check MongoDB connection
-        db.command("ping")
+        await db.command("ping")
 
         # Get collection names for debugging
-        collections = db.list_collection_names()
+        collections = await db.list_collection_names()
 
         # Count documents in episode_metadata if it exists
         episode_count = 0
         if "episode_metadata" in collections:
-            episode_count = db.get_collection("episode_metadata").count_documents({})
+            episode_count = await db.get_collection("episode_metadata").count_documents({})
 
         return {
             "status": "healthy",
@@ -1019,23 +1097,23 @@ async def health_check():
 async def debug_mongodb():
     """Debug MongoDB connection and collections"""
     try:
-        db = get_mongodb()
+        db = await get_mongodb()
 
         # Get basic info
         info = {
             "database_name": db.name,
-            "collections": db.list_collection_names(),
+            "collections": await db.list_collection_names(),
         }
 
         # Check episode_metadata
         if "episode_metadata" in info["collections"]:
             collection = db.get_collection("episode_metadata")
             info["episode_metadata"] = {
-                "count": collection.count_documents({}),
+                "count": await collection.count_documents({}),
                 "sample": None
             }
             # Get one sample document
-            sample = collection.find_one()
+            sample = await collection.find_one()
             if sample:
                 info["episode_metadata"]["sample"] = {
                     "id": str(sample.get("_id")),
@@ -1049,10 +1127,10 @@ async def debug_mongodb():
         if "episode_intelligence" in info["collections"]:
             collection = db.get_collection("episode_intelligence")
             info["episode_intelligence"] = {
-                "count": collection.count_documents({}),
+                "count": await collection.count_documents({}),
                 "sample": None
             }
-            sample = collection.find_one()
+            sample = await collection.find_one()
             if sample:
                 info["episode_intelligence"]["sample"] = {
                     "id": str(sample.get("_id")),
@@ -1065,10 +1143,10 @@ async def debug_mongodb():
         if "podcast_authority" in info["collections"]:
             collection = db.get_collection("podcast_authority")
             info["podcast_authority"] = {
-                "count": collection.count_documents({}),
+                "count": await collection.count_documents({}),
                 "sample": None
             }
-            sample = collection.find_one()
+            sample = await collection.find_one()
             if sample:
                 info["podcast_authority"]["sample"] = {
                     "feed_slug": sample.get("feed_slug"),
@@ -1080,8 +1158,8 @@ async def debug_mongodb():
         if "user_intelligence_prefs" in info["collections"]:
             collection = db.get_collection("user_intelligence_prefs")
             info["user_intelligence_prefs"] = {
-                "count": collection.count_documents({}),
-                "demo_user_exists": collection.count_documents({"user_id": "demo-user"})
+                "count": await collection.count_documents({}),
+                "demo_user_exists": await collection.count_documents({"user_id": "demo-user"})
             }
 
         return info
@@ -1097,10 +1175,10 @@ async def debug_mongodb():
 async def test_data_matching():
     """Test if episode IDs match between collections"""
     try:
-        db = get_mongodb()
+        db = await get_mongodb()
 
         # Get first episode from metadata
-        episode_meta = db.get_collection("episode_metadata").find_one()
+        episode_meta = await db.get_collection("episode_metadata").find_one()
         if not episode_meta:
             return {"error": "No episodes in episode_metadata"}
 
@@ -1110,16 +1188,16 @@ async def test_data_matching():
         # Try to find matching intelligence using episode_id first, then guid, then ObjectId
         intelligence = None
         if episode_id:
-            intelligence = db.get_collection("episode_intelligence").find_one({"episode_id": episode_id})
+            intelligence = await db.get_collection("episode_intelligence").find_one({"episode_id": episode_id})
         if not intelligence and episode_guid:
-            intelligence = db.get_collection("episode_intelligence").find_one({"episode_id": episode_guid})
+            intelligence = await db.get_collection("episode_intelligence").find_one({"episode_id": episode_guid})
         if not intelligence:
             # Try using the ObjectId as string
             object_id_str = str(episode_meta.get("_id"))
-            intelligence = db.get_collection("episode_intelligence").find_one({"episode_id": object_id_str})
+            intelligence = await db.get_collection("episode_intelligence").find_one({"episode_id": object_id_str})
 
         # Also check first intelligence record
-        first_intelligence = db.get_collection("episode_intelligence").find_one()
+        first_intelligence = await db.get_collection("episode_intelligence").find_one()
 
         return {
             "episode_metadata_sample": {
@@ -1144,7 +1222,7 @@ async def test_data_matching():
 async def check_guid_in_collections(guid: str):
     """Check if a specific GUID exists in various collections"""
     try:
-        db = get_mongodb()
+        db = await get_mongodb()
 
         results = {
             "searched_guid": guid,
@@ -1152,7 +1230,7 @@ async def check_guid_in_collections(guid: str):
         }
 
         # Check episode_metadata by guid field
-        metadata_by_guid = db.get_collection("episode_metadata").find_one({"guid": guid})
+        metadata_by_guid = await db.get_collection("episode_metadata").find_one({"guid": guid})
         if metadata_by_guid:
             results["found_in"].append("episode_metadata.guid")
             results["episode_metadata_by_guid"] = {
@@ -1163,7 +1241,7 @@ async def check_guid_in_collections(guid: str):
             }
 
         # Check episode_metadata by episode_id field
-        metadata_by_episode_id = db.get_collection("episode_metadata").find_one({"episode_id": guid})
+        metadata_by_episode_id = await db.get_collection("episode_metadata").find_one({"episode_id": guid})
         if metadata_by_episode_id and metadata_by_episode_id != metadata_by_guid:
             results["found_in"].append("episode_metadata.episode_id")
             results["episode_metadata_by_episode_id"] = {
@@ -1174,7 +1252,7 @@ async def check_guid_in_collections(guid: str):
             }
 
         # Check episode_intelligence
-        intelligence = db.get_collection("episode_intelligence").find_one({"episode_id": guid})
+        intelligence = await db.get_collection("episode_intelligence").find_one({"episode_id": guid})
         if intelligence:
             results["found_in"].append("episode_intelligence.episode_id")
             results["episode_intelligence"] = {
@@ -1184,7 +1262,7 @@ async def check_guid_in_collections(guid: str):
             }
 
         # Check episode_transcripts
-        transcript = db.get_collection("episode_transcripts").find_one({"episode_id": guid})
+        transcript = await db.get_collection("episode_transcripts").find_one({"episode_id": guid})
         if transcript:
             results["found_in"].append("episode_transcripts.episode_id")
             results["episode_transcripts"] = {
@@ -1203,18 +1281,18 @@ async def check_guid_in_collections(guid: str):
 async def find_episodes_with_intelligence():
     """Find episodes that have matching intelligence data"""
     try:
-        db = get_mongodb()
+        db = await get_mongodb()
 
         # Get all episode_intelligence documents
         intelligence_collection = db.get_collection("episode_intelligence")
-        intelligence_docs = list(intelligence_collection.find())
+        intelligence_docs = await intelligence_collection.find().to_list(None)
 
         matches = []
         for intel in intelligence_docs:
             episode_id = intel.get("episode_id")
 
             # Try to find this episode in metadata
-            metadata = db.get_collection("episode_metadata").find_one({
+            metadata = await db.get_collection("episode_metadata").find_one({
                 "$or": [
                     {"guid": episode_id},
                     {"episode_id": episode_id},
@@ -1247,14 +1325,14 @@ async def find_episodes_with_intelligence():
 async def test_get_signals(episode_id: str):
     """Test getting signals for a specific episode ID"""
     try:
-        db = get_mongodb()
+        db = await get_mongodb()
 
         # Direct query to episode_intelligence
         intelligence_collection = db.get_collection("episode_intelligence")
-        intelligence_doc = intelligence_collection.find_one({"episode_id": episode_id})
+        intelligence_doc = await intelligence_collection.find_one({"episode_id": episode_id})
 
         # Also try using get_episode_signals function
-        signals = get_episode_signals(db, episode_id)
+        signals = await get_episode_signals(db, episode_id)
 
         return {
             "searched_episode_id": episode_id,
@@ -1271,11 +1349,11 @@ async def test_get_signals(episode_id: str):
 async def check_guid_matching():
     """Debug endpoint to check which GUIDs match between collections"""
     try:
-        db = get_mongodb()
+        db = await get_mongodb()
 
         # Get all episode_intelligence documents
         intelligence_collection = db.get_collection("episode_intelligence")
-        intelligence_docs = list(intelligence_collection.find({}, {"episode_id": 1}))
+        intelligence_docs = await intelligence_collection.find({}, {"episode_id": 1}).to_list(None)
 
         # Get all episode_metadata documents
         metadata_collection = db.get_collection("episode_metadata")
@@ -1290,7 +1368,7 @@ async def check_guid_matching():
             episode_id = intel_doc.get("episode_id")
 
             # Try to find in metadata using both guid and episode_id fields
-            metadata_match = metadata_collection.find_one({
+            metadata_match = await metadata_collection.find_one({
                 "$or": [
                     {"guid": episode_id},
                     {"episode_id": episode_id}
@@ -1322,11 +1400,11 @@ async def check_guid_matching():
 async def debug_dashboard_issue():
     """Debug why dashboard returns empty despite 50 matching docs"""
     try:
-        db = get_mongodb()
+        db = await get_mongodb()
 
         # Get the first intelligence document
         intelligence_collection = db.get_collection("episode_intelligence")
-        first_intel = intelligence_collection.find_one({})
+        first_intel = await intelligence_collection.find_one({})
 
         if not first_intel:
             return {"error": "No intelligence documents found"}
@@ -1335,14 +1413,14 @@ async def debug_dashboard_issue():
 
         # Try to find this in metadata
         metadata_collection = db.get_collection("episode_metadata")
-        metadata_by_episode_id = metadata_collection.find_one({"episode_id": episode_id})
-        metadata_by_guid = metadata_collection.find_one({"guid": episode_id})
+        metadata_by_episode_id = await metadata_collection.find_one({"episode_id": episode_id})
+        metadata_by_guid = await metadata_collection.find_one({"guid": episode_id})
 
         # Try get_episode_signals
-        signals = get_episode_signals(db, episode_id)
+        signals = await get_episode_signals(db, episode_id)
 
         # Get first few metadata docs to see structure
-        first_metadata_docs = list(metadata_collection.find({}).limit(3))
+        first_metadata_docs = await metadata_collection.find({}).limit(3).to_list(None)
 
         return {
             "intelligence_episode_id": episode_id,
@@ -1373,11 +1451,11 @@ async def debug_dashboard_issue():
 async def debug_signal_structure(episode_id: str):
     """Debug raw signal structure for a specific episode"""
     try:
-        db = get_mongodb()
+        db = await get_mongodb()
         intelligence_collection = db.get_collection("episode_intelligence")
 
         # Get the intelligence document
-        intel_doc = intelligence_collection.find_one({"episode_id": episode_id})
+        intel_doc = await intelligence_collection.find_one({"episode_id": episode_id})
 
         if not intel_doc:
             return {"error": f"No intelligence document found for episode {episode_id}"}
@@ -1410,7 +1488,7 @@ async def debug_signal_structure(episode_id: str):
                 signal_analysis[signal_type] = {"exists": False}
 
         # Try signal extraction
-        extracted_signals = get_episode_signals(db, episode_id)
+        extracted_signals = await get_episode_signals(db, episode_id)
 
         return {
             "episode_id": episode_id,
@@ -1431,11 +1509,11 @@ async def debug_signal_structure(episode_id: str):
 async def audit_empty_signals():
     """Find all episodes with empty signal arrays"""
     try:
-        db = get_mongodb()
+        db = await get_mongodb()
         intelligence_collection = db.get_collection("episode_intelligence")
 
         # Get ALL episode_intelligence documents
-        all_docs = list(intelligence_collection.find())
+        all_docs = await intelligence_collection.find().to_list(None)
 
         empty_episodes = []
         populated_episodes = []
@@ -31,6 +31,9 @@ import aiohttp
 import time
 from pydantic import BaseModel, Field, validator
 from lib.database import get_pool
+from lib.admission import OverloadedError, get_stage_limiter
+from lib.circuit_breaker import get_circuit_breaker
+from lib.instrumentation import get_query_metrics
 from .mongodb_search import get_search_handler
 from .improved_hybrid_search import get_hybrid_search_handler
 # Import from root lib directory
@@ -79,6 +82,7 @@ class AnswerObject(BaseModel):
     text: str
     citations: List[Citation]
     confidence: Optional[float] = None  # Only shown when >80%
+    source: str = "openai"  # "extractive" when the local fallback answered
 
 class SearchResponse(BaseModel):
     answer: Optional[AnswerObject] = None  # Optional synthesized answer
@@ -254,11 +258,16 @@ async def expand_chunk_context(chunk: Dict[str, Any], context_seconds: float = 2
 
         # Fetch surrounding chunks from same episode
         # Use simpler logic: get all chunks where start_time is within our window
-        cursor = collection.find({
-            "episode_id": chunk["episode_id"],
-            "start_time": {"$gte": start_window, "$lte": end_window}
-        }).sort("start_time", 1)
-        surrounding_chunks = await cursor.to_list(None)
+        # (a shed expansion raises OverloadedError and keeps the original text)
+        async with get_stage_limiter("expansion").slot(), \
+                get_circuit_breaker("mongodb").guard(), \
+                get_query_metrics().track("mongodb", "expand_chunk_context") as timer:
+            cursor = collection.find({
+                "episode_id": chunk["episode_id"],
+                "start_time": {"$gte": start_window, "$lte": end_window}
+            }).sort("start_time", 1)
+            surrounding_chunks = await cursor.to_list(None)
+            timer.rows = len(surrounding_chunks)
 
         # Concatenate texts
         texts = []
@@ -282,6 +291,41 @@ async def expand_chunk_context(chunk: Dict[str, Any], context_seconds: float = 2
         return chunk.get("text", "")
 
 
+def prepare_synthesis_chunks(results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Top results as synthesis input, with ObjectIds cleaned for serialization"""
+    chunks_for_synthesis = []
+    for chunk in results[:10]:  # Cap at 10 for synthesis
+        # Make a copy to avoid modifying original
+        clean_chunk = chunk.copy()
+        # Convert ObjectId to string if present
+        if "_id" in clean_chunk:
+            clean_chunk["_id"] = str(clean_chunk["_id"])
+        chunks_for_synthesis.append(clean_chunk)
+    return chunks_for_synthesis
+
+
+async def synthesize_answer_object(chunks_for_synthesis: List[Dict[str, Any]], query: str) -> Optional[AnswerObject]:
+    """Synthesized answer for the response, or None (never raises)"""
+    try:
+        logger.info(f"Synthesizing answer from {len(chunks_for_synthesis)} chunks")
+
+        synthesis_result = await synthesize_with_retry(chunks_for_synthesis, query)
+        if synthesis_result:
+            logger.info(f"Synthesis successful: {len(synthesis_result.citations)} citations")
+            return AnswerObject(
+                text=synthesis_result.text,
+                citations=synthesis_result.citations,
+                confidence=synthesis_result.confidence if synthesis_result.show_confidence else None,
+                source=synthesis_result.source
+            )
+        # Synthesis returned None - this is a no-results scenario
+        logger.info("Synthesis returned None - will return null answer to frontend")
+    except Exception as e:
+        logger.error(f"Synthesis failed: {str(e)}")
+        # Continue without answer - graceful degradation
+    return None
+
+
 async def search_handler_lightweight_768d(request: SearchRequest) -> SearchResponse:
     """
     Enhanced search handler with 768D vector search
@@ -305,6 +349,9 @@ async def search_handler_lightweight_768d(request: SearchRequest) -> SearchRespo
     query_hash = hashlib.sha256(clean_query.encode()).hexdigest()
     search_id = f"search_{query_hash[:8]}_{datetime.now().timestamp()}"
 
+    # Speculative synthesis, started once ranking is final and joined at the end
+    synthesis_task: Optional[asyncio.Task] = None
+
     # Try 768D Vector Search first
     try:
         # Check cache for 768D embedding
@@ -325,8 +372,9 @@ async def search_handler_lightweight_768d(request: SearchRequest) -> SearchRespo
             # Generate session ID for tracking
             session_id = search_id  # Use search_id as session_id
 
-            # Get embedding with timing
-            result = await generate_embedding_768d_local(clean_query, session_id=session_id, return_timing=True)
+            # Get embedding with timing (OverloadedError sheds the whole search)
+            async with get_stage_limiter("modal").slot():
+                result = await generate_embedding_768d_local(clean_query, session_id=session_id, return_timing=True)
 
             if result and isinstance(result, tuple):
                 embedding_768d, modal_response_time = result
@@ -434,13 +482,33 @@ async def search_handler_lightweight_768d(request: SearchRequest) -> SearchRespo
                 paginated_results = paginated_results[:request.limit]
             logger.info(f"After pagination: {len(paginated_results)} results (offset={request.offset}, limit={request.limit})")
 
+            # Synthesis reads the raw text of the top ranked chunks, not the
+            # expanded excerpts, so it starts now and overlaps expansion and
+            # formatting instead of waiting for them
+            chunks_for_synthesis = []
+            if paginated_results:
+                # --- SAFE DIAGNOSTIC LOGGING ---
+                logger.info("--- PRE-SYNTHESIS ENVIRONMENT CHECK ---")
+                synthesis_enabled_env = os.getenv("ANSWER_SYNTHESIS_ENABLED", "not_set")
+                openai_key_env = os.getenv("OPENAI_API_KEY")
+
+                logger.info(f"ENV CHECK: Reading ANSWER_SYNTHESIS_ENABLED: '{synthesis_enabled_env}'")
+                logger.info(f"ENV CHECK: OPENAI_API_KEY is set: {openai_key_env is not None and len(openai_key_env) > 0}")
+                # --- END SAFE DIAGNOSTIC LOGGING ---
+
+                # Use only high-quality results for synthesis
+                synthesis_start = time.time()
+                chunks_for_synthesis = prepare_synthesis_chunks(high_quality_results)
+                synthesis_task = asyncio.create_task(
+                    synthesize_answer_object(chunks_for_synthesis, request.query)
+                )
+
             # Convert to API format with expanded context
             formatted_results = []
             expansion_start = time.time()
             logger.info(f"Starting context expansion for {len(paginated_results)} results")
 
             # Step 1: Prepare all expansion tasks (parallel for quality results up to cap)
-            import asyncio
             expansion_tasks = []
             # Limit expansions to prevent performance issues with broad queries
             results_to_expand = paginated_results[:MAX_CONTEXT_EXPANSIONS]
@@ -557,47 +625,11 @@ async def search_handler_lightweight_768d(request: SearchRequest) -> SearchRespo
             if len(formatted_results) > 0:
                 logger.info(f"Returning {len(formatted_results)} formatted results")
 
-                # --- SAFE DIAGNOSTIC LOGGING ---
-                logger.info("--- PRE-SYNTHESIS ENVIRONMENT CHECK ---")
-                synthesis_enabled_env = os.getenv("ANSWER_SYNTHESIS_ENABLED", "not_set")
-                openai_key_env = os.getenv("OPENAI_API_KEY")
-
-                logger.info(f"ENV CHECK: Reading ANSWER_SYNTHESIS_ENABLED: '{synthesis_enabled_env}'")
-                logger.info(f"ENV CHECK: OPENAI_API_KEY is set: {openai_key_env is not None and len(openai_key_env) > 0}")
-                # --- END SAFE DIAGNOSTIC LOGGING ---
-
-                # Try to synthesize an answer from the top chunks
-                answer_object = None
-                synthesis_start = time.time()
-                try:
-                    # Use only high-quality results for synthesis
-                    # Clean ObjectIds from chunks to avoid serialization issues
-                    chunks_for_synthesis = []
-                    for chunk in high_quality_results[:10]:  # Cap at 10 for synthesis
-                        # Make a copy to avoid modifying original
-                        clean_chunk = chunk.copy()
-                        # Convert ObjectId to string if present
-                        if "_id" in clean_chunk:
-                            clean_chunk["_id"] = str(clean_chunk["_id"])
-                        chunks_for_synthesis.append(clean_chunk)
-
-                    logger.info(f"Synthesizing answer from {len(chunks_for_synthesis)} chunks")
-
-                    synthesis_result = await synthesize_with_retry(chunks_for_synthesis, request.query)
-                    if synthesis_result:
-                        answer_object = AnswerObject(
-                            text=synthesis_result.text,
-                            citations=synthesis_result.citations,
-                            confidence=synthesis_result.confidence if synthesis_result.show_confidence else None
-                        )
-                        logger.info(f"Synthesis successful: {len(synthesis_result.citations)} citations")
-                    else:
-                        # Synthesis returned None - this is a no-results scenario
-                        answer_object = None
-                        logger.info("Synthesis returned None - will return null answer to frontend")
-                except Exception as e:
-                    logger.error(f"Synthesis failed: {str(e)}")
-                    # Continue without answer - graceful degradation
+                # Join the synthesis started before expansion
+                join_start = time.time()
+                answer_object = await synthesis_task
+                synthesis_task = None
+                logger.info(f"[TIMING] Waited {time.time() - join_start:.3f}s for synthesis after formatting")
 
                 synthesis_time = int((time.time() - synthesis_start) * 1000)
                 total_time = int((time.time() - start) * 1000)
@@ -654,10 +686,19 @@ async def search_handler_lightweight_768d(request: SearchRequest) -> SearchRespo
                 return response
             else:
                 logger.warning(f"Hybrid search returned 0 results")
+                if synthesis_task is not None:
+                    synthesis_task.cancel()
                 if DEBUG_MODE:
                     logger.info(f"[DEBUG] hybrid search returned 0 results")
 
+    except (asyncio.CancelledError, OverloadedError):
+        # Client went away or the search was shed: stop the synthesis task too
+        if synthesis_task is not None:
+            synthesis_task.cancel()
+        raise
     except Exception as e:
+        if synthesis_task is not None:
+            synthesis_task.cancel()
         logger.error(f"Hybrid search failed for query '{request.query}': {str(e)}")
         logger.error(f"Exception type: {type(e).__name__}")
         import traceback
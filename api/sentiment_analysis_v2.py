@@ -9,17 +9,44 @@ the sentiment_results collection instead of computing on-demand.
 
 from http.server import BaseHTTPRequestHandler
 import json
-import os
 import logging
-from datetime import datetime, timezone
-from typing import List, Dict, Any
+from datetime import datetime, timedelta, timezone
+from typing import List, Dict, Any, Optional
 import urllib.parse
-from pymongo import MongoClient
+from pymongo import DESCENDING
+
+from lib.cache import TTLCache
+from lib.instrumentation import get_query_metrics
+from lib.mongo_client import get_mongo_db
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+BATCH_WEEKS = 12  # Weeks (W1 oldest .. W12 newest) written by the nightly batch
+RESULT_PROJECTION = {
+    "_id": 0, "topic": 1, "week": 1, "year": 1, "sentiment_score": 1, "episode_count": 1,
+    "chunk_count": 1, "confidence": 1, "keywords_found": 1, "computed_at": 1, "metadata": 1
+}
+RESPONSE_CACHE_TTL = 3600  # Backstop; entries are replaced as soon as a batch run lands
+
+# (weeks, topics) -> (latest computed_at when built, sentiment data)
+_response_cache = TTLCache(max_size=64, ttl=RESPONSE_CACHE_TTL)
+
+
+def requested_week_labels(weeks: int) -> List[str]:
+    """Labels of the most recent `weeks` batch weeks, oldest first"""
+    first = max(1, BATCH_WEEKS - weeks + 1)
+    return [f"W{i}" for i in range(first, max(BATCH_WEEKS, weeks) + 1)]
+
+
+def batch_window_years(now: Optional[datetime] = None) -> List[int]:
+    """ISO years a batch week label can carry for the current window"""
+    now = now or datetime.now(timezone.utc)
+    oldest = now - timedelta(weeks=BATCH_WEEKS + 1)
+    return list(range(oldest.isocalendar().year, now.isocalendar().year + 1))
+
+
 class handler(BaseHTTPRequestHandler):
     def do_OPTIONS(self):
         """Handle CORS preflight requests"""
@@ -82,94 +109,76 @@ class handler(BaseHTTPRequestHandler):
             self.wfile.write(json.dumps(error_response).encode())
 
     def _get_precomputed_sentiment(self, weeks: int, topics: List[str]) -> List[Dict[str, Any]]:
-        """Get pre-computed sentiment data from MongoDB"""
-
-        # Connect to MongoDB
-        mongodb_uri = os.getenv('MONGODB_URI')
-        if not mongodb_uri:
-            raise ValueError("MONGODB_URI not configured")
-
-        client = MongoClient(mongodb_uri)
-        db = client['podinsight']
-        results_collection = db['sentiment_results']
-
-        try:
-            # Build query for requested topics and weeks
-            query = {
-                "topic": {"$in": topics}
-            }
-
-            # Get results sorted by year and week
-            cursor = results_collection.find(query).sort([
-                ("year", 1),
-                ("week", 1),
-                ("topic", 1)
-            ])
-
-            all_results = list(cursor)
-            logger.info(f"Found {len(all_results)} pre-computed results")
-
-            # Filter to requested number of weeks (get most recent)
-            if all_results:
-                # Group by week to get all topics for the most recent weeks
-                weeks_data = {}
-                for result in all_results:
-                    week_key = f"{result['year']}-{result['week']}"
-                    if week_key not in weeks_data:
-                        weeks_data[week_key] = []
-                    weeks_data[week_key].append(result)
-
-                # Sort weeks and take the most recent ones
-                sorted_weeks = sorted(weeks_data.keys(), reverse=True)
-                recent_weeks = sorted_weeks[:weeks]
-
-                # Flatten results from recent weeks
-                filtered_results = []
-                for week_key in reversed(recent_weeks):  # Reverse to show oldest first
-                    filtered_results.extend(weeks_data[week_key])
-
-                all_results = filtered_results
-
-            # Convert to API format
-            sentiment_data = []
-            for result in all_results:
-                # Only include requested topics
-                if result['topic'] in topics:
-                    sentiment_data.append({
-                        "topic": result['topic'],
-                        "week": result['week'],
-                        "sentiment": result['sentiment_score'],
-                        "episodeCount": result['episode_count'],
-                        "chunkCount": result.get('chunk_count', 0),
-                        "confidence": result.get('confidence', 0.0),
-                        "keywordsFound": result.get('keywords_found', []),
-                        "computedAt": result['computed_at'].isoformat() if result.get('computed_at') else None,
-                        "metadata": result.get('metadata', {})
-                    })
-
-            # If no pre-computed data found, return empty structure
-            if not sentiment_data:
-                logger.warning("No pre-computed sentiment data found, returning empty structure")
-                sentiment_data = self._generate_empty_structure(weeks, topics)
-
-            # Ensure we have data for all requested topics and weeks
-            sentiment_data = self._fill_missing_data(sentiment_data, weeks, topics)
-
-            return sentiment_data
-
-        finally:
-            client.close()
+        """Get pre-computed sentiment data from MongoDB (cached until the next batch run)"""
+        results_collection = get_mongo_db()['sentiment_results']
+
+        # Cheap indexed probe: the cache is valid until a batch run writes newer results
+        with get_query_metrics().track("mongodb", "sentiment_latest_computed_at"):
+            latest = results_collection.find_one({}, {"_id": 0, "computed_at": 1}, sort=[("computed_at", DESCENDING)])
+        latest_computed_at = latest.get("computed_at") if latest else None
+
+        cache_key = (weeks, tuple(topics))
+        cached = _response_cache.get(cache_key)
+        if cached is not None and cached[0] == latest_computed_at:
+            return cached[1]
+
+        week_labels = requested_week_labels(weeks)
+
+        # Bounded by the unique (topic, week, year) index instead of all history
+        query = {
+            "topic": {"$in": topics},
+            "week": {"$in": week_labels},
+            "year": {"$in": batch_window_years()}
+        }
+        with get_query_metrics().track("mongodb", "sentiment_results") as timer:
+            all_results = list(results_collection.find(query, RESULT_PROJECTION))
+            timer.rows = len(all_results)
+        logger.info(f"Found {len(all_results)} pre-computed results")
+
+        # Around New Year a label can exist for two years; keep the latest run's
+        latest_by_cell = {}
+        for result in all_results:
+            key = (result['topic'], result['week'])
+            current = latest_by_cell.get(key)
+            if current is None or (result.get('computed_at') or datetime.min) > (current.get('computed_at') or datetime.min):
+                latest_by_cell[key] = result
+
+        # Convert to API format
+        sentiment_data = []
+        for result in latest_by_cell.values():
+            sentiment_data.append({
+                "topic": result['topic'],
+                "week": result['week'],
+                "sentiment": result['sentiment_score'],
+                "episodeCount": result['episode_count'],
+                "chunkCount": result.get('chunk_count', 0),
+                "confidence": result.get('confidence', 0.0),
+                "keywordsFound": result.get('keywords_found', []),
+                "computedAt": result['computed_at'].isoformat() if result.get('computed_at') else None,
+                "metadata": result.get('metadata', {})
+            })
+
+        # If no pre-computed data found, return empty structure
+        if not sentiment_data:
+            logger.warning("No pre-computed sentiment data found, returning empty structure")
+            sentiment_data = self._generate_empty_structure(week_labels, topics)
+
+        # Ensure we have data for all requested topics and weeks
+        sentiment_data = self._fill_missing_data(sentiment_data, week_labels, topics)
+
+        _response_cache.set(cache_key, (latest_computed_at, sentiment_data))
+        return sentiment_data
 
-    def _generate_empty_structure(self, weeks: int, topics: List[str]) -> List[Dict[str, Any]]:
+    def _generate_empty_structure(self, week_labels: List[str], topics: List[str]) -> List[Dict[str, Any]]:
         """Generate empty sentiment structure when no data is available"""
         logger.info("Generating empty sentiment structure (batch not run yet)")
 
         empty_data = []
-        for week_num in range(1, weeks + 1):
+        for week_label in week_labels:
             for topic in topics:
                 empty_data.append({
                     "topic": topic,
-                    "week": f"W{week_num}",
+                    "week": week_label,
                     "sentiment": 0.0,
                     "episodeCount": 0,
                     "chunkCount": 0,
@@ -184,7 +193,7 @@ class handler(BaseHTTPRequestHandler):
 
         return empty_data
 
-    def _fill_missing_data(self, sentiment_data: List[Dict], weeks: int, topics: List[str]) -> List[Dict[str, Any]]:
+    def _fill_missing_data(self, sentiment_data: List[Dict], week_labels: List[str], topics: List[str]) -> List[Dict[str, Any]]:
         """Fill in missing combinations of topics and weeks with zeros"""
 
         # Create a set of existing combinations
@@ -193,8 +202,7 @@ class handler(BaseHTTPRequestHandler):
             existing.add((item['topic'], item['week']))
 
         # Add missing combinations
-        for week_num in range(1, weeks + 1):
-            week_label = f"W{week_num}"
+        for week_label in week_labels:
             for topic in topics:
                 if (topic, week_label) not in existing:
                     sentiment_data.append({
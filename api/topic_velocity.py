@@ -10,15 +10,36 @@ logging.info("[BOOT-FILE] %s  commit=%s",
              __file__,
              os.getenv("VERCEL_GIT_COMMIT_SHA", "?"))
 
-from fastapi import FastAPI, HTTPException, Request
+from fastapi import FastAPI, HTTPException, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from typing import List, Dict, Optional, Any
+from typing import List, Dict, Optional, Any, Tuple
 from datetime import datetime, timedelta, timezone
 from dateutil import parser
 import os
 import logging
 from supabase import create_client, Client
-from lib.database import get_pool, SupabasePool
+from lib.database import get_pool, is_missing_relation, SupabasePool
+from lib.etag import make_etag, etag_matches, not_modified, set_etag
+from lib.admission import OverloadedError, current_client_key, get_admission_states
+from lib.cache import TTLCache
+from lib.cancellation import ClientDisconnected, cancel_on_disconnect
+from lib.circuit_breaker import get_breaker_states
+from lib.entity_graph import EntityGraphNotReady, get_entity_graph_service
+from lib.instrumentation import get_query_metrics
+from lib.synthesis_cache import get_synthesis_cache
+from lib.entity_index import (
+    query_entity_index,
+    is_generic_entity,
+    entity_trend,
+    format_recent_mentions
+)
+from lib.corpus_stats import (
+    get_corpus_stats_service,
+    get_version_stamps,
+    newest_value_query,
+    row_count_query,
+    TOPIC_WEEKLY_ROLLUP
+)
 # Use lightweight version for Vercel deployment
 # from .search import search_handler, SearchRequest, SearchResponse
 from .search_lightweight_768d import search_handler_lightweight_768d as search_handler, SearchRequest, SearchResponse
@@ -153,8 +174,100 @@ async def debug_mongodb():
             "error": str(e)
         }
 
+# Weekly counts cache (rollup itself: scripts/sql/topic_mention_weekly.sql)
+VELOCITY_CACHE_TTL = 300  # 5 minutes; version stamps also invalidate entries
+_velocity_cache = TTLCache(max_size=256, ttl=VELOCITY_CACHE_TTL)
+
+def velocity_week_keys(start_date: datetime, end_date: datetime) -> List[str]:
+    """ISO week keys ("2025-W01") from start_date to end_date, oldest first"""
+    week_keys = []
+    current_date = end_date
+
+    # Generate weeks from end_date backwards to start_date
+    while current_date >= start_date:
+        # Get ISO week number and year
+        iso_year, iso_week, _ = current_date.isocalendar()
+        week_keys.append(f"{iso_year}-W{str(iso_week).zfill(2)}")
+
+        # Move to previous week
+        current_date -= timedelta(weeks=1)
+
+    # Sort chronologically (oldest first)
+    week_keys.reverse()
+    return week_keys
+
+async def fetch_weekly_counts(
+    pool: SupabasePool,
+    topic_list: List[str],
+    week_keys: List[str]
+) -> Dict[str, Dict[str, int]]:
+    """
+    Mention counts as {week_key: {topic: count}} for the requested weeks
+
+    Reads the weekly rollup (O(topics x weeks) rows). Falls back to counting raw
+    topic_mentions rows if the rollup table has not been created yet (a missing
+    relation is not retried); any other error, including an open Supabase
+    breaker, propagates.
+    """
+    wanted = set(week_keys)
+    years = sorted({int(key.split("-W")[0]) for key in week_keys})
+    week_numbers = sorted({int(key.split("-W")[1]) for key in week_keys})
+
+    def query_rollup(client):
+        return client.table(TOPIC_WEEKLY_ROLLUP) \
+            .select("topic_name, iso_year, iso_week, mention_count") \
+            .in_("topic_name", topic_list) \
+            .in_("iso_year", years) \
+            .in_("iso_week", week_numbers) \
+            .execute()
+
+    try:
+        response = await pool.execute_with_retry(query_rollup, name="topic_weekly_counts")
+    except Exception as e:
+        if not is_missing_relation(e):
+            raise
+        logger.warning(f"Weekly rollup not deployed, counting raw mentions: {str(e)}")
+        return await count_weekly_mentions_from_raw(pool, topic_list)
+
+    weekly_data: Dict[str, Dict[str, int]] = {}
+    for row in response.data:
+        week_key = f"{row['iso_year']}-W{str(row['iso_week']).zfill(2)}"
+        if week_key not in wanted:
+            continue  # year/week cross product returns a few extra cells
+        counts = weekly_data.setdefault(week_key, {})
+        counts[row["topic_name"]] = counts.get(row["topic_name"], 0) + row["mention_count"]
+    return weekly_data
+
+async def count_weekly_mentions_from_raw(
+    pool: SupabasePool,
+    topic_list: List[str]
+) -> Dict[str, Dict[str, int]]:
+    """Legacy path: scan every topic_mentions row and bucket by week in Python"""
+    def query_topic_mentions(client):
+        return client.table("topic_mentions") \
+            .select("*, episodes!inner(published_at)") \
+            .in_("topic_name", topic_list) \
+            .execute()
+
+    response = await pool.execute_with_retry(query_topic_mentions, name="topic_mentions_weekly_raw")
+
+    weekly_data: Dict[str, Dict[str, int]] = {}
+    for mention in response.data:
+        topic = mention["topic_name"]
+        week_num = mention["week_number"]  # Already stored as string like "1", "2", etc.
+
+        # Parse the episode's published_at date to get year
+        published_at = parser.parse(mention["episodes"]["published_at"])
+        week_key = f"{published_at.year}-W{week_num.zfill(2)}"  # e.g., "2025-W01"
+
+        counts = weekly_data.setdefault(week_key, {})
+        counts[topic] = counts.get(topic, 0) + 1  # Each row is one mention
+    return weekly_data
+
 @app.get("/api/topic-velocity")
 async def get_topic_velocity(
+    request: Request,
+    response: Response,
     weeks: Optional[int] = 12,
     topics: Optional[str] = None
 ) -> Dict[str, Any]:
@@ -193,121 +306,59 @@ async def get_topic_velocity(
         else:
             topic_list = default_topics
 
-        # Define query function for the pool (sync function since Supabase client is sync)
-        # FIXED: Query ALL mentions to ensure consistent historical data
-        def query_topic_mentions(client):
-            return client.table("topic_mentions") \
-                .select("*, episodes!inner(published_at)") \
-                .in_("topic_name", topic_list) \
-                .execute()
-
-        # Execute with retry
-        query_start = time.time()
-        response = await pool.execute_with_retry(query_topic_mentions)
-        query_time = (time.time() - query_start) * 1000
-        logger.info(f"Topic mentions query took {query_time:.2f}ms")
-
-        # Process data to create Recharts-compatible format
-        # Group mentions by week and count
-        process_start = time.time()
-        weekly_data = {}
-
-        for mention in response.data:
-            topic = mention["topic_name"]
-            week_num = mention["week_number"]  # Already stored as string like "1", "2", etc.
+        # Corpus stats (episode count, date range, version) come from the shared cache
+        stats = await get_corpus_stats_service().get(pool)
 
-            # Parse the episode's published_at date to get year
-            # Use dateutil.parser for robust datetime parsing
-            published_at = parser.parse(mention["episodes"]["published_at"])
-            year = published_at.year
+        # Answer unchanged polls before fetching any mentions
+        # The week window moves with the calendar, so the date is part of the version
+        etag = make_etag("topic-velocity", stats.version, weeks, topic_list, end_date.date())
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            return not_modified(etag)
 
-            # Convert week number to ISO week format
-            week_key = f"{year}-W{week_num.zfill(2)}"  # e.g., "2025-W01"
-
-            if week_key not in weekly_data:
-                weekly_data[week_key] = {topic: 0 for topic in topic_list}
-
-            if topic in weekly_data[week_key]:
-                weekly_data[week_key][topic] += 1  # Each row is one mention
-
-        # Sort weeks chronologically
-        sorted_weeks = sorted(weekly_data.keys())
-
-        # FIXED: Generate ALL weeks in the requested range (including empty weeks)
+        # Generate ALL weeks in the requested range (including empty weeks)
         # This ensures we return exactly the number of weeks requested
-        all_weeks_in_range = []
-        current_date = end_date
-
-        # Generate weeks from end_date backwards to start_date
-        while current_date >= start_date:
-            # Get ISO week number and year
-            iso_year, iso_week, _ = current_date.isocalendar()
-            week_key = f"{iso_year}-W{str(iso_week).zfill(2)}"
-            all_weeks_in_range.append(week_key)
-
-            # Move to previous week
-            current_date -= timedelta(weeks=1)
-
-        # Sort chronologically (oldest first)
-        all_weeks_in_range.reverse()
-
-        logger.info(f"Generated {len(all_weeks_in_range)} weeks for requested range, {len(sorted_weeks)} weeks have data")
-
-        # Build the data structure for Recharts
-        data_by_topic = {topic: [] for topic in topic_list}
-
-        for week in all_weeks_in_range:
-            # Parse week to get date range for display
-            year, week_num = week.split('-W')
-            week_num = int(week_num)
-
-            # Calculate the start date of the week
-            jan1 = datetime(int(year), 1, 1)
-            week_start = jan1 + timedelta(weeks=week_num-1) - timedelta(days=jan1.weekday())
-            week_end = week_start + timedelta(days=6)
-
-            date_range = f"{week_start.strftime('%b %-d')}-{week_end.strftime('%-d')}"
-
-            # Add data point for each topic
-            for topic in topic_list:
-                # Check if we have data for this week, otherwise default to 0
-                mentions = 0
-                if week in weekly_data and topic in weekly_data[week]:
-                    mentions = weekly_data[week][topic]
-
-                data_by_topic[topic].append({
-                    "week": week,
-                    "mentions": mentions,
-                    "date": date_range
-                })
-
-        # Get total episodes count
-        def query_total_episodes(client):
-            return client.table("episodes").select("id", count="exact").execute()
-
-        total_episodes_response = await pool.execute_with_retry(query_total_episodes)
-        total_episodes = total_episodes_response.count if hasattr(total_episodes_response, 'count') else 1171
-
-        # Get date range from episodes
-        def query_date_range_start(client):
-            return client.table("episodes") \
-                .select("published_at") \
-                .order("published_at", desc=False) \
-                .limit(1) \
-                .execute()
-
-        def query_date_range_end(client):
-            return client.table("episodes") \
-                .select("published_at") \
-                .order("published_at", desc=True) \
-                .limit(1) \
-                .execute()
-
-        date_range_response = await pool.execute_with_retry(query_date_range_start)
-        date_range_response_end = await pool.execute_with_retry(query_date_range_end)
-
-        start_date_str = date_range_response.data[0]["published_at"][:10] if date_range_response.data else "2025-01-01"
-        end_date_str = date_range_response_end.data[0]["published_at"][:10] if date_range_response_end.data else "2025-06-14"
+        all_weeks_in_range = velocity_week_keys(start_date, end_date)
+
+        # Weekly counts are cached per (topics, weeks, day) and data version
+        process_start = time.time()
+        cache_key = (tuple(topic_list), weeks, end_date.date().isoformat(), stats.version)
+        data_by_topic = _velocity_cache.get(cache_key)
+
+        if data_by_topic is None:
+            query_start = time.time()
+            weekly_data = await fetch_weekly_counts(pool, topic_list, all_weeks_in_range)
+            query_time = (time.time() - query_start) * 1000
+            logger.info(f"Weekly topic counts took {query_time:.2f}ms")
+
+            # Build the data structure for Recharts
+            data_by_topic = {topic: [] for topic in topic_list}
+
+            for week in all_weeks_in_range:
+                # Parse week to get date range for display
+                year, week_num = week.split('-W')
+                week_num = int(week_num)
+
+                # Calculate the start date of the week
+                jan1 = datetime(int(year), 1, 1)
+                week_start = jan1 + timedelta(weeks=week_num-1) - timedelta(days=jan1.weekday())
+                week_end = week_start + timedelta(days=6)
+
+                date_range = f"{week_start.strftime('%b %-d')}-{week_end.strftime('%-d')}"
+
+                # Add data point for each topic
+                for topic in topic_list:
+                    # Check if we have data for this week, otherwise default to 0
+                    mentions = weekly_data.get(week, {}).get(topic, 0)
+
+                    data_by_topic[topic].append({
+                        "week": week,
+                        "mentions": mentions,
+                        "date": date_range
+                    })
+
+            _velocity_cache.set(cache_key, data_by_topic)
+        else:
+            logger.info(f"Topic velocity cache hit for {len(topic_list)} topics, {weeks} weeks")
 
         # Log processing time
         process_time = (time.time() - process_start) * 1000
@@ -315,11 +366,12 @@ async def get_topic_velocity(
         logger.info(f"Data processing took {process_time:.2f}ms")
         logger.info(f"Total request time: {total_time:.2f}ms")
 
+        set_etag(response, etag)
         return {
             "data": data_by_topic,
             "metadata": {
-                "total_episodes": total_episodes,
-                "date_range": f"{start_date_str} to {end_date_str}",
+                "total_episodes": stats.total_episodes if stats.total_episodes is not None else 1171,
+                "date_range": stats.date_range(),
                 "data_completeness": "topics_only"  # Note: entities available in v2
             }
         }
@@ -347,14 +399,20 @@ async def health_check() -> Dict[str, Any]:
         pool_stats = None
         db_connected = False
 
+    # Dependencies currently failing fast
+    breakers = get_breaker_states()
+    open_breakers = [name for name, state in breakers.items() if state["state"] != "closed"]
+
     return {
-        "status": "healthy" if (has_hf_key and db_connected) else "degraded",
+        "status": "healthy" if (has_hf_key and db_connected and not open_breakers) else "degraded",
         "timestamp": datetime.now().isoformat(),
         "checks": {
             "huggingface_api_key": "configured" if has_hf_key else "missing",
             "database": "connected" if db_connected else "disconnected",
-            "connection_pool": pool_stats if pool_stats else "unavailable"
+            "connection_pool": pool_stats if pool_stats else "unavailable",
+            "circuit_breakers": breakers
         },
+        "degraded_dependencies": open_breakers,
         "version": "1.0.0"
     }
 
@@ -365,29 +423,45 @@ async def get_pool_stats() -> Dict[str, Any]:
     return {
         "success": True,
         "stats": pool.get_stats(),
+        "corpus_stats": get_corpus_stats_service().get_stats(),
+        "query_stats": get_query_metrics().get_stats(),
+        "synthesis_cache": get_synthesis_cache().get_stats(),
+        "admission": get_admission_states(),
         "timestamp": datetime.now().isoformat()
     }
 
+@app.get("/api/metrics")
+async def get_prometheus_metrics() -> Response:
+    """Query latency, retry, wait and row metrics in Prometheus text format"""
+    pool_stats = get_pool().get_stats()
+    gauges = {
+        "podinsight_supabase_active_connections": pool_stats["active_connections"],
+        "podinsight_supabase_max_connections": pool_stats["max_connections"],
+        "podinsight_supabase_running_queries": pool_stats["executor"]["running_queries"],
+        "podinsight_supabase_queued_queries": pool_stats["executor"]["queued_queries"]
+    }
+    for stage, state in get_admission_states().items():
+        gauges[f"podinsight_admission_{stage}_active"] = state["active"]
+        gauges[f"podinsight_admission_{stage}_queued"] = state["queued"]
+        gauges[f"podinsight_admission_{stage}_shed"] = state["shed"]
+    return Response(
+        content=get_query_metrics().prometheus_text(gauges),
+        media_type="text/plain; version=0.0.4"
+    )
+
 @app.get("/api/topics")
-async def get_available_topics() -> Dict[str, List[str]]:
+async def get_available_topics() -> Dict[str, Any]:
     """Get list of all available topics being tracked"""
     pool = get_pool()
 
     try:
-        # Define query function
-        def query_topics(client):
-            return client.table("topic_mentions") \
-                .select("topic_name") \
-                .execute()
-
-        # Execute with retry
-        response = await pool.execute_with_retry(query_topics)
-
-        unique_topics = list(set([r["topic_name"] for r in response.data]))
+        # Distinct topic catalog from the shared corpus stats cache
+        stats = await get_corpus_stats_service().get(pool)
+        unique_topics = stats.topics
 
         return {
             "success": True,
-            "topics": sorted(unique_topics),
+            "topics": unique_topics,
             "count": len(unique_topics)
         }
 
@@ -400,6 +474,8 @@ async def get_available_topics() -> Dict[str, List[str]]:
 
 @app.get("/api/signals")
 async def get_topic_signals(
+    request: Request,
+    response: Response,
     signal_type: Optional[str] = None,
     limit: int = 10
 ) -> Dict[str, Any]:
@@ -423,6 +499,17 @@ async def get_topic_signals(
     try:
         pool = get_pool()
 
+        # Signals are rewritten by the batch job; the newest calculated_at versions them
+        etag = None
+        stamps = await get_version_stamps(pool, [
+            newest_value_query("topic_signals", "calculated_at"),
+            row_count_query("topic_signals")
+        ])
+        if stamps is not None:
+            etag = make_etag("signals", stamps, signal_type, limit)
+            if etag_matches(request.headers.get("if-none-match"), etag):
+                return not_modified(etag)
+
         # Build query
         def query_signals(client):
             query = client.table("topic_signals") \
@@ -435,7 +522,7 @@ async def get_topic_signals(
             return query.limit(limit).execute()
 
         # Execute query
-        signals_response = await pool.execute_with_retry(query_signals)
+        signals_response = await pool.execute_with_retry(query_signals, name="topic_signals")
 
         # Group signals by type
         signals_by_type = {}
@@ -529,6 +616,7 @@ async def get_topic_signals(
                             f"{corr['topics'][0]} + {corr['topics'][1]} discussed in {corr['episode_count']} episodes"
                         )
 
+        set_etag(response, etag)
         return {
             "signals": signals_by_type,
             "signal_messages": signal_messages,
@@ -546,8 +634,97 @@ async def get_topic_signals(
             detail=f"Failed to fetch signals: {str(e)}"
         )
 
+async def aggregate_entities_from_mentions(
+    pool: SupabasePool,
+    search: Optional[str],
+    entity_type: Optional[str],
+    limit: int,
+    date_filter: Optional[datetime]
+) -> Tuple[List[Dict[str, Any]], int]:
+    """
+    Aggregate entities from raw extracted_entities rows
+
+    Used for timeframe-filtered requests and when the entity index is missing.
+    Returns (top entities in API shape, distinct entity count).
+    """
+    # Build the entity search query
+    def query_entities(client):
+        # Base query with episode join for meaningful episode info
+        query = client.table("extracted_entities") \
+            .select("entity_name, entity_type, episode_id, episodes!inner(published_at, podcast_name, duration_seconds)")
+
+        # Add search filter if provided
+        if search:
+            query = query.ilike("entity_name", f"%{search}%")
+
+        # Add type filter if provided (using 'entity_type' field - playbook was wrong)
+        if entity_type:
+            query = query.eq("entity_type", entity_type.upper())
+
+        # Add date filter if specified
+        if date_filter:
+            query = query.gte("episodes.published_at", date_filter.isoformat())
+
+        return query.execute()
+
+    entities_response = await pool.execute_with_retry(query_entities, name="entities_raw")
+
+    # Aggregate entity data (episodes keyed by id, dates parsed once per episode)
+    entity_aggregates = {}
+    for entity_record in entities_response.data:
+        entity_name = entity_record["entity_name"]
+        aggregate = entity_aggregates.get(entity_name)
+        if aggregate is None:
+            aggregate = entity_aggregates[entity_name] = {
+                "name": entity_name,
+                "type_counts": {},
+                "mention_count": 0,
+                "episodes": {}
+            }
+
+        aggregate["mention_count"] += 1
+        type_counts = aggregate["type_counts"]
+        type_counts[entity_record["entity_type"]] = type_counts.get(entity_record["entity_type"], 0) + 1
+
+        episode_id = entity_record["episode_id"]
+        if episode_id not in aggregate["episodes"]:
+            episode_data = entity_record["episodes"]
+            aggregate["episodes"][episode_id] = {
+                "published_at": parser.parse(episode_data["published_at"]),
+                "podcast_name": episode_data.get("podcast_name", "Unknown Podcast"),
+                "duration_seconds": episode_data.get("duration_seconds", 0)
+            }
+
+    # A name found under several types is reported under its most frequent one (as in entity_index)
+    for aggregate in entity_aggregates.values():
+        aggregate["type"] = min(aggregate["type_counts"], key=lambda t: (-aggregate["type_counts"][t], t))
+
+    # Filter out unhelpful single-name PERSON entities, then sort by mention count
+    sorted_entities = sorted(
+        (entity for entity in entity_aggregates.values() if not is_generic_entity(entity["name"], entity["type"])),
+        key=lambda x: x["mention_count"],
+        reverse=True
+    )[:limit]
+
+    # Trends compare the last 4 weeks with the previous period
+    results = []
+    for entity in sorted_entities:
+        episodes = sorted(entity["episodes"].values(), key=lambda ep: ep["published_at"], reverse=True)
+        results.append({
+            "name": entity["name"],
+            "type": entity["type"],
+            "mention_count": entity["mention_count"],
+            "episode_count": len(episodes),
+            "trend": entity_trend([ep["published_at"] for ep in episodes], len(episodes)),
+            "recent_mentions": format_recent_mentions(episodes[:3])
+        })
+
+    return results, len(entity_aggregates)
+
 @app.get("/api/entities")
 async def get_entities(
+    request: Request,
+    response: Response,
     search: Optional[str] = None,
     type: Optional[str] = None,
     limit: int = 20,
@@ -592,143 +769,35 @@ async def get_entities(
             if date_filter.tzinfo is None:
                 date_filter = date_filter.replace(tzinfo=timezone.utc)
 
-        # Build the entity search query
-        def query_entities(client):
-            # Base query with episode join for meaningful episode info
-            query = client.table("extracted_entities") \
-                .select("entity_name, entity_type, episode_id, episodes!inner(published_at, podcast_name, duration_seconds)")
-
-            # Add search filter if provided
-            if search:
-                query = query.ilike("entity_name", f"%{search}%")
-
-            # Add type filter if provided (using 'entity_type' field - playbook was wrong)
-            if type:
-                query = query.eq("entity_type", type.upper())
-
-            # Add date filter if specified
-            if date_filter:
-                query = query.gte("episodes.published_at", date_filter.isoformat())
-
-            return query.execute()
-
-        # Execute query
-        entities_response = await pool.execute_with_retry(query_entities)
-
-        # Aggregate entity data
-        entity_aggregates = {}
-
-        for entity_record in entities_response.data:
-            entity_name = entity_record["entity_name"]
-            entity_type = entity_record["entity_type"]
-            episode_data = entity_record["episodes"]
-
-            if entity_name not in entity_aggregates:
-                entity_aggregates[entity_name] = {
-                    "name": entity_name,
-                    "type": entity_type,
-                    "mention_count": 0,
-                    "episode_count": 0,
-                    "episodes": [],
-                    "recent_mentions": []
-                }
-
-            # Increment counts
-            entity_aggregates[entity_name]["mention_count"] += 1
-
-            # Track unique episodes
-            episode_id = entity_record["episode_id"]
-            if episode_id not in [ep["episode_id"] for ep in entity_aggregates[entity_name]["episodes"]]:
-                entity_aggregates[entity_name]["episode_count"] += 1
-
-                # Add episode info with meaningful title
-                published_date = parser.parse(episode_data["published_at"])
-                podcast_name = episode_data.get("podcast_name", "Unknown Podcast")
-                duration_seconds = episode_data.get("duration_seconds", 0)
-
-                # Create meaningful episode title: "Podcast Name - 65 min (Jun 12, 2025)"
-                if duration_seconds and duration_seconds > 0:
-                    duration_minutes = round(duration_seconds / 60)
-                    display_title = f"{podcast_name} - {duration_minutes} min ({published_date.strftime('%b %d, %Y')})"
-                else:
-                    display_title = f"{podcast_name} ({published_date.strftime('%b %d, %Y')})"
-
-                entity_aggregates[entity_name]["episodes"].append({
-                    "episode_id": episode_id,
-                    "episode_title": display_title,
-                    "published_at": published_date.isoformat(),
-                    "date": published_date.strftime("%B %d, %Y")
-                })
-
-        # Filter out unhelpful single-name PERSON entities
-        filtered_entities = []
-        for entity in entity_aggregates.values():
-            entity_name = entity["name"]
-            entity_type = entity["type"]
-
-            # Skip single-name PERSON entities that are too generic
-            if entity_type == "PERSON" and " " not in entity_name:
-                # Common first names that aren't useful without context
-                generic_names = {"Tom", "Tommy", "Mark", "Ben", "Mike", "John", "David", "Chris", "Matt", "Steve", "Dan", "Paul", "Tim", "Rob", "Jim", "Sam", "Alex", "Ryan", "Brian", "Kevin", "Jason", "Jeff", "Nick", "Eric", "Sean"}
-                if entity_name in generic_names:
-                    continue
-
-            filtered_entities.append(entity)
-
-        # Sort entities by mention count and limit results
-        sorted_entities = sorted(
-            filtered_entities,
-            key=lambda x: x["mention_count"],
-            reverse=True
-        )[:limit]
-
-        # Calculate trends for top entities (compare recent vs older mentions)
-        for entity in sorted_entities:
-            recent_count = 0
-            older_count = 0
-            cutoff_date = datetime.now() - timedelta(weeks=4)
-            cutoff_date = cutoff_date.replace(tzinfo=None)  # Make naive for comparison
-
-            for episode in entity["episodes"]:
-                episode_date = parser.parse(episode["published_at"])
-                # Ensure both dates are naive for comparison
-                if episode_date.tzinfo:
-                    episode_date = episode_date.replace(tzinfo=None)
-                if episode_date > cutoff_date:
-                    recent_count += 1
-                else:
-                    older_count += 1
-
-            # Determine trend
-            if recent_count > older_count * 1.5:
-                entity["trend"] = "up"
-            elif older_count > recent_count * 1.5:
-                entity["trend"] = "down"
-            else:
-                entity["trend"] = "stable"
-
-            # Add recent mentions (last 3)
-            recent_episodes = sorted(
-                entity["episodes"],
-                key=lambda x: x["published_at"],
-                reverse=True
-            )[:3]
-
-            entity["recent_mentions"] = [
-                {
-                    "episode_title": ep["episode_title"],
-                    "date": ep["date"],
-                    "context": f"Mentioned in {ep['episode_title']}"
-                }
-                for ep in recent_episodes
-            ]
-
-            # Clean up episodes list for response
-            del entity["episodes"]
+        # Answer unchanged polls before scanning entity rows
+        etag = None
+        stamps, stats = await asyncio.gather(
+            get_version_stamps(pool, [row_count_query("extracted_entities")]),
+            get_corpus_stats_service().get(pool)
+        )
+        if stamps is not None:
+            # Trends are relative to today, so the date is part of the version
+            etag = make_etag("entities", stamps, stats.version, search, type, limit, timeframe, datetime.now().date())
+            if etag_matches(request.headers.get("if-none-match"), etag):
+                return not_modified(etag)
+
+        # Precomputed index serves top-N and name search; arbitrary timeframes
+        # (or a missing index) fall back to aggregating raw mentions
+        sorted_entities = None
+        if not timeframe:
+            try:
+                sorted_entities, total_entities = await query_entity_index(pool, search, type, limit)
+            except Exception as e:
+                if not is_missing_relation(e):
+                    raise
+                logger.warning(f"Entity index not deployed, aggregating raw mentions: {str(e)}")
 
-        # Get total count for pagination info
-        total_entities = len(entity_aggregates)
+        if sorted_entities is None:
+            sorted_entities, total_entities = await aggregate_entities_from_mentions(
+                pool, search, type, limit, date_filter
+            )
 
+        set_etag(response, etag)
         return {
             "success": True,
             "entities": sorted_entities,
@@ -752,6 +821,80 @@ async def get_entities(
             detail=f"Failed to fetch entities: {str(e)}"
         )
 
+@app.get("/api/entities/graph")
+async def get_entity_graph(
+    entity: Optional[str] = None,
+    type: Optional[str] = None,
+    neighbour_type: Optional[str] = None,
+    k: int = 10,
+    min_count: int = 2,
+    sort: str = "count",
+    nodes: int = 25
+) -> Dict[str, Any]:
+    """
+    Entity co-mention graph (which companies, people and funds are discussed together)
+
+    Query parameters:
+    - entity: Entity name; returns its top-k neighbours. Omit for a graph of the top entities
+    - type: Entity type of `entity`, or of the nodes when no entity is given (PERSON, ORG, GPE, MONEY)
+    - neighbour_type: Only return neighbours of this type
+    - k: Number of neighbours (default 10, max 100)
+    - min_count: Minimum shared episodes for a neighbour/edge (default 2)
+    - sort: 'count' (shared episodes) or 'pmi' (pointwise mutual information)
+    - nodes: Number of nodes when no entity is given (default 25, max 100)
+
+    Answers 503 with Retry-After until the graph has been built (see
+    scripts/build_entity_graph.py).
+
+    Example:
+    ```
+    GET /api/entities/graph?entity=Sequoia&neighbour_type=ORG&k=10
+    ```
+    """
+    if sort not in ("count", "pmi"):
+        raise HTTPException(status_code=400, detail="sort must be 'count' or 'pmi'")
+    k = min(max(k, 1), 100)
+    nodes = min(max(nodes, 2), 100)
+
+    try:
+        pool = get_pool()
+        graph = await get_entity_graph_service().get(pool)
+        metadata = graph.get_stats()
+
+        if not entity:
+            subgraph = graph.subgraph(graph.top_entities(nodes, type), min_count=min_count)
+            return {"success": True, **subgraph, "metadata": metadata}
+
+        entity_id = graph.find_entity(entity, type)
+        if entity_id is None:
+            raise HTTPException(status_code=404, detail=f"Entity '{entity}' not found")
+
+        return {
+            "success": True,
+            "entity": {
+                "name": graph.entity_names[entity_id],
+                "type": graph.entity_types[entity_id],
+                "episode_count": int(graph.degree[entity_id])
+            },
+            "neighbours": graph.neighbours(entity_id, k=k, min_count=min_count, sort=sort, neighbour_type=neighbour_type),
+            "metadata": metadata
+        }
+
+    except HTTPException:
+        raise
+    except EntityGraphNotReady as e:
+        raise HTTPException(
+            status_code=503,
+            detail=str(e),
+            headers={"Retry-After": str(max(int(e.retry_after), 1))}
+        )
+    except Exception as e:
+        logger.error(f"Error building entity graph: {str(e)}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to fetch entity graph: {str(e)}"
+        )
+
 # Removed test endpoints to stay under 12 function limit
 
 @app.post("/api/search", response_model=SearchResponse)
@@ -770,6 +913,8 @@ async def search_episodes_endpoint(
     - Returns relevant episodes with metadata and excerpts
     - Implements query caching for performance
     - Rate limited to 20 requests per minute per IP
+    - Cancels in-flight work if the client disconnects
+    - Sheds load with 429/503 and Retry-After when its stages are saturated
 
     Example:
     ```
@@ -781,7 +926,20 @@ async def search_episodes_endpoint(
     }
     ```
     """
-    return await search_handler(search_request)
+    # Fair queuing in the stage limiters is per client
+    current_client_key.set(get_remote_address(request))
+    try:
+        return await cancel_on_disconnect(request, search_handler(search_request), "search")
+    except ClientDisconnected:
+        # Nobody is listening; 499 is the conventional "client closed request"
+        return Response(status_code=499)
+    except OverloadedError as e:
+        logger.warning(f"Search shed: {e}")
+        raise HTTPException(
+            status_code=e.status_code,
+            detail="Search is busy, please retry shortly",
+            headers={"Retry-After": str(max(int(e.retry_after), 1))}
+        )
 
 # Test endpoint disabled for production deployment
 # from .test_search import test_search_handler, TestSearchRequest, TestSearchResponse
@@ -0,0 +1,197 @@
+"""
+Admission control for expensive search stages
+Only the per-IP rate limit on /api/search existed, so a burst from a few
+clients could run any number of Modal calls, context expansions and OpenAI
+calls at once, exhausting OpenAI rate limits and MongoDB pools for everyone.
+
+One limiter per stage (Modal, expansion, synthesis):
+- at most max_concurrent calls run; the rest wait in a bounded queue
+- waiters are served round-robin across client keys, so one client's burst
+  queues behind itself instead of in front of everyone else
+- a call is shed with OverloadedError instead of queueing when the queue
+  is full (503), its client already has max_queue_per_client waiters (429),
+  or it has waited max_wait_seconds (503); retry_after is estimated from
+  queue depth and recent slot hold times
+
+The client key comes from the `current_client_key` context variable, set by
+the endpoint and inherited by the tasks it spawns.
+"""
+import asyncio
+import contextvars
+import math
+import os
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from typing import Any, Deque, Dict, Optional
+
+DEFAULT_CLIENT_KEY = "anonymous"
+MAX_RETRY_AFTER_SECONDS = 30
+
+current_client_key: contextvars.ContextVar[str] = contextvars.ContextVar(
+    "admission_client_key", default=DEFAULT_CLIENT_KEY
+)
+
+
+class OverloadedError(Exception):
+    """Raised when a stage sheds a call instead of queueing it"""
+
+    def __init__(self, stage: str, retry_after: float, status_code: int = 503):
+        self.stage = stage
+        self.retry_after = retry_after
+        self.status_code = status_code
+        super().__init__(f"{stage} overloaded, retry in {retry_after:.0f}s")
+
+
+class StageLimiter:
+    """Concurrency limit with a bounded, per-client fair wait queue"""
+
+    def __init__(
+        self,
+        name: str,
+        max_concurrent: int,
+        max_queue: int,
+        max_queue_per_client: Optional[int] = None,
+        max_wait_seconds: float = 5.0,
+        expected_hold_seconds: float = 1.0
+    ):
+        self.name = name
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.max_queue_per_client = max_queue_per_client or max(max_queue // 4, 1)
+        self.max_wait_seconds = max_wait_seconds
+
+        self.active = 0
+        self.queued = 0
+        self._waiters: "OrderedDict[str, Deque[asyncio.Future]]" = OrderedDict()
+        self.avg_hold_seconds = expected_hold_seconds
+
+        self.admitted = 0
+        self.waited = 0
+        self.shed = 0
+        self.timed_out = 0
+
+    def retry_after(self) -> float:
+        """Seconds until a new call would likely get a slot"""
+        estimate = (self.queued + 1) * self.avg_hold_seconds / self.max_concurrent
+        return min(max(math.ceil(estimate), 1), MAX_RETRY_AFTER_SECONDS)
+
+    def _shed(self, status_code: int) -> OverloadedError:
+        self.shed += 1
+        return OverloadedError(self.name, self.retry_after(), status_code)
+
+    async def _acquire(self, key: str) -> None:
+        if self.active < self.max_concurrent and self.queued == 0:
+            self.active += 1
+            self.admitted += 1
+            return
+
+        if self.queued >= self.max_queue:
+            raise self._shed(503)
+        waiters = self._waiters.get(key)
+        if waiters is not None and len(waiters) >= self.max_queue_per_client:
+            raise self._shed(429)
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.setdefault(key, deque()).append(waiter)
+        self.queued += 1
+        self.waited += 1
+        try:
+            await asyncio.wait_for(waiter, timeout=self.max_wait_seconds)
+        except BaseException as e:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over just as we gave up: pass it on
+                self._release()
+            else:
+                self._remove(key, waiter)
+            if isinstance(e, asyncio.TimeoutError):
+                self.timed_out += 1
+                raise self._shed(503) from None
+            raise
+        self.admitted += 1
+
+    def _remove(self, key: str, waiter: asyncio.Future) -> None:
+        waiters = self._waiters.get(key)
+        if waiters is not None and waiter in waiters:
+            waiters.remove(waiter)
+            self.queued -= 1
+            if not waiters:
+                del self._waiters[key]
+
+    def _release(self) -> None:
+        """Hand the slot to the next client in round-robin order, or free it"""
+        while self._waiters:
+            key, waiters = next(iter(self._waiters.items()))
+            waiter = waiters.popleft()
+            self.queued -= 1
+            if waiters:
+                self._waiters.move_to_end(key)
+            else:
+                del self._waiters[key]
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.active -= 1
+
+    @asynccontextmanager
+    async def slot(self, client_key: Optional[str] = None):
+        """
+        Hold one of the stage's slots for the block
+
+        Raises OverloadedError if the call is shed.
+        """
+        await self._acquire(client_key or current_client_key.get())
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            held = time.perf_counter() - start
+            self.avg_hold_seconds += 0.2 * (held - self.avg_hold_seconds)
+            self._release()
+
+    def get_state(self) -> Dict[str, Any]:
+        return {
+            "active": self.active,
+            "max_concurrent": self.max_concurrent,
+            "queued": self.queued,
+            "max_queue": self.max_queue,
+            "queued_clients": len(self._waiters),
+            "avg_hold_ms": round(self.avg_hold_seconds * 1000, 1),
+            "admitted": self.admitted,
+            "waited": self.waited,
+            "shed": self.shed,
+            "timed_out": self.timed_out
+        }
+
+
+def _env_int(name: str, default: int) -> int:
+    return int(os.getenv(name, str(default)))
+
+
+# Per-stage settings; concurrency can be tuned with ADMISSION_<STAGE>_CONCURRENCY
+STAGE_SETTINGS: Dict[str, Dict[str, Any]] = {
+    # Query embedding: a shed call fails the search fast with 429/503
+    "modal": {"max_concurrent": _env_int("ADMISSION_MODAL_CONCURRENCY", 8), "max_queue": 32,
+              "max_wait_seconds": 5.0, "expected_hold_seconds": 1.0},
+    # One call per expanded result (up to 8 per search); shed calls keep the raw chunk text
+    "expansion": {"max_concurrent": _env_int("ADMISSION_EXPANSION_CONCURRENCY", 32), "max_queue": 128,
+                  "max_wait_seconds": 2.0, "expected_hold_seconds": 0.2},
+    # OpenAI synthesis; shed calls get the local extractive answer
+    "synthesis": {"max_concurrent": _env_int("ADMISSION_SYNTHESIS_CONCURRENCY", 4), "max_queue": 16,
+                  "max_wait_seconds": 3.0, "expected_hold_seconds": 3.0}
+}
+
+_limiters: Dict[str, StageLimiter] = {}
+
+
+def get_stage_limiter(name: str) -> StageLimiter:
+    """Get or create the shared limiter for a stage"""
+    limiter = _limiters.get(name)
+    if limiter is None:
+        limiter = _limiters[name] = StageLimiter(name, **STAGE_SETTINGS.get(name, {"max_concurrent": 8, "max_queue": 32}))
+    return limiter
+
+
+def get_admission_states() -> Dict[str, Dict[str, Any]]:
+    """State of every stage limiter (for /api/pool-stats)"""
+    return {name: get_stage_limiter(name).get_state() for name in STAGE_SETTINGS}
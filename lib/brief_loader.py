@@ -0,0 +1,231 @@
+"""
+Brief assembly loader for the intelligence API
+Fetches every document an episode brief needs in one batched round trip:
+metadata, intelligence and transcript via a single aggregation, with the
+user's scoring preferences fetched concurrently.
+"""
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from bson import ObjectId
+
+from .cache import TTLCache
+from .instrumentation import get_query_metrics
+
+logger = logging.getLogger(__name__)
+
+# Characters of transcript needed for the fallback summary (+1 to detect truncation)
+SUMMARY_CHARS = 500
+
+# podcast_authority is a small reference table - keep it in process
+AUTHORITY_CACHE_TTL = 600  # 10 minutes
+_authority_cache = TTLCache(max_size=1, ttl=AUTHORITY_CACHE_TTL)
+
+
+@dataclass
+class BriefInputs:
+    """All documents needed to build and score one episode brief"""
+    requested_id: str
+    episode_doc: Optional[Dict[str, Any]] = None
+    intelligence_doc: Optional[Dict[str, Any]] = None
+    transcript_doc: Optional[Dict[str, Any]] = None
+    intelligence_prefs_doc: Optional[Dict[str, Any]] = None
+    authority: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+
+    @property
+    def episode_guid(self) -> str:
+        """GUID used to key intelligence documents for this episode"""
+        if self.episode_doc:
+            guid = self.episode_doc.get("episode_id") or self.episode_doc.get("guid")
+            if guid:
+                return guid
+        return self.requested_id
+
+    @property
+    def authority_doc(self) -> Optional[Dict[str, Any]]:
+        if not self.episode_doc:
+            return None
+        raw_entry = self.episode_doc.get("raw_entry_original_feed", {})
+        return self.authority.get(raw_entry.get("podcast_title", ""))
+
+
+def episode_match(episode_id: str) -> Dict[str, Any]:
+    """Metadata filter for a brief ID (ObjectId first, then GUID in episode_id)"""
+    if ObjectId.is_valid(episode_id):
+        return {"_id": ObjectId(episode_id)}
+    return {"episode_id": episode_id}
+
+
+def brief_lookup_stages() -> list:
+    """Aggregation stages joining intelligence and a trimmed transcript to metadata"""
+    return [
+        {"$lookup": {
+            "from": "episode_intelligence",
+            # Same key as BriefInputs.episode_guid: episode_id, then guid, then the requested ID
+            "let": {"guid": {"$ifNull": ["$episode_id", {"$ifNull": ["$guid", {"$toString": "$_id"}]}]}},
+            "pipeline": [
+                {"$match": {"$expr": {"$eq": ["$episode_id", "$$guid"]}}},
+                {"$limit": 1}
+            ],
+            "as": "_intelligence"
+        }},
+        {"$lookup": {
+            "from": "episode_transcripts",
+            "let": {"doc_id": {"$toString": "$_id"}},
+            "pipeline": [
+                {"$match": {"$expr": {"$eq": ["$episode_id", "$$doc_id"]}}},
+                {"$limit": 1},
+                # Only the head of the transcript is used (summary fallback)
+                {"$project": {
+                    "episode_id": 1,
+                    "full_text": {"$substrCP": [{"$ifNull": ["$full_text", ""]}, 0, SUMMARY_CHARS + 1]}
+                }}
+            ],
+            "as": "_transcript"
+        }}
+    ]
+
+
+def split_joined_doc(doc: Dict[str, Any]):
+    """Split an aggregated metadata document into (metadata, intelligence, transcript)"""
+    intelligence = doc.pop("_intelligence", None) or [None]
+    transcript = doc.pop("_transcript", None) or [None]
+    return doc, intelligence[0], transcript[0]
+
+
+async def get_podcast_authority(db) -> Dict[str, Dict[str, Any]]:
+    """Get the podcast_authority table keyed by podcast name (process cached)"""
+    authority = _authority_cache.get("authority")
+    if authority is not None:
+        return authority
+
+    # Table is small; a concurrent duplicate refresh is harmless
+    docs = await db.get_collection("podcast_authority").find(
+        {}, {"podcast_name": 1, "tier": 1, "authority_score": 1}
+    ).to_list(None)
+    authority = {doc.get("podcast_name"): doc for doc in docs if doc.get("podcast_name")}
+    _authority_cache.set("authority", authority)
+    logger.info(f"Loaded {len(authority)} podcast authority records")
+    return authority
+
+
+def clear_authority_cache() -> None:
+    _authority_cache.clear()
+
+
+async def load_brief_inputs(db, episode_id: str, user_id: str = "demo-user") -> BriefInputs:
+    """
+    Load everything a brief needs in one concurrent round trip
+
+    - episode_metadata + episode_intelligence + episode_transcripts: one aggregation
+    - user_intelligence_prefs: fetched alongside
+    - podcast_authority: process cache
+    """
+    pipeline = [{"$match": episode_match(episode_id)}, {"$limit": 1}] + brief_lookup_stages()
+
+    async with get_query_metrics().track("mongodb", "load_brief_inputs") as timer:
+        joined, intelligence_prefs_doc, authority = await asyncio.gather(
+            db.get_collection("episode_metadata").aggregate(pipeline).to_list(1),
+            db.get_collection("user_intelligence_prefs").find_one({"user_id": user_id}),
+            get_podcast_authority(db)
+        )
+        timer.rows = len(joined)
+
+    inputs = BriefInputs(
+        requested_id=episode_id,
+        intelligence_prefs_doc=intelligence_prefs_doc,
+        authority=authority
+    )
+    if joined:
+        inputs.episode_doc, inputs.intelligence_doc, inputs.transcript_doc = split_joined_doc(joined[0])
+    return inputs
+
+
+async def load_brief_inputs_bulk(
+    db, episode_ids: List[str], user_id: str = "demo-user"
+) -> List[BriefInputs]:
+    """
+    Load brief inputs for many episodes with batched $in queries
+
+    Returns one BriefInputs per requested ID, in request order. IDs that match
+    no episode get BriefInputs with episode_doc=None.
+    """
+    object_ids = list({ObjectId(i) for i in episode_ids if ObjectId.is_valid(i)})
+    guids = list({i for i in episode_ids if not ObjectId.is_valid(i)})
+
+    clauses = []
+    if object_ids:
+        clauses.append({"_id": {"$in": object_ids}})
+    if guids:
+        clauses.append({"episode_id": {"$in": guids}})
+
+    async def fetch_metadata():
+        if not clauses:
+            return []
+        return await db.get_collection("episode_metadata").find(
+            {"$or": clauses} if len(clauses) > 1 else clauses[0]
+        ).to_list(None)
+
+    # Round trip 1: metadata, with preferences and authority alongside
+    async with get_query_metrics().track("mongodb", "load_brief_metadata_bulk") as timer:
+        metadata_docs, intelligence_prefs_doc, authority = await asyncio.gather(
+            fetch_metadata(),
+            db.get_collection("user_intelligence_prefs").find_one({"user_id": user_id}),
+            get_podcast_authority(db)
+        )
+        timer.rows = len(metadata_docs)
+
+    by_object_id = {str(doc["_id"]): doc for doc in metadata_docs}
+    by_guid = {doc["episode_id"]: doc for doc in metadata_docs if doc.get("episode_id")}
+
+    inputs_list = []
+    for episode_id in episode_ids:
+        if ObjectId.is_valid(episode_id):
+            episode_doc = by_object_id.get(str(ObjectId(episode_id)))
+        else:
+            episode_doc = by_guid.get(episode_id)
+        inputs_list.append(BriefInputs(
+            requested_id=episode_id,
+            episode_doc=episode_doc,
+            intelligence_prefs_doc=intelligence_prefs_doc,
+            authority=authority
+        ))
+
+    found = [inputs for inputs in inputs_list if inputs.episode_doc]
+    if not found:
+        return inputs_list
+
+    episode_guids = list({inputs.episode_guid for inputs in found})
+    doc_ids = list({str(inputs.episode_doc["_id"]) for inputs in found})
+
+    # Round trip 2: intelligence and trimmed transcripts for every found episode
+    async with get_query_metrics().track("mongodb", "load_brief_content_bulk") as timer:
+        intelligence_docs, transcript_docs = await asyncio.gather(
+            db.get_collection("episode_intelligence").find(
+                {"episode_id": {"$in": episode_guids}}
+            ).to_list(None),
+            db.get_collection("episode_transcripts").aggregate([
+                {"$match": {"episode_id": {"$in": doc_ids}}},
+                {"$project": {
+                    "episode_id": 1,
+                    "full_text": {"$substrCP": [{"$ifNull": ["$full_text", ""]}, 0, SUMMARY_CHARS + 1]}
+                }}
+            ]).to_list(None)
+        )
+        timer.rows = len(intelligence_docs) + len(transcript_docs)
+
+    # First document per key wins, matching find_one
+    intelligence_by_guid: Dict[str, Dict[str, Any]] = {}
+    for doc in intelligence_docs:
+        intelligence_by_guid.setdefault(doc.get("episode_id"), doc)
+    transcript_by_id: Dict[str, Dict[str, Any]] = {}
+    for doc in transcript_docs:
+        transcript_by_id.setdefault(doc.get("episode_id"), doc)
+
+    for inputs in found:
+        inputs.intelligence_doc = intelligence_by_guid.get(inputs.episode_guid)
+        inputs.transcript_doc = transcript_by_id.get(str(inputs.episode_doc["_id"]))
+
+    return inputs_list
@@ -0,0 +1,85 @@
+"""
+Small in-process caches shared by API modules
+LRU eviction with optional per-entry TTL (same approach as the search handlers)
+"""
+import time
+import threading
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+
+class TTLCache:
+    """
+    LRU cache with an optional time-to-live per entry
+
+    Safe to share between the event loop and executor threads.
+    """
+
+    def __init__(self, max_size: int = 100, ttl: Optional[float] = 300.0):
+        """
+        Args:
+            max_size: Maximum number of entries before the oldest is evicted
+            ttl: Seconds an entry stays valid (None = never expires)
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Get item from cache if present and not expired"""
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                self.misses += 1
+                return None
+
+            value, stored_at = item
+            if self.ttl is not None and time.time() - stored_at >= self.ttl:
+                # Expired
+                del self._data[key]
+                self.misses += 1
+                return None
+
+            # Move to end (LRU)
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """Add item to cache with LRU eviction"""
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+            self._data[key] = (value, time.time())
+
+            # Remove oldest if over capacity
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def invalidate(self, key: Hashable) -> None:
+        """Remove a single entry"""
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        """Remove all entries"""
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get_stats(self) -> dict:
+        """Get cache statistics"""
+        total = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "max_size": self.max_size,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate_percent": (self.hits / total) * 100 if total else 0.0
+        }
@@ -0,0 +1,73 @@
+"""
+Cancel in-flight work when the client disconnects
+A search keeps running after the user navigates away or retypes: Modal,
+the Atlas aggregations, context expansions and the OpenAI call are all
+still paid for and hold capacity that live requests need.
+
+cancel_on_disconnect() runs the handler as a task and polls
+Request.is_disconnected(); on disconnect the task is cancelled, which
+propagates into whatever it is awaiting (gathered expansions, the
+synthesis task, HTTP calls). Backend calls interrupted this way are
+counted as `cancelled` in the query metrics, and each abandoned request
+as a cancelled ("api", name) call.
+"""
+import asyncio
+import logging
+import os
+import time
+from typing import Any, Awaitable, TypeVar
+
+from .instrumentation import get_query_metrics
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+DISCONNECT_POLL_SECONDS = 0.25
+# Kill switch for servers whose ASGI bridge reports disconnects unreliably
+CANCEL_ON_DISCONNECT = os.getenv("CANCEL_ON_DISCONNECT", "true").lower() == "true"
+
+
+class ClientDisconnected(Exception):
+    """The client went away before the response was ready"""
+
+
+async def cancel_on_disconnect(
+    request: Any,
+    work: Awaitable[T],
+    name: str,
+    poll_interval: float = DISCONNECT_POLL_SECONDS
+) -> T:
+    """
+    Await work, cancelling its task tree if the client disconnects
+
+    Raises ClientDisconnected after the work has been cancelled.
+    """
+    if not CANCEL_ON_DISCONNECT:
+        return await work
+
+    start = time.perf_counter()
+    task = asyncio.ensure_future(work)
+    try:
+        while True:
+            done, _ = await asyncio.wait({task}, timeout=poll_interval)
+            if done:
+                return task.result()
+            if await request.is_disconnected():
+                break
+    finally:
+        # Also covers this coroutine itself being cancelled
+        if not task.done():
+            task.cancel()
+
+    try:
+        await task
+    except asyncio.CancelledError:
+        pass
+    except Exception as e:
+        logger.debug(f"{name} failed while cancelling: {e}")
+
+    elapsed = time.perf_counter() - start
+    get_query_metrics().record("api", name, elapsed, cancelled=True)
+    logger.info(f"[CANCELLED] Client disconnected, cancelled {name} after {elapsed:.2f}s")
+    raise ClientDisconnected(name)
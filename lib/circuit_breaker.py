@@ -0,0 +1,286 @@
+"""
+Circuit breakers for outbound dependencies
+One breaker per dependency (Modal, MongoDB Atlas, Supabase, OpenAI, audio
+Lambda) so a degraded service fails fast instead of every request waiting out
+its timeouts and retries.
+
+- closed: calls pass; outcomes go into a rolling window of time buckets
+- open: calls are rejected with CircuitOpenError until open_seconds pass
+- half-open: a limited number of probe calls pass; success closes the
+  breaker, failure re-opens it
+
+The breaker trips when, over the rolling window and with at least
+min_calls calls, the error rate or the slow-call rate crosses its threshold.
+Only errors that say the dependency is unhealthy count as failures (see
+is_dependency_failure); a rejected request such as a missing relation or
+a bad query means the dependency answered.
+"""
+import threading
+import time
+from contextlib import asynccontextmanager
+from typing import Any, Dict, Optional
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+# SQLSTATE classes that mean the database itself is in trouble: connection
+# exceptions, insufficient resources, operator intervention (incl. statement
+# timeout), system and internal errors
+SERVER_SQLSTATE_CLASSES = ("08", "53", "57", "58", "XX")
+# PostgREST connection, schema cache and pool errors
+SERVER_POSTGREST_CODES = ("PGRST000", "PGRST001", "PGRST002", "PGRST003")
+# MongoDB command errors that are timeouts or node availability, not bad requests
+SERVER_MONGODB_CODES = {6, 7, 50, 89, 91, 189, 262, 11600, 11602}
+
+
+def is_dependency_failure(exc: BaseException) -> bool:
+    """
+    Whether an error says the dependency is unhealthy
+
+    Transport errors, timeouts, 5xx and 429 responses count. PostgREST
+    4xx/PGRST*/SQLSTATE errors (e.g. 42P01, relation does not exist) and
+    MongoDB command errors are the request's fault: they are re-raised
+    without tripping the breaker or being retried.
+    """
+    status = getattr(exc, "status_code", None)
+    if status is None:
+        status = getattr(getattr(exc, "response", None), "status_code", None)
+    if isinstance(status, int):
+        return status >= 500 or status == 429
+
+    module = type(exc).__module__
+    if module.startswith("postgrest"):
+        code = str(getattr(exc, "code", "") or "")
+        if code.isdigit():
+            return int(code) >= 500 or int(code) == 429
+        if code.startswith("PGRST"):
+            return code in SERVER_POSTGREST_CODES
+        if len(code) == 5:
+            return code[:2] in SERVER_SQLSTATE_CLASSES
+        return True
+
+    if module.startswith("pymongo"):
+        from pymongo.errors import ExecutionTimeout, OperationFailure
+        if isinstance(exc, OperationFailure) and not isinstance(exc, ExecutionTimeout):
+            return exc.code in SERVER_MONGODB_CODES
+
+    return True
+
+
+class CircuitOpenError(Exception):
+    """Raised when a call is rejected because the dependency's breaker is open"""
+
+    def __init__(self, name: str, retry_after: float):
+        self.name = name
+        self.retry_after = retry_after
+        super().__init__(f"{name} circuit open, retry in {retry_after:.0f}s")
+
+
+class CircuitBreaker:
+    """Rolling-window circuit breaker with half-open probing"""
+
+    def __init__(
+        self,
+        name: str,
+        window_seconds: float = 60.0,
+        bucket_count: int = 12,
+        min_calls: int = 5,
+        error_rate_threshold: float = 0.5,
+        slow_call_seconds: float = 10.0,
+        slow_rate_threshold: float = 0.8,
+        open_seconds: float = 30.0,
+        half_open_max_calls: int = 1
+    ):
+        self.name = name
+        self.window_seconds = window_seconds
+        self.bucket_count = bucket_count
+        self.bucket_seconds = window_seconds / bucket_count
+        self.min_calls = min_calls
+        self.error_rate_threshold = error_rate_threshold
+        self.slow_call_seconds = slow_call_seconds
+        self.slow_rate_threshold = slow_rate_threshold
+        self.open_seconds = open_seconds
+        self.half_open_max_calls = half_open_max_calls
+
+        self.state = CLOSED
+        self.opened_at: Optional[float] = None
+        self.last_trip_reason: Optional[str] = None
+        self.times_opened = 0
+        self.rejected_calls = 0
+        self._half_open_in_flight = 0
+        self._lock = threading.Lock()
+
+        # Ring of [bucket_id, calls, failures, slow_calls]
+        self._buckets = [[-1, 0, 0, 0] for _ in range(bucket_count)]
+
+    # Window --------------------------------------------------------------
+
+    def _bucket(self, now: float):
+        bucket_id = int(now // self.bucket_seconds)
+        bucket = self._buckets[bucket_id % self.bucket_count]
+        if bucket[0] != bucket_id:
+            bucket[:] = [bucket_id, 0, 0, 0]
+        return bucket
+
+    def _window_totals(self, now: float):
+        oldest = int(now // self.bucket_seconds) - self.bucket_count + 1
+        calls = failures = slow = 0
+        for bucket_id, bucket_calls, bucket_failures, bucket_slow in self._buckets:
+            if bucket_id >= oldest:
+                calls += bucket_calls
+                failures += bucket_failures
+                slow += bucket_slow
+        return calls, failures, slow
+
+    def _reset_window(self) -> None:
+        for bucket in self._buckets:
+            bucket[:] = [-1, 0, 0, 0]
+
+    # State machine -------------------------------------------------------
+
+    def _trip(self, now: float, reason: str) -> None:
+        self.state = OPEN
+        self.opened_at = now
+        self.last_trip_reason = reason
+        self.times_opened += 1
+        self._half_open_in_flight = 0
+
+    def allow(self) -> bool:
+        """Whether a call may proceed now (reserves a probe slot when half-open)"""
+        with self._lock:
+            now = time.monotonic()
+            if self.state == OPEN and now - self.opened_at >= self.open_seconds:
+                self.state = HALF_OPEN
+                self._half_open_in_flight = 0
+            if self.state == CLOSED:
+                return True
+            if self.state == HALF_OPEN and self._half_open_in_flight < self.half_open_max_calls:
+                self._half_open_in_flight += 1
+                return True
+            self.rejected_calls += 1
+            return False
+
+    def retry_after(self) -> float:
+        with self._lock:
+            if self.state != OPEN or self.opened_at is None:
+                return 0.0
+            return max(self.open_seconds - (time.monotonic() - self.opened_at), 0.0)
+
+    def record(self, success: bool, duration: float) -> None:
+        """Record the outcome of a call that allow() let through"""
+        slow = duration >= self.slow_call_seconds
+        with self._lock:
+            now = time.monotonic()
+            if self.state == HALF_OPEN:
+                self._half_open_in_flight = max(self._half_open_in_flight - 1, 0)
+                if success and not slow:
+                    self.state = CLOSED
+                    self.opened_at = None
+                    self._reset_window()
+                else:
+                    self._trip(now, "probe failed" if not success else "probe slow")
+                return
+            if self.state == OPEN:
+                # Call started before the breaker opened
+                return
+
+            bucket = self._bucket(now)
+            bucket[1] += 1
+            bucket[2] += 0 if success else 1
+            bucket[3] += 1 if slow else 0
+
+            calls, failures, slow_calls = self._window_totals(now)
+            if calls < self.min_calls:
+                return
+            if failures / calls >= self.error_rate_threshold:
+                self._trip(now, f"error rate {failures}/{calls}")
+            elif slow_calls / calls >= self.slow_rate_threshold:
+                self._trip(now, f"slow calls {slow_calls}/{calls} over {self.slow_call_seconds}s")
+
+    def record_success(self, duration: float) -> None:
+        self.record(True, duration)
+
+    def record_failure(self, duration: float) -> None:
+        self.record(False, duration)
+
+    @asynccontextmanager
+    async def guard(self):
+        """
+        Run a block through the breaker
+
+        Raises CircuitOpenError without running the block while open. The
+        block counts as failed if it raises a dependency failure or sets
+        `call.failed = True`; other errors count as answered calls, and
+        cancellation is not an outcome and only frees a probe slot.
+        """
+        if not self.allow():
+            raise CircuitOpenError(self.name, self.retry_after())
+        call = _GuardedCall()
+        start = time.perf_counter()
+        try:
+            yield call
+        except Exception as e:
+            # A rejected request still means the dependency answered
+            self.record(not is_dependency_failure(e), time.perf_counter() - start)
+            raise
+        except BaseException:
+            self._release_probe()
+            raise
+        self.record(not call.failed, time.perf_counter() - start)
+
+    def _release_probe(self) -> None:
+        with self._lock:
+            if self.state == HALF_OPEN:
+                self._half_open_in_flight = max(self._half_open_in_flight - 1, 0)
+
+    def get_state(self) -> Dict[str, Any]:
+        with self._lock:
+            now = time.monotonic()
+            calls, failures, slow_calls = self._window_totals(now)
+            state = self.state
+            if state == OPEN and now - self.opened_at >= self.open_seconds:
+                state = HALF_OPEN  # Next call will probe
+            return {
+                "state": state,
+                "window_calls": calls,
+                "error_rate": round(failures / calls, 3) if calls else 0.0,
+                "slow_call_rate": round(slow_calls / calls, 3) if calls else 0.0,
+                "retry_after_seconds": round(max(self.open_seconds - (now - self.opened_at), 0.0), 1)
+                if state == OPEN else 0.0,
+                "last_trip_reason": self.last_trip_reason,
+                "times_opened": self.times_opened,
+                "rejected_calls": self.rejected_calls
+            }
+
+
+class _GuardedCall:
+    failed = False
+
+
+# Per-dependency settings: slow thresholds sit below each client's timeout
+BREAKER_SETTINGS: Dict[str, Dict[str, Any]] = {
+    "modal": {"slow_call_seconds": 15.0, "open_seconds": 30.0},  # 25s timeout, cold starts ~10s
+    "mongodb": {"slow_call_seconds": 5.0, "open_seconds": 15.0},
+    "supabase": {"slow_call_seconds": 5.0, "open_seconds": 15.0},
+    "openai": {"slow_call_seconds": 8.0, "open_seconds": 30.0},  # 10s client timeout
+    "lambda": {"slow_call_seconds": 20.0, "open_seconds": 30.0}  # 25s client timeout
+}
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def get_circuit_breaker(name: str) -> CircuitBreaker:
+    """Get or create the shared breaker for a dependency"""
+    with _breakers_lock:
+        breaker = _breakers.get(name)
+        if breaker is None:
+            breaker = _breakers[name] = CircuitBreaker(name, **BREAKER_SETTINGS.get(name, {}))
+        return breaker
+
+
+def get_breaker_states() -> Dict[str, Dict[str, Any]]:
+    """State of every dependency breaker (for /api/health)"""
+    return {name: get_circuit_breaker(name).get_state() for name in BREAKER_SETTINGS}
@@ -0,0 +1,235 @@
+"""
+Corpus statistics shared by the analytics endpoints
+Episode count, published date range, topic catalog and per-topic totals only
+change when the ETL runs, so they are cached in process and refreshed on TTL
+expiry or when the corpus version stamps change.
+"""
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from .database import SupabasePool, is_missing_relation
+
+logger = logging.getLogger(__name__)
+
+# Full refresh interval and how often version stamps are re-checked in between
+CORPUS_STATS_TTL = 600  # 10 minutes
+VERSION_CHECK_INTERVAL = 60  # 1 minute
+
+# Weekly topic-mention rollup (see scripts/sql/topic_mention_weekly.sql)
+TOPIC_WEEKLY_ROLLUP = "topic_mention_weekly"
+
+
+# Version stamps (cheap indexed queries, no row payloads)
+def newest_value_query(table: str, column: str):
+    """Query returning the newest value of a column"""
+    def query(client):
+        return client.table(table).select(column).order(column, desc=True).limit(1).execute()
+    query.__name__ = f"newest:{table}.{column}"
+    return query
+
+
+def oldest_value_query(table: str, column: str):
+    """Query returning the oldest value of a column"""
+    def query(client):
+        return client.table(table).select(column).order(column, desc=False).limit(1).execute()
+    query.__name__ = f"oldest:{table}.{column}"
+    return query
+
+
+def row_count_query(table: str):
+    """Query returning the exact row count of a table"""
+    def query(client):
+        return client.table(table).select("id", count="exact").limit(1).execute()
+    query.__name__ = f"count:{table}"
+    return query
+
+
+async def get_version_stamps(pool: SupabasePool, queries) -> Optional[List[Any]]:
+    """
+    Run version-stamp queries concurrently; returns None if any fails
+    """
+    try:
+        responses = await asyncio.gather(*(pool.execute_with_retry(q) for q in queries))
+    except Exception as e:
+        logger.warning(f"Version stamp lookup failed: {str(e)}")
+        return None
+    return [r.count if getattr(r, "count", None) is not None else r.data for r in responses]
+
+
+@dataclass
+class CorpusStats:
+    """Snapshot of corpus-wide statistics"""
+    total_episodes: Optional[int]
+    earliest_published_at: Optional[str]
+    latest_published_at: Optional[str]
+    topic_totals: Dict[str, int] = field(default_factory=dict)
+    version: Tuple = ()
+    refreshed_at: float = 0.0
+
+    @property
+    def topics(self) -> List[str]:
+        """Distinct topic catalog (sorted)"""
+        return sorted(self.topic_totals)
+
+    def date_range(self, default_start: str = "2025-01-01", default_end: str = "2025-06-14") -> str:
+        start = self.earliest_published_at[:10] if self.earliest_published_at else default_start
+        end = self.latest_published_at[:10] if self.latest_published_at else default_end
+        return f"{start} to {end}"
+
+
+def _first_value(rows: Any, column: str) -> Optional[str]:
+    if isinstance(rows, list) and rows:
+        return rows[0].get(column)
+    return None
+
+
+class CorpusStatsService:
+    """
+    Process cache for CorpusStats
+
+    - Served from memory for up to ttl seconds
+    - Version stamps (episode count, newest published_at, mention count) are
+      re-checked every version_check_interval seconds; a change forces a reload
+    - If a refresh fails, the previous snapshot keeps being served
+    - Refreshes are serialised: concurrent callers wait for one reload
+    """
+
+    def __init__(self, ttl: float = CORPUS_STATS_TTL, version_check_interval: float = VERSION_CHECK_INTERVAL):
+        self.ttl = ttl
+        self.version_check_interval = version_check_interval
+        self._stats: Optional[CorpusStats] = None
+        self._version_checked_at = 0.0
+        self._refresh_lock = asyncio.Lock()
+        self.refresh_count = 0
+
+    def invalidate(self) -> None:
+        """Force a reload on the next call (e.g. after an ETL run)"""
+        self._stats = None
+
+    def _is_current(self, stats: Optional[CorpusStats], now: float) -> bool:
+        return (
+            stats is not None
+            and now - stats.refreshed_at < self.ttl
+            and now - self._version_checked_at < self.version_check_interval
+        )
+
+    async def get(self, pool: SupabasePool) -> CorpusStats:
+        stats = self._stats
+        if self._is_current(stats, time.time()):
+            return stats
+
+        async with self._refresh_lock:
+            return await self._refresh(pool)
+
+    async def _refresh(self, pool: SupabasePool) -> CorpusStats:
+        now = time.time()
+        stats = self._stats
+        # Another caller may have refreshed (or re-checked) while we waited for the lock
+        if self._is_current(stats, now):
+            return stats
+
+        if stats is not None and now - stats.refreshed_at < self.ttl:
+            version = await self._read_version(pool)
+            self._version_checked_at = now
+            if version is None or version == stats.version:
+                return stats
+            logger.info("Corpus version changed, reloading corpus stats")
+        else:
+            version = await self._read_version(pool)
+            self._version_checked_at = now
+
+        try:
+            self._stats = await self._load(pool, version)
+            self.refresh_count += 1
+        except Exception as e:
+            if stats is None:
+                raise
+            logger.warning(f"Corpus stats refresh failed, serving previous snapshot: {str(e)}")
+            return stats
+        return self._stats
+
+    async def _read_version(self, pool: SupabasePool) -> Optional[Tuple]:
+        stamps = await get_version_stamps(pool, [
+            row_count_query("episodes"),
+            newest_value_query("episodes", "published_at"),
+            row_count_query("topic_mentions")
+        ])
+        if stamps is None:
+            return None
+        episode_count, newest_rows, mention_count = stamps
+        return (episode_count, _first_value(newest_rows, "published_at"), mention_count)
+
+    async def _load(self, pool: SupabasePool, version: Optional[Tuple]) -> CorpusStats:
+        earliest_response, topic_totals = await asyncio.gather(
+            pool.execute_with_retry(oldest_value_query("episodes", "published_at")),
+            self._load_topic_totals(pool)
+        )
+
+        if version is None:
+            # Version lookup failed - fetch the values it would have provided
+            version = await self._read_version(pool)
+            if version is None:
+                raise RuntimeError("Unable to read corpus version stamps")
+
+        episode_count, latest_published_at, _ = version
+        return CorpusStats(
+            total_episodes=episode_count,
+            earliest_published_at=_first_value(earliest_response.data, "published_at"),
+            latest_published_at=latest_published_at,
+            topic_totals=topic_totals,
+            version=version,
+            refreshed_at=time.time()
+        )
+
+    async def _load_topic_totals(self, pool: SupabasePool) -> Dict[str, int]:
+        """Per-topic mention totals from the weekly rollup (raw rows if it isn't deployed)"""
+        def query_rollup(client):
+            return client.table(TOPIC_WEEKLY_ROLLUP) \
+                .select("topic_name, mention_count") \
+                .execute()
+
+        totals: Dict[str, int] = {}
+        try:
+            response = await pool.execute_with_retry(query_rollup, name="topic_weekly_totals")
+            for row in response.data:
+                totals[row["topic_name"]] = totals.get(row["topic_name"], 0) + row["mention_count"]
+            return totals
+        except Exception as e:
+            # Anything but a missing rollup fails the refresh (the previous snapshot is kept)
+            if not is_missing_relation(e):
+                raise
+            logger.warning(f"Weekly rollup not deployed, counting raw mentions: {str(e)}")
+
+        def query_topics(client):
+            return client.table("topic_mentions") \
+                .select("topic_name") \
+                .execute()
+
+        response = await pool.execute_with_retry(query_topics, name="topic_mention_totals")
+        for row in response.data:
+            totals[row["topic_name"]] = totals.get(row["topic_name"], 0) + 1
+        return totals
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats = self._stats
+        return {
+            "cached": stats is not None,
+            "age_seconds": round(time.time() - stats.refreshed_at, 1) if stats else None,
+            "refresh_count": self.refresh_count,
+            "ttl_seconds": self.ttl
+        }
+
+
+# Global service instance
+_corpus_stats_service: Optional[CorpusStatsService] = None
+
+
+def get_corpus_stats_service() -> CorpusStatsService:
+    """Get or create the global corpus stats service"""
+    global _corpus_stats_service
+    if _corpus_stats_service is None:
+        _corpus_stats_service = CorpusStatsService()
+    return _corpus_stats_service
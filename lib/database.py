@@ -1,17 +1,35 @@
 """
 Database connection pool manager for Supabase
 Handles connection pooling to stay within free tier limits
+
+supabase-py queries are synchronous, so they run on a bounded thread pool
+(one client, and so one HTTP connection pool, per worker thread) instead of
+blocking the event loop.
 """
 import asyncio
 import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional, Dict, Any
 from datetime import datetime
 from contextlib import asynccontextmanager
 from supabase import create_client, Client
 import os
 
+from .circuit_breaker import CircuitOpenError, get_circuit_breaker, is_dependency_failure
+from .instrumentation import get_query_metrics
+
 logger = logging.getLogger(__name__)
 
+# Undefined table (SQLSTATE) and "table not in the schema cache" (PostgREST)
+MISSING_RELATION_CODES = ("42P01", "PGRST205")
+
+
+def is_missing_relation(exc: BaseException) -> bool:
+    """Whether a query failed because its table/view has not been created yet"""
+    return str(getattr(exc, "code", "") or "") in MISSING_RELATION_CODES
+
 
 class SupabasePool:
     """
@@ -33,6 +51,19 @@ class SupabasePool:
         self.connection_errors = 0
         self._client: Optional[Client] = None
 
+        # Worker threads for sync queries, each with its own client
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._thread_local = threading.local()
+        self._stats_lock = threading.Lock()
+        self.running_queries = 0
+        self.peak_running_queries = 0
+        self.queued_queries = 0
+        self.executed_queries = 0
+        self.total_queue_wait = 0.0     # Submitted -> started on a worker thread
+        self.max_queue_wait = 0.0
+        self.total_semaphore_wait = 0.0  # Waiting for a connection slot
+        self.max_semaphore_wait = 0.0
+
         # Connection monitoring
         self.connection_log: Dict[str, Any] = {
             "created_at": datetime.now().isoformat(),
@@ -59,6 +90,46 @@ class SupabasePool:
             self._client = self._create_client()
         return self._client
 
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        """Bounded thread pool for sync supabase-py queries"""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_connections,
+                thread_name_prefix="supabase"
+            )
+        return self._executor
+
+    def _thread_client(self) -> Client:
+        """Client owned by the current worker thread"""
+        client = getattr(self._thread_local, "client", None)
+        if client is None:
+            client = self._thread_local.client = self._create_client()
+        return client
+
+    def _run_sync(self, query_func, submitted_at: float):
+        """Run a sync query on a worker thread, recording queue wait and concurrency"""
+        queue_wait = time.perf_counter() - submitted_at
+        with self._stats_lock:
+            self.queued_queries -= 1
+            self.running_queries += 1
+            self.peak_running_queries = max(self.peak_running_queries, self.running_queries)
+            self.total_queue_wait += queue_wait
+            self.max_queue_wait = max(self.max_queue_wait, queue_wait)
+        try:
+            return query_func(self._thread_client())
+        finally:
+            with self._stats_lock:
+                self.running_queries -= 1
+                self.executed_queries += 1
+
+    async def run_sync(self, query_func):
+        """Run a sync query function on the thread pool without blocking the event loop"""
+        with self._stats_lock:
+            self.queued_queries += 1
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, self._run_sync, query_func, time.perf_counter())
+
     @asynccontextmanager
     async def acquire(self):
         """
@@ -77,7 +148,11 @@ class SupabasePool:
             )
 
         # Wait for available connection slot
+        wait_start = time.perf_counter()
         async with self.semaphore:
+            semaphore_wait = time.perf_counter() - wait_start
+            self.total_semaphore_wait += semaphore_wait
+            self.max_semaphore_wait = max(self.max_semaphore_wait, semaphore_wait)
             self.active_connections += 1
             self.total_requests += 1
             self.connection_log["total_requests"] = self.total_requests
@@ -93,6 +168,8 @@ class SupabasePool:
 
             try:
                 yield self.client
+            except CircuitOpenError:
+                raise
             except Exception as e:
                 self.connection_errors += 1
                 self.connection_log["errors"] += 1
@@ -104,61 +181,113 @@ class SupabasePool:
                     f"Connection released: {self.active_connections}/{self.max_connections} active"
                 )
 
-    async def execute_with_retry(self, query_func, max_retries: int = 3):
+    async def execute_with_retry(self, query_func, max_retries: int = 3, name: Optional[str] = None):
         """
         Execute a query with automatic retry on connection failure
 
+        Sync query functions run on the pool's worker threads with a
+        thread-owned client; async ones run on the event loop. Calls go
+        through the shared "supabase" circuit breaker, which times the query
+        but not the wait for a slot; while it is open this raises
+        CircuitOpenError immediately instead of retrying. Errors
+        that are the request's fault (PostgREST 4xx, SQLSTATE such as 42P01)
+        are re-raised at once: retrying cannot fix them. Latency,
+        retries, semaphore wait and row count are recorded under `name`
+        (default: the query function's name).
+
         Args:
             query_func: Function that performs the query (can be sync or async)
             max_retries: Maximum number of retry attempts
+            name: Query name for instrumentation
 
         Returns:
             Query result
         """
         last_error = None
+        name = name or getattr(query_func, "__name__", "query")
+        breaker = get_circuit_breaker("supabase")
 
-        for attempt in range(max_retries):
-            try:
-                async with self.acquire() as client:
-                    # Support both sync and async query functions
-                    if asyncio.iscoroutinefunction(query_func):
-                        return await query_func(client)
+        async with get_query_metrics().track("supabase", name) as timer:
+            for attempt in range(max_retries):
+                timer.retries = attempt
+                try:
+                    if breaker.retry_after() > 0:
+                        # Open: fail fast instead of queueing for a slot
+                        raise CircuitOpenError(breaker.name, breaker.retry_after())
+                    wait_start = time.perf_counter()
+                    async with self.acquire() as client:
+                        timer.semaphore_wait += time.perf_counter() - wait_start
+                        # Only the query is timed: waiting for a slot is local load, not
+                        # Supabase latency (slot holders never queue for a worker thread)
+                        async with breaker.guard():
+                            # Support both sync and async query functions
+                            if asyncio.iscoroutinefunction(query_func):
+                                result = await query_func(client)
+                            else:
+                                result = await self.run_sync(query_func)
+                                if asyncio.iscoroutine(result):
+                                    result = await result
+                    data = getattr(result, "data", None)
+                    if isinstance(data, list):
+                        timer.rows = len(data)
+                    return result
+                except CircuitOpenError:
+                    logger.warning(f"Supabase circuit open, failing fast: {name}")
+                    raise
+                except Exception as e:
+                    if not is_dependency_failure(e):
+                        logger.warning(f"Query rejected, not retrying: {name}: {str(e)}")
+                        raise
+                    last_error = e
+                    if attempt < max_retries - 1:
+                        wait_time = 2 ** attempt  # Exponential backoff
+                        logger.warning(
+                            f"Query failed (attempt {attempt + 1}/{max_retries}), "
+                            f"retrying in {wait_time}s: {str(e)}"
+                        )
+                        await asyncio.sleep(wait_time)
                     else:
-                        result = query_func(client)
-                        if asyncio.iscoroutine(result):
-                            return await result
-                        return result
-            except Exception as e:
-                last_error = e
-                if attempt < max_retries - 1:
-                    wait_time = 2 ** attempt  # Exponential backoff
-                    logger.warning(
-                        f"Query failed (attempt {attempt + 1}/{max_retries}), "
-                        f"retrying in {wait_time}s: {str(e)}"
-                    )
-                    await asyncio.sleep(wait_time)
-                else:
-                    logger.error(f"Query failed after {max_retries} attempts: {str(e)}")
-
-        raise last_error
+                        logger.error(f"Query failed after {max_retries} attempts: {str(e)}")
+
+            raise last_error
 
     def get_stats(self) -> Dict[str, Any]:
         """Get connection pool statistics"""
+        with self._stats_lock:
+            executed = self.executed_queries
+            executor_stats = {
+                "max_workers": self.max_connections,
+                "running_queries": self.running_queries,
+                "peak_running_queries": self.peak_running_queries,
+                "queued_queries": self.queued_queries,
+                "executed_queries": executed,
+                "avg_queue_wait_ms": round(self.total_queue_wait / executed * 1000, 2) if executed else 0.0,
+                "max_queue_wait_ms": round(self.max_queue_wait * 1000, 2)
+            }
+
         return {
             "active_connections": self.active_connections,
             "max_connections": self.max_connections,
             "total_requests": self.total_requests,
             "connection_errors": self.connection_errors,
             "utilization_percent": (self.active_connections / self.max_connections) * 100,
+            "avg_semaphore_wait_ms": round(
+                self.total_semaphore_wait / self.total_requests * 1000, 2
+            ) if self.total_requests else 0.0,
+            "max_semaphore_wait_ms": round(self.max_semaphore_wait * 1000, 2),
+            "executor": executor_stats,
             **self.connection_log
         }
 
     async def health_check(self) -> Dict[str, Any]:
         """Perform a health check on the connection pool"""
         try:
-            async with self.acquire() as client:
-                # Simple query to test connection
-                result = client.table("episodes").select("id").limit(1).execute()
+            # Simple query to test connection
+            await self.execute_with_retry(
+                lambda client: client.table("episodes").select("id").limit(1).execute(),
+                max_retries=1,
+                name="health_check"
+            )
 
             return {
                 "status": "healthy",
@@ -173,6 +302,12 @@ class SupabasePool:
                 "timestamp": datetime.now().isoformat()
             }
 
+    def close(self) -> None:
+        """Shut down the worker threads (queued queries still complete)"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
 
 # Global connection pool instance
 _pool: Optional[SupabasePool] = None
@@ -12,6 +12,9 @@ import json
 import time
 from datetime import datetime
 
+from .circuit_breaker import CircuitOpenError, get_circuit_breaker
+from .instrumentation import get_query_metrics
+
 logger = logging.getLogger(__name__)
 
 class ModalInstructorXLEmbedder:
@@ -62,35 +65,45 @@ class ModalInstructorXLEmbedder:
             If return_timing=True, returns (embedding, elapsed_time) tuple or None
         """
         total_start = time.time()
-
-        for attempt in range(retries + 1):
-            try:
-                result = await self._encode_query_async(query, session_id, return_timing)
-                if result is not None:
-                    return result
-            except asyncio.TimeoutError:
-                if attempt < retries:
-                    logger.info(f"Modal timeout on attempt {attempt + 1}, retrying...")
-                    await asyncio.sleep(0.5)  # Short delay before retry
-                else:
-                    total_elapsed = time.time() - total_start
-                    logger.error(f"Modal timeout after {retries + 1} attempts, total time: {total_elapsed:.2f}s")
-
-                    # Log failure analytics
-                    analytics_data = {
-                        "timestamp": datetime.utcnow().isoformat() + "Z",
-                        "session_id": session_id,
-                        "request_type": "embedding",
-                        "modal": {
-                            "response_time": total_elapsed,
-                            "is_cold_start": True,  # Timeouts are usually cold starts
-                            "error": "timeout",
-                            "attempts": retries + 1
+        breaker = get_circuit_breaker("modal")
+
+        async with get_query_metrics().track("modal", "encode_query") as timer:
+            for attempt in range(retries + 1):
+                timer.retries = attempt
+                try:
+                    async with breaker.guard() as call:
+                        result = await self._encode_query_async(query, session_id, return_timing)
+                        call.failed = result is None
+                    if result is not None:
+                        return result
+                except CircuitOpenError as e:
+                    # Degraded path: callers fall back to text search
+                    logger.warning(f"Skipping Modal embedding: {e}")
+                    break
+                except asyncio.TimeoutError:
+                    if attempt < retries:
+                        logger.info(f"Modal timeout on attempt {attempt + 1}, retrying...")
+                        await asyncio.sleep(0.5)  # Short delay before retry
+                    else:
+                        total_elapsed = time.time() - total_start
+                        logger.error(f"Modal timeout after {retries + 1} attempts, total time: {total_elapsed:.2f}s")
+
+                        # Log failure analytics
+                        analytics_data = {
+                            "timestamp": datetime.utcnow().isoformat() + "Z",
+                            "session_id": session_id,
+                            "request_type": "embedding",
+                            "modal": {
+                                "response_time": total_elapsed,
+                                "is_cold_start": True,  # Timeouts are usually cold starts
+                                "error": "timeout",
+                                "attempts": retries + 1
+                            }
                         }
-                    }
-                    logger.info(f"MODAL_ANALYTICS: {json.dumps(analytics_data)}")
-                    raise
-        return None
+                        logger.info(f"MODAL_ANALYTICS: {json.dumps(analytics_data)}")
+                        raise
+            timer.error = True
+            return None
 
     async def _encode_query_async(self, query: str, session_id: Optional[str] = None,
                                   return_timing: bool = False) -> Union[Optional[List[float]], Optional[Tuple[List[float], float]]]:
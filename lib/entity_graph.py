@@ -0,0 +1,475 @@
+"""
+Entity co-mention graph
+Entity x episode incidence held as NumPy index arrays (CSR by entity and by
+episode). Co-occurrence rows are sparse products A[e] . A^T computed with
+bincount over the touched episodes, so a neighbour query never touches the
+raw extracted_entities rows. The graph is extended incrementally with rows
+created after its watermark.
+
+Paging every extracted_entities row takes longer than a serverless request
+may run, so requests never build the graph. scripts/build_entity_graph.py
+builds it and stores it in the entity_graph_state table (see
+scripts/sql/entity_graph.sql); the service loads that row (or a local .npz
+cache) and folds in newer rows in the background. Until a graph exists,
+EntityGraphNotReady is raised and a background build is started.
+"""
+import asyncio
+import base64
+import io
+import logging
+import os
+import time
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+
+from .database import SupabasePool
+from .entity_index import is_generic_entity
+
+logger = logging.getLogger(__name__)
+
+# Local cache file (Vercel functions can write to /tmp)
+ENTITY_GRAPH_CACHE_PATH = os.getenv("ENTITY_GRAPH_CACHE_PATH", "/tmp/podinsight_entity_graph.npz")
+REFRESH_INTERVAL = 600  # Seconds between checks for new extracted_entities rows
+PAGE_SIZE = 1000  # PostgREST max rows per request
+ENTITY_GRAPH_STATE_TABLE = "entity_graph_state"
+STATE_ROW_ID = "graph"
+BUILD_RETRY_AFTER = 30  # Seconds a client is told to wait while the graph is built
+
+
+class EntityGraphNotReady(Exception):
+    """No graph has been built yet (one is being built in the background)"""
+
+    def __init__(self, retry_after: float = BUILD_RETRY_AFTER):
+        self.retry_after = retry_after
+        super().__init__(f"Entity graph not built yet, retry in {retry_after:.0f}s")
+
+
+class EntityGraph:
+    """Immutable entity x episode incidence with co-occurrence queries"""
+
+    def __init__(
+        self,
+        entity_names: List[str],
+        entity_types: List[str],
+        episode_ids: List[str],
+        pair_entities: np.ndarray,
+        pair_episodes: np.ndarray,
+        watermark: Optional[str] = None
+    ):
+        self.entity_names = list(entity_names)
+        self.entity_types = list(entity_types)
+        self.episode_ids = list(episode_ids)
+        self.watermark = watermark
+        self.built_at = time.time()
+
+        n_entities = len(self.entity_names)
+        n_episodes = len(self.episode_ids)
+
+        # Deduplicate (entity, episode) pairs - incidence is binary
+        keys = np.unique(pair_entities.astype(np.int64) * max(n_episodes, 1) + pair_episodes.astype(np.int64))
+        entities = (keys // max(n_episodes, 1)).astype(np.int32)
+        episodes = (keys % max(n_episodes, 1)).astype(np.int32)
+
+        # CSR by entity (keys are already sorted by entity, then episode)
+        self.entity_episodes = episodes
+        self.entity_indptr = np.zeros(n_entities + 1, dtype=np.int64)
+        np.cumsum(np.bincount(entities, minlength=n_entities), out=self.entity_indptr[1:])
+
+        # CSR by episode (i.e. CSC of the entity x episode matrix)
+        order = np.argsort(episodes, kind="stable")
+        self.episode_entities = entities[order]
+        self.episode_indptr = np.zeros(n_episodes + 1, dtype=np.int64)
+        np.cumsum(np.bincount(episodes, minlength=n_episodes), out=self.episode_indptr[1:])
+
+        # Episode frequency per entity (diagonal of A . A^T)
+        self.degree = np.diff(self.entity_indptr)
+        # Episodes with at least one entity (PMI denominator)
+        self.total_episodes = int(np.count_nonzero(np.diff(self.episode_indptr)))
+
+        self._lookup: Dict[str, List[int]] = {}
+        for entity_id, name in enumerate(self.entity_names):
+            self._lookup.setdefault(name.lower(), []).append(entity_id)
+
+    @property
+    def pair_count(self) -> int:
+        return int(self.entity_episodes.size)
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Dict[str, Any]]) -> "EntityGraph":
+        return cls([], [], [], np.zeros(0, np.int32), np.zeros(0, np.int32)).merge_rows(rows)
+
+    def merge_rows(self, rows: Iterable[Dict[str, Any]]) -> "EntityGraph":
+        """New graph with extracted_entities rows added (existing pairs are ignored)"""
+        entity_names = list(self.entity_names)
+        entity_types = list(self.entity_types)
+        episode_ids = list(self.episode_ids)
+        entity_ids = {(n, t): i for i, (n, t) in enumerate(zip(entity_names, entity_types))}
+        episode_index = {e: i for i, e in enumerate(episode_ids)}
+
+        new_entities, new_episodes = [], []
+        watermark = self.watermark
+        for row in rows:
+            key = (row["entity_name"], row["entity_type"])
+            entity_id = entity_ids.get(key)
+            if entity_id is None:
+                entity_id = entity_ids[key] = len(entity_names)
+                entity_names.append(key[0])
+                entity_types.append(key[1])
+
+            episode_id = str(row["episode_id"])
+            episode_pos = episode_index.get(episode_id)
+            if episode_pos is None:
+                episode_pos = episode_index[episode_id] = len(episode_ids)
+                episode_ids.append(episode_id)
+
+            new_entities.append(entity_id)
+            new_episodes.append(episode_pos)
+            created_at = row.get("created_at")
+            if created_at and (watermark is None or created_at > watermark):
+                watermark = created_at
+
+        existing_entities = np.repeat(np.arange(len(self.entity_names), dtype=np.int32), self.degree)
+        return EntityGraph(
+            entity_names,
+            entity_types,
+            episode_ids,
+            np.concatenate([existing_entities, np.asarray(new_entities, dtype=np.int32)]),
+            np.concatenate([self.entity_episodes, np.asarray(new_episodes, dtype=np.int32)]),
+            watermark
+        )
+
+    def find_entity(self, name: str, entity_type: Optional[str] = None) -> Optional[int]:
+        """Case-insensitive lookup; the most-mentioned type wins if not specified"""
+        candidates = self._lookup.get(name.strip().lower(), [])
+        if entity_type:
+            candidates = [c for c in candidates if self.entity_types[c] == entity_type.upper()]
+        if not candidates:
+            return None
+        return max(candidates, key=lambda c: self.degree[c])
+
+    def co_occurrence_row(self, entity_id: int) -> np.ndarray:
+        """Row entity_id of A . A^T: shared-episode counts with every entity"""
+        episodes = self.entity_episodes[self.entity_indptr[entity_id]:self.entity_indptr[entity_id + 1]]
+        starts = self.episode_indptr[episodes]
+        lengths = self.episode_indptr[episodes + 1] - starts
+        if lengths.sum() == 0:
+            return np.zeros(len(self.entity_names), dtype=np.int64)
+
+        # Gather the entity lists of every touched episode in one vectorized step
+        offsets = np.repeat(starts - np.concatenate([[0], np.cumsum(lengths)[:-1]]), lengths)
+        positions = offsets + np.arange(lengths.sum())
+        row = np.bincount(self.episode_entities[positions], minlength=len(self.entity_names))
+        row[entity_id] = 0
+        return row
+
+    def pmi(self, co_counts: np.ndarray, degree_a: np.ndarray, degree_b: np.ndarray) -> np.ndarray:
+        """Pointwise mutual information (log2) of episode co-occurrence"""
+        with np.errstate(divide="ignore", invalid="ignore"):
+            values = np.log2(co_counts * self.total_episodes / (degree_a * degree_b))
+        return np.where(co_counts > 0, values, 0.0)
+
+    def neighbours(
+        self,
+        entity_id: int,
+        k: int = 10,
+        min_count: int = 2,
+        sort: str = "count",
+        neighbour_type: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """Top-k entities discussed in the same episodes"""
+        row = self.co_occurrence_row(entity_id)
+        candidates = np.nonzero(row >= max(min_count, 1))[0]
+        if neighbour_type:
+            wanted = neighbour_type.upper()
+            candidates = np.array([c for c in candidates if self.entity_types[c] == wanted], dtype=np.int64)
+        candidates = np.array(
+            [c for c in candidates if not is_generic_entity(self.entity_names[c], self.entity_types[c])],
+            dtype=np.int64
+        )
+        if candidates.size == 0:
+            return []
+
+        counts = row[candidates]
+        pmi = self.pmi(counts.astype(np.float64), float(self.degree[entity_id]), self.degree[candidates].astype(np.float64))
+        score = pmi if sort == "pmi" else counts + pmi * 1e-6  # PMI breaks count ties
+
+        if candidates.size > k:
+            top = np.argpartition(-score, k - 1)[:k]
+        else:
+            top = np.arange(candidates.size)
+        top = top[np.argsort(-score[top], kind="stable")]
+
+        return [
+            {
+                "name": self.entity_names[candidates[i]],
+                "type": self.entity_types[candidates[i]],
+                "co_occurrences": int(counts[i]),
+                "pmi": round(float(pmi[i]), 3),
+                "episode_count": int(self.degree[candidates[i]])
+            }
+            for i in top
+        ]
+
+    def top_entities(self, n: int = 25, entity_type: Optional[str] = None) -> List[int]:
+        """Entity ids with the most episodes (generic first names excluded)"""
+        order = np.argsort(-self.degree, kind="stable")
+        selected = []
+        for entity_id in order:
+            if self.degree[entity_id] == 0 or len(selected) >= n:
+                break
+            if entity_type and self.entity_types[entity_id] != entity_type.upper():
+                continue
+            if is_generic_entity(self.entity_names[entity_id], self.entity_types[entity_id]):
+                continue
+            selected.append(int(entity_id))
+        return selected
+
+    def subgraph(self, entity_ids: List[int], min_count: int = 2) -> Dict[str, Any]:
+        """Nodes and weighted edges among the given entities (dense product of their rows)"""
+        n = len(entity_ids)
+        matrix = np.zeros((n, max(len(self.episode_ids), 1)), dtype=np.float32)
+        for i, entity_id in enumerate(entity_ids):
+            matrix[i, self.entity_episodes[self.entity_indptr[entity_id]:self.entity_indptr[entity_id + 1]]] = 1.0
+        co = (matrix @ matrix.T).astype(np.int64)
+
+        degrees = self.degree[entity_ids].astype(np.float64)
+        pmi = self.pmi(co.astype(np.float64), degrees[:, None], degrees[None, :])
+
+        rows, cols = np.nonzero(np.triu(co, k=1) >= max(min_count, 1))
+        return {
+            "nodes": [
+                {"name": self.entity_names[e], "type": self.entity_types[e], "episode_count": int(self.degree[e])}
+                for e in entity_ids
+            ],
+            "edges": [
+                {
+                    "source": self.entity_names[entity_ids[i]],
+                    "target": self.entity_names[entity_ids[j]],
+                    "co_occurrences": int(co[i, j]),
+                    "pmi": round(float(pmi[i, j]), 3)
+                }
+                for i, j in zip(rows, cols)
+            ]
+        }
+
+    def to_bytes(self) -> bytes:
+        """Compressed .npz encoding (plain string arrays, so loading needs no pickle)"""
+        buffer = io.BytesIO()
+        np.savez_compressed(
+            buffer,
+            entity_names=np.array(self.entity_names, dtype=str),
+            entity_types=np.array(self.entity_types, dtype=str),
+            episode_ids=np.array(self.episode_ids, dtype=str),
+            pair_entities=np.repeat(np.arange(len(self.entity_names), dtype=np.int32), self.degree),
+            pair_episodes=self.entity_episodes,
+            watermark=np.array(self.watermark or "", dtype=str)
+        )
+        return buffer.getvalue()
+
+    @classmethod
+    def from_bytes(cls, payload: bytes) -> "EntityGraph":
+        with np.load(io.BytesIO(payload), allow_pickle=False) as data:
+            watermark = str(data["watermark"].item()) or None
+            return cls(
+                data["entity_names"].tolist(),
+                data["entity_types"].tolist(),
+                data["episode_ids"].tolist(),
+                data["pair_entities"],
+                data["pair_episodes"],
+                watermark
+            )
+
+    def save(self, path: str) -> None:
+        """Write the graph to a local .npz cache"""
+        tmp_path = f"{path}.tmp.npz"
+        with open(tmp_path, "wb") as f:
+            f.write(self.to_bytes())
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> "EntityGraph":
+        with open(path, "rb") as f:
+            return cls.from_bytes(f.read())
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "entities": len(self.entity_names),
+            "episodes": self.total_episodes,
+            "pairs": self.pair_count,
+            "watermark": self.watermark,
+            "built_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(self.built_at))
+        }
+
+
+async def fetch_entity_rows(pool: SupabasePool, since: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Page through extracted_entities (only rows created at/after `since` if given)"""
+    rows: List[Dict[str, Any]] = []
+    start = 0
+    while True:
+        def query_page(client, start=start):
+            query = client.table("extracted_entities") \
+                .select("entity_name, entity_type, episode_id, created_at")
+            if since:
+                query = query.gte("created_at", since)
+            return query.order("created_at").order("id").range(start, start + PAGE_SIZE - 1).execute()
+
+        response = await pool.execute_with_retry(query_page, name="extracted_entities_page")
+        rows.extend(response.data)
+        if len(response.data) < PAGE_SIZE:
+            return rows
+        start += PAGE_SIZE
+
+
+async def load_stored_graph(pool: SupabasePool) -> Optional[EntityGraph]:
+    """Graph saved in the entity_graph_state row, or None if there is none"""
+    def query_state(client):
+        return client.table(ENTITY_GRAPH_STATE_TABLE) \
+            .select("graph") \
+            .eq("id", STATE_ROW_ID) \
+            .limit(1) \
+            .execute()
+
+    response = await pool.execute_with_retry(query_state, name="load_entity_graph_state")
+    if not response.data:
+        return None
+    return EntityGraph.from_bytes(base64.b64decode(response.data[0]["graph"]))
+
+
+async def save_stored_graph(pool: SupabasePool, graph: EntityGraph) -> None:
+    """Save the graph to the entity_graph_state row"""
+    row = {
+        "id": STATE_ROW_ID,
+        "graph": base64.b64encode(graph.to_bytes()).decode("ascii"),
+        "watermark": graph.watermark,
+        "updated_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+    }
+    await pool.execute_with_retry(
+        lambda client: client.table(ENTITY_GRAPH_STATE_TABLE).upsert(row, on_conflict="id").execute(),
+        name="save_entity_graph_state"
+    )
+
+
+async def build_entity_graph(pool: SupabasePool, full: bool = False) -> Dict[str, Any]:
+    """
+    Bring the stored graph up to date (scripts/build_entity_graph.py)
+
+    Incremental from the stored graph unless `full` is set or none is stored.
+    """
+    graph = None if full else await load_stored_graph(pool)
+    mode = "incremental" if graph is not None else "full"
+    if graph is None and not full:
+        logger.warning(f"No entity graph in table {ENTITY_GRAPH_STATE_TABLE}, running full build")
+
+    # >= watermark re-reads boundary rows; merge ignores known pairs
+    rows = await fetch_entity_rows(pool, since=graph.watermark if graph else None)
+    graph = graph.merge_rows(rows) if graph is not None else EntityGraph.from_rows(rows)
+    await save_stored_graph(pool, graph)
+    return {"mode": mode, "rows_read": len(rows), **graph.get_stats()}
+
+
+class EntityGraphService:
+    """
+    Keeps the entity graph in memory; requests never page extracted_entities
+
+    - First use: load the local cache file, else the stored graph row; with
+      neither, start a background build and raise EntityGraphNotReady
+    - Every refresh_interval: a background task folds in rows created since
+      the watermark while the current graph keeps being served
+
+    Only the build script writes the stored row; the API just reads it.
+    """
+
+    def __init__(self, cache_path: str = ENTITY_GRAPH_CACHE_PATH, refresh_interval: float = REFRESH_INTERVAL):
+        self.cache_path = cache_path
+        self.refresh_interval = refresh_interval
+        self._graph: Optional[EntityGraph] = None
+        self._checked_at = 0.0
+        self._refresh_task: Optional[asyncio.Task] = None
+
+    @property
+    def refreshing(self) -> bool:
+        return self._refresh_task is not None and not self._refresh_task.done()
+
+    async def get(self, pool: SupabasePool) -> EntityGraph:
+        if self._graph is None and not self.refreshing:
+            self._graph = await self._load_saved(pool)
+
+        if self._graph is None:
+            self._start_refresh(pool)
+            raise EntityGraphNotReady()
+
+        if time.time() - self._checked_at >= self.refresh_interval:
+            self._start_refresh(pool)
+        return self._graph
+
+    async def wait_for_refresh(self) -> None:
+        """Wait for a running background build or refresh (tests, warm-up)"""
+        if self._refresh_task is not None:
+            await self._refresh_task
+
+    async def _load_saved(self, pool: SupabasePool) -> Optional[EntityGraph]:
+        if os.path.exists(self.cache_path):
+            try:
+                graph = EntityGraph.load(self.cache_path)
+                logger.info(f"Loaded entity graph from {self.cache_path}: {graph.get_stats()}")
+                return graph
+            except Exception as e:
+                logger.warning(f"Entity graph cache unreadable: {str(e)}")
+
+        try:
+            graph = await load_stored_graph(pool)
+        except Exception as e:
+            logger.warning(f"Stored entity graph unavailable: {str(e)}")
+            return None
+        if graph is None:
+            logger.warning(f"No entity graph stored in {ENTITY_GRAPH_STATE_TABLE}, building in the background "
+                           "(run scripts/build_entity_graph.py to keep one stored)")
+            return None
+        logger.info(f"Loaded stored entity graph: {graph.get_stats()}")
+        self._save_local(graph)
+        return graph
+
+    def _start_refresh(self, pool: SupabasePool) -> None:
+        if self.refreshing:
+            return
+        self._checked_at = time.time()
+        self._refresh_task = asyncio.create_task(self._refresh(pool))
+
+    async def _refresh(self, pool: SupabasePool) -> None:
+        graph = self._graph
+        try:
+            # >= watermark re-reads boundary rows; merge ignores known pairs
+            rows = await fetch_entity_rows(pool, since=graph.watermark if graph else None)
+            if graph is None:
+                merged = EntityGraph.from_rows(rows)
+                logger.info(f"Built entity graph from {len(rows)} rows")
+            else:
+                merged = graph.merge_rows(rows)
+                if merged.pair_count == graph.pair_count and merged.watermark == graph.watermark:
+                    return
+                logger.info(f"Merged {len(rows)} entity rows into graph: {merged.get_stats()}")
+        except Exception:
+            logger.warning("Entity graph refresh failed, serving previous graph", exc_info=True)
+            return
+
+        self._graph = merged
+        self._save_local(merged)
+
+    def _save_local(self, graph: EntityGraph) -> None:
+        try:
+            graph.save(self.cache_path)
+        except OSError as e:
+            logger.warning(f"Could not write entity graph cache {self.cache_path}: {str(e)}")
+
+
+# Global service instance
+_entity_graph_service: Optional[EntityGraphService] = None
+
+
+def get_entity_graph_service() -> EntityGraphService:
+    """Get or create the global entity graph service"""
+    global _entity_graph_service
+    if _entity_graph_service is None:
+        _entity_graph_service = EntityGraphService()
+    return _entity_graph_service
@@ -0,0 +1,148 @@
+"""
+Entity index access for /api/entities
+Reads the precomputed entity_index table (see scripts/sql/entity_index.sql)
+so top-N and name searches never scan raw extracted_entities rows.
+"""
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from dateutil import parser
+
+from .database import SupabasePool
+
+logger = logging.getLogger(__name__)
+
+ENTITY_INDEX_TABLE = "entity_index"
+# entity_type of the per-name rows aggregated across types
+ALL_ENTITY_TYPES = "ALL"
+
+# Trend window: episodes newer than this count as "recent"
+TREND_WINDOW = timedelta(weeks=4)
+
+# Common first names that aren't useful without context (single-name PERSON entities)
+GENERIC_FIRST_NAMES = {
+    "Tom", "Tommy", "Mark", "Ben", "Mike", "John", "David", "Chris", "Matt", "Steve",
+    "Dan", "Paul", "Tim", "Rob", "Jim", "Sam", "Alex", "Ryan", "Brian", "Kevin",
+    "Jason", "Jeff", "Nick", "Eric", "Sean"
+}
+
+
+def is_generic_entity(entity_name: str, entity_type: str) -> bool:
+    """Single-name PERSON entities that are too generic to show"""
+    return entity_type == "PERSON" and " " not in entity_name and entity_name in GENERIC_FIRST_NAMES
+
+
+def _as_naive_utc(value: Any) -> datetime:
+    parsed = value if isinstance(value, datetime) else parser.parse(value)
+    if parsed.tzinfo:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+def entity_trend(recent_episode_dates: List[Any], episode_count: int, now: Optional[datetime] = None) -> str:
+    """
+    Compare episodes in the last 4 weeks with everything older
+
+    recent_episode_dates only needs to cover the trend window; every other
+    episode is older by construction.
+    """
+    now = now or datetime.utcnow()
+    cutoff = now - TREND_WINDOW
+    recent_count = sum(1 for value in recent_episode_dates or [] if _as_naive_utc(value) > cutoff)
+    older_count = max(episode_count - recent_count, 0)
+
+    if recent_count > older_count * 1.5:
+        return "up"
+    if older_count > recent_count * 1.5:
+        return "down"
+    return "stable"
+
+
+def episode_display_title(podcast_name: Optional[str], duration_seconds: Optional[int], published_date: datetime) -> str:
+    """Meaningful episode title: "Podcast Name - 65 min (Jun 12, 2025)" """
+    podcast_name = podcast_name or "Unknown Podcast"
+    if duration_seconds and duration_seconds > 0:
+        duration_minutes = round(duration_seconds / 60)
+        return f"{podcast_name} - {duration_minutes} min ({published_date.strftime('%b %d, %Y')})"
+    return f"{podcast_name} ({published_date.strftime('%b %d, %Y')})"
+
+
+def format_recent_mentions(recent_mentions: List[Dict[str, Any]]) -> List[Dict[str, str]]:
+    """API shape for the (up to three) most recent episodes of an entity"""
+    formatted = []
+    for mention in recent_mentions[:3]:
+        published_date = parser.parse(mention["published_at"]) if isinstance(mention["published_at"], str) else mention["published_at"]
+        title = episode_display_title(mention.get("podcast_name"), mention.get("duration_seconds"), published_date)
+        formatted.append({
+            "episode_title": title,
+            "date": published_date.strftime("%B %d, %Y"),
+            "context": f"Mentioned in {title}"
+        })
+    return formatted
+
+
+async def query_entity_index(
+    pool: SupabasePool,
+    search: Optional[str] = None,
+    entity_type: Optional[str] = None,
+    limit: int = 20
+) -> Tuple[List[Dict[str, Any]], int]:
+    """
+    Top entities by mention count from the index
+
+    Without a type filter, entities are grouped by name across types (the
+    'ALL' rows) and reported under their most frequent type. Returns
+    (entities in API shape, total matching index rows).
+    """
+    # Over-fetch so dropping generic first names still leaves `limit` rows
+    fetch_limit = limit + len(GENERIC_FIRST_NAMES)
+
+    def query_index(client):
+        query = client.table(ENTITY_INDEX_TABLE) \
+            .select(
+                "entity_name, primary_type, mention_count, episode_count, recent_episode_dates, recent_mentions",
+                count="exact"
+            ) \
+            .eq("entity_type", entity_type.upper() if entity_type else ALL_ENTITY_TYPES)
+        if search:
+            # Served by the pg_trgm index on entity_name
+            query = query.ilike("entity_name", f"%{search}%")
+        return query.order("mention_count", desc=True).limit(fetch_limit).execute()
+
+    response = await pool.execute_with_retry(query_index, name="entity_index")
+
+    now = datetime.utcnow()
+    entities = []
+    for row in response.data:
+        if is_generic_entity(row["entity_name"], row["primary_type"]):
+            continue
+        entities.append({
+            "name": row["entity_name"],
+            "type": row["primary_type"],
+            "mention_count": row["mention_count"],
+            "episode_count": row["episode_count"],
+            "trend": entity_trend(row.get("recent_episode_dates") or [], row["episode_count"], now),
+            "recent_mentions": format_recent_mentions(row.get("recent_mentions") or [])
+        })
+        if len(entities) >= limit:
+            break
+
+    total = response.count if response.count is not None else len(response.data)
+    return entities, total
+
+
+async def refresh_entity_index(pool: SupabasePool, entity_names: Optional[List[str]] = None) -> int:
+    """
+    Recompute index rows for the given entity names (None = full rebuild)
+
+    Called by the entity ETL after loading a batch; inserts are also picked up
+    by the trigger installed with the index.
+    """
+    def call_refresh(client):
+        return client.rpc("refresh_entity_index", {"p_entity_names": entity_names}).execute()
+
+    response = await pool.execute_with_retry(call_refresh, name="refresh_entity_index")
+    refreshed = response.data if isinstance(response.data, int) else 0
+    logger.info(f"Refreshed {refreshed} entity index rows")
+    return refreshed
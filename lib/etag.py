@@ -0,0 +1,50 @@
+"""
+Response versioning for polled read endpoints
+Builds ETags from the version stamps of the underlying collections/tables
+(newest timestamp, row count) plus the request parameters, so a repeat poll can
+be answered with 304 Not Modified before any heavy query runs.
+"""
+import hashlib
+import json
+import logging
+from typing import Any, Optional
+
+from fastapi import Response
+
+logger = logging.getLogger(__name__)
+
+# Clients must revalidate every time, but may keep the body
+CACHE_CONTROL = "private, no-cache"
+
+
+def make_etag(*parts: Any) -> str:
+    """Weak ETag over version stamps and request parameters"""
+    payload = json.dumps(parts, sort_keys=True, default=str, separators=(",", ":"))
+    digest = hashlib.sha1(payload.encode("utf-8")).hexdigest()[:20]
+    return f'W/"{digest}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison of an If-None-Match header against an ETag"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+
+    def opaque(tag: str) -> str:
+        tag = tag.strip()
+        return tag[2:] if tag.startswith("W/") else tag
+
+    return any(opaque(candidate) == opaque(etag) for candidate in if_none_match.split(","))
+
+
+def not_modified(etag: str) -> Response:
+    """304 response carrying the current validator"""
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": CACHE_CONTROL})
+
+
+def set_etag(response: Response, etag: Optional[str]) -> None:
+    """Attach the validator to a full response"""
+    if etag:
+        response.headers["ETag"] = etag
+        response.headers["Cache-Control"] = CACHE_CONTROL
@@ -0,0 +1,297 @@
+"""
+Per-query instrumentation for backend calls
+Records latency, retries, semaphore wait and row counts per (backend, query
+name) for Supabase, MongoDB, Modal, OpenAI and the audio Lambda.
+
+Memory is bounded: each query keeps HDR-style log-linear histograms (fixed
+bucket arrays, ~3% relative error) for lifetime percentiles plus a fixed-size
+ring buffer of recent samples for exact recent percentiles, and the number
+of distinct query names is capped.
+"""
+import asyncio
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+# Histogram layout: values in microseconds, 64 linear sub-buckets per power of two
+SUB_BUCKET_BITS = 6
+SUB_BUCKET_COUNT = 1 << SUB_BUCKET_BITS
+HALF_SUB_BUCKET = SUB_BUCKET_COUNT // 2
+MAX_EXPONENT = 40  # 2^40 us ~ 12 days; larger values land in the last bucket
+BUCKET_COUNT = SUB_BUCKET_COUNT + (MAX_EXPONENT - SUB_BUCKET_BITS) * HALF_SUB_BUCKET
+
+RING_SIZE = 512         # Recent samples kept per query
+MAX_QUERY_NAMES = 256   # Further names are folded into "other"
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+def _bucket_index(value_us: int) -> int:
+    if value_us < SUB_BUCKET_COUNT:
+        return max(value_us, 0)
+    exponent = value_us.bit_length() - SUB_BUCKET_BITS
+    mantissa = value_us >> exponent
+    index = SUB_BUCKET_COUNT + (exponent - 1) * HALF_SUB_BUCKET + (mantissa - HALF_SUB_BUCKET)
+    return min(index, BUCKET_COUNT - 1)
+
+
+def _bucket_value(index: int) -> int:
+    """Upper bound (in microseconds) of a bucket"""
+    if index < SUB_BUCKET_COUNT:
+        return index
+    exponent = (index - SUB_BUCKET_COUNT) // HALF_SUB_BUCKET + 1
+    mantissa = (index - SUB_BUCKET_COUNT) % HALF_SUB_BUCKET + HALF_SUB_BUCKET
+    return ((mantissa + 1) << exponent) - 1
+
+
+class LatencyHistogram:
+    """Fixed-size log-linear histogram of durations"""
+
+    def __init__(self):
+        self.counts = np.zeros(BUCKET_COUNT, dtype=np.int64)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, seconds: float) -> None:
+        self.counts[_bucket_index(int(seconds * 1_000_000))] += 1
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def percentile(self, quantile: float) -> float:
+        """Duration in seconds at the given quantile (0..1)"""
+        if self.count == 0:
+            return 0.0
+        rank = max(int(np.ceil(quantile * self.count)), 1)
+        index = int(np.searchsorted(np.cumsum(self.counts), rank))
+        return min(_bucket_value(index) / 1_000_000, self.max)
+
+
+class QueryStats:
+    """Counters, histograms and recent samples for one named query"""
+
+    def __init__(self, backend: str, name: str):
+        self.backend = backend
+        self.name = name
+        self.calls = 0
+        self.errors = 0
+        self.cancelled = 0
+        self.retries = 0
+        self.rows_total = 0
+        self.latency = LatencyHistogram()
+        self.semaphore_wait = LatencyHistogram()
+
+        # Ring buffer of recent samples
+        self._recent_latency = np.zeros(RING_SIZE, dtype=np.float64)
+        self._recent_rows = np.full(RING_SIZE, -1, dtype=np.int64)
+        self._recent_next = 0
+        self._recent_size = 0
+
+    def record(self, latency: float, rows: Optional[int], retries: int, semaphore_wait: float, error: bool,
+               cancelled: bool = False) -> None:
+        self.calls += 1
+        self.retries += retries
+        if error:
+            self.errors += 1
+        if cancelled:
+            self.cancelled += 1
+        if rows is not None:
+            self.rows_total += rows
+        self.latency.record(latency)
+        self.semaphore_wait.record(semaphore_wait)
+
+        self._recent_latency[self._recent_next] = latency
+        self._recent_rows[self._recent_next] = -1 if rows is None else rows
+        self._recent_next = (self._recent_next + 1) % RING_SIZE
+        self._recent_size = min(self._recent_size + 1, RING_SIZE)
+
+    def to_dict(self) -> Dict[str, Any]:
+        recent = self._recent_latency[:self._recent_size]
+        recent_rows = self._recent_rows[:self._recent_size]
+        recent_rows = recent_rows[recent_rows >= 0]
+        recent_quantiles = np.quantile(recent, QUANTILES) if recent.size else [0.0] * len(QUANTILES)
+
+        return {
+            "backend": self.backend,
+            "query": self.name,
+            "calls": self.calls,
+            "errors": self.errors,
+            "cancelled": self.cancelled,
+            "retries": self.retries,
+            "rows_total": self.rows_total,
+            "avg_ms": round(self.latency.total / self.calls * 1000, 2) if self.calls else 0.0,
+            "p50_ms": round(self.latency.percentile(0.5) * 1000, 2),
+            "p95_ms": round(self.latency.percentile(0.95) * 1000, 2),
+            "p99_ms": round(self.latency.percentile(0.99) * 1000, 2),
+            "max_ms": round(self.latency.max * 1000, 2),
+            "semaphore_wait_p95_ms": round(self.semaphore_wait.percentile(0.95) * 1000, 2),
+            "semaphore_wait_max_ms": round(self.semaphore_wait.max * 1000, 2),
+            "recent": {
+                "samples": int(recent.size),
+                "p50_ms": round(float(recent_quantiles[0]) * 1000, 2),
+                "p95_ms": round(float(recent_quantiles[1]) * 1000, 2),
+                "p99_ms": round(float(recent_quantiles[2]) * 1000, 2),
+                "avg_rows": round(float(recent_rows.mean()), 1) if recent_rows.size else None
+            }
+        }
+
+
+class QueryTimer:
+    """
+    Times one call; usable with `with` or `async with`
+
+    Set `rows`, `retries`, `semaphore_wait` or `error` on the timer inside
+    the block. An exception escaping the block counts as an error, except
+    cancellation, which is counted separately.
+    """
+
+    def __init__(self, metrics: "QueryMetrics", backend: str, name: str):
+        self.metrics = metrics
+        self.backend = backend
+        self.name = name
+        self.rows: Optional[int] = None
+        self.retries = 0
+        self.semaphore_wait = 0.0
+        self.error = False
+        self._start = 0.0
+
+    def __enter__(self) -> "QueryTimer":
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        cancelled = exc_type is not None and issubclass(exc_type, asyncio.CancelledError)
+        self.metrics.record(
+            self.backend,
+            self.name,
+            time.perf_counter() - self._start,
+            rows=self.rows,
+            retries=self.retries,
+            semaphore_wait=self.semaphore_wait,
+            error=self.error or (exc_type is not None and not cancelled),
+            cancelled=cancelled
+        )
+        return False
+
+    async def __aenter__(self) -> "QueryTimer":
+        return self.__enter__()
+
+    async def __aexit__(self, exc_type, exc, tb) -> bool:
+        return self.__exit__(exc_type, exc, tb)
+
+
+class QueryMetrics:
+    """Registry of QueryStats keyed by (backend, query name)"""
+
+    def __init__(self, max_queries: int = MAX_QUERY_NAMES):
+        self.max_queries = max_queries
+        self._queries: Dict[Tuple[str, str], QueryStats] = {}
+        self._lock = threading.Lock()
+        self.started_at = time.time()
+
+    def track(self, backend: str, name: str) -> QueryTimer:
+        return QueryTimer(self, backend, name)
+
+    def record(
+        self,
+        backend: str,
+        name: str,
+        latency: float,
+        rows: Optional[int] = None,
+        retries: int = 0,
+        semaphore_wait: float = 0.0,
+        error: bool = False,
+        cancelled: bool = False
+    ) -> None:
+        with self._lock:
+            key = (backend, name)
+            stats = self._queries.get(key)
+            if stats is None:
+                if len(self._queries) >= self.max_queries:
+                    key = (backend, "other")
+                    stats = self._queries.get(key)
+                if stats is None:
+                    stats = self._queries[key] = QueryStats(*key)
+            stats.record(latency, rows, retries, semaphore_wait, error, cancelled)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            queries = [stats.to_dict() for stats in self._queries.values()]
+        queries.sort(key=lambda q: (q["backend"], -q["p95_ms"]))
+
+        backends: Dict[str, List[Dict[str, Any]]] = {}
+        for query in queries:
+            backends.setdefault(query["backend"], []).append(query)
+        return {
+            "since": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(self.started_at)),
+            "queries": backends
+        }
+
+    def prometheus_text(self, gauges: Optional[Dict[str, float]] = None) -> str:
+        """Prometheus text exposition (format 0.0.4) of all query stats"""
+        with self._lock:
+            snapshot = [
+                (stats.backend, stats.name, stats.calls, stats.errors, stats.retries, stats.rows_total,
+                 [stats.latency.percentile(q) for q in QUANTILES], stats.latency.total,
+                 [stats.semaphore_wait.percentile(q) for q in QUANTILES], stats.semaphore_wait.total,
+                 stats.cancelled)
+                for stats in self._queries.values()
+            ]
+
+        lines = [
+            "# HELP podinsight_query_duration_seconds Backend call latency by query",
+            "# TYPE podinsight_query_duration_seconds summary"
+        ]
+        for backend, name, calls, _, _, _, latency, latency_sum, _, _, _ in snapshot:
+            labels = _labels(backend=backend, query=name)
+            for quantile, value in zip(QUANTILES, latency):
+                lines.append(f'podinsight_query_duration_seconds{{{labels},quantile="{quantile}"}} {value:.6f}')
+            lines.append(f"podinsight_query_duration_seconds_sum{{{labels}}} {latency_sum:.6f}")
+            lines.append(f"podinsight_query_duration_seconds_count{{{labels}}} {calls}")
+
+        lines += [
+            "# HELP podinsight_query_semaphore_wait_seconds Time spent waiting for a connection slot",
+            "# TYPE podinsight_query_semaphore_wait_seconds summary"
+        ]
+        for backend, name, calls, _, _, _, _, _, wait, wait_sum, _ in snapshot:
+            labels = _labels(backend=backend, query=name)
+            for quantile, value in zip(QUANTILES, wait):
+                lines.append(f'podinsight_query_semaphore_wait_seconds{{{labels},quantile="{quantile}"}} {value:.6f}')
+            lines.append(f"podinsight_query_semaphore_wait_seconds_sum{{{labels}}} {wait_sum:.6f}")
+            lines.append(f"podinsight_query_semaphore_wait_seconds_count{{{labels}}} {calls}")
+
+        counters = (
+            ("podinsight_query_errors_total", "Failed backend calls", 3),
+            ("podinsight_query_retries_total", "Retries across backend calls", 4),
+            ("podinsight_query_rows_total", "Rows/documents returned", 5),
+            ("podinsight_query_cancelled_total", "Backend calls cancelled before completing", 10)
+        )
+        for metric, help_text, position in counters:
+            lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} counter"]
+            for row in snapshot:
+                lines.append(f"{metric}{{{_labels(backend=row[0], query=row[1])}}} {row[position]}")
+
+        for metric, value in (gauges or {}).items():
+            lines += [f"# TYPE {metric} gauge", f"{metric} {value}"]
+
+        return "\n".join(lines) + "\n"
+
+
+def _labels(**labels: str) -> str:
+    def escape(value: str) -> str:
+        return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+    return ",".join(f'{key}="{escape(str(value))}"' for key, value in labels.items())
+
+
+# Global metrics instance
+_query_metrics: Optional[QueryMetrics] = None
+
+
+def get_query_metrics() -> QueryMetrics:
+    """Get or create the global query metrics registry"""
+    global _query_metrics
+    if _query_metrics is None:
+        _query_metrics = QueryMetrics()
+    return _query_metrics
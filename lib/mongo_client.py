@@ -0,0 +1,51 @@
+"""
+Shared synchronous MongoDB client
+Serverless handlers used to open a MongoClient per request, paying DNS SRV
+lookup, TLS and authentication on every call. pymongo clients are
+thread-safe and pool their connections, so one client per process is reused
+across warm invocations.
+"""
+import os
+import threading
+from typing import Optional
+
+from pymongo import MongoClient
+from pymongo.database import Database
+
+DEFAULT_DATABASE = "podinsight"
+
+_client: Optional[MongoClient] = None
+_client_lock = threading.Lock()
+
+
+def get_mongo_client() -> MongoClient:
+    """Get or create the process-wide MongoDB client"""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                mongodb_uri = os.getenv('MONGODB_URI')
+                if not mongodb_uri:
+                    raise ValueError("MONGODB_URI not configured")
+                _client = MongoClient(
+                    mongodb_uri,
+                    maxPoolSize=10,
+                    minPoolSize=0,
+                    serverSelectionTimeoutMS=5000,
+                    connectTimeoutMS=5000
+                )
+    return _client
+
+
+def get_mongo_db(name: Optional[str] = None) -> Database:
+    """Database on the shared client (MONGODB_DATABASE, default podinsight)"""
+    return get_mongo_client()[name or os.getenv('MONGODB_DATABASE', DEFAULT_DATABASE)]
+
+
+def close_mongo_client() -> None:
+    """Close the shared client (tests and shutdown)"""
+    global _client
+    with _client_lock:
+        if _client is not None:
+            _client.close()
+            _client = None
@@ -0,0 +1,166 @@
+"""
+Token-budgeted prompt packing for synthesis
+Excerpts used to be cut at 200 characters regardless of relevance, so prompt
+size (and with it OpenAI latency and cost) varied with whatever the search
+returned while strong evidence was truncated as hard as weak evidence.
+
+The packer splits a fixed input-token budget across chunks by score. Each
+share is filled with whole sentences, starting from the sentence that
+matches the most query terms and growing outwards; unused tokens roll over
+to the next chunk. Tokens are counted with tiktoken when it is installed,
+otherwise estimated at ~4 characters per token.
+
+tiktoken downloads its BPE file on first use, a blocking multi-MB request.
+The encoding is therefore loaded on a background thread started at import
+(TIKTOKEN_CACHE_DIR can point at a shipped copy); until it is ready, and if
+it cannot be loaded, counts are estimated. Counting never blocks the event
+loop.
+"""
+import logging
+import math
+import os
+import re
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict, List, Tuple
+
+try:
+    import tiktoken
+except ImportError:  # Optional: token counts are estimated without it
+    tiktoken = None
+
+logger = logging.getLogger(__name__)
+
+# Input tokens for the user prompt (excerpts, headers and instructions)
+PROMPT_TOKEN_BUDGET = int(os.getenv("SYNTHESIS_PROMPT_TOKEN_BUDGET", "1200"))
+MIN_EXCERPT_TOKENS = 24  # Smaller shares carry no usable evidence
+CHARS_PER_TOKEN = 4
+TOKENIZER_ENCODING = "o200k_base"  # gpt-4o family
+
+SENTENCE_BOUNDARY = re.compile(r'(?<=[.!?])\s+')
+
+# None until loaded, False if it can't be
+_encoding: Any = None
+
+
+def load_encoding() -> None:
+    """Load the tiktoken encoding (blocking; run off the event loop)"""
+    global _encoding
+    if _encoding is not None or tiktoken is None:
+        return
+    for name in (TOKENIZER_ENCODING, "cl100k_base"):
+        try:
+            _encoding = tiktoken.get_encoding(name)
+            logger.info(f"tiktoken encoding {name} loaded")
+            return
+        except Exception as e:
+            # Encodings are downloaded on first use; estimate if that fails
+            logger.warning(f"tiktoken encoding {name} unavailable: {e}")
+    _encoding = False
+
+
+def _get_encoding():
+    """tiktoken encoding if already loaded, else None (never loads it)"""
+    return _encoding or None
+
+
+def count_tokens(text: str) -> int:
+    """Tokens in text (exact once tiktoken is loaded, estimated otherwise)"""
+    if not text:
+        return 0
+    encoding = _get_encoding()
+    if encoding is not None:
+        return len(encoding.encode(text))
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Cut text at a word boundary so that it (plus "...") fits max_tokens"""
+    if count_tokens(text) <= max_tokens:
+        return text
+    words = text[:max_tokens * CHARS_PER_TOKEN].split()
+    while words and count_tokens(" ".join(words) + "...") > max_tokens:
+        words.pop()
+    return " ".join(words) + "..." if words else ""
+
+
+def split_sentences(text: str) -> List[str]:
+    """Split transcript text into sentences"""
+    return [s.strip() for s in SENTENCE_BOUNDARY.split(text) if s.strip()]
+
+
+def select_sentences(text: str, query_terms: List[str], max_tokens: int) -> Tuple[str, int]:
+    """
+    Whole sentences around the best query match that fit max_tokens
+
+    Returns (excerpt, tokens used). A single anchor sentence longer than the
+    share is cut at a word boundary.
+    """
+    sentences = split_sentences(text)
+    if not sentences or max_tokens <= 0:
+        return "", 0
+
+    # +1 for the joining space
+    costs = [count_tokens(s) + 1 for s in sentences]
+
+    def matches(i: int) -> int:
+        lowered = sentences[i].lower()
+        return sum(1 for term in query_terms if term in lowered)
+
+    anchor = max(range(len(sentences)), key=lambda i: (matches(i), -i))
+    if costs[anchor] > max_tokens:
+        excerpt = truncate_to_tokens(sentences[anchor], max_tokens)
+        return excerpt, count_tokens(excerpt)
+
+    lo = hi = anchor
+    used = costs[anchor]
+    grown = True
+    while grown:
+        grown = False
+        # Following sentence first: it usually completes the matched claim
+        for i in (hi + 1, lo - 1):
+            if 0 <= i < len(sentences) and used + costs[i] <= max_tokens:
+                used += costs[i]
+                lo, hi = min(lo, i), max(hi, i)
+                grown = True
+
+    return " ".join(sentences[lo:hi + 1]), used
+
+
+@dataclass
+class PackedExcerpts:
+    """Excerpts in chunk order and the tokens they use"""
+    excerpts: List[str]
+    tokens: int
+
+
+def pack_excerpts(chunks: List[Dict[str, Any]], query_terms: List[str], budget: int) -> PackedExcerpts:
+    """
+    Split budget across chunks by score and fill each share with sentences
+
+    Higher-scored chunks are packed first; tokens a chunk doesn't need pass
+    to the chunks after it. Chunks left with less than MIN_EXCERPT_TOKENS
+    get an empty excerpt.
+    """
+    excerpts = [""] * len(chunks)
+    weights = [max(float(chunk.get("score") or 0.0), 0.05) for chunk in chunks]
+    order = sorted(range(len(chunks)), key=lambda i: -weights[i])
+
+    remaining_budget = max(budget, 0)
+    remaining_weight = sum(weights)
+    tokens = 0
+    for i in order:
+        share = int(remaining_budget * weights[i] / remaining_weight) if remaining_weight else 0
+        share = min(max(share, MIN_EXCERPT_TOKENS), remaining_budget)
+        remaining_weight -= weights[i]
+        if share < MIN_EXCERPT_TOKENS:
+            continue
+        excerpts[i], used = select_sentences(chunks[i].get("text", "").strip(), query_terms, share)
+        remaining_budget -= used
+        tokens += used
+
+    return PackedExcerpts(excerpts=excerpts, tokens=tokens)
+
+
+if tiktoken is not None:
+    threading.Thread(target=load_encoding, name="tiktoken-warmup", daemon=True).start()
@@ -0,0 +1,218 @@
+"""
+Personalised relevance scoring for episode intelligence briefs
+Compiles a user's portfolio companies and topics into one Aho-Corasick automaton
+so each episode's signal text is scanned once instead of once per preference.
+"""
+import hashlib
+import json
+import logging
+from collections import deque
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from .cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+# Boosts applied on top of the stored episode relevance score
+PORTFOLIO_BOOST = 0.15  # Applied once if any portfolio company is mentioned
+TOPIC_BOOST = 0.05      # Applied for every matching topic/keyword
+
+# Signal types rendered in briefs (scored text must match what the user sees)
+SIGNAL_TYPES = ["investable", "competitive", "portfolio", "soundbites"]
+
+
+class PreferenceMatcher:
+    """
+    Multi-pattern substring matcher built from one version of user preferences
+
+    Matching is case-insensitive and reports overlapping matches, so the result
+    is identical to testing ``pattern.lower() in text.lower()`` for every pattern.
+    """
+
+    def __init__(self, portfolio_companies: List[str], topics: List[str]):
+        self.portfolio_companies = [c.lower() for c in portfolio_companies]
+        self.topics = [t.lower() for t in topics]
+        self.version = preferences_version(portfolio_companies, topics)
+
+        self._patterns: List[str] = []
+        self._always_match: Set[int] = set()
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[int]] = [[]]
+
+        pattern_ids: Dict[str, int] = {}
+        for pattern in self.portfolio_companies + self.topics:
+            if pattern not in pattern_ids:
+                pattern_ids[pattern] = len(self._patterns)
+                self._patterns.append(pattern)
+        self._company_ids = {pattern_ids[c] for c in self.portfolio_companies}
+        self._topic_ids = [pattern_ids[t] for t in self.topics]
+
+        for pattern_id, pattern in enumerate(self._patterns):
+            if not pattern:
+                # "" in text is always True
+                self._always_match.add(pattern_id)
+                continue
+            self._insert(pattern, pattern_id)
+        self._build_failure_links()
+
+    def _insert(self, pattern: str, pattern_id: int) -> None:
+        state = 0
+        for char in pattern:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            state = next_state
+        self._out[state].append(pattern_id)
+
+    def _build_failure_links(self) -> None:
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[next_state] = target if target != next_state else 0
+                # Inherit outputs of the suffix state so overlapping matches are reported
+                self._out[next_state] = self._out[next_state] + self._out[self._fail[next_state]]
+
+    @property
+    def is_empty(self) -> bool:
+        return not self._patterns
+
+    def find(self, text: str) -> Set[int]:
+        """Return ids of all patterns that occur in text (single pass)"""
+        found = set(self._always_match)
+        remaining = len(self._patterns) - len(found)
+        if remaining == 0 or not text:
+            return found
+
+        goto, fail, out = self._goto, self._fail, self._out
+        state = 0
+        for char in text.lower():
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if out[state]:
+                for pattern_id in out[state]:
+                    if pattern_id not in found:
+                        found.add(pattern_id)
+                        remaining -= 1
+                if remaining == 0:
+                    break
+        return found
+
+    def boost(self, text: str) -> float:
+        """Preference boost for a block of signal text"""
+        if self.is_empty:
+            return 0.0
+        found = self.find(text)
+        boost = 0.0
+        if self._company_ids & found:
+            boost += PORTFOLIO_BOOST
+        # Duplicate topics each count, as in the original per-topic loop
+        boost += TOPIC_BOOST * sum(1 for topic_id in self._topic_ids if topic_id in found)
+        return boost
+
+
+def preferences_version(portfolio_companies: Iterable[str], topics: Iterable[str]) -> str:
+    """Stable fingerprint of a preference set (changes whenever the lists change)"""
+    payload = json.dumps([list(portfolio_companies), list(topics)], ensure_ascii=False)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+def signal_text(signal_data: Dict[str, Any]) -> str:
+    """Lower-cased text of all displayable signals in an intelligence document"""
+    parts = []
+    for signal_type in SIGNAL_TYPES:
+        items = signal_data.get(signal_type)
+        if not isinstance(items, list):
+            continue
+        for item in items:
+            if isinstance(item, dict):
+                content = item.get("content") or item.get("signal_text") or ""
+                parts.append(content.lower())
+    return " ".join(parts)
+
+
+def _episode_cache_key(intel_doc: Dict[str, Any], text: Optional[str]) -> Tuple[Any, str]:
+    """Identify one version of an episode's intelligence document"""
+    episode_id = intel_doc.get("episode_id") or str(intel_doc.get("_id", ""))
+    stamp = intel_doc.get("updated_at") or intel_doc.get("created_at")
+    if stamp is not None:
+        return episode_id, str(stamp)
+    # No timestamp stored: fall back to a fingerprint of the scored text
+    return episode_id, hashlib.sha1((text or "").encode("utf-8")).hexdigest()
+
+
+class RelevanceScorer:
+    """
+    Scores intelligence documents against user preferences
+
+    - One compiled matcher per preference version
+    - Per-episode boosts cached until the preferences or the document change
+    """
+
+    def __init__(self, max_matchers: int = 64, max_scores: int = 20000):
+        self._matchers = TTLCache(max_size=max_matchers, ttl=None)
+        self._scores = TTLCache(max_size=max_scores, ttl=None)
+
+    def matcher_for(self, portfolio_companies: List[str], topics: List[str]) -> PreferenceMatcher:
+        """Get (or compile) the matcher for this preference set"""
+        version = preferences_version(portfolio_companies, topics)
+        matcher = self._matchers.get(version)
+        if matcher is None:
+            matcher = PreferenceMatcher(portfolio_companies, topics)
+            self._matchers.set(version, matcher)
+        return matcher
+
+    def preference_boost(self, matcher: PreferenceMatcher, intel_doc: Dict[str, Any]) -> float:
+        """Boost for one episode, reusing the cached value when nothing changed"""
+        if matcher.is_empty:
+            return 0.0
+
+        has_stamp = intel_doc.get("updated_at") or intel_doc.get("created_at")
+        text = None if has_stamp else signal_text(intel_doc.get("signals") or {})
+        key = (matcher.version,) + _episode_cache_key(intel_doc, text)
+
+        cached = self._scores.get(key)
+        if cached is not None:
+            return cached
+
+        if text is None:
+            text = signal_text(intel_doc.get("signals") or {})
+        boost = matcher.boost(text)
+        self._scores.set(key, boost)
+        return boost
+
+    def score(self, base_score: float, matcher: Optional[PreferenceMatcher],
+              intel_doc: Dict[str, Any]) -> float:
+        """Base score plus preference boost, capped at 1.0"""
+        if matcher is None:
+            return base_score
+        return min(base_score + self.preference_boost(matcher, intel_doc), 1.0)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "matchers": self._matchers.get_stats(),
+            "scores": self._scores.get_stats()
+        }
+
+
+# Global scorer instance
+_scorer: Optional[RelevanceScorer] = None
+
+
+def get_relevance_scorer() -> RelevanceScorer:
+    """Get or create the global relevance scorer"""
+    global _scorer
+    if _scorer is None:
+        _scorer = RelevanceScorer()
+    return _scorer
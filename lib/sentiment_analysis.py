@@ -6,18 +6,95 @@ Analyzes sentiment trends for topics using MongoDB transcripts
 
 from http.server import BaseHTTPRequestHandler
 import json
-import os
 import re
 from datetime import datetime, timedelta, timezone
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Tuple
 import urllib.parse
-from pymongo import MongoClient
 import logging
 
+from .instrumentation import get_query_metrics
+from .mongo_client import get_mongo_db
+from .sentiment_lexicon import SentimentLexicon
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Sentiment keywords with weights
+SENTIMENT_KEYWORDS = {
+    # Strong positive
+    'amazing': 1.0, 'incredible': 1.0, 'revolutionary': 1.0, 'breakthrough': 1.0,
+    'phenomenal': 1.0, 'excellent': 0.8, 'fantastic': 0.8, 'brilliant': 0.8,
+
+    # Positive
+    'great': 0.7, 'love': 0.7, 'wonderful': 0.7, 'outstanding': 0.7,
+    'excited': 0.6, 'impressive': 0.6, 'innovative': 0.6, 'powerful': 0.6,
+    'successful': 0.5, 'valuable': 0.5, 'promising': 0.5, 'good': 0.4,
+    'interesting': 0.3, 'useful': 0.4, 'helpful': 0.4,
+
+    # Negative
+    'bad': -0.4, 'poor': -0.5, 'disappointing': -0.6, 'failed': -0.6,
+    'useless': -0.7, 'terrible': -0.8, 'horrible': -0.8, 'awful': -0.8,
+    'problematic': -0.5, 'concerning': -0.4, 'worried': -0.4, 'difficult': -0.3,
+    'challenging': -0.2, 'risky': -0.4, 'dangerous': -0.6, 'threat': -0.5,
+
+    # Strong negative
+    'disaster': -1.0, 'catastrophe': -1.0, 'failure': -0.8, 'worst': -0.8
+}
+CONTEXT_CHARS = 200  # Context window either side of a topic mention
+MAX_CONTEXTS = 5     # Topic mentions scored per transcript
+SAMPLE_SIZE = 50     # Chunks analyzed per topic/week
+AGGREGATION_TIMEOUT_MS = 8000  # Leave headroom inside the serverless time limit
+WEEK_MS = 7 * 24 * 60 * 60 * 1000
+
+_lexicon = SentimentLexicon(SENTIMENT_KEYWORDS)
+
+
+def topic_regex(topic: str) -> str:
+    """Case-insensitive literal match for a topic name"""
+    return re.escape(topic)
+
+
+def build_sentiment_pipeline(topics: List[str], start_date: datetime, end_date: datetime) -> List[Dict[str, Any]]:
+    """
+    One aggregation returning counts and samples for every (topic, week)
+
+    The leading $match bounds the scan by date and by any topic, then a
+    $facet branch per topic (t0, t1, ...) groups its chunks by week index
+    with the chunk count and the first SAMPLE_SIZE texts.
+    """
+    week_index = {"$floor": {"$divide": [{"$subtract": ["$created_at", start_date]}, WEEK_MS]}}
+    facets = {
+        f"t{i}": [
+            {"$match": {"text": {"$regex": topic_regex(topic), "$options": "i"}}},
+            {"$group": {
+                "_id": week_index,
+                "chunk_count": {"$sum": 1},
+                "samples": {"$firstN": {"n": SAMPLE_SIZE, "input": "$text"}}
+            }}
+        ]
+        for i, topic in enumerate(topics)
+    }
+    return [
+        {"$match": {
+            "created_at": {"$gte": start_date, "$lt": end_date},
+            "text": {"$regex": "|".join(topic_regex(topic) for topic in topics), "$options": "i"}
+        }},
+        {"$project": {"_id": 0, "text": 1, "created_at": 1}},
+        {"$facet": facets}
+    ]
+
+
+def cells_from_facets(facets: Dict[str, Any], topics: List[str]) -> Dict[Tuple[str, int], Dict[str, Any]]:
+    """(topic, week index) -> {"chunk_count", "samples"} from the $facet result"""
+    cells = {}
+    for i, topic in enumerate(topics):
+        for group in facets.get(f"t{i}", []):
+            if group.get("_id") is None:
+                continue
+            cells[(topic, int(group["_id"]))] = group
+    return cells
+
 
 class handler(BaseHTTPRequestHandler):
     def do_OPTIONS(self):
@@ -79,157 +156,83 @@ class handler(BaseHTTPRequestHandler):
 
     def _calculate_sentiment(self, weeks: int, topics: List[str]) -> List[Dict[str, Any]]:
         """Calculate sentiment scores based on transcript content from MongoDB"""
-
-        # Connect to MongoDB
-        mongodb_uri = os.getenv('MONGODB_URI')
-        if not mongodb_uri:
-            raise ValueError("MONGODB_URI not configured")
-
-        client = MongoClient(mongodb_uri)
-        db = client['podinsight']
-        collection = db['transcript_chunks_768d']
-
-        try:
-            # Get date range
-            end_date = datetime.now(timezone.utc)
-            start_date = end_date - timedelta(weeks=weeks)
-
-            # ADD COMPREHENSIVE LOGGING
-            logger.info(f"=== Sentiment Analysis Request ===")
-            logger.info(f"Date range: {start_date.strftime('%Y-%m-%d')} to {end_date.strftime('%Y-%m-%d')}")
-            logger.info(f"Weeks requested: {weeks}")
-            logger.info(f"Topics: {topics}")
-
-            # Sentiment keywords with weights
-            sentiment_keywords = {
-                # Strong positive
-                'amazing': 1.0, 'incredible': 1.0, 'revolutionary': 1.0, 'breakthrough': 1.0,
-                'phenomenal': 1.0, 'excellent': 0.8, 'fantastic': 0.8, 'brilliant': 0.8,
-
-                # Positive
-                'great': 0.7, 'love': 0.7, 'wonderful': 0.7, 'outstanding': 0.7,
-                'excited': 0.6, 'impressive': 0.6, 'innovative': 0.6, 'powerful': 0.6,
-                'successful': 0.5, 'valuable': 0.5, 'promising': 0.5, 'good': 0.4,
-                'interesting': 0.3, 'useful': 0.4, 'helpful': 0.4,
-
-                # Negative
-                'bad': -0.4, 'poor': -0.5, 'disappointing': -0.6, 'failed': -0.6,
-                'useless': -0.7, 'terrible': -0.8, 'horrible': -0.8, 'awful': -0.8,
-                'problematic': -0.5, 'concerning': -0.4, 'worried': -0.4, 'difficult': -0.3,
-                'challenging': -0.2, 'risky': -0.4, 'dangerous': -0.6, 'threat': -0.5,
-
-                # Strong negative
-                'disaster': -1.0, 'catastrophe': -1.0, 'failure': -0.8, 'worst': -0.8
-            }
-
-            sentiment_results = []
-
-            # Process each week
-            for week_offset in range(weeks):
-                week_start = start_date + timedelta(weeks=week_offset)
-                week_end = week_start + timedelta(days=7)
-                week_label = f"W{week_offset + 1}"
-
-                for topic in topics:
-                    # Create case-insensitive regex for topic
-                    topic_pattern = re.compile(re.escape(topic), re.IGNORECASE)
-
-                    # Find chunks in this date range that mention the topic
-                    # Note: transcript_chunks_768d uses 'text' field and 'created_at' for dates
-                    query = {
-                        "text": {"$regex": topic_pattern},
-                        "created_at": {
-                            "$gte": week_start,
-                            "$lt": week_end
-                        }
-                    }
-
-                    # Count chunks (as a proxy for episode mentions)
-                    chunk_count = collection.count_documents(query)
-                    # Estimate episode count (rough approximation: ~30 chunks per episode)
-                    episode_count = max(1, chunk_count // 30) if chunk_count > 0 else 0
-
-                    if chunk_count == 0:
-                        logger.info(f"No chunks found for {topic} in week {week_label} ({week_start.strftime('%Y-%m-%d')} to {week_end.strftime('%Y-%m-%d')})")
-                        sentiment_results.append({
-                            "topic": topic,
-                            "week": week_label,
-                            "sentiment": 0.0,
-                            "episodeCount": 0
-                        })
-                        continue
-
-                    # Get sample of chunks (limit to prevent timeout)
-                    cursor = collection.find(query, {
-                        "text": 1,
-                        "episode_title": 1,
-                        "episode_id": 1,
-                        "_id": 0
-                    }).limit(50)  # Analyze up to 50 chunks per topic/week
-
-                    transcripts = list(cursor)
-
-                    # Calculate sentiment for sampled transcripts
-                    total_sentiment_score = 0
-                    analyzed_count = 0
-
-                    for transcript in transcripts:
-                        content = transcript.get('text', '').lower()
-
-                        # Find context around topic mentions (±200 characters)
-                        contexts = []
-                        for match in topic_pattern.finditer(content, re.IGNORECASE):
-                            start = max(0, match.start() - 200)
-                            end = min(len(content), match.end() + 200)
-                            contexts.append(content[start:end])
-
-                        if not contexts:
-                            continue
-
-                        # Calculate sentiment for contexts
-                        context_sentiments = []
-
-                        for context in contexts[:5]:  # Limit contexts per transcript
-                            sentiment_score = 0
-                            keyword_hits = 0
-
-                            # Check for sentiment keywords
-                            for keyword, weight in sentiment_keywords.items():
-                                if keyword in context:
-                                    sentiment_score += weight
-                                    keyword_hits += 1
-
-                            # Only count if we found sentiment keywords
-                            if keyword_hits > 0:
-                                context_sentiments.append(sentiment_score / keyword_hits)
-
-                        # Average sentiment across contexts
-                        if context_sentiments:
-                            transcript_sentiment = sum(context_sentiments) / len(context_sentiments)
-                            total_sentiment_score += transcript_sentiment
-                            analyzed_count += 1
-
-                    # Calculate average sentiment
-                    if analyzed_count > 0:
-                        avg_sentiment = total_sentiment_score / analyzed_count
-                        logger.info(f"Analyzed {analyzed_count}/{len(transcripts)} transcripts with keywords")
-                    else:
-                        avg_sentiment = 0.0
-                        logger.info(f"No sentiment keywords found in {len(transcripts)} transcripts for {topic}")
-
-                    # Clamp to [-1, 1] range
-                    avg_sentiment = max(-1, min(1, avg_sentiment))
-
+        collection = get_mongo_db()['transcript_chunks_768d']
+
+        # Get date range
+        end_date = datetime.now(timezone.utc)
+        start_date = end_date - timedelta(weeks=weeks)
+
+        logger.info(f"=== Sentiment Analysis Request ===")
+        logger.info(f"Date range: {start_date.strftime('%Y-%m-%d')} to {end_date.strftime('%Y-%m-%d')}")
+        logger.info(f"Weeks requested: {weeks}")
+        logger.info(f"Topics: {topics}")
+
+        # Counts and samples for every topic/week in one round trip
+        # Note: transcript_chunks_768d uses 'text' field and 'created_at' for dates
+        pipeline = build_sentiment_pipeline(topics, start_date, end_date)
+        with get_query_metrics().track("mongodb", "sentiment_facet") as timer:
+            facets = next(collection.aggregate(pipeline, maxTimeMS=AGGREGATION_TIMEOUT_MS), {})
+            timer.rows = sum(len(facets.get(f"t{i}", [])) for i in range(len(topics)))
+        cells = cells_from_facets(facets, topics)
+
+        sentiment_results = []
+
+        # Process each week
+        for week_offset in range(weeks):
+            week_start = start_date + timedelta(weeks=week_offset)
+            week_end = week_start + timedelta(days=7)
+            week_label = f"W{week_offset + 1}"
+
+            for topic in topics:
+                cell = cells.get((topic, week_offset))
+                chunk_count = cell["chunk_count"] if cell else 0
+                # Estimate episode count (rough approximation: ~30 chunks per episode)
+                episode_count = max(1, chunk_count // 30) if chunk_count > 0 else 0
+
+                if chunk_count == 0:
+                    logger.info(f"No chunks found for {topic} in week {week_label} ({week_start.strftime('%Y-%m-%d')} to {week_end.strftime('%Y-%m-%d')})")
                     sentiment_results.append({
                         "topic": topic,
                         "week": week_label,
-                        "sentiment": round(avg_sentiment, 2),
-                        "episodeCount": episode_count
+                        "sentiment": 0.0,
+                        "episodeCount": 0
                     })
-
-                    logger.info(f"Topic: {topic}, Week: {week_label}, Sentiment: {avg_sentiment:.2f}, Chunks: {chunk_count}, Est. Episodes: {episode_count}")
-
-            return sentiment_results
-
-        finally:
-            client.close()
+                    continue
+
+                # Calculate sentiment for sampled transcripts
+                topic_pattern = re.compile(topic_regex(topic), re.IGNORECASE)
+                contents = [(text or '').lower() for text in cell["samples"]]
+                scores = _lexicon.score_many(
+                    [(content, [match.span() for match in topic_pattern.finditer(content)]) for content in contents],
+                    CONTEXT_CHARS,
+                    MAX_CONTEXTS
+                )
+
+                total_sentiment_score = 0
+                analyzed_count = 0
+                for transcript_sentiment, _ in scores:
+                    if transcript_sentiment is not None:
+                        total_sentiment_score += transcript_sentiment
+                        analyzed_count += 1
+
+                # Calculate average sentiment
+                if analyzed_count > 0:
+                    avg_sentiment = total_sentiment_score / analyzed_count
+                    logger.info(f"Analyzed {analyzed_count}/{len(contents)} transcripts with keywords")
+                else:
+                    avg_sentiment = 0.0
+                    logger.info(f"No sentiment keywords found in {len(contents)} transcripts for {topic}")
+
+                # Clamp to [-1, 1] range
+                avg_sentiment = max(-1, min(1, avg_sentiment))
+
+                sentiment_results.append({
+                    "topic": topic,
+                    "week": week_label,
+                    "sentiment": round(avg_sentiment, 2),
+                    "episodeCount": episode_count
+                })
+
+                logger.info(f"Topic: {topic}, Week: {week_label}, Sentiment: {avg_sentiment:.2f}, Chunks: {chunk_count}, Est. Episodes: {episode_count}")
+
+        return sentiment_results
@@ -0,0 +1,55 @@
+"""
+Keyword-lexicon sentiment scoring shared by the API and the nightly batch
+Scores the ±N-character context windows around topic mentions in a chunk.
+A keyword counts for a window when it occurs inside the window (substring
+semantics, as the original per-keyword `keyword in context` loops), at most
+once per window, and a window's score is the mean weight of its keywords.
+
+Each window is a few hundred characters, so one C-level substring search per
+keyword is already cheap; token-table and regex variants measured no faster
+in pure Python. The batch speedup comes from compile_topic_matcher in
+scripts/batch_sentiment.py, which finds the topic mentions that produce the
+windows.
+"""
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+Span = Tuple[int, int]
+Score = Tuple[Optional[float], List[str]]
+
+
+class SentimentLexicon:
+    """Keyword weights for windowed scoring of lower-cased text"""
+
+    def __init__(self, weights: Dict[str, float]):
+        # Dict order is kept so sums and keyword lists match the original loop exactly
+        self.keywords: List[str] = list(weights)
+        self.weights: List[float] = [weights[k] for k in self.keywords]
+
+    def keywords_in(self, text: str) -> List[int]:
+        """Ids of the keywords occurring in text, in lexicon order"""
+        return [keyword_id for keyword_id, keyword in enumerate(self.keywords) if keyword in text]
+
+    def score(self, content: str, spans: Sequence[Span], context_chars: int = 200,
+              max_contexts: int = 3) -> Score:
+        """
+        Sentiment of one lower-cased chunk from the windows around `spans`
+
+        Returns (mean of the window scores, keywords found per window in
+        lexicon order), or (None, []) when no window holds a keyword.
+        """
+        window_scores = []
+        keywords_found = []
+        for start, end in spans[:max_contexts]:
+            keyword_ids = self.keywords_in(content[max(0, start - context_chars):end + context_chars])
+            if keyword_ids:
+                window_scores.append(sum(self.weights[k] for k in keyword_ids) / len(keyword_ids))
+                keywords_found.extend(self.keywords[k] for k in keyword_ids)
+
+        if not window_scores:
+            return None, []
+        return sum(window_scores) / len(window_scores), keywords_found
+
+    def score_many(self, items: Iterable[Tuple[str, Sequence[Span]]], context_chars: int = 200,
+                   max_contexts: int = 3) -> List[Score]:
+        """Score many (content, spans) pairs"""
+        return [self.score(content, spans, context_chars, max_contexts) for content, spans in items]
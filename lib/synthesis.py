@@ -12,8 +12,20 @@ import openai
 from openai import AsyncOpenAI
 import time
 
+from .admission import OverloadedError, get_stage_limiter
+from .circuit_breaker import CircuitOpenError, get_circuit_breaker
+from .instrumentation import get_query_metrics
+from .prompt_packer import PROMPT_TOKEN_BUDGET, count_tokens, pack_excerpts, split_sentences
+from .synthesis_cache import get_synthesis_cache, synthesis_cache_key
+
 logger = logging.getLogger(__name__)
 
+SYNTHESIS_MODEL = "gpt-4o-mini"
+# Bump whenever prompts or answer post-processing change: it is part of the cache key
+SYNTHESIS_PROMPT_VERSION = "2025-07-v3"
+# Seconds the LLM answer may take before the extractive answer is served
+SYNTHESIS_DEADLINE_SECONDS = float(os.getenv("SYNTHESIS_DEADLINE_SECONDS", "8"))
+
 # --- LAZY INITIALIZATION FOR OPENAI CLIENT ---
 # Global variable for the client, initialized to None
 _openai_client = None
@@ -70,6 +82,8 @@ class SynthesizedAnswer(BaseModel):
     synthesis_time_ms: int
     confidence: Optional[float] = None
     show_confidence: bool = False
+    source: str = "openai"  # "openai" or "extractive" (local fallback)
+    prompt_tokens: Optional[int] = None  # Input tokens sent to the model
 
 def format_timestamp(seconds: float) -> str:
     """Convert seconds to MM:SS format"""
@@ -77,26 +91,28 @@ def format_timestamp(seconds: float) -> str:
     secs = int(seconds % 60)
     return f"{minutes}:{secs:02d}"
 
+# Signs of specific, actionable VC data in a text
+SPECIFIC_INDICATORS = [
+    re.compile(r'\$[\d,]+[MBK]?\s*(ARR|revenue|valuation)', re.IGNORECASE),  # Dollar amounts
+    re.compile(r'\d+[xX]\s*(return|multiple|growth)', re.IGNORECASE),         # Multiples
+    re.compile(r'Series [A-E]', re.IGNORECASE),                               # Funding rounds
+    re.compile(r'\d+%\s*(growth|increase|stake)', re.IGNORECASE),             # Percentages
+    re.compile(r'(acquired|raised|closed|launched)', re.IGNORECASE),           # Action verbs
+]
+# Specific companies named (not generic)
+COMPANY_PATTERN = re.compile(r'[A-Z][a-zA-Z]+\.ai|[A-Z][a-zA-Z]+\s+(AI|Labs|Tech|Bio)')
+
 def analyze_chunks_for_specifics(chunks: List[Dict[str, Any]], query: str) -> bool:
     """Determine if chunks contain specific actionable data"""
-    specific_indicators = [
-        r'\$[\d,]+[MBK]?\s*(ARR|revenue|valuation)',  # Dollar amounts
-        r'\d+[xX]\s*(return|multiple|growth)',         # Multiples
-        r'Series [A-E]',                               # Funding rounds
-        r'\d+%\s*(growth|increase|stake)',             # Percentages
-        r'(acquired|raised|closed|launched)',           # Action verbs
-    ]
-
     combined_text = " ".join([c.get("text", "") for c in chunks])
 
     # Check if any specific pattern matches
-    for pattern in specific_indicators:
-        if re.search(pattern, combined_text, re.IGNORECASE):
+    for pattern in SPECIFIC_INDICATORS:
+        if pattern.search(combined_text):
             return True
 
     # Check if specific companies are named (not generic)
-    company_pattern = r'[A-Z][a-zA-Z]+\.ai|[A-Z][a-zA-Z]+\s+(AI|Labs|Tech|Bio)'
-    if re.search(company_pattern, combined_text):
+    if COMPANY_PATTERN.search(combined_text):
         return True
 
     return False
@@ -279,25 +295,51 @@ def remove_gpt_fluff(text: str) -> str:
 
     return text.strip()
 
-def format_no_results_prompt(query: str, num_sources: int, related_insights: List[Dict[str, Any]]) -> str:
+def format_sources_prompt(
+    intro: List[str],
+    chunks: List[Dict[str, Any]],
+    query: str,
+    excerpt_label: str,
+    outro: List[str],
+    token_budget: int
+) -> str:
+    """
+    Numbered sources between intro and outro, fitted to token_budget
+
+    Fixed text is counted first; the rest of the budget is packed with
+    excerpts by chunk score (see lib.prompt_packer).
+    """
+    headers = [
+        f"[{i}] {chunk.get('podcast_title', 'Unknown Podcast')} - {chunk.get('episode_title', 'Unknown Episode')}"
+        for i, chunk in enumerate(chunks, 1)
+    ]
+    # Excerpt label, quotes and newlines cost ~6 tokens per source
+    overhead = count_tokens("\n".join(intro + headers + outro)) + len(chunks) * (count_tokens(excerpt_label) + 6)
+    packed = pack_excerpts(chunks, extract_key_terms(query), token_budget - overhead)
+
+    prompt_parts = list(intro)
+    for header, excerpt in zip(headers, packed.excerpts):
+        if excerpt:
+            prompt_parts.append(f"{header}\n{excerpt_label}: \"{excerpt}\"\n")
+        else:
+            prompt_parts.append(f"{header}\n")
+    prompt_parts.extend(outro)
+
+    return "\n".join(prompt_parts)
+
+def format_no_results_prompt(
+    query: str,
+    num_sources: int,
+    related_insights: List[Dict[str, Any]],
+    token_budget: int = PROMPT_TOKEN_BUDGET
+) -> str:
     """Format prompt when no direct results found"""
-    prompt_parts = [
+    intro = [
         f"Query: \"{query}\"\n",
         f"Direct search returned no specific results from {num_sources} sources.\n",
         "However, here are related insights that might be valuable:\n"
     ]
-
-    for i, chunk in enumerate(related_insights, 1):
-        podcast = chunk.get("podcast_title", "Unknown Podcast")
-        episode = chunk.get("episode_title", "Unknown Episode")
-        text = chunk.get("text", "").strip()[:200]
-
-        prompt_parts.append(
-            f"[{i}] {podcast} - {episode}\n"
-            f"Related content: \"{text}\"\n"
-        )
-
-    return "\n".join(prompt_parts)
+    return format_sources_prompt(intro, related_insights, query, "Related content", [], token_budget)
 
 def deduplicate_chunks(chunks: List[Dict[str, Any]], max_per_episode: int = 2) -> List[Dict[str, Any]]:
     """
@@ -321,36 +363,25 @@ def deduplicate_chunks(chunks: List[Dict[str, Any]], max_per_episode: int = 2) -
 
     return deduplicated
 
-def format_chunks_for_prompt(chunks: List[Dict[str, Any]], query: str) -> str:
+def format_chunks_for_prompt(
+    chunks: List[Dict[str, Any]],
+    query: str,
+    token_budget: int = PROMPT_TOKEN_BUDGET
+) -> str:
     """
     Format chunks for the OpenAI prompt with clear numbering
+    Excerpts are packed into token_budget by relevance (keep prompt predictable)
     """
-    prompt_parts = [
+    intro = [
         f"Query: \"{query}\"\n",
         f"Here are {len(chunks)} context sources from podcast discussions:\n"
     ]
-
-    for i, chunk in enumerate(chunks, 1):
-        podcast = chunk.get("podcast_title", "Unknown Podcast")
-        episode = chunk.get("episode_title", "Unknown Episode")
-        text = chunk.get("text", "").strip()
-
-        # Truncate text if too long (keep prompt manageable)
-        if len(text) > 200:
-            text = text[:197] + "..."
-
-        prompt_parts.append(
-            f"[{i}] {podcast} - {episode}\n"
-            f"Excerpt: \"{text}\"\n"
-        )
-
-    prompt_parts.append(
+    outro = [
         "\nProvide specific, actionable intelligence that directly addresses the query. "
         "Prioritize company names, metrics, and concrete details. "
         "Cite sources using [number] format. Never generalize when specifics are available."
-    )
-
-    return "\n".join(prompt_parts)
+    ]
+    return format_sources_prompt(intro, chunks, query, "Excerpt", outro, token_budget)
 
 def parse_citations(text: str) -> Tuple[str, List[int]]:
     """
@@ -370,10 +401,96 @@ def parse_citations(text: str) -> Tuple[str, List[int]]:
 
     return formatted_text, cited_indices
 
+def build_citations(cited_indices: List[int], chunks: List[Dict[str, Any]]) -> List[Citation]:
+    """Citation objects for 1-based cited indices into chunks"""
+    citations = []
+    for idx in cited_indices:
+        if 1 <= idx <= len(chunks):
+            chunk = chunks[idx - 1]  # Convert to 0-based index
+            citations.append(Citation(
+                index=idx,
+                episode_id=chunk.get("episode_id", "unknown"),
+                episode_title=chunk.get("episode_title", "Unknown Episode"),
+                podcast_name=chunk.get("podcast_title", "Unknown Podcast"),
+                timestamp=format_timestamp(chunk.get("start_time", 0)),
+                start_seconds=chunk.get("start_time", 0),
+                chunk_index=chunk.get("chunk_index", 0),
+                chunk_text=chunk.get("text", "")
+            ))
+    return citations
+
+def has_relevant_chunks(chunks: List[Dict[str, Any]]) -> bool:
+    """False when there are no chunks or every scored chunk is below 0.4"""
+    if not chunks:
+        return False
+    return not all(chunk.get('score', 1.0) < 0.4 for chunk in chunks if 'score' in chunk)
+
+# Local extractive fallback -------------------------------------------------
+
+EXTRACTIVE_MAX_BULLETS = 3
+EXTRACTIVE_MAX_SENTENCE_CHARS = 180
+def score_sentence(sentence: str, query_terms: List[str], chunk_score: float) -> float:
+    """Query-term overlap, VC-specific indicators and the chunk's search score"""
+    lowered = sentence.lower()
+    overlap = sum(1 for term in query_terms if term in lowered) / len(query_terms) if query_terms else 0.0
+    specifics = sum(1 for pattern in SPECIFIC_INDICATORS if pattern.search(sentence))
+    if COMPANY_PATTERN.search(sentence):
+        specifics += 1
+    return overlap + 0.25 * min(specifics, 3) + 0.5 * chunk_score
+
+def extractive_answer(chunks: List[Dict[str, Any]], query: str) -> Optional[SynthesizedAnswer]:
+    """
+    Bulleted, cited answer built from the chunks' own sentences (no LLM)
+
+    Runs in milliseconds, so it can stand in when OpenAI is slow, failing
+    or its breaker is open. Picks the best sentence from each of the top
+    chunks, at most EXTRACTIVE_MAX_BULLETS.
+    """
+    start_time = time.time()
+    deduplicated_chunks = deduplicate_chunks(chunks, max_per_episode=2)
+    if not has_relevant_chunks(deduplicated_chunks):
+        return None
+
+    query_terms = extract_key_terms(query)
+    candidates = []
+    for idx, chunk in enumerate(deduplicated_chunks, 1):
+        best = None
+        for sentence in split_sentences(chunk.get("text", "")):
+            if len(sentence) < 25:
+                continue
+            score = score_sentence(sentence, query_terms, chunk.get("score", 0.0))
+            if best is None or score > best[0]:
+                best = (score, sentence)
+        if best is not None:
+            candidates.append((best[0], idx, best[1]))
+
+    if not candidates:
+        return None
+
+    candidates.sort(key=lambda c: (-c[0], c[1]))
+    bullets = []
+    for _, idx, sentence in candidates[:EXTRACTIVE_MAX_BULLETS]:
+        if len(sentence) > EXTRACTIVE_MAX_SENTENCE_CHARS:
+            sentence = sentence[:EXTRACTIVE_MAX_SENTENCE_CHARS - 3].rsplit(" ", 1)[0] + "..."
+        bullets.append(f"• {sentence}[{idx}]")
+
+    formatted_answer, cited_indices = parse_citations("\n".join(bullets))
+    has_specific_data = analyze_chunks_for_specifics(deduplicated_chunks, query)
+
+    return SynthesizedAnswer(
+        text=formatted_answer,
+        citations=build_citations(cited_indices, deduplicated_chunks),
+        cited_indices=cited_indices,
+        synthesis_time_ms=int((time.time() - start_time) * 1000),
+        confidence=calculate_smart_confidence(has_specific_data, deduplicated_chunks),
+        show_confidence=False,  # Quotes, not a judged answer
+        source="extractive"
+    )
+
 async def synthesize_answer(
     chunks: List[Dict[str, Any]],
     query: str,
-    model: str = "gpt-4o-mini",
+    model: str = SYNTHESIS_MODEL,
     temperature: float = 0.0,
     max_tokens: int = 250
 ) -> Optional[SynthesizedAnswer]:
@@ -402,13 +519,7 @@ async def synthesize_answer(
         # Only return null if we have NO relevant results at all
         # Check if chunks have very low relevance scores
         # Lowered threshold to match hybrid search improvements
-        all_low_relevance = all(
-            chunk.get('score', 1.0) < 0.4
-            for chunk in deduplicated_chunks
-            if 'score' in chunk
-        )
-
-        if len(deduplicated_chunks) == 0 or all_low_relevance:
+        if not has_relevant_chunks(deduplicated_chunks):
             logger.info("[SYNTHESIS v1] No relevant results found (empty or all scores < 0.4)")
             return None
 
@@ -442,20 +553,23 @@ async def synthesize_answer(
             "🔍 Try: '[suggestion1]' or '[suggestion2]'"
         )
 
-        logger.info(f"Calling OpenAI {model} for synthesis")
+        prompt_tokens = count_tokens(system_prompt) + count_tokens(user_prompt)
+        logger.info(f"Calling OpenAI {model} for synthesis ({prompt_tokens} prompt tokens)")
         openai_start = time.time()
 
         # Call OpenAI with tighter token limit for conciseness
-        response = await client.chat.completions.create(
-            model=model,
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt}
-            ],
-            temperature=temperature,
-            max_tokens=150,  # Tighter limit for more concise responses
-            n=1
-        )
+        async with get_query_metrics().track("openai", "synthesize_answer") as timer:
+            timer.rows = prompt_tokens  # Input tokens, so rows_total tracks prompt volume
+            response = await client.chat.completions.create(
+                model=model,
+                messages=[
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": user_prompt}
+                ],
+                temperature=temperature,
+                max_tokens=150,  # Tighter limit for more concise responses
+                n=1
+            )
 
         openai_end = time.time()
         logger.info(f"OpenAI API call completed in {openai_end - openai_start:.2f} seconds")
@@ -474,20 +588,7 @@ async def synthesize_answer(
         confidence = calculate_smart_confidence(has_specific_data, deduplicated_chunks)
 
         # Build citation objects for cited sources
-        citations = []
-        for idx in cited_indices:
-            if 1 <= idx <= len(deduplicated_chunks):
-                chunk = deduplicated_chunks[idx - 1]  # Convert to 0-based index
-                citations.append(Citation(
-                    index=idx,
-                    episode_id=chunk.get("episode_id", "unknown"),
-                    episode_title=chunk.get("episode_title", "Unknown Episode"),
-                    podcast_name=chunk.get("podcast_title", "Unknown Podcast"),
-                    timestamp=format_timestamp(chunk.get("start_time", 0)),
-                    start_seconds=chunk.get("start_time", 0),
-                    chunk_index=chunk.get("chunk_index", 0),
-                    chunk_text=chunk.get("text", "")
-                ))
+        citations = build_citations(cited_indices, deduplicated_chunks)
 
         synthesis_time_ms = int((time.time() - start_time) * 1000)
 
@@ -510,7 +611,8 @@ async def synthesize_answer(
             cited_indices=cited_indices,
             synthesis_time_ms=synthesis_time_ms,
             confidence=confidence,
-            show_confidence=show_confidence
+            show_confidence=show_confidence,
+            prompt_tokens=prompt_tokens
         )
 
     except Exception as e:
@@ -524,7 +626,7 @@ async def synthesize_answer_v2(
     chunks: List[Dict[str, Any]],
     query: str,
     all_chunks: List[Dict[str, Any]] = None,  # For finding related content
-    model: str = "gpt-4o-mini",
+    model: str = SYNTHESIS_MODEL,
     temperature: float = 0.0
 ) -> Optional[SynthesizedAnswer]:
     """Enhanced synthesis with fallback to related insights"""
@@ -546,33 +648,29 @@ async def synthesize_answer_v2(
 
         # Check if chunks have very low relevance scores
         # Lowered threshold to match hybrid search improvements
-        all_low_relevance = all(
-            chunk.get('score', 1.0) < 0.4
-            for chunk in deduplicated_chunks
-            if 'score' in chunk
-        )
-
-        if len(deduplicated_chunks) == 0 or all_low_relevance:
+        if not has_relevant_chunks(deduplicated_chunks):
             logger.info("[SYNTHESIS v2] No relevant results found (empty or all scores < 0.4)")
             return None
 
         # Analyze if we have specific actionable data
         has_specific_data = analyze_chunks_for_specifics(deduplicated_chunks, query)
 
+        # Query suggestions based on what we DO have; excerpts get the rest of the budget
+        suggestions_line = f"\n\nSuggested searches: {generate_better_queries(query, all_chunks or deduplicated_chunks)}"
+        token_budget = PROMPT_TOKEN_BUDGET - count_tokens(suggestions_line)
+
         if has_specific_data:
             # Standard synthesis for good results
-            user_prompt = format_chunks_for_prompt(deduplicated_chunks, query)
+            user_prompt = format_chunks_for_prompt(deduplicated_chunks, query, token_budget)
         else:
             # Enhanced prompt for no direct results
             if all_chunks:
                 related_insights = find_related_insights(query, all_chunks)
-                user_prompt = format_no_results_prompt(query, len(chunks), related_insights)
+                user_prompt = format_no_results_prompt(query, len(chunks), related_insights, token_budget)
             else:
-                user_prompt = format_chunks_for_prompt(deduplicated_chunks, query)
+                user_prompt = format_chunks_for_prompt(deduplicated_chunks, query, token_budget)
 
-        # Add query suggestions based on what we DO have
-        suggestions = generate_better_queries(query, all_chunks or deduplicated_chunks)
-        user_prompt += f"\n\nSuggested searches: {suggestions}"
+        user_prompt += suggestions_line
 
         # System prompt
         system_prompt = (
@@ -598,16 +696,21 @@ async def synthesize_answer_v2(
             "🔍 Try: '[suggestion1]' or '[suggestion2]'"
         )
 
+        prompt_tokens = count_tokens(system_prompt) + count_tokens(user_prompt)
+        logger.info(f"[SYNTHESIS v2] Prompt tokens: {prompt_tokens} (user budget {PROMPT_TOKEN_BUDGET})")
+
         # Call OpenAI with strict token limit
-        response = await client.chat.completions.create(
-            model=model,
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt}
-            ],
-            temperature=temperature,
-            max_tokens=150  # Keep it tight
-        )
+        async with get_query_metrics().track("openai", "synthesize_answer_v2") as timer:
+            timer.rows = prompt_tokens  # Input tokens, so rows_total tracks prompt volume
+            response = await client.chat.completions.create(
+                model=model,
+                messages=[
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": user_prompt}
+                ],
+                temperature=temperature,
+                max_tokens=150  # Keep it tight
+            )
 
         raw_answer = response.choices[0].message.content.strip()
 
@@ -621,20 +724,7 @@ async def synthesize_answer_v2(
         confidence = calculate_smart_confidence(has_specific_data, deduplicated_chunks)
 
         # Build citation objects
-        citations = []
-        for idx in cited_indices:
-            if 1 <= idx <= len(deduplicated_chunks):
-                chunk = deduplicated_chunks[idx - 1]
-                citations.append(Citation(
-                    index=idx,
-                    episode_id=chunk.get("episode_id", "unknown"),
-                    episode_title=chunk.get("episode_title", "Unknown Episode"),
-                    podcast_name=chunk.get("podcast_title", "Unknown Podcast"),
-                    timestamp=format_timestamp(chunk.get("start_time", 0)),
-                    start_seconds=chunk.get("start_time", 0),
-                    chunk_index=chunk.get("chunk_index", 0),
-                    chunk_text=chunk.get("text", "")
-                ))
+        citations = build_citations(cited_indices, deduplicated_chunks)
 
         synthesis_time_ms = int((time.time() - start_time) * 1000)
 
@@ -657,7 +747,8 @@ async def synthesize_answer_v2(
             cited_indices=cited_indices,
             synthesis_time_ms=synthesis_time_ms,
             confidence=confidence,
-            show_confidence=show_confidence
+            show_confidence=show_confidence,
+            prompt_tokens=prompt_tokens
         )
 
     except Exception as e:
@@ -669,27 +760,83 @@ async def synthesize_answer_v2(
 async def synthesize_with_retry(
     chunks: List[Dict[str, Any]],
     query: str,
-    max_retries: int = 0  # Reduced from 2 to avoid timeout issues
+    max_retries: int = 0,  # Reduced from 2 to avoid timeout issues
+    deadline: float = SYNTHESIS_DEADLINE_SECONDS
 ) -> Optional[SynthesizedAnswer]:
     """
     Wrapper function with retry logic for resilience
     Updated to use the enhanced v2 synthesis
+
+    The LLM answer races a deadline: when OpenAI is slow, failing or its
+    breaker is open, the local extractive answer is returned instead.
     """
     logger.info(f"[SYNTHESIS WITH RETRY] Called with query: '{query}', chunks: {len(chunks)}")
 
+    # Same question over the same evidence: reuse the answer instead of paying for a call
+    lookup_start = time.time()
+    cache = get_synthesis_cache()
+    cache_key = synthesis_cache_key(query, chunks, SYNTHESIS_MODEL, SYNTHESIS_PROMPT_VERSION)
+    cached = await cache.get(cache_key)
+    if cached is not None:
+        logger.info("[SYNTHESIS WITH RETRY] cache hit")
+        return SynthesizedAnswer.model_validate(cached).model_copy(
+            update={"synthesis_time_ms": int((time.time() - lookup_start) * 1000)}
+        )
+
+    with get_query_metrics().track("local", "extractive_answer"):
+        fallback = extractive_answer(chunks, query)
+
+    # Nothing relevant to synthesize: no OpenAI call, so no slot or breaker outcome
+    if not has_relevant_chunks(deduplicate_chunks(chunks, max_per_episode=2)):
+        logger.info("[SYNTHESIS WITH RETRY] No relevant chunks, skipping LLM synthesis")
+        return fallback
+
+    async def admitted_llm() -> Optional[SynthesizedAnswer]:
+        # Waiting for a synthesis slot counts against the deadline
+        async with get_stage_limiter("synthesis").slot():
+            return await _synthesize_llm(chunks, query, max_retries)
+
+    try:
+        result = await asyncio.wait_for(admitted_llm(), timeout=deadline)
+    except asyncio.TimeoutError:
+        logger.warning(f"[SYNTHESIS WITH RETRY] LLM missed the {deadline}s deadline, using extractive answer")
+        return fallback
+    except (CircuitOpenError, OverloadedError) as e:
+        # Degraded path: extractive answer (or results without an answer)
+        logger.warning(f"Skipping LLM synthesis: {e}")
+        return fallback
+
+    if result is None:
+        return fallback
+
+    await cache.set(cache_key, result.model_dump())
+    return result
+
+async def _synthesize_llm(
+    chunks: List[Dict[str, Any]],
+    query: str,
+    max_retries: int
+) -> Optional[SynthesizedAnswer]:
+    """v2 synthesis (v1 as fallback) behind the OpenAI breaker, with retries"""
+    breaker = get_circuit_breaker("openai")
+
     for attempt in range(max_retries + 1):
         try:
-            # Try v2 first for better results
-            logger.info("[SYNTHESIS WITH RETRY] Attempting v2 synthesis")
-            result = await synthesize_answer_v2(chunks, query)
-            if result:
-                logger.info(f"[SYNTHESIS WITH RETRY] v2 succeeded, confidence: {result.confidence}, show: {result.show_confidence}")
-                return result
-            # Fallback to original if v2 fails
-            logger.info("[SYNTHESIS WITH RETRY] v2 failed, falling back to v1")
-            result = await synthesize_answer(chunks, query)
+            async with breaker.guard() as call:
+                # Try v2 first for better results
+                logger.info("[SYNTHESIS WITH RETRY] Attempting v2 synthesis")
+                result = await synthesize_answer_v2(chunks, query)
+                if not result:
+                    # Fallback to original if v2 fails
+                    logger.info("[SYNTHESIS WITH RETRY] v2 failed, falling back to v1")
+                    result = await synthesize_answer(chunks, query)
+                # Relevance was checked by the caller, so None means the OpenAI calls raised
+                call.failed = result is None
             if result:
+                logger.info(f"[SYNTHESIS WITH RETRY] succeeded, confidence: {result.confidence}, show: {result.show_confidence}")
                 return result
+        except CircuitOpenError:
+            raise
         except Exception as e:
             logger.warning(f"Synthesis attempt {attempt + 1} failed: {e}")
             if attempt < max_retries:
@@ -0,0 +1,155 @@
+"""
+Cache for synthesized answers
+Keyed by (normalized query, ordered chunk IDs, model, prompt version): a
+repeated question over the same evidence reuses the answer, and any change
+to the retrieved chunks, their order, the model or the prompt misses.
+
+Two tiers:
+- in-process LRU with TTL (always on)
+- MongoDB collection with a TTL index, shared across instances (optional,
+  SYNTHESIS_CACHE_MONGO=true); failures there never fail a search and go to
+  the tier's own breaker, not the "mongodb" breaker guarding search traffic
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import re
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+from .cache import TTLCache
+from .circuit_breaker import CircuitBreaker, CircuitOpenError
+
+logger = logging.getLogger(__name__)
+
+SYNTHESIS_CACHE_TTL = int(os.getenv("SYNTHESIS_CACHE_TTL", str(6 * 3600)))
+SYNTHESIS_CACHE_SIZE = 512
+SYNTHESIS_CACHE_COLLECTION = "synthesis_cache"
+
+
+def normalize_query(query: str) -> str:
+    """Lower-case, trim trailing punctuation and collapse whitespace"""
+    return " ".join(re.sub(r"[?!.]+$", "", query.strip().lower()).split())
+
+
+def chunk_identity(chunk: Dict[str, Any]) -> str:
+    """Stable ID for a chunk: Mongo _id, else episode and chunk index"""
+    if chunk.get("_id") is not None:
+        return str(chunk["_id"])
+    return f"{chunk.get('episode_id', 'unknown')}:{chunk.get('chunk_index', 0)}"
+
+
+def synthesis_cache_key(query: str, chunks: List[Dict[str, Any]], model: str, prompt_version: str) -> str:
+    payload = json.dumps(
+        [normalize_query(query), [chunk_identity(c) for c in chunks], model, prompt_version],
+        separators=(",", ":")
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class SynthesisCache:
+    """In-process LRU in front of an optional MongoDB TTL collection"""
+
+    def __init__(self, ttl: int = SYNTHESIS_CACHE_TTL, max_size: int = SYNTHESIS_CACHE_SIZE,
+                 use_mongo: Optional[bool] = None):
+        self.ttl = ttl
+        self._memory = TTLCache(max_size=max_size, ttl=ttl)
+        if use_mongo is None:
+            use_mongo = os.getenv("SYNTHESIS_CACHE_MONGO", "false").lower() in ("1", "true", "yes")
+        self.use_mongo = use_mongo and bool(os.getenv("MONGODB_URI"))
+        self._client_per_loop: Dict[int, Any] = {}
+        self._index_ready = False
+        # Best-effort tier: its failures must not open the search path's breaker
+        self._breaker = CircuitBreaker("synthesis_cache", slow_call_seconds=2.0, open_seconds=60.0)
+        self.mongo_hits = 0
+        self.mongo_errors = 0
+
+    def _get_collection(self):
+        """Collection bound to the running event loop (Motor clients are per-loop)"""
+        from motor.motor_asyncio import AsyncIOMotorClient
+
+        loop_id = id(asyncio.get_running_loop())
+        client = self._client_per_loop.get(loop_id)
+        if client is None:
+            client = AsyncIOMotorClient(
+                os.getenv("MONGODB_URI"),
+                serverSelectionTimeoutMS=2000,
+                socketTimeoutMS=2000,
+                maxPoolSize=5
+            )
+            self._client_per_loop[loop_id] = client
+        return client[os.getenv("MONGODB_DATABASE", "podinsight")][SYNTHESIS_CACHE_COLLECTION]
+
+    async def _ensure_index(self, collection) -> None:
+        if not self._index_ready:
+            # Documents are removed by MongoDB once expires_at passes
+            await collection.create_index("expires_at", expireAfterSeconds=0)
+            self._index_ready = True
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Cached answer payload, or None"""
+        value = self._memory.get(key)
+        if value is not None or not self.use_mongo:
+            return value
+
+        try:
+            async with self._breaker.guard():
+                doc = await self._get_collection().find_one(
+                    {"_id": key, "expires_at": {"$gt": datetime.now(timezone.utc)}},
+                    {"answer": 1}
+                )
+        except CircuitOpenError:
+            return None
+        except Exception as e:
+            self.mongo_errors += 1
+            logger.warning(f"Synthesis cache read failed: {e}")
+            return None
+
+        if doc is None:
+            return None
+        self.mongo_hits += 1
+        self._memory.set(key, doc["answer"])
+        return doc["answer"]
+
+    async def set(self, key: str, answer: Dict[str, Any]) -> None:
+        """Store an answer payload in both tiers"""
+        self._memory.set(key, answer)
+        if not self.use_mongo:
+            return
+
+        try:
+            async with self._breaker.guard():
+                collection = self._get_collection()
+                await self._ensure_index(collection)
+                await collection.replace_one(
+                    {"_id": key},
+                    {"answer": answer, "expires_at": datetime.now(timezone.utc) + timedelta(seconds=self.ttl)},
+                    upsert=True
+                )
+        except CircuitOpenError:
+            pass
+        except Exception as e:
+            self.mongo_errors += 1
+            logger.warning(f"Synthesis cache write failed: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self._memory.get_stats(),
+            "mongo_enabled": self.use_mongo,
+            "mongo_hits": self.mongo_hits,
+            "mongo_errors": self.mongo_errors,
+            "mongo_breaker": self._breaker.get_state()
+        }
+
+
+_synthesis_cache: Optional[SynthesisCache] = None
+
+
+def get_synthesis_cache() -> SynthesisCache:
+    """Get or create the shared synthesis cache"""
+    global _synthesis_cache
+    if _synthesis_cache is None:
+        _synthesis_cache = SynthesisCache()
+    return _synthesis_cache
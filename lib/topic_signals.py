@@ -0,0 +1,401 @@
+"""
+Topic signal engine for the dashboard SIGNAL bar
+Builds a topic x episode incidence matrix from topic_mentions and derives the
+three topic_signals types with NumPy:
+
+- correlation: share of episodes mentioning either topic that mention both
+- spike: this week's episodes for a topic vs the average of the weeks before
+- trending_combo: co-occurrences in the latest period vs the period before
+
+The incidence is saved with a created_at watermark, so incremental runs only
+read mentions added since the last run. It is kept in the topic_signal_state
+table so it survives serverless and CI runs; TOPIC_SIGNALS_STATE_PATH (or
+state_path) keeps it in a local .npz file instead. Only signals whose data
+changed are written back (see scripts/sql/topic_signals.sql).
+"""
+import base64
+import io
+import logging
+import os
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from dateutil import parser
+
+from .database import SupabasePool
+
+logger = logging.getLogger(__name__)
+
+# Local state file; unset keeps the state in Supabase
+TOPIC_SIGNALS_STATE_PATH = os.getenv("TOPIC_SIGNALS_STATE_PATH") or None
+TOPIC_SIGNALS_STATE_TABLE = "topic_signal_state"
+STATE_ROW_ID = "incidence"
+PAGE_SIZE = 1000  # PostgREST max rows per request
+
+# Signal thresholds
+MIN_CORRELATION_EPISODES = 3  # Shared episodes before a pair is reported
+SPIKE_BASELINE_WEEKS = 4      # Weeks averaged for the spike baseline
+MIN_SPIKE_FACTOR = 2.0
+MIN_SPIKE_MENTIONS = 3
+TREND_PERIOD_WEEKS = 4        # Length of the current and base periods for combos
+MIN_COMBO_MENTIONS = 3
+
+Signal = Tuple[str, Dict[str, Any]]  # (signal_type, signal_data)
+
+
+def week_start(value: Any) -> int:
+    """Ordinal of the Monday of the ISO week containing `value`"""
+    parsed = value if isinstance(value, datetime) else parser.parse(value)
+    day = parsed.date()
+    return day.toordinal() - day.weekday()
+
+
+def pair_key(signal_type: str, topic_a: str, topic_b: str) -> str:
+    return f"{signal_type}:{topic_a}|{topic_b}"
+
+
+class TopicIncidence:
+    """Boolean topic x episode matrix plus each episode's week"""
+
+    def __init__(
+        self,
+        topics: List[str],
+        episode_ids: List[str],
+        episode_weeks: np.ndarray,
+        matrix: np.ndarray,
+        watermark: Optional[str] = None
+    ):
+        self.topics = list(topics)
+        self.episode_ids = list(episode_ids)
+        self.episode_weeks = np.asarray(episode_weeks, dtype=np.int64)
+        self.matrix = np.asarray(matrix, dtype=bool).reshape(len(self.topics), len(self.episode_ids))
+        self.watermark = watermark
+
+    @property
+    def mention_count(self) -> int:
+        return int(self.matrix.sum())
+
+    @classmethod
+    def empty(cls) -> "TopicIncidence":
+        return cls([], [], np.zeros(0, np.int64), np.zeros((0, 0), bool))
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Dict[str, Any]]) -> "TopicIncidence":
+        return cls.empty().merge_rows(rows)
+
+    def merge_rows(self, rows: Iterable[Dict[str, Any]]) -> "TopicIncidence":
+        """
+        New incidence with topic_mentions rows added
+
+        Rows need topic_name, episode_id, created_at and the episode's
+        published_at (embedded as episodes.published_at). Known
+        (topic, episode) pairs are ignored, so re-reading rows is harmless.
+        """
+        topics = list(self.topics)
+        episode_ids = list(self.episode_ids)
+        episode_weeks = self.episode_weeks.tolist()
+        topic_index = {t: i for i, t in enumerate(topics)}
+        episode_index = {e: i for i, e in enumerate(episode_ids)}
+
+        new_topics, new_episodes = [], []
+        watermark = self.watermark
+        for row in rows:
+            topic = row["topic_name"]
+            topic_pos = topic_index.get(topic)
+            if topic_pos is None:
+                topic_pos = topic_index[topic] = len(topics)
+                topics.append(topic)
+
+            episode_id = str(row["episode_id"])
+            episode_pos = episode_index.get(episode_id)
+            if episode_pos is None:
+                episode_pos = episode_index[episode_id] = len(episode_ids)
+                episode_ids.append(episode_id)
+                published_at = (row.get("episodes") or {}).get("published_at") or row["mention_date"]
+                episode_weeks.append(week_start(published_at))
+
+            new_topics.append(topic_pos)
+            new_episodes.append(episode_pos)
+            created_at = row.get("created_at")
+            if created_at and (watermark is None or created_at > watermark):
+                watermark = created_at
+
+        matrix = np.zeros((len(topics), len(episode_ids)), dtype=bool)
+        matrix[:self.matrix.shape[0], :self.matrix.shape[1]] = self.matrix
+        matrix[np.asarray(new_topics, dtype=np.int64), np.asarray(new_episodes, dtype=np.int64)] = True
+        return TopicIncidence(topics, episode_ids, np.asarray(episode_weeks, dtype=np.int64), matrix, watermark)
+
+    def _pair_counts(self, episode_mask: Optional[np.ndarray] = None) -> np.ndarray:
+        """Topic x topic co-occurrence counts (M . M^T) over the masked episodes"""
+        m = self.matrix if episode_mask is None else self.matrix[:, episode_mask]
+        m = m.astype(np.int64)
+        return m @ m.T
+
+    def compute_signals(self) -> Dict[str, Signal]:
+        """All signals keyed by signal_key"""
+        signals: Dict[str, Signal] = {}
+        n_topics = len(self.topics)
+        if n_topics == 0 or not self.episode_ids:
+            return signals
+
+        # Pairs in alphabetical order so keys are stable across runs
+        order = np.argsort(np.asarray(self.topics, dtype=object))
+        names = [self.topics[i] for i in order]
+        upper_a, upper_b = np.triu_indices(n_topics, 1)
+        a_idx, b_idx = order[upper_a], order[upper_b]
+
+        # Correlation: |A and B| / |A or B|
+        co = self._pair_counts()
+        episodes_per_topic = np.diag(co)
+        shared = co[a_idx, b_idx]
+        either = episodes_per_topic[a_idx] + episodes_per_topic[b_idx] - shared
+        percent = np.divide(shared * 100.0, either, out=np.zeros(shared.shape), where=either > 0)
+        for i in np.flatnonzero(shared >= MIN_CORRELATION_EPISODES):
+            a, b = names[upper_a[i]], names[upper_b[i]]
+            signals[pair_key("correlation", a, b)] = ("correlation", {
+                "topics": [a, b],
+                "co_occurrence_percent": round(float(percent[i]), 1),
+                "episode_count": int(shared[i])
+            })
+
+        # Weeks back from the latest week with data (0 = current week)
+        weeks_back = (self.episode_weeks.max() - self.episode_weeks) // 7
+
+        # Spike: topic x week counts via a one-hot episode -> week matrix
+        window = SPIKE_BASELINE_WEEKS + 1
+        in_window = weeks_back < window
+        week_onehot = np.zeros((len(self.episode_ids), window), dtype=np.int64)
+        week_onehot[np.flatnonzero(in_window), weeks_back[in_window]] = 1
+        weekly = self.matrix.astype(np.int64) @ week_onehot
+        current = weekly[:, 0]
+        baseline = weekly[:, 1:].mean(axis=1)
+        factor = np.divide(current, baseline, out=np.zeros(n_topics), where=baseline > 0)
+        spiking = (current >= MIN_SPIKE_MENTIONS) & (factor >= MIN_SPIKE_FACTOR)
+        for t in np.flatnonzero(spiking):
+            topic = self.topics[t]
+            signals[f"spike:{topic}"] = ("spike", {
+                "topic": topic,
+                "spike_factor": round(float(factor[t]), 1),
+                "current_week_mentions": int(current[t]),
+                "baseline_weekly_mentions": round(float(baseline[t]), 1)
+            })
+
+        # Trending combos: pair growth between consecutive periods
+        current_pairs = self._pair_counts(weeks_back < TREND_PERIOD_WEEKS)[a_idx, b_idx]
+        base_pairs = self._pair_counts(
+            (weeks_back >= TREND_PERIOD_WEEKS) & (weeks_back < 2 * TREND_PERIOD_WEEKS)
+        )[a_idx, b_idx]
+        growth = np.divide(
+            (current_pairs - base_pairs) * 100.0, base_pairs,
+            out=np.zeros(current_pairs.shape), where=base_pairs > 0
+        )
+        trending = (current_pairs >= MIN_COMBO_MENTIONS) & (base_pairs > 0) & (growth > 0)
+        for i in np.flatnonzero(trending):
+            a, b = names[upper_a[i]], names[upper_b[i]]
+            signals[pair_key("trending_combo", a, b)] = ("trending_combo", {
+                "topics": [a, b],
+                "growth_rate": round(float(growth[i]), 1),
+                "current_period_mentions": int(current_pairs[i]),
+                "base_period_mentions": int(base_pairs[i])
+            })
+
+        return signals
+
+    def to_bytes(self) -> bytes:
+        """Compressed .npz encoding (plain string arrays, so loading needs no pickle)"""
+        buffer = io.BytesIO()
+        np.savez_compressed(
+            buffer,
+            topics=np.asarray(self.topics, dtype=str),
+            episode_ids=np.asarray(self.episode_ids, dtype=str),
+            episode_weeks=self.episode_weeks,
+            matrix=self.matrix,
+            watermark=np.asarray(self.watermark or "", dtype=str)
+        )
+        return buffer.getvalue()
+
+    @classmethod
+    def from_bytes(cls, payload: bytes) -> "TopicIncidence":
+        with np.load(io.BytesIO(payload), allow_pickle=False) as data:
+            return cls(
+                data["topics"].tolist(),
+                data["episode_ids"].tolist(),
+                data["episode_weeks"],
+                data["matrix"],
+                str(data["watermark"].item()) or None
+            )
+
+    def save(self, path: str) -> None:
+        """Write atomically so a concurrent reader never sees a partial file"""
+        tmp_path = f"{path}.tmp.npz"
+        with open(tmp_path, "wb") as f:
+            f.write(self.to_bytes())
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> "TopicIncidence":
+        with open(path, "rb") as f:
+            return cls.from_bytes(f.read())
+
+
+async def fetch_mention_rows(pool: SupabasePool, since: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Page through topic_mentions with episode dates (only rows created at/after `since` if given)"""
+    rows: List[Dict[str, Any]] = []
+    start = 0
+    while True:
+        def query_page(client, start=start):
+            query = client.table("topic_mentions") \
+                .select("topic_name, episode_id, mention_date, created_at, episodes!inner(published_at)")
+            if since:
+                query = query.gte("created_at", since)
+            return query.order("created_at").order("id").range(start, start + PAGE_SIZE - 1).execute()
+
+        response = await pool.execute_with_retry(query_page, name="topic_mentions_page")
+        rows.extend(response.data)
+        if len(response.data) < PAGE_SIZE:
+            return rows
+        start += PAGE_SIZE
+
+
+async def fetch_stored_signals(pool: SupabasePool) -> Dict[str, Signal]:
+    """Current topic_signals rows keyed by signal_key"""
+    stored: Dict[str, Signal] = {}
+    start = 0
+    while True:
+        def query_page(client, start=start):
+            return client.table("topic_signals") \
+                .select("signal_key, signal_type, signal_data") \
+                .order("signal_key") \
+                .range(start, start + PAGE_SIZE - 1) \
+                .execute()
+
+        response = await pool.execute_with_retry(query_page, name="topic_signals_page")
+        for row in response.data:
+            if row.get("signal_key"):
+                stored[row["signal_key"]] = (row["signal_type"], row["signal_data"])
+        if len(response.data) < PAGE_SIZE:
+            return stored
+        start += PAGE_SIZE
+
+
+def diff_signals(stored: Dict[str, Signal], computed: Dict[str, Signal]) -> Tuple[Dict[str, Signal], List[str]]:
+    """(signals to upsert, keys to delete)"""
+    changed = {key: signal for key, signal in computed.items() if stored.get(key) != signal}
+    removed = sorted(key for key in stored if key not in computed)
+    return changed, removed
+
+
+async def write_signals(pool: SupabasePool, changed: Dict[str, Signal], removed: List[str]) -> None:
+    calculated_at = datetime.now(timezone.utc).isoformat()
+    rows = [
+        {"signal_key": key, "signal_type": signal_type, "signal_data": signal_data, "calculated_at": calculated_at}
+        for key, (signal_type, signal_data) in sorted(changed.items())
+    ]
+
+    for start in range(0, len(rows), PAGE_SIZE):
+        batch = rows[start:start + PAGE_SIZE]
+        await pool.execute_with_retry(
+            lambda client, batch=batch: client.table("topic_signals").upsert(batch, on_conflict="signal_key").execute(),
+            name="upsert_topic_signals"
+        )
+
+    for start in range(0, len(removed), PAGE_SIZE):
+        batch = removed[start:start + PAGE_SIZE]
+        await pool.execute_with_retry(
+            lambda client, batch=batch: client.table("topic_signals").delete().in_("signal_key", batch).execute(),
+            name="delete_topic_signals"
+        )
+
+
+async def load_state(pool: SupabasePool, state_path: Optional[str] = None) -> Optional[TopicIncidence]:
+    """Saved incidence from state_path, or from the Supabase state row; None if there is none"""
+    if state_path:
+        return TopicIncidence.load(state_path) if os.path.exists(state_path) else None
+
+    def query_state(client):
+        return client.table(TOPIC_SIGNALS_STATE_TABLE) \
+            .select("incidence") \
+            .eq("id", STATE_ROW_ID) \
+            .limit(1) \
+            .execute()
+
+    response = await pool.execute_with_retry(query_state, name="load_topic_signal_state")
+    if not response.data:
+        return None
+    return TopicIncidence.from_bytes(base64.b64decode(response.data[0]["incidence"]))
+
+
+async def save_state(pool: SupabasePool, incidence: TopicIncidence, state_path: Optional[str] = None) -> None:
+    """Save the incidence to state_path, or to the Supabase state row"""
+    if state_path:
+        incidence.save(state_path)
+        return
+
+    row = {
+        "id": STATE_ROW_ID,
+        "incidence": base64.b64encode(incidence.to_bytes()).decode("ascii"),
+        "watermark": incidence.watermark,
+        "updated_at": datetime.now(timezone.utc).isoformat()
+    }
+    await pool.execute_with_retry(
+        lambda client: client.table(TOPIC_SIGNALS_STATE_TABLE).upsert(row, on_conflict="id").execute(),
+        name="save_topic_signal_state"
+    )
+
+
+async def run_topic_signals(
+    pool: SupabasePool,
+    state_path: Optional[str] = TOPIC_SIGNALS_STATE_PATH,
+    full: bool = False,
+    dry_run: bool = False
+) -> Dict[str, Any]:
+    """
+    Recompute topic_signals and write the differences
+
+    Incremental unless `full` is set or there is no usable saved state.
+    Deleted mentions are only picked up by a full run.
+    """
+    location = state_path or f"table {TOPIC_SIGNALS_STATE_TABLE}"
+    incidence = None
+    if full:
+        logger.info("Full topic signal build requested, ignoring saved state")
+    else:
+        try:
+            incidence = await load_state(pool, state_path)
+        except Exception as e:
+            logger.warning(f"Topic signal state in {location} unreadable, running full build: {str(e)}")
+        else:
+            if incidence is None:
+                logger.warning(f"No topic signal state in {location}, running full build over all mentions")
+
+    mode = "incremental" if incidence is not None else "full"
+    # >= watermark re-reads boundary rows; merge ignores known pairs
+    rows = await fetch_mention_rows(pool, since=incidence.watermark if incidence else None)
+    incidence = (incidence or TopicIncidence.empty()).merge_rows(rows)
+
+    computed = incidence.compute_signals()
+    stored = await fetch_stored_signals(pool)
+    changed, removed = diff_signals(stored, computed)
+
+    if not dry_run:
+        await write_signals(pool, changed, removed)
+        try:
+            await save_state(pool, incidence, state_path)
+        except Exception as e:
+            logger.warning(f"Could not save topic signal state to {location}, next run will be full: {str(e)}")
+
+    summary = {
+        "mode": mode,
+        "rows_read": len(rows),
+        "topics": len(incidence.topics),
+        "episodes": len(incidence.episode_ids),
+        "signals": len(computed),
+        "upserted": len(changed),
+        "deleted": len(removed),
+        "unchanged": len(computed) - len(changed),
+        "watermark": incidence.watermark,
+        "dry_run": dry_run
+    }
+    logger.info(f"Topic signals: {summary}")
+    return summary
@@ -8,13 +8,23 @@ This runs without time constraints, allowing processing of 800k+ chunks.
 
 import os
 import sys
+import json
 import time
 import logging
+import argparse
 from datetime import datetime, timedelta, timezone
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterable, Optional, Set, Tuple
 import re
-from pymongo import MongoClient
-from pymongo.errors import DuplicateKeyError
+from bisect import bisect_right
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from bson import ObjectId
+from pymongo import MongoClient, UpdateOne
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from lib.sentiment_lexicon import SentimentLexicon  # noqa: E402
 
 # Configure logging
 logging.basicConfig(
@@ -27,18 +37,280 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+
+# Topic search patterns (matched against lower-cased chunk text)
+TOPIC_SEARCH_PATTERNS = {
+    # Specific AI agent and autonomous system terms
+    "AI Agents": "\\b(ai agent|ai agents|autonomous agent|agentic|llm agent|gpt agent|claude|chatgpt|copilot|ai assistant|langchain|autogpt|babyagi|crew ai|multi.agent)\\b",
+    # Specific capital efficiency and burn rate terms
+    "Capital Efficiency": "\\b(capital efficiency|burn rate|runway|unit economics|ltv.cac|gross margin|path to profitability|cash flow positive|default alive|ramen profitable)\\b",
+    # Specific DePIN and decentralized infrastructure terms
+    "DePIN": "\\b(depin|decentralized physical infrastructure|helium|filecoin|arweave|akash|render network|hivemapper|dimo|physical infrastructure network)\\b",
+    # Specific B2B SaaS metrics and terms
+    "B2B SaaS": "\\b(b2b saas|arr|mrr|annual recurring revenue|monthly recurring|net retention|gross retention|churn rate|acv|sales.led growth|product.led growth|plg)\\b",
+    # Specific crypto/web3 investment terms
+    "Crypto/Web3": "\\b(web3|crypto startup|token economics|tokenomics|defi protocol|layer 1|layer 2|zk.rollup|blockchain infrastructure|onchain|stablecoin|smart contract)\\b"
+}
+
+# Comprehensive sentiment keywords with weights
+SENTIMENT_KEYWORDS = {
+    # Strong positive
+    'amazing': 1.0, 'incredible': 1.0, 'revolutionary': 1.0, 'breakthrough': 1.0,
+    'phenomenal': 1.0, 'outstanding': 0.9, 'exceptional': 0.9, 'brilliant': 0.8,
+    'excellent': 0.8, 'fantastic': 0.8, 'superb': 0.8, 'wonderful': 0.7,
+
+    # Positive
+    'great': 0.7, 'love': 0.7, 'awesome': 0.7, 'impressive': 0.6,
+    'exciting': 0.6, 'excited': 0.6, 'innovative': 0.6, 'powerful': 0.6,
+    'successful': 0.5, 'valuable': 0.5, 'promising': 0.5, 'strong': 0.5,
+    'good': 0.4, 'positive': 0.4, 'useful': 0.4, 'helpful': 0.4,
+    'interesting': 0.3, 'solid': 0.3, 'nice': 0.3, 'cool': 0.3,
+
+    # Negative
+    'bad': -0.4, 'poor': -0.5, 'disappointing': -0.6, 'failed': -0.6,
+    'failing': -0.6, 'struggle': -0.4, 'struggling': -0.4, 'difficult': -0.3,
+    'challenging': -0.2, 'concerning': -0.4, 'worried': -0.4, 'risky': -0.4,
+    'problem': -0.5, 'problems': -0.5, 'issue': -0.3, 'issues': -0.3,
+
+    # Strong negative
+    'terrible': -0.8, 'horrible': -0.8, 'awful': -0.8, 'useless': -0.7,
+    'disaster': -1.0, 'catastrophe': -1.0, 'failure': -0.8, 'worst': -0.8,
+    'broken': -0.6, 'dangerous': -0.6, 'threat': -0.5, 'crisis': -0.7
+}
+
+CONTEXT_CHARS = 200         # Context window either side of a topic mention
+MAX_CONTEXTS_PER_CHUNK = 3  # Topic mentions scored per chunk
+CHUNK_BATCH_SIZE = 2000     # Cursor batch size for the chunk scan
+SHARD_EPISODES = 20         # Episodes per shard (unit of parallel work and checkpointing)
+CHECKPOINT_MAX_AGE = timedelta(hours=24)  # Older checkpoints are discarded, not resumed
+DEFAULT_CHECKPOINT_PATH = 'batch_sentiment_checkpoint.json'
+INCREMENTAL_STATE_ID = 'incremental'
+WATERMARK_LAG = timedelta(minutes=5)  # Chunks newer than this are left for the next run
+
+
+def topic_search_pattern(topic: str) -> str:
+    """Regex for a topic (default: the topic name itself)"""
+    return TOPIC_SEARCH_PATTERNS.get(topic, re.escape(topic.lower()))
+
+
+WORD_BOUNDED_PATTERN = re.compile(r"\\b\(([^()]*)\)\\b")
+
+
+def compile_topic_matcher(topics: List[str]):
+    """
+    One regex matching every topic at once, for lower-cased text
+
+    Each topic's pattern sits in its own named group (t0, t1, ...), so
+    match.lastgroup identifies the topic. Returns (regex, group name -> topic).
+
+    Chunks are lower-cased before matching, so the regex is compiled without
+    IGNORECASE (several times slower in the regex engine). When every pattern
+    is a word-bounded alternation, the shared \\b...\\b is hoisted out of the
+    per-topic groups so it is tested once per position, not once per topic.
+    """
+    group_topics = {f"t{i}": topic for i, topic in enumerate(topics)}
+    patterns = {group: topic_search_pattern(topic) for group, topic in group_topics.items()}
+    bounded = {group: WORD_BOUNDED_PATTERN.fullmatch(pattern) for group, pattern in patterns.items()}
+    if all(bounded.values()):
+        combined = "\\b(?:" + "|".join(f"(?P<{group}>{match.group(1)})" for group, match in bounded.items()) + ")\\b"
+    else:
+        combined = "|".join(f"(?P<{group}>{pattern})" for group, pattern in patterns.items())
+    return re.compile(combined), group_topics
+
+
+@dataclass
+class SentimentCell:
+    """Running aggregates for one (topic, week)"""
+    chunk_count: int = 0
+    analyzed_count: int = 0
+    sentiment_total: float = 0.0
+    keyword_counts: Counter = field(default_factory=Counter)
+    episode_ids: Set[str] = field(default_factory=set)
+
+    def add_chunk(self, episode_id: str, chunk_sentiment: Optional[float], keywords: List[str]) -> None:
+        self.chunk_count += 1
+        self.episode_ids.add(episode_id)
+        if chunk_sentiment is not None:
+            self.sentiment_total += chunk_sentiment
+            self.analyzed_count += 1
+            self.keyword_counts.update(keywords)
+
+    def merge(self, other: "SentimentCell") -> None:
+        self.chunk_count += other.chunk_count
+        self.analyzed_count += other.analyzed_count
+        self.sentiment_total += other.sentiment_total
+        self.keyword_counts.update(other.keyword_counts)
+        self.episode_ids.update(other.episode_ids)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'chunk_count': self.chunk_count,
+            'analyzed_count': self.analyzed_count,
+            'sentiment_total': self.sentiment_total,
+            'keyword_counts': dict(self.keyword_counts),
+            'episode_ids': sorted(self.episode_ids)
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "SentimentCell":
+        return cls(
+            chunk_count=data['chunk_count'],
+            analyzed_count=data['analyzed_count'],
+            sentiment_total=data['sentiment_total'],
+            keyword_counts=Counter(data['keyword_counts']),
+            episode_ids=set(data['episode_ids'])
+        )
+
+    def to_result(self, topic: str, week_info: Dict[str, Any]) -> Dict[str, Any]:
+        """sentiment_results document for this cell"""
+        if self.analyzed_count > 0:
+            avg_sentiment = self.sentiment_total / self.analyzed_count
+            confidence = min(1.0, self.analyzed_count / 10)  # Higher confidence with more analyzed chunks
+        else:
+            avg_sentiment = 0.0
+            confidence = 0.0
+
+        # Clamp sentiment to [-1, 1] range
+        avg_sentiment = max(-1, min(1, avg_sentiment))
+
+        return {
+            'topic': topic,
+            'week': week_info['week_label'],
+            'year': week_info['year'],
+            'sentiment_score': round(avg_sentiment, 3),
+            'episode_count': len(self.episode_ids),
+            'chunk_count': self.chunk_count,
+            'sample_size': self.chunk_count,  # Every matching chunk is analyzed
+            'confidence': round(confidence, 3),
+            'keywords_found': [keyword for keyword, _ in self.keyword_counts.most_common(10)],
+            'computed_at': datetime.now(timezone.utc),
+            'metadata': {
+                'date_range': f"{week_info['start_date'].strftime('%Y-%m-%d')} to {week_info['end_date'].strftime('%Y-%m-%d')}",
+                'analyzed_chunks': self.analyzed_count,
+                'iso_week': week_info['iso_week']
+            }
+        }
+
+
+def cell_key(topic: str, week_index: int) -> str:
+    return f"{week_index}|{topic}"
+
+
+def parse_cell_key(key: str) -> Tuple[str, int]:
+    week_index, topic = key.split("|", 1)
+    return topic, int(week_index)
+
+
+def next_week_start(now: datetime) -> datetime:
+    """Monday 00:00 UTC after `now` (end of the current ISO week)"""
+    monday = (now - timedelta(days=now.weekday())).replace(hour=0, minute=0, second=0, microsecond=0)
+    return monday + timedelta(weeks=1)
+
+
+class FileCheckpoint:
+    """Run plan and finished shard aggregates in a local JSON file"""
+
+    def __init__(self, path: str = DEFAULT_CHECKPOINT_PATH):
+        self.path = path
+        self.state: Optional[Dict[str, Any]] = None
+
+    def load(self) -> Optional[Dict[str, Any]]:
+        if not os.path.exists(self.path):
+            return None
+        with open(self.path) as f:
+            self.state = json.load(f)
+        return self.state
+
+    def start(self, state: Dict[str, Any]) -> None:
+        self.state = state
+        self._write()
+
+    def save_shard(self, shard_id: int, partial: Dict[str, Any]) -> None:
+        self.state['completed'][str(shard_id)] = partial
+        self._write()
+
+    def clear(self) -> None:
+        self.state = None
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    def _write(self) -> None:
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(self.state, f)
+        os.replace(tmp_path, self.path)
+
+
+class MongoCheckpoint:
+    """Run plan and finished shard aggregates in a MongoDB collection"""
+
+    def __init__(self, collection):
+        self.collection = collection
+
+    def load(self) -> Optional[Dict[str, Any]]:
+        plan = self.collection.find_one({'_id': 'plan'})
+        if plan is None:
+            return None
+        plan.pop('_id')
+        plan['completed'] = {
+            doc['shard_id']: doc['partial']
+            for doc in self.collection.find({'_id': {'$ne': 'plan'}})
+        }
+        return plan
+
+    def start(self, state: Dict[str, Any]) -> None:
+        self.collection.delete_many({})
+        self.collection.insert_one({'_id': 'plan', **{k: v for k, v in state.items() if k != 'completed'}})
+
+    def save_shard(self, shard_id: int, partial: Dict[str, Any]) -> None:
+        self.collection.replace_one(
+            {'_id': f"shard-{shard_id}"},
+            {'shard_id': str(shard_id), 'partial': partial},
+            upsert=True
+        )
+
+    def clear(self) -> None:
+        self.collection.delete_many({})
+
+
+# Per-process state for pool workers
+_worker_processor = None
+
+
+def _init_worker(mongodb_uri: str, topics: List[str]) -> None:
+    global _worker_processor
+    _worker_processor = BatchSentimentProcessor(db=MongoClient(mongodb_uri)['podinsight'])
+    _worker_processor.topics = topics
+
+
+def _process_shard_in_worker(episode_weeks: Dict[str, int]) -> Dict[str, Any]:
+    return _worker_processor.process_shard(episode_weeks)
+
+
 class BatchSentimentProcessor:
-    def __init__(self):
-        """Initialize the batch sentiment processor"""
-        mongodb_uri = os.getenv('MONGODB_URI')
-        if not mongodb_uri:
-            raise ValueError("MONGODB_URI environment variable not set")
-
-        self.client = MongoClient(mongodb_uri)
-        self.db = self.client['podinsight']
+    def __init__(self, db=None):
+        """
+        Initialize the batch sentiment processor
+
+        Args:
+            db: Database to use (default: connect with MONGODB_URI)
+        """
+        self.client = None
+        self.mongodb_uri = None
+        if db is None:
+            mongodb_uri = os.getenv('MONGODB_URI')
+            if not mongodb_uri:
+                raise ValueError("MONGODB_URI environment variable not set")
+
+            self.mongodb_uri = mongodb_uri
+            self.client = MongoClient(mongodb_uri)
+            db = self.client['podinsight']
+
+        self.db = db
         self.chunks_collection = self.db['transcript_chunks_768d']
         self.episodes_collection = self.db['episode_metadata']
         self.results_collection = self.db['sentiment_results']
+        self.state_collection = self.db['sentiment_batch_state']
 
         # Ensure unique index on topic + week + year
         self.results_collection.create_index([
@@ -46,6 +318,8 @@ class BatchSentimentProcessor:
             ("week", 1),
             ("year", 1)
         ], unique=True)
+        # Latest computed_at is the API v2 cache validator
+        self.results_collection.create_index([("computed_at", -1)])
 
         # Default topics to analyze
         self.topics = [
@@ -56,35 +330,12 @@ class BatchSentimentProcessor:
             "Crypto/Web3"
         ]
 
-        # Comprehensive sentiment keywords with weights
-        self.sentiment_keywords = {
-            # Strong positive
-            'amazing': 1.0, 'incredible': 1.0, 'revolutionary': 1.0, 'breakthrough': 1.0,
-            'phenomenal': 1.0, 'outstanding': 0.9, 'exceptional': 0.9, 'brilliant': 0.8,
-            'excellent': 0.8, 'fantastic': 0.8, 'superb': 0.8, 'wonderful': 0.7,
-
-            # Positive
-            'great': 0.7, 'love': 0.7, 'awesome': 0.7, 'impressive': 0.6,
-            'exciting': 0.6, 'excited': 0.6, 'innovative': 0.6, 'powerful': 0.6,
-            'successful': 0.5, 'valuable': 0.5, 'promising': 0.5, 'strong': 0.5,
-            'good': 0.4, 'positive': 0.4, 'useful': 0.4, 'helpful': 0.4,
-            'interesting': 0.3, 'solid': 0.3, 'nice': 0.3, 'cool': 0.3,
-
-            # Negative
-            'bad': -0.4, 'poor': -0.5, 'disappointing': -0.6, 'failed': -0.6,
-            'failing': -0.6, 'struggle': -0.4, 'struggling': -0.4, 'difficult': -0.3,
-            'challenging': -0.2, 'concerning': -0.4, 'worried': -0.4, 'risky': -0.4,
-            'problem': -0.5, 'problems': -0.5, 'issue': -0.3, 'issues': -0.3,
-
-            # Strong negative
-            'terrible': -0.8, 'horrible': -0.8, 'awful': -0.8, 'useless': -0.7,
-            'disaster': -1.0, 'catastrophe': -1.0, 'failure': -0.8, 'worst': -0.8,
-            'broken': -0.6, 'dangerous': -0.6, 'threat': -0.5, 'crisis': -0.7
-        }
+        self.sentiment_keywords = SENTIMENT_KEYWORDS
+        self.lexicon = SentimentLexicon(SENTIMENT_KEYWORDS)
 
-    def get_week_ranges(self, weeks: int = 12) -> List[Dict[str, Any]]:
-        """Generate week ranges for analysis"""
-        end_date = datetime.now(timezone.utc)
+    def get_week_ranges(self, weeks: int = 12, end_date: Optional[datetime] = None) -> List[Dict[str, Any]]:
+        """Generate week ranges for analysis (ending now unless end_date is given)"""
+        end_date = end_date or datetime.now(timezone.utc)
         start_date = end_date - timedelta(weeks=weeks)
 
         week_ranges = []
@@ -105,277 +356,357 @@ class BatchSentimentProcessor:
 
         return week_ranges
 
-    def calculate_sentiment_for_chunks(self, chunks: List[Dict], topic_pattern) -> Dict[str, Any]:
-        """Calculate sentiment score for a list of chunks"""
-        if not chunks:
-            return {
-                'sentiment_score': 0.0,
-                'confidence': 0.0,
-                'keywords_found': [],
-                'analyzed_chunks': 0
-            }
+    def score_chunk(self, content: str, spans: List[Tuple[int, int]]) -> Tuple[Optional[float], List[str]]:
+        """
+        Sentiment of one chunk from the contexts around its topic mentions
 
-        total_sentiment = 0
-        analyzed_count = 0
-        all_keywords_found = []
+        Returns (average context sentiment, keywords found), or (None, [])
+        when no context contains a sentiment keyword.
+        """
+        return self.lexicon.score(content, spans, CONTEXT_CHARS, MAX_CONTEXTS_PER_CHUNK)
 
-        for chunk in chunks:
-            content = chunk.get('text', '').lower()
+    def load_episode_weeks(self, week_ranges: List[Dict[str, Any]]) -> Dict[str, int]:
+        """Map episode guid -> index into week_ranges for episodes published in the window"""
+        week_starts = [w['start_date'].strftime("%Y-%m-%d") for w in week_ranges]
+        window_end = week_ranges[-1]['end_date'].strftime("%Y-%m-%d")
 
-            # Find context around topic mentions (±200 characters)
-            contexts = []
-            for match in topic_pattern.finditer(content, re.IGNORECASE):
-                start = max(0, match.start() - 200)
-                end = min(len(content), match.end() + 200)
-                contexts.append(content[start:end])
+        episodes = self.episodes_collection.find({
+            "raw_entry_original_feed.published_date_iso": {
+                "$gte": week_starts[0],
+                "$lt": window_end
+            }
+        }, {"guid": 1, "raw_entry_original_feed.published_date_iso": 1, "_id": 0})
 
-            if not contexts:
+        episode_weeks = {}
+        for episode in episodes:
+            published = episode.get("raw_entry_original_feed", {}).get("published_date_iso")
+            if not episode.get("guid") or not published:
                 continue
+            episode_weeks[episode["guid"]] = bisect_right(week_starts, published) - 1
+        return episode_weeks
+
+    def iter_chunks(self, episode_ids: List[str]) -> Iterable[Dict[str, Any]]:
+        """Stream the text of every chunk belonging to the given episodes"""
+        return self.chunks_collection.find(
+            {"episode_id": {"$in": episode_ids}},
+            {"text": 1, "episode_id": 1, "_id": 0}
+        ).batch_size(CHUNK_BATCH_SIZE)
+
+    def accumulate_chunks(
+        self,
+        chunks: Iterable[Dict[str, Any]],
+        episode_weeks: Dict[str, int],
+        cells: Dict[Tuple[str, int], SentimentCell]
+    ) -> int:
+        """Match all topics in each chunk once and fold the chunk into its cells"""
+        matcher, group_topics = compile_topic_matcher(self.topics)
+        processed = 0
 
-            # Calculate sentiment for each context
-            context_sentiments = []
-            chunk_keywords = []
-
-            for context in contexts[:3]:  # Limit to 3 contexts per chunk
-                sentiment_score = 0
-                keyword_hits = 0
-
-                # Check for sentiment keywords
-                for keyword, weight in self.sentiment_keywords.items():
-                    if keyword in context:
-                        sentiment_score += weight
-                        keyword_hits += 1
-                        chunk_keywords.append(keyword)
-
-                # Only count if we found sentiment keywords
-                if keyword_hits > 0:
-                    context_sentiments.append(sentiment_score / keyword_hits)
-
-            # Average sentiment across contexts for this chunk
-            if context_sentiments:
-                chunk_sentiment = sum(context_sentiments) / len(context_sentiments)
-                total_sentiment += chunk_sentiment
-                analyzed_count += 1
-                all_keywords_found.extend(chunk_keywords)
-
-        # Calculate final metrics
-        if analyzed_count > 0:
-            avg_sentiment = total_sentiment / analyzed_count
-            confidence = min(1.0, analyzed_count / 10)  # Higher confidence with more analyzed chunks
-        else:
-            avg_sentiment = 0.0
-            confidence = 0.0
+        for chunk in chunks:
+            processed += 1
+            week_index = episode_weeks.get(chunk.get('episode_id'))
+            if week_index is None:
+                continue
+            content = chunk.get('text', '').lower()
 
-        # Clamp sentiment to [-1, 1] range
-        avg_sentiment = max(-1, min(1, avg_sentiment))
+            spans_by_topic: Dict[str, List[Tuple[int, int]]] = {}
+            for match in matcher.finditer(content):
+                spans_by_topic.setdefault(group_topics[match.lastgroup], []).append(match.span())
+
+            for topic, spans in spans_by_topic.items():
+                chunk_sentiment, keywords = self.score_chunk(content, spans)
+                cell = cells.setdefault((topic, week_index), SentimentCell())
+                cell.add_chunk(chunk['episode_id'], chunk_sentiment, keywords)
+
+        return processed
+
+    def build_results(
+        self,
+        cells: Dict[Tuple[str, int], SentimentCell],
+        week_ranges: List[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        """One result per (topic, week), including weeks with no mentions"""
+        return [
+            cells.get((topic, week_index), SentimentCell()).to_result(topic, week_info)
+            for week_index, week_info in enumerate(week_ranges)
+            for topic in self.topics
+        ]
 
-        # Get unique keywords found
-        unique_keywords = list(set(all_keywords_found))
+    def store_results(self, results: List[Dict[str, Any]]) -> int:
+        """Upsert all results with one bulk_write; returns the number written"""
+        if not results:
+            return 0
+        operations = [
+            UpdateOne(
+                {'topic': r['topic'], 'week': r['week'], 'year': r['year']},
+                {'$set': {k: v for k, v in r.items() if k != '_id'}},
+                upsert=True
+            )
+            for r in results
+        ]
+        outcome = self.results_collection.bulk_write(operations, ordered=False)
+        return outcome.matched_count + outcome.upserted_count
 
+    def process_shard(self, episode_weeks: Dict[str, int]) -> Dict[str, Any]:
+        """Partial aggregates for the chunks of one shard of episodes (JSON-serialisable)"""
+        cells: Dict[Tuple[str, int], SentimentCell] = {}
+        chunks = self.accumulate_chunks(self.iter_chunks(sorted(episode_weeks)), episode_weeks, cells)
         return {
-            'sentiment_score': round(avg_sentiment, 3),
-            'confidence': round(confidence, 3),
-            'keywords_found': unique_keywords[:10],  # Top 10 keywords
-            'analyzed_chunks': analyzed_count
+            'cells': {cell_key(topic, week_index): cell.to_dict() for (topic, week_index), cell in cells.items()},
+            'chunks': chunks
         }
 
-    def process_topic_week(self, topic: str, week_info: Dict[str, Any]) -> Dict[str, Any]:
-        """Process sentiment for a specific topic and week"""
-        logger.info(f"Processing {topic} for {week_info['week_label']} ({week_info['year']})")
-
-        # Create flexible search pattern
-        # For multi-word topics, search for any of the key words
-        words = topic.lower().split()
-
-        if topic == "AI Agents":
-            # Specific AI agent and autonomous system terms
-            search_pattern = "\\b(ai agent|ai agents|autonomous agent|agentic|llm agent|gpt agent|claude|chatgpt|copilot|ai assistant|langchain|autogpt|babyagi|crew ai|multi.agent)\\b"
-        elif topic == "Capital Efficiency":
-            # Specific capital efficiency and burn rate terms
-            search_pattern = "\\b(capital efficiency|burn rate|runway|unit economics|ltv.cac|gross margin|path to profitability|cash flow positive|default alive|ramen profitable)\\b"
-        elif topic == "DePIN":
-            # Specific DePIN and decentralized infrastructure terms
-            search_pattern = "\\b(depin|decentralized physical infrastructure|helium|filecoin|arweave|akash|render network|hivemapper|dimo|physical infrastructure network)\\b"
-        elif topic == "B2B SaaS":
-            # Specific B2B SaaS metrics and terms
-            search_pattern = "\\b(b2b saas|arr|mrr|annual recurring revenue|monthly recurring|net retention|gross retention|churn rate|acv|sales.led growth|product.led growth|plg)\\b"
-        elif topic == "Crypto/Web3":
-            # Specific crypto/web3 investment terms
-            search_pattern = "\\b(web3|crypto startup|token economics|tokenomics|defi protocol|layer 1|layer 2|zk.rollup|blockchain infrastructure|onchain|stablecoin|smart contract)\\b"
-        else:
-            # Default: escape the topic as-is
-            search_pattern = re.escape(topic)
-
-        topic_pattern = re.compile(search_pattern, re.IGNORECASE)
-
-        # First, find episodes in this date range
-        start_date_iso = week_info['start_date'].strftime("%Y-%m-%d")
-        end_date_iso = week_info['end_date'].strftime("%Y-%m-%d")
-
-        episode_ids = []
-        episodes = self.episodes_collection.find({
-            "raw_entry_original_feed.published_date_iso": {
-                "$gte": start_date_iso,
-                "$lt": end_date_iso
+    def plan_shards(self, episode_weeks: Dict[str, int]) -> List[List[str]]:
+        """Deterministic shards of SHARD_EPISODES episodes, in date order"""
+        ordered = sorted(episode_weeks, key=lambda guid: (episode_weeks[guid], guid))
+        return [ordered[i:i + SHARD_EPISODES] for i in range(0, len(ordered), SHARD_EPISODES)]
+
+    def _run_shards(self, shard_inputs: Dict[int, Dict[str, int]], workers: int):
+        """Yield (shard_id, partial) as shards finish, in a process pool when workers > 1"""
+        if workers <= 1 or self.mongodb_uri is None:
+            for shard_id, episode_weeks in shard_inputs.items():
+                yield shard_id, self.process_shard(episode_weeks)
+            return
+
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(self.mongodb_uri, self.topics)
+        ) as executor:
+            futures = {
+                executor.submit(_process_shard_in_worker, episode_weeks): shard_id
+                for shard_id, episode_weeks in shard_inputs.items()
             }
-        }, {"guid": 1})
+            for future in as_completed(futures):
+                yield futures[future], future.result()
 
-        episode_ids = [ep['guid'] for ep in episodes]
+    def _resumable_state(self, checkpoint, weeks: int) -> Optional[Dict[str, Any]]:
+        if checkpoint is None:
+            return None
+        try:
+            state = checkpoint.load()
+        except Exception as e:
+            logger.warning(f"Could not read checkpoint, starting fresh: {e}")
+            return None
+        if not state or state.get('weeks') != weeks or state.get('topics') != self.topics:
+            return None
+        if datetime.now(timezone.utc) - datetime.fromisoformat(state['end_date']) > CHECKPOINT_MAX_AGE:
+            logger.info("Checkpoint is too old, starting fresh")
+            return None
+        return state
+
+    def run_batch_process(self, weeks: int = 12, workers: int = 1, checkpoint=None) -> Dict[str, Any]:
+        """
+        Run the complete batch sentiment analysis process
+
+        One pass over the chunks of episodes in the window: every topic is
+        matched at once and (topic, week) aggregates are kept in memory, so
+        the cost scales with the number of chunks, not chunks x topics x weeks.
+
+        Episodes are split into shards processed by `workers` processes.
+        Partial aggregates are merged in shard order, so results do not depend
+        on completion order. With a checkpoint, finished shards are recorded
+        as they complete and a rerun after a crash resumes the same plan.
+        """
+        start_time = time.time()
+        logger.info(f"Starting batch sentiment analysis for {weeks} weeks, {len(self.topics)} topics, {workers} worker(s)")
 
-        if not episode_ids:
-            logger.info(f"No episodes found in date range {start_date_iso} to {end_date_iso}")
-            chunk_count = 0
+        state = self._resumable_state(checkpoint, weeks)
+        if state:
+            logger.info(f"Resuming checkpoint: {len(state['completed'])}/{len(state['shards'])} shards already done")
         else:
-            # Query chunks from these episodes that mention the topic
-            query = {
-                "text": {"$regex": search_pattern, "$options": "i"},
-                "episode_id": {"$in": episode_ids}
-            }
-
-            # Count total chunks
-            chunk_count = self.chunks_collection.count_documents(query)
-
-        if chunk_count == 0:
-            logger.info(f"No chunks found for {topic} in {week_info['week_label']}")
-            return {
-                'topic': topic,
-                'week': week_info['week_label'],
-                'year': week_info['year'],
-                'sentiment_score': 0.0,
-                'episode_count': 0,
-                'chunk_count': 0,
-                'sample_size': 0,
-                'confidence': 0.0,
-                'keywords_found': [],
-                'computed_at': datetime.now(timezone.utc),
-                'metadata': {
-                    'date_range': f"{week_info['start_date'].strftime('%Y-%m-%d')} to {week_info['end_date'].strftime('%Y-%m-%d')}",
-                    'analyzed_chunks': 0
-                }
+            end_date = datetime.now(timezone.utc)
+            week_ranges = self.get_week_ranges(weeks, end_date)
+            episode_weeks = self.load_episode_weeks(week_ranges)
+            state = {
+                'weeks': weeks,
+                'topics': list(self.topics),
+                'end_date': end_date.isoformat(),
+                'episode_weeks': episode_weeks,
+                'shards': self.plan_shards(episode_weeks),
+                'completed': {}
             }
+            if checkpoint is not None:
+                checkpoint.start(state)
 
-        # Use sampling for large datasets to improve performance
-        sample_size = min(chunk_count, 200)  # Sample up to 200 chunks
-
-        if sample_size < chunk_count:
-            # Use MongoDB $sample for random sampling
-            pipeline = [
-                {"$match": query},
-                {"$sample": {"size": sample_size}},
-                {"$project": {"text": 1, "episode_id": 1, "_id": 0}}
-            ]
-            chunks = list(self.chunks_collection.aggregate(pipeline))
-        else:
-            # Get all chunks if small dataset
-            chunks = list(self.chunks_collection.find(query, {
-                "text": 1, "episode_id": 1, "_id": 0
-            }))
-
-        # Calculate sentiment (pass original topic for context finding)
-        sentiment_result = self.calculate_sentiment_for_chunks(chunks, topic_pattern)
-
-        # Estimate episode count (approximate: 30 chunks per episode)
-        episode_count = max(1, chunk_count // 30) if chunk_count > 0 else 0
+        # Get week ranges
+        week_ranges = self.get_week_ranges(weeks, datetime.fromisoformat(state['end_date']))
+        logger.info(f"Processing {len(week_ranges)} weeks from {week_ranges[0]['start_date'].date()} to {week_ranges[-1]['end_date'].date()}")
+        logger.info(f"Found {len(state['episode_weeks'])} episodes in range, {len(state['shards'])} shards")
 
-        result = {
-            'topic': topic,
-            'week': week_info['week_label'],
-            'year': week_info['year'],
-            'sentiment_score': sentiment_result['sentiment_score'],
-            'episode_count': episode_count,
-            'chunk_count': chunk_count,
-            'sample_size': sample_size,
-            'confidence': sentiment_result['confidence'],
-            'keywords_found': sentiment_result['keywords_found'],
-            'computed_at': datetime.now(timezone.utc),
-            'metadata': {
-                'date_range': f"{week_info['start_date'].strftime('%Y-%m-%d')} to {week_info['end_date'].strftime('%Y-%m-%d')}",
-                'analyzed_chunks': sentiment_result['analyzed_chunks'],
-                'iso_week': week_info['iso_week']
-            }
+        total_operations = len(week_ranges) * len(self.topics)
+        partials = {int(shard_id): partial for shard_id, partial in state['completed'].items()}
+        chunks_resumed = sum(p['chunks'] for p in partials.values())
+        chunks_processed = 0
+
+        pending = {
+            shard_id: {guid: state['episode_weeks'][guid] for guid in guids}
+            for shard_id, guids in enumerate(state['shards'])
+            if shard_id not in partials
         }
-
-        logger.info(f"  Result: sentiment={sentiment_result['sentiment_score']:.3f}, "
-                   f"chunks={chunk_count}, analyzed={sentiment_result['analyzed_chunks']}")
-
-        return result
-
-    def store_result(self, result: Dict[str, Any]) -> bool:
-        """Store result in MongoDB, handling duplicates"""
+        scan_start = time.time()
+        for shard_id, partial in self._run_shards(pending, workers):
+            partials[shard_id] = partial
+            chunks_processed += partial['chunks']
+            if checkpoint is not None:
+                checkpoint.save_shard(shard_id, partial)
+            rate = chunks_processed / max(time.time() - scan_start, 1e-9)
+            logger.info(f"Shard {len(partials)}/{len(state['shards'])} done "
+                        f"({chunks_processed} chunks this run, {rate:.0f} chunks/s)")
+        scan_seconds = time.time() - scan_start
+
+        # Deterministic merge: shard order, not completion order
+        cells: Dict[Tuple[str, int], SentimentCell] = {}
+        for shard_id in sorted(partials):
+            for key, data in partials[shard_id]['cells'].items():
+                cells.setdefault(parse_cell_key(key), SentimentCell()).merge(SentimentCell.from_dict(data))
+
+        results = self.build_results(cells, week_ranges)
         try:
-            # Use upsert to insert or update
-            filter_query = {
-                'topic': result['topic'],
-                'week': result['week'],
-                'year': result['year']
-            }
+            completed_operations = self.store_results(results)
+        except Exception as e:
+            logger.error(f"Failed to store results: {e}")
+            completed_operations = 0
+        failed_operations = total_operations - completed_operations
 
-            # Remove _id if it exists to avoid update errors
-            update_doc = {k: v for k, v in result.items() if k != '_id'}
+        if checkpoint is not None and failed_operations == 0:
+            checkpoint.clear()
 
-            update_result = self.results_collection.update_one(
-                filter_query,
-                {'$set': update_doc},
-                upsert=True
-            )
+        elapsed_time = time.time() - start_time
+
+        summary = {
+            'total_operations': total_operations,
+            'completed_operations': completed_operations,
+            'failed_operations': failed_operations,
+            'elapsed_seconds': elapsed_time,
+            'success_rate': (completed_operations / total_operations) * 100 if total_operations > 0 else 0,
+            'chunks_processed': chunks_processed,
+            'chunks_resumed': chunks_resumed,
+            # Shard scan only: excludes discovery, the merge and the result writes
+            'scan_seconds': scan_seconds,
+            'chunks_per_second': chunks_processed / scan_seconds if scan_seconds > 0 else 0.0,
+            'shards': len(state['shards']),
+            'workers': workers
+        }
 
-            if update_result.upserted_id:
-                logger.debug(f"Inserted new result for {result['topic']} {result['week']} {result['year']}")
-            else:
-                logger.info(f"Updated existing result for {result['topic']} {result['week']} {result['year']}")
+        logger.info(f"Batch process completed in {elapsed_time:.1f}s ({chunks_processed} chunks, "
+                    f"{summary['chunks_per_second']:.0f} chunks/s)")
+        logger.info(f"Success: {completed_operations}/{total_operations} ({summary['success_rate']:.1f}%)")
 
-            return True
-        except Exception as e:
-            logger.error(f"Failed to store result: {e}, full error: {e.args[0] if e.args else 'No details'}")
-            return False
+        return summary
 
-    def run_batch_process(self, weeks: int = 12) -> Dict[str, Any]:
-        """Run the complete batch sentiment analysis process"""
+    def load_incremental_state(self, weeks: int, now: datetime) -> Optional[Dict[str, Any]]:
+        """Stored partial sums and watermark, or None when a rebuild is needed"""
+        state = self.state_collection.find_one({'_id': INCREMENTAL_STATE_ID})
+        if not state or state.get('weeks') != weeks or state.get('topics') != self.topics:
+            return None
+        if now - datetime.fromisoformat(state['window_end']) >= timedelta(weeks=weeks):
+            # Every stored week has left the window
+            return None
+        return state
+
+    def iter_new_chunks(
+        self,
+        episode_ids: List[str],
+        watermark: Optional[ObjectId],
+        upper_bound: ObjectId
+    ) -> Iterable[Dict[str, Any]]:
+        """Stream chunks of the given episodes with watermark < _id < upper_bound"""
+        id_range: Dict[str, ObjectId] = {'$lt': upper_bound}
+        if watermark is not None:
+            id_range['$gt'] = watermark
+        return self.chunks_collection.find(
+            {"episode_id": {"$in": episode_ids}, "_id": id_range},
+            {"text": 1, "episode_id": 1, "_id": 0}
+        ).batch_size(CHUNK_BATCH_SIZE)
+
+    def run_incremental(self, weeks: int = 12, rebuild: bool = False) -> Dict[str, Any]:
+        """
+        Fold only chunks added since the last run into stored (topic, week) sums
+
+        State in sentiment_batch_state keeps each cell's partial sums (keyed
+        by week start) and a high-water mark on chunk _id. Weeks are ISO
+        calendar weeks, the newest being the current partial week, and the
+        window slides a whole week at a time, so stored cells stay valid and a
+        run costs O(new chunks). The state is rebuilt from the full window
+        when missing, stale, or rebuild=True.
+
+        Chunks whose episode metadata lands after the chunk itself are only
+        picked up by a rebuild; run one periodically (e.g. weekly).
+        """
         start_time = time.time()
-        logger.info(f"Starting batch sentiment analysis for {weeks} weeks, {len(self.topics)} topics")
+        now = datetime.now(timezone.utc)
+        upper_bound = ObjectId.from_datetime(now - WATERMARK_LAG)
 
-        # Get week ranges
-        week_ranges = self.get_week_ranges(weeks)
-        logger.info(f"Processing {len(week_ranges)} weeks from {week_ranges[0]['start_date'].date()} to {week_ranges[-1]['end_date'].date()}")
+        state = None if rebuild else self.load_incremental_state(weeks, now)
+        if state is None:
+            logger.info("Rebuilding incremental sentiment state from the full window")
+            window_end, watermark, stored_cells = next_week_start(now), None, {}
+        else:
+            window_end = datetime.fromisoformat(state['window_end'])
+            watermark = ObjectId(state['watermark'])
+            stored_cells = state['cells']
+            while now >= window_end:
+                window_end += timedelta(weeks=1)
+
+        week_ranges = self.get_week_ranges(weeks, window_end)
+        week_keys = [w['start_date'].isoformat() for w in week_ranges]
+        week_index_by_key = {key: i for i, key in enumerate(week_keys)}
+
+        # Stored cells for weeks still in the window
+        cells: Dict[Tuple[str, int], SentimentCell] = {}
+        for key, data in stored_cells.items():
+            week_key, topic = key.split("|", 1)
+            if week_key in week_index_by_key:
+                cells[(topic, week_index_by_key[week_key])] = SentimentCell.from_dict(data)
+
+        episode_weeks = self.load_episode_weeks(week_ranges)
+        scan_start = time.time()
+        chunks_processed = self.accumulate_chunks(
+            self.iter_new_chunks(sorted(episode_weeks), watermark, upper_bound),
+            episode_weeks,
+            cells
+        )
+        scan_seconds = time.time() - scan_start
 
         total_operations = len(week_ranges) * len(self.topics)
-        completed_operations = 0
-        failed_operations = 0
-
-        # Process each combination of topic and week
-        for week_info in week_ranges:
-            for topic in self.topics:
-                try:
-                    result = self.process_topic_week(topic, week_info)
-                    success = self.store_result(result)
-
-                    if success:
-                        completed_operations += 1
-                    else:
-                        failed_operations += 1
-
-                except Exception as e:
-                    logger.error(f"Failed to process {topic} for {week_info['week_label']}: {e}")
-                    failed_operations += 1
-
-                # Progress logging
-                if (completed_operations + failed_operations) % 10 == 0:
-                    progress = ((completed_operations + failed_operations) / total_operations) * 100
-                    logger.info(f"Progress: {progress:.1f}% ({completed_operations}/{total_operations})")
+        try:
+            completed_operations = self.store_results(self.build_results(cells, week_ranges))
+        except Exception as e:
+            logger.error(f"Failed to store results: {e}")
+            completed_operations = 0
+        failed_operations = total_operations - completed_operations
+
+        # Only advance the watermark once the results it covers are stored
+        if failed_operations == 0:
+            self.state_collection.replace_one({'_id': INCREMENTAL_STATE_ID}, {
+                'weeks': weeks,
+                'topics': list(self.topics),
+                'window_end': window_end.isoformat(),
+                'watermark': str(upper_bound),
+                'cells': {
+                    f"{week_keys[week_index]}|{topic}": cell.to_dict()
+                    for (topic, week_index), cell in cells.items()
+                },
+                'updated_at': now
+            }, upsert=True)
 
         elapsed_time = time.time() - start_time
-
         summary = {
             'total_operations': total_operations,
             'completed_operations': completed_operations,
             'failed_operations': failed_operations,
             'elapsed_seconds': elapsed_time,
-            'success_rate': (completed_operations / total_operations) * 100 if total_operations > 0 else 0
+            'success_rate': (completed_operations / total_operations) * 100 if total_operations > 0 else 0,
+            'chunks_processed': chunks_processed,
+            'scan_seconds': scan_seconds,
+            'chunks_per_second': chunks_processed / scan_seconds if scan_seconds > 0 else 0.0,
+            'rebuilt': state is None,
+            'workers': 1
         }
 
-        logger.info(f"Batch process completed in {elapsed_time:.1f}s")
-        logger.info(f"Success: {completed_operations}/{total_operations} ({summary['success_rate']:.1f}%)")
-
+        logger.info(f"Incremental update completed in {elapsed_time:.1f}s ({chunks_processed} new chunks, "
+                    f"{'rebuilt' if state is None else 'folded into stored sums'})")
         return summary
 
     def cleanup_old_results(self, days_to_keep: int = 30):
@@ -390,19 +721,45 @@ class BatchSentimentProcessor:
 
     def close(self):
         """Close MongoDB connection"""
-        self.client.close()
+        if self.client is not None:
+            self.client.close()
 
 def main():
     """Main function to run batch sentiment processing"""
+    arg_parser = argparse.ArgumentParser(description="Pre-compute weekly topic sentiment")
+    arg_parser.add_argument("--weeks", type=int, default=12, help="Number of weeks to process")
+    arg_parser.add_argument("--workers", type=int, default=1, help="Worker processes (default 1)")
+    arg_parser.add_argument("--checkpoint",
+                            help=f"Checkpoint file for resuming a crashed run (default {DEFAULT_CHECKPOINT_PATH})")
+    arg_parser.add_argument("--mongo-checkpoint", action="store_true",
+                            help="Keep the checkpoint in MongoDB instead of a local file "
+                                 "(default under CI, where the runner's disk does not survive the run)")
+    arg_parser.add_argument("--no-checkpoint", action="store_true", help="Disable checkpointing")
+    arg_parser.add_argument("--incremental", action="store_true",
+                            help="Only fold chunks added since the last incremental run into stored sums")
+    arg_parser.add_argument("--rebuild", action="store_true",
+                            help="With --incremental, recompute the stored sums from the full window")
+    args = arg_parser.parse_args()
+
     logger.info("=" * 60)
     logger.info("BATCH SENTIMENT ANALYSIS PROCESSOR")
     logger.info("=" * 60)
 
     processor = BatchSentimentProcessor()
 
+    if args.no_checkpoint:
+        checkpoint = None
+    elif args.mongo_checkpoint or (os.getenv('CI', '').lower() == 'true' and args.checkpoint is None):
+        checkpoint = MongoCheckpoint(processor.db['sentiment_batch_checkpoints'])
+    else:
+        checkpoint = FileCheckpoint(args.checkpoint or DEFAULT_CHECKPOINT_PATH)
+
     try:
         # Run the batch process
-        summary = processor.run_batch_process(weeks=12)
+        if args.incremental:
+            summary = processor.run_incremental(weeks=args.weeks, rebuild=args.rebuild)
+        else:
+            summary = processor.run_batch_process(weeks=args.weeks, workers=args.workers, checkpoint=checkpoint)
 
         # Cleanup old results
         processor.cleanup_old_results(days_to_keep=30)
@@ -416,6 +773,9 @@ def main():
         logger.info(f"Failed: {summary['failed_operations']}")
         logger.info(f"Success rate: {summary['success_rate']:.1f}%")
         logger.info(f"Total time: {summary['elapsed_seconds']:.1f} seconds")
+        logger.info(f"Throughput: {summary['chunks_per_second']:.0f} chunks/s "
+                    f"({summary['chunks_processed']} chunks in {summary['scan_seconds']:.1f}s of scanning, "
+                    f"{summary['workers']} worker(s))")
         logger.info("=" * 60)
 
         # Exit with appropriate code
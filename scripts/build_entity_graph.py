@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Build Entity Graph
+
+Brings the stored entity co-mention graph behind /api/entities/graph up to
+date. Requests never build the graph themselves (a full build pages every
+extracted_entities row); API instances load the stored row instead. Run it
+after each entity ETL batch.
+
+Usage:
+    python scripts/build_entity_graph.py          # incremental (new rows only)
+    python scripts/build_entity_graph.py --full   # rebuild from all rows
+
+Requires scripts/sql/entity_graph.sql to have been applied, and a
+SUPABASE_KEY that can write entity_graph_state.
+"""
+import argparse
+import asyncio
+import logging
+import os
+import sys
+
+from dotenv import load_dotenv
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+load_dotenv()
+
+from lib.database import get_pool
+from lib.entity_graph import build_entity_graph
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Build the stored entity co-mention graph")
+    arg_parser.add_argument("--full", action="store_true", help="Ignore the stored graph and rebuild")
+    args = arg_parser.parse_args()
+
+    try:
+        summary = asyncio.run(build_entity_graph(get_pool(), full=args.full))
+    except Exception as e:
+        logger.error(f"❌ Entity graph build failed: {e}")
+        sys.exit(1)
+
+    logger.info(
+        f"✅ {summary['mode']} build: {summary['rows_read']} rows read, "
+        f"{summary['entities']} entities, {summary['episodes']} episodes, {summary['pairs']} pairs"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Compute Topic Signals
+
+Recomputes the correlation, spike and trending_combo rows behind /api/signals
+from topic_mentions and writes only the signals that changed.
+
+Usage:
+    python scripts/compute_topic_signals.py            # incremental (new mentions only)
+    python scripts/compute_topic_signals.py --full     # rebuild from all mentions
+    python scripts/compute_topic_signals.py --dry-run  # compute and report, write nothing
+
+The incidence state that makes runs incremental is kept in the Supabase
+topic_signal_state table, so it survives fresh CI runners and serverless
+instances. --state-path (or TOPIC_SIGNALS_STATE_PATH) keeps it in a local
+file instead; only use that on a machine whose disk persists between runs.
+
+Requires scripts/sql/topic_signals.sql to have been applied.
+"""
+import argparse
+import asyncio
+import logging
+import os
+import sys
+
+from dotenv import load_dotenv
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+load_dotenv()
+
+from lib.database import get_pool
+from lib.topic_signals import TOPIC_SIGNALS_STATE_PATH, run_topic_signals
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Compute topic_signals from topic_mentions")
+    arg_parser.add_argument("--full", action="store_true", help="Ignore the saved state and rebuild")
+    arg_parser.add_argument("--dry-run", action="store_true", help="Report changes without writing")
+    arg_parser.add_argument("--state-path", default=TOPIC_SIGNALS_STATE_PATH,
+                            help="Local incidence state file (default: the Supabase topic_signal_state row)")
+    args = arg_parser.parse_args()
+
+    try:
+        summary = asyncio.run(run_topic_signals(
+            get_pool(),
+            state_path=args.state_path,
+            full=args.full,
+            dry_run=args.dry_run
+        ))
+    except Exception as e:
+        logger.error(f"❌ Topic signal computation failed: {e}")
+        sys.exit(1)
+
+    logger.info(
+        f"✅ {summary['mode']} run: {summary['rows_read']} mentions read, "
+        f"{summary['signals']} signals ({summary['upserted']} upserted, "
+        f"{summary['deleted']} deleted, {summary['unchanged']} unchanged)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,19 @@
+-- Stored entity co-mention graph for /api/entities/graph
+-- (lib/entity_graph.py, built by scripts/build_entity_graph.py)
+--
+-- Building the graph pages every extracted_entities row, which takes longer
+-- than a serverless request may run. The build script stores the graph here
+-- (a base64 .npz of the entity x episode incidence plus its created_at
+-- watermark) and API instances load this one row on a cold start.
+--
+-- Apply once in the Supabase SQL editor (safe to re-run).
+
+CREATE TABLE IF NOT EXISTS entity_graph_state (
+    id TEXT PRIMARY KEY,
+    graph TEXT NOT NULL,
+    watermark TEXT,
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+-- Read access for the API's anon key (only the build script writes)
+GRANT SELECT ON entity_graph_state TO anon, authenticated;
@@ -0,0 +1,151 @@
+-- Precomputed entity index for /api/entities
+--
+-- One row per (entity_name, entity_type) with mention/episode counts, the
+-- three most recent episodes and the publish dates of episodes from the last
+-- 35 days (enough to compute the API's 4-week trend at request time).
+--
+-- Each name also gets an entity_type = 'ALL' row aggregated over all its
+-- types, which serves requests without a type filter (the API has always
+-- grouped those by name alone). primary_type is the name's most frequent
+-- type on 'ALL' rows and equals entity_type otherwise.
+-- A trigram index on entity_name keeps ILIKE '%term%' search off a full scan.
+--
+-- Refresh:
+--   * automatically per INSERT statement on extracted_entities (affected names only)
+--   * explicitly by the entity ETL: SELECT refresh_entity_index(ARRAY['Sequoia', ...]);
+--   * full rebuild: SELECT refresh_entity_index();
+--
+-- Apply once in the Supabase SQL editor (safe to re-run).
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+CREATE TABLE IF NOT EXISTS entity_index (
+    entity_name          TEXT          NOT NULL,
+    entity_type          TEXT          NOT NULL,
+    primary_type         TEXT          NOT NULL,
+    mention_count        INTEGER       NOT NULL,
+    episode_count        INTEGER       NOT NULL,
+    first_mentioned_at   TIMESTAMPTZ,
+    last_mentioned_at    TIMESTAMPTZ,
+    recent_episode_dates TIMESTAMPTZ[] NOT NULL DEFAULT '{}',
+    recent_mentions      JSONB         NOT NULL DEFAULT '[]',
+    updated_at           TIMESTAMPTZ   NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (entity_name, entity_type)
+);
+
+-- Tables created before the 'ALL' rows existed
+ALTER TABLE entity_index ADD COLUMN IF NOT EXISTS primary_type TEXT;
+
+-- Every read filters on entity_type ('ALL' when unfiltered)
+DROP INDEX IF EXISTS idx_entity_index_mentions;
+CREATE INDEX IF NOT EXISTS idx_entity_index_name_trgm
+    ON entity_index USING GIN (entity_name gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_entity_index_type_mentions
+    ON entity_index (entity_type, mention_count DESC);
+
+-- Recompute index rows for the given names (NULL = every entity)
+CREATE OR REPLACE FUNCTION refresh_entity_index(p_entity_names TEXT[] DEFAULT NULL)
+RETURNS INTEGER AS $$
+DECLARE
+    affected INTEGER;
+BEGIN
+    DELETE FROM entity_index
+    WHERE p_entity_names IS NULL OR entity_name = ANY(p_entity_names);
+
+    WITH typed_mentions AS (
+        SELECT ee.entity_name, ee.entity_type, ee.episode_id,
+               e.published_at, e.podcast_name, e.duration_seconds
+        FROM extracted_entities ee
+        JOIN episodes e ON e.id = ee.episode_id
+        WHERE p_entity_names IS NULL OR ee.entity_name = ANY(p_entity_names)
+    ),
+    -- Every mention again under 'ALL', so each name is also grouped across types
+    mentions AS (
+        SELECT * FROM typed_mentions
+        UNION ALL
+        SELECT entity_name, 'ALL', episode_id, published_at, podcast_name, duration_seconds
+        FROM typed_mentions
+    ),
+    primary_types AS (
+        SELECT DISTINCT ON (entity_name) entity_name, entity_type AS primary_type
+        FROM typed_mentions
+        GROUP BY entity_name, entity_type
+        ORDER BY entity_name, COUNT(*) DESC, entity_type
+    ),
+    mention_totals AS (
+        SELECT entity_name, entity_type, COUNT(*) AS mention_count
+        FROM mentions
+        GROUP BY entity_name, entity_type
+    ),
+    entity_episodes AS (
+        SELECT DISTINCT ON (entity_name, entity_type, episode_id)
+               entity_name, entity_type, episode_id, published_at, podcast_name, duration_seconds
+        FROM mentions
+        ORDER BY entity_name, entity_type, episode_id
+    ),
+    ranked AS (
+        SELECT *, ROW_NUMBER() OVER (
+            PARTITION BY entity_name, entity_type ORDER BY published_at DESC
+        ) AS recency_rank
+        FROM entity_episodes
+    ),
+    episode_totals AS (
+        SELECT entity_name, entity_type,
+               COUNT(*) AS episode_count,
+               MIN(published_at) AS first_mentioned_at,
+               MAX(published_at) AS last_mentioned_at,
+               COALESCE(
+                   ARRAY_AGG(published_at ORDER BY published_at DESC)
+                       FILTER (WHERE published_at > NOW() - INTERVAL '35 days'),
+                   '{}'
+               ) AS recent_episode_dates,
+               COALESCE(
+                   JSONB_AGG(JSONB_BUILD_OBJECT(
+                       'episode_id', episode_id,
+                       'published_at', published_at,
+                       'podcast_name', podcast_name,
+                       'duration_seconds', duration_seconds
+                   ) ORDER BY published_at DESC) FILTER (WHERE recency_rank <= 3),
+                   '[]'
+               ) AS recent_mentions
+        FROM ranked
+        GROUP BY entity_name, entity_type
+    )
+    INSERT INTO entity_index (
+        entity_name, entity_type, primary_type, mention_count, episode_count,
+        first_mentioned_at, last_mentioned_at, recent_episode_dates, recent_mentions, updated_at
+    )
+    SELECT m.entity_name, m.entity_type,
+           CASE WHEN m.entity_type = 'ALL' THEN p.primary_type ELSE m.entity_type END,
+           m.mention_count, e.episode_count,
+           e.first_mentioned_at, e.last_mentioned_at, e.recent_episode_dates, e.recent_mentions, NOW()
+    FROM mention_totals m
+    JOIN episode_totals e USING (entity_name, entity_type)
+    JOIN primary_types p USING (entity_name);
+
+    GET DIAGNOSTICS affected = ROW_COUNT;
+    RETURN affected;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Incremental refresh for each batch the ETL inserts
+CREATE OR REPLACE FUNCTION entity_index_after_insert() RETURNS TRIGGER AS $$
+BEGIN
+    PERFORM refresh_entity_index(ARRAY(SELECT DISTINCT entity_name FROM new_rows));
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_entity_index ON extracted_entities;
+CREATE TRIGGER trg_entity_index
+    AFTER INSERT ON extracted_entities
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION entity_index_after_insert();
+
+-- Initial build (also fills primary_type and the 'ALL' rows on older tables)
+SELECT refresh_entity_index();
+
+ALTER TABLE entity_index ALTER COLUMN primary_type SET NOT NULL;
+
+-- Read access for the API's anon key
+GRANT SELECT ON entity_index TO anon, authenticated;
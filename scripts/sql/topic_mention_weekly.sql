@@ -0,0 +1,75 @@
+-- Weekly topic-mention rollup for /api/topic-velocity
+--
+-- One row per (topic, year, week) holding the number of topic_mentions rows,
+-- kept current by a trigger on topic_mentions so the API reads
+-- O(topics x weeks) rows instead of every mention.
+--
+-- Buckets match the API's historical grouping: iso_year is the year of the
+-- episode's published_at and iso_week is topic_mentions.week_number.
+--
+-- Apply once in the Supabase SQL editor (safe to re-run).
+
+CREATE TABLE IF NOT EXISTS topic_mention_weekly (
+    topic_name    TEXT        NOT NULL,
+    iso_year      INTEGER     NOT NULL,
+    iso_week      INTEGER     NOT NULL,
+    mention_count INTEGER     NOT NULL DEFAULT 0,
+    updated_at    TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (topic_name, iso_year, iso_week)
+);
+
+CREATE INDEX IF NOT EXISTS idx_topic_mention_weekly_week
+    ON topic_mention_weekly (iso_year, iso_week);
+
+-- Incremental maintenance: +1 on insert, -1 on delete
+CREATE OR REPLACE FUNCTION topic_mention_weekly_apply() RETURNS TRIGGER AS $$
+DECLARE
+    mention RECORD;
+    delta   INTEGER;
+    pub_at  TIMESTAMPTZ;
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        mention := OLD;
+        delta := -1;
+    ELSE
+        mention := NEW;
+        delta := 1;
+    END IF;
+
+    SELECT published_at INTO pub_at FROM episodes WHERE id = mention.episode_id;
+    IF pub_at IS NULL OR mention.week_number IS NULL THEN
+        RETURN NULL;  -- Not counted by the API either (inner join on episodes)
+    END IF;
+
+    INSERT INTO topic_mention_weekly (topic_name, iso_year, iso_week, mention_count, updated_at)
+    VALUES (mention.topic_name, EXTRACT(YEAR FROM pub_at)::INTEGER, mention.week_number::INTEGER, delta, NOW())
+    ON CONFLICT (topic_name, iso_year, iso_week) DO UPDATE
+        SET mention_count = topic_mention_weekly.mention_count + EXCLUDED.mention_count,
+            updated_at = NOW();
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_topic_mention_weekly ON topic_mentions;
+CREATE TRIGGER trg_topic_mention_weekly
+    AFTER INSERT OR DELETE ON topic_mentions
+    FOR EACH ROW EXECUTE FUNCTION topic_mention_weekly_apply();
+
+-- Backfill (recomputes every bucket from scratch)
+INSERT INTO topic_mention_weekly (topic_name, iso_year, iso_week, mention_count, updated_at)
+SELECT tm.topic_name,
+       EXTRACT(YEAR FROM e.published_at)::INTEGER,
+       tm.week_number::INTEGER,
+       COUNT(*),
+       NOW()
+FROM topic_mentions tm
+JOIN episodes e ON e.id = tm.episode_id
+WHERE e.published_at IS NOT NULL AND tm.week_number IS NOT NULL
+GROUP BY 1, 2, 3
+ON CONFLICT (topic_name, iso_year, iso_week) DO UPDATE
+    SET mention_count = EXCLUDED.mention_count,
+        updated_at = NOW();
+
+-- Read access for the API's anon key
+GRANT SELECT ON topic_mention_weekly TO anon, authenticated;
@@ -0,0 +1,49 @@
+-- Keys and watermark column for the in-repo topic signal engine
+-- (lib/topic_signals.py, run by scripts/compute_topic_signals.py)
+--
+-- topic_signals.signal_key identifies one signal ("correlation:A|B",
+-- "spike:A", "trending_combo:A|B") so the engine can upsert only the
+-- signals whose data changed and delete the ones that no longer hold.
+--
+-- topic_mentions.created_at is the incremental watermark: a run only reads
+-- mentions created since the previous run. Existing rows get the migration
+-- time, which is fine because the first run is always a full build.
+--
+-- topic_signal_state holds the engine's incidence matrix and watermark
+-- (base64 .npz) between runs, so incremental runs work from CI runners and
+-- serverless instances whose local disk does not persist.
+--
+-- Apply once in the Supabase SQL editor (safe to re-run).
+
+ALTER TABLE topic_mentions
+    ADD COLUMN IF NOT EXISTS created_at TIMESTAMPTZ NOT NULL DEFAULT NOW();
+
+CREATE INDEX IF NOT EXISTS idx_topic_mentions_created_at
+    ON topic_mentions (created_at);
+
+ALTER TABLE topic_signals
+    ADD COLUMN IF NOT EXISTS signal_key TEXT;
+
+-- Backfill keys for rows written by the old external job
+UPDATE topic_signals
+SET signal_key = signal_type || ':' || COALESCE(
+    signal_data->>'topic',
+    (SELECT STRING_AGG(t, '|' ORDER BY t) FROM JSONB_ARRAY_ELEMENTS_TEXT(signal_data->'topics') AS t)
+)
+WHERE signal_key IS NULL;
+
+-- Keep only the newest row per key before adding the unique index
+DELETE FROM topic_signals s
+USING topic_signals newer
+WHERE s.signal_key = newer.signal_key
+  AND (s.calculated_at, s.id::TEXT) < (newer.calculated_at, newer.id::TEXT);
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_topic_signals_key
+    ON topic_signals (signal_key);
+
+CREATE TABLE IF NOT EXISTS topic_signal_state (
+    id TEXT PRIMARY KEY,
+    incidence TEXT NOT NULL,
+    watermark TEXT,
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
@@ -0,0 +1,137 @@
+"""
+Tests for per-stage admission control
+"""
+import asyncio
+
+import pytest
+
+from lib import synthesis
+from lib.admission import OverloadedError, StageLimiter
+from lib.synthesis_cache import SynthesisCache
+from tests.test_synthesis_extractive import CHUNKS
+
+
+async def hold(limiter, key, order, release):
+    async with limiter.slot(key):
+        order.append(key)
+        await release.wait()
+
+
+@pytest.mark.asyncio
+async def test_limits_concurrency():
+    limiter = StageLimiter("test", max_concurrent=2, max_queue=4)
+    order, release = [], asyncio.Event()
+    tasks = [asyncio.create_task(hold(limiter, key, order, release)) for key in "abc"]
+    await asyncio.sleep(0.01)
+
+    assert order == ["a", "b"]
+    assert limiter.get_state()["queued"] == 1
+    release.set()
+    await asyncio.gather(*tasks)
+    assert order == ["a", "b", "c"]
+    assert limiter.active == 0 and limiter.queued == 0
+
+
+@pytest.mark.asyncio
+async def test_waiters_served_round_robin_across_clients():
+    limiter = StageLimiter("test", max_concurrent=1, max_queue=8, max_queue_per_client=4)
+    order = []
+
+    async def run(key):
+        async with limiter.slot(key):
+            order.append(key)
+            await asyncio.sleep(0.01)
+
+    first = asyncio.create_task(run("burst"))
+    await asyncio.sleep(0)
+    tasks = [asyncio.create_task(run("burst")) for _ in range(3)]
+    await asyncio.sleep(0)
+    tasks.append(asyncio.create_task(run("other")))
+    await asyncio.gather(first, *tasks)
+
+    assert order == ["burst", "burst", "other", "burst", "burst"]
+
+
+@pytest.mark.asyncio
+async def test_sheds_with_status_and_retry_after():
+    limiter = StageLimiter("test", max_concurrent=1, max_queue=4, max_queue_per_client=2, max_wait_seconds=0.05)
+    release = asyncio.Event()
+    holder = asyncio.create_task(hold(limiter, "a", [], release))
+    waiters = [asyncio.create_task(hold(limiter, key, [], release)) for key in ("a", "a", "b")]
+    await asyncio.sleep(0.01)
+
+    # Client "a" already has two waiters
+    with pytest.raises(OverloadedError) as client_full:
+        await limiter._acquire("a")
+    assert client_full.value.status_code == 429
+
+    # The queue is full for everyone
+    waiters.append(asyncio.create_task(hold(limiter, "b", [], release)))
+    await asyncio.sleep(0)
+    with pytest.raises(OverloadedError) as queue_full:
+        await limiter._acquire("c")
+    assert queue_full.value.status_code == 503
+    assert queue_full.value.retry_after >= 1
+
+    # Waiters give up after max_wait_seconds and leave the queue
+    results = await asyncio.gather(*waiters, return_exceptions=True)
+    assert all(isinstance(r, OverloadedError) and r.status_code == 503 for r in results)
+    assert limiter.queued == 0 and limiter.get_state()["timed_out"] == 4
+
+    release.set()
+    await holder
+    assert limiter.active == 0
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_leaves_queue():
+    limiter = StageLimiter("test", max_concurrent=1, max_queue=4)
+    release = asyncio.Event()
+    holder = asyncio.create_task(hold(limiter, "a", [], release))
+    waiter = asyncio.create_task(hold(limiter, "b", [], release))
+    await asyncio.sleep(0.01)
+
+    waiter.cancel()
+    await asyncio.gather(waiter, return_exceptions=True)
+    assert limiter.queued == 0
+    release.set()
+    await holder
+    assert limiter.active == 0
+
+
+@pytest.mark.asyncio
+async def test_saturated_synthesis_serves_extractive_answer(monkeypatch):
+    limiter = StageLimiter("synthesis", max_concurrent=1, max_queue=0)
+    monkeypatch.setattr(synthesis, "get_stage_limiter", lambda name: limiter)
+    monkeypatch.setattr(synthesis, "get_synthesis_cache", lambda cache=SynthesisCache(use_mongo=False): cache)
+
+    async def never_called(chunks, query):
+        raise AssertionError("OpenAI called while synthesis is saturated")
+
+    monkeypatch.setattr(synthesis, "synthesize_answer_v2", never_called)
+
+    release = asyncio.Event()
+    holder = asyncio.create_task(hold(limiter, "other", [], release))
+    await asyncio.sleep(0)
+
+    answer = await synthesis.synthesize_with_retry(CHUNKS, "acme series a")
+    assert answer.source == "extractive"
+    release.set()
+    await holder
+
+
+@pytest.mark.asyncio
+async def test_saturated_modal_sheds_the_search(monkeypatch):
+    from api import search_lightweight_768d as search
+
+    limiter = StageLimiter("modal", max_concurrent=1, max_queue=0)
+    monkeypatch.setattr(search, "get_stage_limiter", lambda name: limiter)
+    release = asyncio.Event()
+    holder = asyncio.create_task(hold(limiter, "other", [], release))
+    await asyncio.sleep(0)
+
+    with pytest.raises(OverloadedError) as shed:
+        await search.search_handler_lightweight_768d(search.SearchRequest(query="acme"))
+    assert shed.value.status_code == 503
+    release.set()
+    await holder
@@ -0,0 +1,271 @@
+"""
+Tests for the single-pass batch sentiment processor
+Results are compared with a per-topic, per-week reference scan
+"""
+import os
+import re
+import sys
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from bson import ObjectId
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "scripts"))
+
+import batch_sentiment  # noqa: E402
+from batch_sentiment import BatchSentimentProcessor, FileCheckpoint, topic_search_pattern  # noqa: E402
+
+
+class FakeCursor(list):
+    def batch_size(self, size):
+        return self
+
+
+class FakeCollection:
+    def __init__(self, docs=None):
+        self.docs = docs or []
+        self.finds = 0
+        self.bulk_writes = []
+        self.stored = {}
+
+    def create_index(self, *args, **kwargs):
+        pass
+
+    def find(self, query, projection=None):
+        self.finds += 1
+        if "episode_id" in query:
+            wanted = set(query["episode_id"]["$in"])
+            id_range = query.get("_id", {})
+            return FakeCursor(
+                d for d in self.docs
+                if d["episode_id"] in wanted
+                and ("$gt" not in id_range or d["_id"] > id_range["$gt"])
+                and ("$lt" not in id_range or d["_id"] < id_range["$lt"])
+            )
+        bounds = query["raw_entry_original_feed.published_date_iso"]
+        return FakeCursor(
+            d for d in self.docs
+            if bounds["$gte"] <= d["raw_entry_original_feed"]["published_date_iso"] < bounds["$lt"]
+        )
+
+    def bulk_write(self, operations, ordered=True):
+        self.bulk_writes.append(len(operations))
+        for op in operations:
+            key = tuple(op._filter[k] for k in ("topic", "week", "year"))
+            self.stored[key] = op._doc["$set"]
+
+        class Outcome:
+            matched_count = 0
+            upserted_count = len(operations)
+        return Outcome()
+
+    def find_one(self, query):
+        return self.stored.get(query["_id"])
+
+    def replace_one(self, query, doc, upsert=False):
+        self.stored[query["_id"]] = dict(doc, _id=query["_id"])
+
+
+TEXTS = [
+    "We think ai agents are amazing and the burn rate is a problem for everyone.",
+    "Helium and filecoin had a terrible year, a disaster for depin.",
+    "Our arr grew and net retention is strong. Great quarter, no issues.",
+    "Nothing to see here, just a podcast intro about the weather.",
+    "chatgpt changed everything, incredible, but copilot is failing in some ways",
+    "ai agents ai agents ai agents good bad",
+    "layer 2 rollups and stablecoin rails look promising; smart contract risk is concerning",
+]
+
+
+def empty_db():
+    return {
+        "transcript_chunks_768d": FakeCollection(),
+        "episode_metadata": FakeCollection(),
+        "sentiment_results": FakeCollection(),
+        "sentiment_batch_state": FakeCollection()
+    }
+
+
+def chunk_id(age, serial):
+    """ObjectId created `age` ago"""
+    seconds = int((datetime.now(timezone.utc) - age).timestamp())
+    return ObjectId(f"{seconds:08x}{serial:016x}")
+
+
+def make_db(processor_weeks):
+    episodes, chunks = [], []
+    for week_index, week in enumerate(processor_weeks):
+        for e in range(2):
+            guid = f"ep-{week_index}-{e}"
+            published = (week["start_date"] + timedelta(days=e * 3, hours=1)).strftime("%Y-%m-%dT%H:%M:%S")
+            episodes.append({"guid": guid, "raw_entry_original_feed": {"published_date_iso": published}})
+            for c, text in enumerate(TEXTS):
+                if (c + week_index + e) % 3:
+                    chunks.append({
+                        "_id": chunk_id(timedelta(hours=1), len(chunks)),
+                        "episode_id": guid,
+                        "text": text.upper() if c % 2 else text
+                    })
+    chunks.append({"_id": chunk_id(timedelta(hours=1), len(chunks)),
+                   "episode_id": "outside-window", "text": "ai agents are amazing"})
+    return {
+        "transcript_chunks_768d": FakeCollection(chunks),
+        "episode_metadata": FakeCollection(episodes),
+        "sentiment_results": FakeCollection(),
+        "sentiment_batch_state": FakeCollection()
+    }
+
+
+def reference_cell(processor, topic, week_chunks):
+    """The per-topic scan the single pass replaces"""
+    pattern = re.compile(topic_search_pattern(topic), re.IGNORECASE)
+    total, analyzed, matched = 0.0, 0, 0
+    for chunk in week_chunks:
+        content = chunk["text"].lower()
+        spans = [m.span() for m in pattern.finditer(content)]
+        if not spans:
+            continue
+        matched += 1
+        sentiment, _ = processor.score_chunk(content, spans)
+        if sentiment is not None:
+            total += sentiment
+            analyzed += 1
+    score = max(-1, min(1, total / analyzed)) if analyzed else 0.0
+    return round(score, 3), matched, analyzed
+
+
+class TestSinglePass:
+    def test_matches_per_topic_reference(self):
+        weeks = 3
+        week_ranges = BatchSentimentProcessor(db=empty_db()).get_week_ranges(weeks)
+        db = make_db(week_ranges)
+        processor = BatchSentimentProcessor(db=db)
+
+        summary = processor.run_batch_process(weeks=weeks)
+
+        results = db["sentiment_results"]
+        assert results.bulk_writes == [weeks * len(processor.topics)]
+        assert db["transcript_chunks_768d"].finds == 1
+        assert summary["completed_operations"] == weeks * len(processor.topics)
+        assert summary["chunks_processed"] > 0
+        assert 0 <= summary["scan_seconds"] <= summary["elapsed_seconds"]
+
+        for week_index, week in enumerate(week_ranges):
+            prefix = f"ep-{week_index}-"
+            week_chunks = [c for c in db["transcript_chunks_768d"].docs if c["episode_id"].startswith(prefix)]
+            for topic in processor.topics:
+                stored = results.stored[(topic, week["week_label"], week["year"])]
+                score, matched, analyzed = reference_cell(processor, topic, week_chunks)
+                assert stored["sentiment_score"] == score
+                assert stored["chunk_count"] == matched
+                assert stored["metadata"]["analyzed_chunks"] == analyzed
+
+    def test_empty_window_still_writes_zero_cells(self):
+        db = empty_db()
+        processor = BatchSentimentProcessor(db=db)
+        summary = processor.run_batch_process(weeks=2)
+        assert summary["completed_operations"] == 10
+        assert all(r["sentiment_score"] == 0.0 for r in db["sentiment_results"].stored.values())
+
+    def test_episode_count_is_distinct_episodes(self):
+        processor = BatchSentimentProcessor(db=empty_db())
+        cells = {}
+        processor.accumulate_chunks(
+            [{"episode_id": "a", "text": "ai agents are great"},
+             {"episode_id": "a", "text": "more ai agents, amazing"},
+             {"episode_id": "b", "text": "chatgpt is good"}],
+            {"a": 0, "b": 0},
+            cells
+        )
+        cell = cells[("AI Agents", 0)]
+        assert cell.chunk_count == 3
+        assert len(cell.episode_ids) == 2
+        assert cell.keyword_counts["great"] == 1
+
+
+class TestShardedRun:
+    def run(self, monkeypatch, shard_episodes, checkpoint=None):
+        monkeypatch.setattr(batch_sentiment, "SHARD_EPISODES", shard_episodes)
+        week_ranges = BatchSentimentProcessor(db=empty_db()).get_week_ranges(3)
+        db = make_db(week_ranges)
+        summary = BatchSentimentProcessor(db=db).run_batch_process(weeks=3, checkpoint=checkpoint)
+        return db, summary
+
+    def test_sharded_merge_matches_single_shard(self, monkeypatch):
+        single, _ = self.run(monkeypatch, 100)
+        sharded, summary = self.run(monkeypatch, 1)
+        assert summary["shards"] == 6
+        assert sharded["transcript_chunks_768d"].finds == 6
+        for key, doc in single["sentiment_results"].stored.items():
+            other = sharded["sentiment_results"].stored[key]
+            for field in ("sentiment_score", "episode_count", "chunk_count", "keywords_found"):
+                assert other[field] == doc[field]
+
+    def test_resume_skips_completed_shards(self, monkeypatch, tmp_path):
+        checkpoint = FileCheckpoint(str(tmp_path / "checkpoint.json"))
+        calls = []
+        original = BatchSentimentProcessor.process_shard
+
+        def crash_on_third(self, episode_weeks):
+            calls.append(sorted(episode_weeks))
+            if len(calls) == 3:
+                raise RuntimeError("worker died")
+            return original(self, episode_weeks)
+
+        monkeypatch.setattr(BatchSentimentProcessor, "process_shard", crash_on_third)
+        with pytest.raises(RuntimeError):
+            self.run(monkeypatch, 1, checkpoint)
+        saved = FileCheckpoint(checkpoint.path).load()
+        assert len(saved["completed"]) == 2
+
+        calls.clear()
+        monkeypatch.setattr(BatchSentimentProcessor, "process_shard", original)
+        db, summary = self.run(monkeypatch, 1, FileCheckpoint(checkpoint.path))
+        assert db["transcript_chunks_768d"].finds == 4
+        assert summary["chunks_resumed"] > 0
+        assert summary["failed_operations"] == 0
+        assert not (tmp_path / "checkpoint.json").exists()
+
+
+class TestIncremental:
+    def test_folding_new_chunks_matches_full_run(self, monkeypatch):
+        week_ranges = BatchSentimentProcessor(db=empty_db()).get_week_ranges(3)
+        db = make_db(week_ranges)
+        chunks = db["transcript_chunks_768d"].docs
+        late = [c for c in chunks if c["episode_id"].startswith("ep-2-")][:4]
+        for c in late:
+            chunks.remove(c)
+
+        processor = BatchSentimentProcessor(db=db)
+        # First run as if 45 minutes ago: its watermark predates the late chunks
+        monkeypatch.setattr(batch_sentiment, "WATERMARK_LAG", timedelta(minutes=45))
+        first = processor.run_incremental(weeks=3)
+        assert first["rebuilt"]
+        monkeypatch.undo()
+
+        # New chunks arrive; only they are scanned on the next run
+        for serial, c in enumerate(late):
+            chunks.append(dict(c, _id=chunk_id(timedelta(minutes=30), 10_000 + serial)))
+        second = processor.run_incremental(weeks=3)
+        assert not second["rebuilt"]
+        assert second["chunks_processed"] == len(late)
+        incremental = dict(db["sentiment_results"].stored)
+
+        third = processor.run_incremental(weeks=3)
+        assert third["chunks_processed"] == 0
+
+        rebuilt = processor.run_incremental(weeks=3, rebuild=True)
+        assert rebuilt["chunks_processed"] == first["chunks_processed"] + len(late)
+        for key, doc in db["sentiment_results"].stored.items():
+            for field in ("sentiment_score", "episode_count", "chunk_count", "keywords_found"):
+                assert incremental[key][field] == doc[field]
+
+    def test_recent_chunks_wait_for_watermark_lag(self):
+        week_ranges = BatchSentimentProcessor(db=empty_db()).get_week_ranges(3)
+        db = make_db(week_ranges)
+        processor = BatchSentimentProcessor(db=db)
+        processor.run_incremental(weeks=3)
+
+        db["transcript_chunks_768d"].docs.append(
+            {"_id": chunk_id(timedelta(seconds=0), 99_999), "episode_id": "ep-0-0", "text": "ai agents"})
+        assert processor.run_incremental(weeks=3)["chunks_processed"] == 0
@@ -0,0 +1,134 @@
+"""
+Unit tests for the intelligence brief loader
+Covers ID resolution, joined-document splitting and the authority cache
+"""
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from bson import ObjectId
+
+from lib.brief_loader import (
+    BriefInputs,
+    episode_match,
+    split_joined_doc,
+    get_podcast_authority,
+    load_brief_inputs,
+    load_brief_inputs_bulk,
+    clear_authority_cache
+)
+
+
+def make_cursor(docs):
+    cursor = MagicMock()
+    cursor.to_list = AsyncMock(return_value=docs)
+    return cursor
+
+
+def make_db(joined, prefs_doc=None, authority_docs=None):
+    collections = {
+        "episode_metadata": MagicMock(),
+        "user_intelligence_prefs": MagicMock(),
+        "podcast_authority": MagicMock()
+    }
+    collections["episode_metadata"].aggregate.return_value = make_cursor(joined)
+    collections["user_intelligence_prefs"].find_one = AsyncMock(return_value=prefs_doc)
+    collections["podcast_authority"].find.return_value = make_cursor(authority_docs or [])
+
+    db = MagicMock()
+    db.get_collection.side_effect = lambda name: collections[name]
+    return db, collections
+
+
+class TestEpisodeMatch:
+    def test_object_id(self):
+        oid = ObjectId()
+        assert episode_match(str(oid)) == {"_id": oid}
+
+    def test_guid(self):
+        assert episode_match("abc-123") == {"episode_id": "abc-123"}
+
+
+class TestBriefInputs:
+    def test_split_joined_doc(self):
+        doc = {"_id": 1, "_intelligence": [{"episode_id": "g1"}], "_transcript": []}
+        metadata, intelligence, transcript = split_joined_doc(doc)
+        assert metadata == {"_id": 1}
+        assert intelligence == {"episode_id": "g1"}
+        assert transcript is None
+
+    def test_episode_guid_fallbacks(self):
+        assert BriefInputs("req", episode_doc={"episode_id": "e", "guid": "g"}).episode_guid == "e"
+        assert BriefInputs("req", episode_doc={"guid": "g"}).episode_guid == "g"
+        assert BriefInputs("req", episode_doc={}).episode_guid == "req"
+
+    def test_authority_doc_by_podcast_name(self):
+        inputs = BriefInputs(
+            "req",
+            episode_doc={"raw_entry_original_feed": {"podcast_title": "All-In"}},
+            authority={"All-In": {"tier": 1}}
+        )
+        assert inputs.authority_doc == {"tier": 1}
+
+
+class TestLoader:
+    def setup_method(self):
+        clear_authority_cache()
+
+    @pytest.mark.asyncio
+    async def test_loads_all_inputs_in_one_pass(self):
+        joined = [{
+            "_id": ObjectId(),
+            "episode_id": "g1",
+            "_intelligence": [{"episode_id": "g1", "relevance_score": 70}],
+            "_transcript": [{"full_text": "hello"}]
+        }]
+        db, collections = make_db(joined, {"user_id": "demo-user"}, [{"podcast_name": "P", "tier": 2}])
+
+        inputs = await load_brief_inputs(db, "g1")
+
+        assert inputs.episode_doc["episode_id"] == "g1"
+        assert inputs.intelligence_doc["relevance_score"] == 70
+        assert inputs.transcript_doc["full_text"] == "hello"
+        assert inputs.intelligence_prefs_doc == {"user_id": "demo-user"}
+        assert inputs.authority == {"P": {"podcast_name": "P", "tier": 2}}
+        collections["episode_metadata"].aggregate.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_missing_episode(self):
+        db, _ = make_db([])
+        inputs = await load_brief_inputs(db, "missing")
+        assert inputs.episode_doc is None
+        assert inputs.intelligence_doc is None
+
+    @pytest.mark.asyncio
+    async def test_authority_table_cached(self):
+        db, collections = make_db([], authority_docs=[{"podcast_name": "P", "tier": 1}])
+        await get_podcast_authority(db)
+        await get_podcast_authority(db)
+        assert collections["podcast_authority"].find.call_count == 1
+
+    @pytest.mark.asyncio
+    async def test_bulk_preserves_request_order_and_marks_missing(self):
+        oid = ObjectId()
+        metadata = [
+            {"_id": oid, "episode_id": "g1"},
+            {"_id": ObjectId(), "episode_id": "g2"}
+        ]
+        db, collections = make_db([])
+        collections["episode_metadata"].find.return_value = make_cursor(metadata)
+        collections["episode_intelligence"] = MagicMock()
+        collections["episode_intelligence"].find.return_value = make_cursor([{"episode_id": "g1", "relevance_score": 80}])
+        collections["episode_transcripts"] = MagicMock()
+        collections["episode_transcripts"].aggregate.return_value = make_cursor([{"episode_id": str(oid), "full_text": "t"}])
+
+        results = await load_brief_inputs_bulk(db, ["g2", "missing", str(oid)])
+
+        assert [r.requested_id for r in results] == ["g2", "missing", str(oid)]
+        assert results[0].episode_doc["episode_id"] == "g2"
+        assert results[0].intelligence_doc is None
+        assert results[1].episode_doc is None
+        assert results[2].intelligence_doc["relevance_score"] == 80
+        assert results[2].transcript_doc["full_text"] == "t"
+
+        # One $in query per collection
+        collections["episode_metadata"].find.assert_called_once()
+        collections["episode_intelligence"].find.assert_called_once()
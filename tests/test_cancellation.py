@@ -0,0 +1,83 @@
+"""
+Tests for cancelling search work when the client disconnects
+"""
+import asyncio
+
+import pytest
+
+from api import search_lightweight_768d as search
+from api.search_lightweight_768d import SearchRequest, search_handler_lightweight_768d
+from lib.cancellation import ClientDisconnected, cancel_on_disconnect
+from lib.instrumentation import QueryMetrics
+
+
+class FakeRequest:
+    def __init__(self, disconnect_after: float):
+        self.disconnect_at = asyncio.get_running_loop().time() + disconnect_after
+
+    async def is_disconnected(self):
+        return asyncio.get_running_loop().time() >= self.disconnect_at
+
+
+@pytest.fixture
+def metrics(monkeypatch):
+    metrics = QueryMetrics()
+    monkeypatch.setattr("lib.cancellation.get_query_metrics", lambda: metrics)
+    return metrics
+
+
+def stats(metrics, backend, name):
+    return next(q for q in metrics.get_stats()["queries"][backend] if q["query"] == name)
+
+
+@pytest.mark.asyncio
+async def test_finished_work_is_returned(metrics):
+    async def work():
+        return "done"
+
+    assert await cancel_on_disconnect(FakeRequest(10), work(), "search", poll_interval=0.01) == "done"
+    assert "api" not in metrics.get_stats()["queries"]
+
+
+@pytest.mark.asyncio
+async def test_disconnect_cancels_expansions_and_synthesis(monkeypatch, metrics):
+    finished = []
+
+    async def embed(text, session_id=None, return_timing=False):
+        return [0.1] * 768, 0.01
+
+    class Hybrid:
+        async def search(self, query, **kwargs):
+            return [{"episode_id": f"ep{i}", "text": "t", "score": 0.9} for i in range(3)]
+
+    async def hybrid():
+        return Hybrid()
+
+    async def expand(chunk, context_seconds=20.0):
+        async with metrics.track("mongodb", "expand_chunk_context"):
+            await asyncio.sleep(5)
+        finished.append("expansion")
+
+    async def synthesize(chunks, query):
+        async with metrics.track("openai", "synthesize_answer_v2"):
+            await asyncio.sleep(5)
+        finished.append("synthesis")
+
+    monkeypatch.setattr(search, "generate_embedding_768d_local", embed)
+    monkeypatch.setattr(search, "get_hybrid_search_handler", hybrid)
+    monkeypatch.setattr(search, "expand_chunk_context", expand)
+    monkeypatch.setattr(search, "synthesize_answer_object", synthesize)
+
+    with pytest.raises(ClientDisconnected):
+        await cancel_on_disconnect(
+            FakeRequest(0.05), search_handler_lightweight_768d(SearchRequest(query="acme")), "search",
+            poll_interval=0.01
+        )
+    await asyncio.sleep(0)
+
+    assert finished == []
+    assert stats(metrics, "mongodb", "expand_chunk_context")["cancelled"] == 3
+    assert stats(metrics, "mongodb", "expand_chunk_context")["errors"] == 0
+    assert stats(metrics, "openai", "synthesize_answer_v2")["cancelled"] == 1
+    assert stats(metrics, "api", "search")["cancelled"] == 1
+    assert "podinsight_query_cancelled_total" in metrics.prometheus_text()
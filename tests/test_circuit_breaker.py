@@ -0,0 +1,170 @@
+"""
+Tests for the dependency circuit breakers
+"""
+import asyncio
+import time
+
+import pytest
+
+from lib.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpenError, is_dependency_failure
+from lib.database import SupabasePool
+
+
+def make_breaker(**overrides):
+    settings = {"min_calls": 4, "error_rate_threshold": 0.5, "open_seconds": 0.05, "slow_call_seconds": 1.0}
+    settings.update(overrides)
+    return CircuitBreaker("test", **settings)
+
+
+async def fail(breaker):
+    with pytest.raises(RuntimeError):
+        async with breaker.guard():
+            raise RuntimeError("down")
+
+
+class TestCircuitBreaker:
+    @pytest.mark.asyncio
+    async def test_trips_on_error_rate_and_rejects(self):
+        breaker = make_breaker()
+        for _ in range(2):
+            async with breaker.guard():
+                pass
+        await fail(breaker)
+        assert breaker.state == CLOSED  # 1/3 failed, under min_calls
+        await fail(breaker)
+        assert breaker.state == OPEN    # 2/4 failed
+
+        with pytest.raises(CircuitOpenError) as exc_info:
+            async with breaker.guard():
+                pytest.fail("block must not run while open")
+        assert exc_info.value.retry_after > 0
+        assert breaker.get_state()["rejected_calls"] == 1
+
+    @pytest.mark.asyncio
+    async def test_half_open_probe_success_closes(self):
+        breaker = make_breaker(min_calls=1)
+        await fail(breaker)
+        await asyncio.sleep(0.06)
+        assert breaker.get_state()["state"] == HALF_OPEN
+
+        async with breaker.guard():
+            # Only one probe at a time
+            assert not breaker.allow()
+        assert breaker.state == CLOSED
+        assert breaker.get_state()["window_calls"] == 0
+
+    @pytest.mark.asyncio
+    async def test_half_open_probe_failure_reopens(self):
+        breaker = make_breaker(min_calls=1)
+        await fail(breaker)
+        await asyncio.sleep(0.06)
+        async with breaker.guard() as call:
+            call.failed = True
+        assert breaker.state == OPEN
+        assert breaker.times_opened == 2
+
+    def test_slow_calls_trip(self):
+        breaker = make_breaker(slow_call_seconds=0.5, slow_rate_threshold=0.75)
+        for _ in range(4):
+            breaker.record_success(0.6)
+        assert breaker.state == OPEN
+        assert "slow" in breaker.last_trip_reason
+
+    def test_old_failures_leave_the_window(self, monkeypatch):
+        now = [1000.0]
+        monkeypatch.setattr("lib.circuit_breaker.time.monotonic", lambda: now[0])
+        breaker = make_breaker(window_seconds=10, bucket_count=5)
+        for _ in range(3):
+            breaker.record_failure(0.1)
+        now[0] += 11
+        breaker.record_failure(0.1)
+        breaker.record_success(0.1)
+        assert breaker.state == CLOSED
+        assert breaker.get_state()["window_calls"] == 2
+
+    @pytest.mark.asyncio
+    async def test_cancelled_probe_frees_slot(self):
+        breaker = make_breaker(min_calls=1)
+        await fail(breaker)
+        await asyncio.sleep(0.06)
+
+        async def probe():
+            async with breaker.guard():
+                await asyncio.sleep(10)
+
+        task = asyncio.create_task(probe())
+        await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        assert breaker.allow()
+
+
+class TestSupabaseFailFast:
+    @pytest.mark.asyncio
+    async def test_open_breaker_skips_retries(self, monkeypatch):
+        breaker = make_breaker(min_calls=1, open_seconds=60)
+        monkeypatch.setattr("lib.database.get_circuit_breaker", lambda name: breaker)
+        pool = SupabasePool(max_connections=2)
+        pool._create_client = lambda: object()
+        breaker.record_failure(0.1)
+
+        calls = []
+        start = time.perf_counter()
+        with pytest.raises(CircuitOpenError):
+            await pool.execute_with_retry(lambda client: calls.append(1))
+        assert calls == []
+        assert time.perf_counter() - start < 0.5  # No backoff sleeps
+        pool.close()
+
+    @pytest.mark.asyncio
+    async def test_slot_wait_is_not_a_slow_call(self, monkeypatch):
+        breaker = make_breaker(min_calls=1, slow_call_seconds=0.05, open_seconds=60)
+        monkeypatch.setattr("lib.database.get_circuit_breaker", lambda name: breaker)
+        pool = SupabasePool(max_connections=1)
+        pool._create_client = lambda: object()
+
+        async with pool.acquire():
+            query = asyncio.create_task(pool.execute_with_retry(lambda client: "ok"))
+            await asyncio.sleep(0.2)  # Local queueing well past the slow-call threshold
+        assert await query == "ok"
+        assert breaker.state == CLOSED
+        assert breaker.get_state()["slow_call_rate"] == 0.0
+        pool.close()
+
+
+class TestFailureClassification:
+    def test_request_errors_are_not_dependency_failures(self):
+        from postgrest.exceptions import APIError
+        from pymongo.errors import ExecutionTimeout, OperationFailure, ServerSelectionTimeoutError
+
+        assert not is_dependency_failure(APIError({"code": "42P01", "message": "relation does not exist"}))
+        assert not is_dependency_failure(APIError({"code": "PGRST116", "message": "no rows"}))
+        assert not is_dependency_failure(OperationFailure("bad query", code=2))
+        assert is_dependency_failure(APIError({"code": "57014", "message": "statement timeout"}))
+        assert is_dependency_failure(APIError({"code": "PGRST003", "message": "pool timeout"}))
+        assert is_dependency_failure(ExecutionTimeout("maxTimeMS", code=50))
+        assert is_dependency_failure(ServerSelectionTimeoutError("no servers"))
+        assert is_dependency_failure(RuntimeError("down"))
+
+    @pytest.mark.asyncio
+    async def test_missing_relation_neither_retried_nor_recorded(self, monkeypatch):
+        from postgrest.exceptions import APIError
+
+        breaker = make_breaker(min_calls=1, open_seconds=60)
+        monkeypatch.setattr("lib.database.get_circuit_breaker", lambda name: breaker)
+        pool = SupabasePool(max_connections=2)
+        pool._create_client = lambda: object()
+
+        calls = []
+
+        def missing(client):
+            calls.append(1)
+            raise APIError({"code": "42P01", "message": 'relation "topic_mention_weekly" does not exist'})
+
+        for _ in range(3):
+            with pytest.raises(APIError):
+                await pool.execute_with_retry(missing)
+        assert len(calls) == 3  # One attempt per call, no backoff retries
+        assert breaker.state == CLOSED
+        pool.close()
@@ -0,0 +1,150 @@
+"""
+Tests for the cached corpus statistics service
+"""
+import asyncio
+
+import pytest
+from unittest.mock import MagicMock
+
+from postgrest.exceptions import APIError
+
+from lib.corpus_stats import CorpusStatsService
+
+
+class FakeQuery:
+    """Minimal stand-in for the Supabase query builder"""
+
+    def __init__(self, corpus, table):
+        self.corpus = corpus
+        self.table = table
+        self.count = None
+        self.desc = None
+
+    def select(self, *columns, count=None):
+        self.count = count
+        return self
+
+    def order(self, column, desc=False):
+        self.desc = desc
+        return self
+
+    def limit(self, n):
+        return self
+
+    def execute(self):
+        self.corpus.queries.append(self.table)
+        if self.table in self.corpus.failing:
+            raise Exception(f"{self.table} unavailable")
+        if self.table in self.corpus.missing:
+            raise APIError({"code": "42P01", "message": f'relation "{self.table}" does not exist'})
+        response = MagicMock()
+        response.count = None
+        if self.count == "exact":
+            response.count = self.corpus.counts[self.table]
+            response.data = []
+        elif self.table == "episodes":
+            dates = sorted(self.corpus.published)
+            response.data = [{"published_at": dates[-1] if self.desc else dates[0]}]
+        elif self.table == "topic_mention_weekly":
+            response.data = self.corpus.rollup
+        else:
+            response.data = [{"topic_name": t} for t in self.corpus.raw_topics]
+        return response
+
+
+class FakeCorpus:
+    def __init__(self):
+        self.counts = {"episodes": 3, "topic_mentions": 4}
+        self.published = ["2025-01-05T00:00:00Z", "2025-03-01T00:00:00Z", "2025-06-10T00:00:00Z"]
+        self.rollup = [
+            {"topic_name": "AI Agents", "mention_count": 3},
+            {"topic_name": "DePIN", "mention_count": 1}
+        ]
+        self.raw_topics = ["AI Agents", "AI Agents", "DePIN"]
+        self.failing = set()
+        self.missing = set()
+        self.queries = []
+
+    def pool(self):
+        pool = MagicMock()
+
+        async def execute_with_retry(query_func, name=None):
+            client = MagicMock()
+            client.table.side_effect = lambda name: FakeQuery(self, name)
+            return query_func(client)
+
+        pool.execute_with_retry = execute_with_retry
+        return pool
+
+
+class TestCorpusStatsService:
+    @pytest.mark.asyncio
+    async def test_loads_stats(self):
+        corpus = FakeCorpus()
+        stats = await CorpusStatsService().get(corpus.pool())
+
+        assert stats.total_episodes == 3
+        assert stats.date_range() == "2025-01-05 to 2025-06-10"
+        assert stats.topics == ["AI Agents", "DePIN"]
+        assert stats.topic_totals == {"AI Agents": 3, "DePIN": 1}
+
+    @pytest.mark.asyncio
+    async def test_served_from_cache_within_check_interval(self):
+        corpus = FakeCorpus()
+        service = CorpusStatsService(ttl=600, version_check_interval=60)
+        await service.get(corpus.pool())
+        corpus.queries.clear()
+
+        await service.get(corpus.pool())
+        assert corpus.queries == []
+
+    @pytest.mark.asyncio
+    async def test_version_change_triggers_reload(self):
+        corpus = FakeCorpus()
+        service = CorpusStatsService(ttl=600, version_check_interval=0)
+        await service.get(corpus.pool())
+
+        # Same version: only the stamps are read
+        corpus.queries.clear()
+        await service.get(corpus.pool())
+        assert "topic_mention_weekly" not in corpus.queries
+        assert service.refresh_count == 1
+
+        # New episode: full reload
+        corpus.counts["episodes"] = 4
+        stats = await service.get(corpus.pool())
+        assert stats.total_episodes == 4
+        assert service.refresh_count == 2
+
+    @pytest.mark.asyncio
+    async def test_raw_mentions_fallback_without_rollup(self):
+        corpus = FakeCorpus()
+        corpus.missing.add("topic_mention_weekly")
+        stats = await CorpusStatsService().get(corpus.pool())
+        assert stats.topic_totals == {"AI Agents": 2, "DePIN": 1}
+
+    @pytest.mark.asyncio
+    async def test_rollup_errors_do_not_scan_raw_mentions(self):
+        corpus = FakeCorpus()
+        corpus.failing.add("topic_mention_weekly")
+        with pytest.raises(Exception, match="topic_mention_weekly unavailable"):
+            await CorpusStatsService().get(corpus.pool())
+        # Only the exact-count stamp touches topic_mentions, never the row scan
+        assert corpus.queries.count("topic_mentions") == 1
+
+    @pytest.mark.asyncio
+    async def test_concurrent_callers_share_one_refresh(self):
+        corpus = FakeCorpus()
+        service = CorpusStatsService()
+        first, second = await asyncio.gather(service.get(corpus.pool()), service.get(corpus.pool()))
+        assert first is second
+        assert service.refresh_count == 1
+
+    @pytest.mark.asyncio
+    async def test_previous_snapshot_served_when_refresh_fails(self):
+        corpus = FakeCorpus()
+        service = CorpusStatsService(ttl=0)
+        first = await service.get(corpus.pool())
+
+        corpus.failing.update({"episodes", "topic_mentions", "topic_mention_weekly"})
+        assert await service.get(corpus.pool()) is first
@@ -0,0 +1,75 @@
+"""
+Tests for SupabasePool's thread-pool execution of sync queries
+"""
+import asyncio
+import threading
+import time
+
+import pytest
+
+from lib.database import SupabasePool
+
+
+def make_pool(max_connections=2):
+    pool = SupabasePool(max_connections=max_connections)
+    pool._create_client = lambda: object()
+    return pool
+
+
+class TestSupabasePool:
+    @pytest.mark.asyncio
+    async def test_sync_queries_run_off_the_event_loop(self):
+        pool = make_pool()
+        loop_thread = threading.get_ident()
+
+        result = await pool.execute_with_retry(lambda client: threading.get_ident())
+        assert result != loop_thread
+        pool.close()
+
+    @pytest.mark.asyncio
+    async def test_event_loop_stays_responsive_during_slow_query(self):
+        pool = make_pool()
+        ticks = []
+
+        async def ticker():
+            for _ in range(5):
+                ticks.append(time.perf_counter())
+                await asyncio.sleep(0.01)
+
+        await asyncio.gather(
+            pool.execute_with_retry(lambda client: time.sleep(0.1)),
+            ticker()
+        )
+        # All ticks ran while the query was still sleeping
+        assert ticks[-1] - ticks[0] < 0.1
+        pool.close()
+
+    @pytest.mark.asyncio
+    async def test_concurrency_bounded_and_reported(self):
+        pool = make_pool(max_connections=2)
+
+        await asyncio.gather(*[
+            pool.execute_with_retry(lambda client: time.sleep(0.02)) for _ in range(6)
+        ])
+        stats = pool.get_stats()
+
+        assert stats["executor"]["peak_running_queries"] == 2
+        assert stats["executor"]["executed_queries"] == 6
+        assert stats["executor"]["running_queries"] == 0
+        assert stats["executor"]["queued_queries"] == 0
+        # Later queries waited for a connection slot
+        assert stats["max_semaphore_wait_ms"] >= 20
+        pool.close()
+
+    @pytest.mark.asyncio
+    async def test_each_worker_thread_has_its_own_client(self):
+        pool = make_pool(max_connections=2)
+        seen = {}
+
+        def query(client):
+            seen.setdefault(threading.get_ident(), set()).add(id(client))
+            time.sleep(0.01)
+
+        await asyncio.gather(*[pool.execute_with_retry(query) for _ in range(6)])
+        assert all(len(clients) == 1 for clients in seen.values())
+        pool.close()
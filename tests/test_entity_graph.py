@@ -0,0 +1,180 @@
+"""
+Tests for the entity co-mention graph
+Compares sparse co-occurrence/PMI results with a brute-force set computation
+"""
+import math
+import random
+
+import pytest
+from unittest.mock import MagicMock
+
+from lib.entity_graph import EntityGraph, EntityGraphNotReady, EntityGraphService, build_entity_graph
+
+
+def make_rows(seed=7, episodes=120, entities=25):
+    rng = random.Random(seed)
+    rows = []
+    for episode in range(episodes):
+        for entity in rng.sample(range(entities), rng.randint(1, 5)):
+            row = {
+                "entity_name": f"Company {entity}",
+                "entity_type": "ORG",
+                "episode_id": f"ep{episode}",
+                "created_at": f"2025-06-{episode % 28 + 1:02d}T00:00:00"
+            }
+            rows.append(row)
+            if rng.random() < 0.3:
+                rows.append(dict(row))  # Repeat mention in the same episode
+    return rows
+
+
+def episode_sets(rows):
+    sets = {}
+    for row in rows:
+        sets.setdefault(row["entity_name"], set()).add(row["episode_id"])
+    return sets
+
+
+class TestEntityGraph:
+    def test_neighbours_match_brute_force(self):
+        rows = make_rows()
+        graph = EntityGraph.from_rows(rows)
+        sets = episode_sets(rows)
+        total = len({row["episode_id"] for row in rows})
+
+        entity_id = graph.find_entity("company 3")
+        neighbours = graph.neighbours(entity_id, k=100, min_count=1)
+
+        expected = {name for name, eps in sets.items() if name != "Company 3" and eps & sets["Company 3"]}
+        assert {n["name"] for n in neighbours} == expected
+        for n in neighbours:
+            shared = len(sets["Company 3"] & sets[n["name"]])
+            assert n["co_occurrences"] == shared
+            expected_pmi = math.log2(shared * total / (len(sets["Company 3"]) * len(sets[n["name"]])))
+            assert n["pmi"] == pytest.approx(expected_pmi, abs=1e-3)
+
+        # Sorted by shared episodes
+        counts = [n["co_occurrences"] for n in neighbours]
+        assert counts == sorted(counts, reverse=True)
+
+    def test_top_k_and_min_count(self):
+        graph = EntityGraph.from_rows(make_rows())
+        entity_id = graph.find_entity("Company 1")
+        top = graph.neighbours(entity_id, k=3, min_count=2, sort="pmi")
+        assert len(top) <= 3
+        assert all(n["co_occurrences"] >= 2 for n in top)
+        assert [n["pmi"] for n in top] == sorted((n["pmi"] for n in top), reverse=True)
+
+    def test_incremental_merge_equals_full_build(self):
+        rows = make_rows()
+        full = EntityGraph.from_rows(rows)
+        incremental = EntityGraph.from_rows(rows[:200]).merge_rows(rows[150:])
+
+        entity_id = full.find_entity("Company 5")
+        assert incremental.neighbours(incremental.find_entity("Company 5"), k=100, min_count=1) == \
+            full.neighbours(entity_id, k=100, min_count=1)
+        assert incremental.pair_count == full.pair_count
+
+    def test_subgraph_edges(self):
+        rows = make_rows()
+        graph = EntityGraph.from_rows(rows)
+        sets = episode_sets(rows)
+        subgraph = graph.subgraph(graph.top_entities(8), min_count=1)
+
+        assert len(subgraph["nodes"]) == 8
+        for edge in subgraph["edges"]:
+            assert edge["co_occurrences"] == len(sets[edge["source"]] & sets[edge["target"]])
+
+    def test_save_and_load(self, tmp_path):
+        graph = EntityGraph.from_rows(make_rows())
+        path = str(tmp_path / "graph.npz")
+        graph.save(path)
+        loaded = EntityGraph.load(path)
+
+        entity_id = graph.find_entity("Company 2")
+        assert loaded.neighbours(entity_id, min_count=1) == graph.neighbours(entity_id, min_count=1)
+        assert loaded.watermark == graph.watermark
+
+
+class FakeSupabase:
+    """extracted_entities pages in order plus the entity_graph_state row"""
+
+    def __init__(self, batches, stored=None):
+        self.batches = list(batches)
+        self.stored = stored
+        self.requested_since = []
+
+    def pool(self):
+        pool = MagicMock()
+
+        async def execute_with_retry(query_func, name=None):
+            return query_func(self.client())
+
+        pool.execute_with_retry = execute_with_retry
+        return pool
+
+    def client(self):
+        client = MagicMock()
+
+        def table(name):
+            query = MagicMock()
+            query.select.return_value = query
+            query.order.return_value = query
+            query.eq.return_value = query
+            query.gte.side_effect = lambda column, value: self.requested_since.append(value) or query
+            if name == "entity_graph_state":
+                query.limit.return_value.execute.return_value.data = [self.stored] if self.stored else []
+
+                def upsert(row, on_conflict=None):
+                    self.stored = row
+                    return MagicMock()
+
+                query.upsert.side_effect = upsert
+            else:
+                query.range.return_value.execute.side_effect = lambda: MagicMock(data=self.batches.pop(0))
+            return query
+
+        client.table.side_effect = table
+        return client
+
+
+class TestEntityGraphService:
+    @pytest.mark.asyncio
+    async def test_cold_start_builds_in_background(self, tmp_path):
+        rows = make_rows()
+        supabase = FakeSupabase([rows[:300], rows[300:]])
+        service = EntityGraphService(cache_path=str(tmp_path / "graph.npz"), refresh_interval=0)
+
+        # No graph anywhere: the request is answered at once, the build runs behind it
+        with pytest.raises(EntityGraphNotReady):
+            await service.get(supabase.pool())
+        await service.wait_for_refresh()
+        first = await service.get(supabase.pool())
+        assert supabase.requested_since == []
+        assert (tmp_path / "graph.npz").exists()
+        assert supabase.stored is None  # Only the build script writes the stored row
+
+        # Stale graph is served while newer rows are folded in
+        await service.wait_for_refresh()
+        second = await service.get(supabase.pool())
+        assert supabase.requested_since == [first.watermark]
+        assert second.pair_count == EntityGraph.from_rows(rows).pair_count
+
+    @pytest.mark.asyncio
+    async def test_cold_start_loads_stored_graph(self, tmp_path):
+        rows = make_rows()
+        supabase = FakeSupabase([rows])
+        summary = await build_entity_graph(supabase.pool())
+        assert summary["mode"] == "full"
+        assert summary["pairs"] == EntityGraph.from_rows(rows).pair_count
+
+        supabase.batches = [[]]
+        service = EntityGraphService(cache_path=str(tmp_path / "graph.npz"))
+        graph = await service.get(supabase.pool())
+        assert graph.pair_count == summary["pairs"]
+        assert graph.watermark == summary["watermark"]
+
+        # The next script run is incremental from the stored watermark
+        supabase.batches = [[]]
+        assert (await build_entity_graph(supabase.pool()))["mode"] == "incremental"
+        assert supabase.requested_since[-1] == summary["watermark"]
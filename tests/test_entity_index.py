@@ -0,0 +1,125 @@
+"""
+Tests for the entity index read path and the raw-mention fallback
+"""
+import pytest
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock
+
+from lib.entity_index import (
+    entity_trend,
+    format_recent_mentions,
+    query_entity_index,
+    is_generic_entity
+)
+from api.topic_velocity import aggregate_entities_from_mentions
+
+
+def make_pool(data, count=None):
+    pool = MagicMock()
+
+    async def execute_with_retry(query_func, name=None):
+        response = MagicMock()
+        response.data = data
+        response.count = count
+        return response
+
+    pool.execute_with_retry = execute_with_retry
+    return pool
+
+
+NOW = datetime(2025, 6, 30)
+
+
+class TestEntityTrend:
+    def test_up_when_recent_dominates(self):
+        dates = [NOW - timedelta(days=d) for d in (1, 5, 10)]
+        assert entity_trend(dates, episode_count=4, now=NOW) == "up"
+
+    def test_down_when_only_older_episodes(self):
+        assert entity_trend([], episode_count=5, now=NOW) == "down"
+
+    def test_stable(self):
+        dates = ["2025-06-25T00:00:00+00:00", "2025-06-20T00:00:00+00:00"]
+        assert entity_trend(dates, episode_count=4, now=NOW) == "stable"
+
+
+class TestFormatting:
+    def test_recent_mentions_titles(self):
+        formatted = format_recent_mentions([
+            {"published_at": "2025-06-12T08:00:00+00:00", "podcast_name": "All-In", "duration_seconds": 3900},
+            {"published_at": "2025-06-01T08:00:00+00:00", "podcast_name": None, "duration_seconds": 0}
+        ])
+        assert formatted[0]["episode_title"] == "All-In - 65 min (Jun 12, 2025)"
+        assert formatted[0]["date"] == "June 12, 2025"
+        assert formatted[1]["episode_title"] == "Unknown Podcast (Jun 01, 2025)"
+
+    def test_generic_names(self):
+        assert is_generic_entity("Tom", "PERSON")
+        assert not is_generic_entity("Tom", "ORG")
+        assert not is_generic_entity("Tom Smith", "PERSON")
+
+
+class TestIndexQuery:
+    @pytest.mark.asyncio
+    async def test_skips_generic_names_and_applies_limit(self):
+        rows = [
+            {"entity_name": "Mike", "primary_type": "PERSON", "mention_count": 90, "episode_count": 40,
+             "recent_episode_dates": [], "recent_mentions": []},
+            {"entity_name": "Sequoia", "primary_type": "ORG", "mention_count": 50, "episode_count": 20,
+             "recent_episode_dates": [], "recent_mentions": []},
+            {"entity_name": "a16z", "primary_type": "ORG", "mention_count": 30, "episode_count": 10,
+             "recent_episode_dates": [], "recent_mentions": []}
+        ]
+        entities, total = await query_entity_index(make_pool(rows, count=3), limit=1)
+        assert [e["name"] for e in entities] == ["Sequoia"]
+        assert entities[0]["trend"] == "down"
+        assert total == 3
+
+    @pytest.mark.asyncio
+    async def test_unfiltered_reads_per_name_rows(self):
+        client = MagicMock()
+        query = client.table.return_value.select.return_value
+        query.eq.return_value = query
+        pool = MagicMock()
+
+        async def execute_with_retry(query_func, name=None):
+            query_func(client)
+            return MagicMock(data=[], count=0)
+
+        pool.execute_with_retry = execute_with_retry
+
+        await query_entity_index(pool)
+        query.eq.assert_called_with("entity_type", "ALL")
+        await query_entity_index(pool, entity_type="org")
+        query.eq.assert_called_with("entity_type", "ORG")
+
+
+class TestRawAggregation:
+    @pytest.mark.asyncio
+    async def test_counts_mentions_and_distinct_episodes(self):
+        def row(name, episode_id, published_at, entity_type="ORG"):
+            return {
+                "entity_name": name,
+                "entity_type": entity_type,
+                "episode_id": episode_id,
+                "episodes": {"published_at": published_at, "podcast_name": "Pod", "duration_seconds": 600}
+            }
+
+        rows = [
+            row("Sequoia", "e1", "2025-06-01T00:00:00Z"),
+            row("Sequoia", "e1", "2025-06-01T00:00:00Z"),
+            row("Sequoia", "e2", "2025-05-01T00:00:00Z"),
+            row("Tom", "e1", "2025-06-01T00:00:00Z", "PERSON"),
+            row("Stripe", "e2", "2025-05-01T00:00:00Z"),
+            row("Stripe", "e3", "2025-05-02T00:00:00Z", "PERSON")
+        ]
+        entities, total = await aggregate_entities_from_mentions(make_pool(rows), None, None, 20, None)
+
+        assert total == 3
+        assert [e["name"] for e in entities] == ["Sequoia", "Stripe"]
+        assert entities[0]["mention_count"] == 3
+        assert entities[0]["episode_count"] == 2
+        assert entities[0]["recent_mentions"][0]["date"] == "June 01, 2025"
+        # One entry per name across types, under its most frequent type (ties alphabetical)
+        assert entities[1]["type"] == "ORG"
+        assert entities[1]["mention_count"] == 2
@@ -0,0 +1,82 @@
+"""
+Tests for conditional GET support (ETag / If-None-Match)
+"""
+from unittest.mock import patch, MagicMock
+
+from fastapi.testclient import TestClient
+
+from lib.etag import make_etag, etag_matches
+
+
+def make_response(data=None, count=None):
+    response = MagicMock()
+    response.data = data or []
+    response.count = count
+    return response
+
+
+class TestEtagHelpers:
+    def test_etag_is_stable_and_weak(self):
+        etag = make_etag("signals", ["2025-06-01T00:00:00"], None, 10)
+        assert etag == make_etag("signals", ["2025-06-01T00:00:00"], None, 10)
+        assert etag.startswith('W/"')
+
+    def test_etag_changes_with_stamps_and_params(self):
+        base = make_etag("signals", [1], None, 10)
+        assert base != make_etag("signals", [2], None, 10)
+        assert base != make_etag("signals", [1], "spike", 10)
+
+    def test_if_none_match_parsing(self):
+        etag = make_etag("x")
+        assert etag_matches(etag, etag)
+        assert etag_matches(etag[2:], etag)  # strong form of the same tag
+        assert etag_matches(f'"other", {etag}', etag)
+        assert etag_matches("*", etag)
+        assert not etag_matches(None, etag)
+        assert not etag_matches('"other"', etag)
+
+
+class TestSignalsConditionalGet:
+    def make_pool(self, calculated_at):
+        pool = MagicMock()
+        calls = []
+
+        async def execute_with_retry(query_func, name=None):
+            calls.append(query_func)
+            if len(calls) == 1:
+                return make_response([{"calculated_at": calculated_at}])
+            if len(calls) == 2:
+                return make_response(count=1)
+            return make_response([{
+                "signal_type": "spike",
+                "signal_data": {"topic": "AI Agents", "spike_factor": 4, "current_week_mentions": 12},
+                "calculated_at": calculated_at
+            }])
+
+        pool.execute_with_retry = execute_with_retry
+        pool.calls = calls
+        return pool
+
+    def test_not_modified_skips_signal_query(self):
+        from api.topic_velocity import app
+
+        client = TestClient(app)
+        pool = self.make_pool("2025-06-01T00:00:00")
+        with patch("api.topic_velocity.get_pool", return_value=pool):
+            first = client.get("/api/signals")
+        assert first.status_code == 200
+        assert len(pool.calls) == 3
+        etag = first.headers["etag"]
+
+        pool = self.make_pool("2025-06-01T00:00:00")
+        with patch("api.topic_velocity.get_pool", return_value=pool):
+            second = client.get("/api/signals", headers={"If-None-Match": etag})
+        assert second.status_code == 304
+        assert second.headers["etag"] == etag
+        assert len(pool.calls) == 2  # Only the version stamps were read
+
+        pool = self.make_pool("2025-06-08T00:00:00")
+        with patch("api.topic_velocity.get_pool", return_value=pool):
+            third = client.get("/api/signals", headers={"If-None-Match": etag})
+        assert third.status_code == 200
+        assert third.headers["etag"] != etag
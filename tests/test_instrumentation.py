@@ -0,0 +1,106 @@
+"""
+Tests for per-query latency histograms and Prometheus output
+"""
+import random
+
+import numpy as np
+import pytest
+from unittest.mock import MagicMock
+
+from lib.corpus_stats import row_count_query
+from lib.database import SupabasePool
+from lib.instrumentation import RING_SIZE, LatencyHistogram, QueryMetrics
+
+
+class TestLatencyHistogram:
+    def test_percentiles_within_bucket_precision(self):
+        rng = random.Random(3)
+        samples = [rng.lognormvariate(-3, 1) for _ in range(5000)]
+        histogram = LatencyHistogram()
+        for value in samples:
+            histogram.record(value)
+
+        for quantile in (0.5, 0.95, 0.99):
+            exact = float(np.quantile(samples, quantile))
+            assert histogram.percentile(quantile) == pytest.approx(exact, rel=0.04)
+
+    def test_empty(self):
+        assert LatencyHistogram().percentile(0.99) == 0.0
+
+
+class TestQueryMetrics:
+    def test_records_calls_errors_and_rows(self):
+        metrics = QueryMetrics()
+        with metrics.track("mongodb", "vector_search") as timer:
+            timer.rows = 12
+        with pytest.raises(ValueError):
+            with metrics.track("mongodb", "vector_search"):
+                raise ValueError("boom")
+
+        query = metrics.get_stats()["queries"]["mongodb"][0]
+        assert query["calls"] == 2
+        assert query["errors"] == 1
+        assert query["rows_total"] == 12
+        assert query["recent"]["samples"] == 2
+        assert query["recent"]["avg_rows"] == 12.0
+
+    def test_memory_is_bounded(self):
+        metrics = QueryMetrics(max_queries=3)
+        for i in range(RING_SIZE * 2):
+            metrics.record("supabase", f"query_{i % 5}", 0.01)
+
+        queries = metrics.get_stats()["queries"]["supabase"]
+        assert sorted(q["query"] for q in queries) == ["other", "query_0", "query_1", "query_2"]
+        assert all(q["recent"]["samples"] <= RING_SIZE for q in queries)
+
+    def test_prometheus_text(self):
+        metrics = QueryMetrics()
+        metrics.record("openai", 'synth"esis', 0.25, retries=1)
+        text = metrics.prometheus_text({"podinsight_supabase_active_connections": 2})
+
+        assert "# TYPE podinsight_query_duration_seconds summary" in text
+        assert 'podinsight_query_duration_seconds_count{backend="openai",query="synth\\"esis"} 1' in text
+        assert 'podinsight_query_retries_total{backend="openai",query="synth\\"esis"} 1' in text
+        assert "podinsight_supabase_active_connections 2" in text
+        assert text.endswith("\n")
+
+
+class TestSupabaseInstrumentation:
+    @pytest.mark.asyncio
+    async def test_named_query_recorded(self, monkeypatch):
+        metrics = QueryMetrics()
+        monkeypatch.setattr("lib.database.get_query_metrics", lambda: metrics)
+        pool = SupabasePool(max_connections=2)
+        pool._create_client = lambda: object()
+
+        def query_signals(client):
+            response = MagicMock()
+            response.data = [{"id": 1}, {"id": 2}]
+            return response
+
+        await pool.execute_with_retry(query_signals)
+        pool.close()
+
+        query = metrics.get_stats()["queries"]["supabase"][0]
+        assert query["query"] == "query_signals"
+        assert query["rows_total"] == 2
+        assert query["retries"] == 0
+
+    @pytest.mark.asyncio
+    async def test_distinct_queries_recorded_separately(self, monkeypatch):
+        metrics = QueryMetrics()
+        monkeypatch.setattr("lib.database.get_query_metrics", lambda: metrics)
+        pool = SupabasePool(max_connections=2)
+        pool._create_client = lambda: MagicMock()
+
+        try:
+            await pool.execute_with_retry(row_count_query("episodes"))
+            await pool.execute_with_retry(row_count_query("topic_mentions"))
+            await pool.execute_with_retry(lambda client: client.table("episodes").execute(), name="episodes_page")
+            await pool.execute_with_retry(lambda client: client.table("topic_signals").execute(), name="signals_page")
+        finally:
+            pool.close()
+
+        queries = {q["query"]: q for q in metrics.get_stats()["queries"]["supabase"]}
+        assert set(queries) == {"count:episodes", "count:topic_mentions", "episodes_page", "signals_page"}
+        assert all(q["calls"] == 1 for q in queries.values())
@@ -0,0 +1,82 @@
+"""
+Tests for token-budgeted prompt packing
+"""
+import pytest
+
+from lib import prompt_packer
+from lib.prompt_packer import count_tokens, pack_excerpts, select_sentences
+from lib.synthesis import format_chunks_for_prompt
+
+FILLER = "We spent a while on the weather and travel plans. " * 6
+TEXT = FILLER + "Acme raised a $20M Series A at a $200M valuation. The round was led by Sequoia. " + FILLER
+
+
+def chunk(text, score, episode="ep"):
+    return {"text": text, "score": score, "podcast_title": "Pod", "episode_title": episode}
+
+
+def test_keeps_whole_sentences_around_the_match():
+    excerpt, used = select_sentences(TEXT, ["acme", "valuation"], 40)
+
+    assert "Acme raised a $20M Series A at a $200M valuation. The round was led by Sequoia." in excerpt
+    assert excerpt.startswith("We spent") and excerpt.endswith(".")
+    assert used <= 40
+
+
+def test_budget_is_shared_by_score():
+    chunks = [chunk(TEXT, 0.9), chunk(TEXT, 0.3), chunk(TEXT, 0.3)]
+    packed = pack_excerpts(chunks, ["acme"], 150)
+
+    assert packed.tokens <= 150
+    assert len(packed.excerpts[0]) > len(packed.excerpts[1])
+    assert all("Acme raised" in e for e in packed.excerpts)
+
+
+def test_exhausted_budget_leaves_low_scores_empty():
+    chunks = [chunk(TEXT, 0.9), chunk(TEXT, 0.1)]
+    packed = pack_excerpts(chunks, ["acme"], prompt_packer.MIN_EXCERPT_TOKENS + 10)
+    assert packed.excerpts[0] and not packed.excerpts[1]
+
+
+def test_prompt_fits_budget():
+    chunks = [chunk(TEXT * 3, 0.9 - i * 0.05, f"Episode {i}") for i in range(10)]
+    prompt = format_chunks_for_prompt(chunks, "What did Acme raise?", token_budget=600)
+
+    assert count_tokens(prompt) <= 600
+    assert "[10] Pod - Episode 9" in prompt
+    assert prompt.count("Acme raised a $20M Series A") == 10
+
+
+class WordEncoding:
+    """Stand-in for a tiktoken encoding: one token per word"""
+
+    def encode(self, text):
+        return text.split()
+
+
+def test_uses_loaded_encoding(monkeypatch):
+    monkeypatch.setattr(prompt_packer, "_encoding", WordEncoding())
+    assert count_tokens("Acme raised a $20M Series A.") == 6
+
+    chunks = [chunk(TEXT, 0.9), chunk(TEXT, 0.5)]
+    packed = pack_excerpts(chunks, ["acme"], 60)
+    assert packed.tokens <= 60
+    assert all("Acme raised" in e for e in packed.excerpts)
+
+
+def test_counting_never_loads_the_encoding(monkeypatch):
+    class Tiktoken:
+        def get_encoding(self, name):
+            raise AssertionError("encoding loaded on the request path")
+
+    monkeypatch.setattr(prompt_packer, "tiktoken", Tiktoken())
+    monkeypatch.setattr(prompt_packer, "_encoding", None)
+    assert count_tokens("x" * 40) == 10
+
+
+def test_tiktoken_encoding():
+    pytest.importorskip("tiktoken", reason="tiktoken not installed; token counts are estimated")
+    prompt_packer.load_encoding()
+    if prompt_packer._get_encoding() is None:
+        pytest.skip("tiktoken encoding could not be downloaded")
+    assert 0 < count_tokens("Acme raised a $20M Series A.") < 15
@@ -0,0 +1,121 @@
+"""
+Unit tests for personalised relevance scoring
+Checks the compiled matcher against the original per-preference substring loops
+"""
+import random
+
+import pytest
+
+from lib.relevance_scoring import (
+    PreferenceMatcher,
+    RelevanceScorer,
+    signal_text,
+    PORTFOLIO_BOOST,
+    TOPIC_BOOST
+)
+
+
+def naive_boost(portfolio_companies, topics, text):
+    """Reference implementation (the loops previously inlined in the router)"""
+    boost = 0.0
+    for company in portfolio_companies:
+        if company.lower() in text:
+            boost += PORTFOLIO_BOOST
+            break
+    for topic in topics:
+        if topic.lower() in text:
+            boost += TOPIC_BOOST
+    return boost
+
+
+def make_intel_doc(episode_id, texts, created_at="2025-06-01T00:00:00"):
+    return {
+        "episode_id": episode_id,
+        "created_at": created_at,
+        "signals": {
+            "investable": [{"content": t} for t in texts[:1]],
+            "soundbites": [{"signal_text": t} for t in texts[1:]]
+        }
+    }
+
+
+class TestPreferenceMatcher:
+    def test_overlapping_and_nested_patterns(self):
+        matcher = PreferenceMatcher(["Stripe", "rip"], ["AI", "ai agents", "agents"])
+        found = matcher.find("stripe is building ai agents")
+        assert len(found) == 5
+
+    def test_case_insensitive(self):
+        matcher = PreferenceMatcher(["OpenAI"], [])
+        assert matcher.boost("Talks about OPENAI pricing") == pytest.approx(PORTFOLIO_BOOST)
+
+    def test_portfolio_boost_applied_once(self):
+        matcher = PreferenceMatcher(["a16z", "sequoia"], [])
+        assert matcher.boost("a16z and sequoia co-led") == pytest.approx(PORTFOLIO_BOOST)
+
+    def test_duplicate_topics_count_each_time(self):
+        matcher = PreferenceMatcher([], ["fintech", "Fintech"])
+        assert matcher.boost("fintech round") == pytest.approx(2 * TOPIC_BOOST)
+
+    def test_empty_pattern_always_matches(self):
+        matcher = PreferenceMatcher([], [""])
+        assert matcher.boost("") == pytest.approx(TOPIC_BOOST)
+
+    def test_matches_naive_loops_on_random_input(self):
+        rng = random.Random(42)
+        alphabet = "abc "
+        for _ in range(300):
+            companies = ["".join(rng.choice(alphabet) for _ in range(rng.randint(1, 4)))
+                         for _ in range(rng.randint(0, 4))]
+            topics = ["".join(rng.choice(alphabet) for _ in range(rng.randint(1, 4)))
+                      for _ in range(rng.randint(0, 5))]
+            text = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 40)))
+
+            matcher = PreferenceMatcher(companies, topics)
+            assert matcher.boost(text) == pytest.approx(naive_boost(companies, topics, text))
+
+
+class TestRelevanceScorer:
+    def test_signal_text_uses_content_then_signal_text(self):
+        doc = make_intel_doc("ep1", ["Raised a Series A", "Great Quote"])
+        assert signal_text(doc["signals"]) == "raised a series a great quote"
+
+    def test_score_capped_at_one(self):
+        scorer = RelevanceScorer()
+        matcher = scorer.matcher_for(["acme"], ["ai"])
+        doc = make_intel_doc("ep1", ["Acme ships AI"])
+        assert scorer.score(0.95, matcher, doc) == 1.0
+
+    def test_no_preferences_returns_base(self):
+        scorer = RelevanceScorer()
+        doc = make_intel_doc("ep1", ["Acme ships AI"])
+        assert scorer.score(0.6, None, doc) == 0.6
+
+    def test_matcher_compiled_once_per_preference_version(self):
+        scorer = RelevanceScorer()
+        first = scorer.matcher_for(["acme"], ["ai"])
+        assert scorer.matcher_for(["acme"], ["ai"]) is first
+        assert scorer.matcher_for(["acme"], ["ai", "crypto"]) is not first
+
+    def test_episode_score_cached_until_document_changes(self):
+        scorer = RelevanceScorer()
+        matcher = scorer.matcher_for(["acme"], [])
+        doc = make_intel_doc("ep1", ["Acme ships"])
+        assert scorer.preference_boost(matcher, doc) == pytest.approx(PORTFOLIO_BOOST)
+
+        # Same version stamp: cached result is reused
+        doc["signals"]["investable"] = [{"content": "nothing relevant"}]
+        assert scorer.preference_boost(matcher, doc) == pytest.approx(PORTFOLIO_BOOST)
+
+        # New version stamp: rescored
+        doc["updated_at"] = "2025-06-02T00:00:00"
+        assert scorer.preference_boost(matcher, doc) == 0.0
+
+    def test_unstamped_documents_keyed_by_content(self):
+        scorer = RelevanceScorer()
+        matcher = scorer.matcher_for(["acme"], [])
+        doc = make_intel_doc("ep1", ["Acme ships"], created_at=None)
+        assert scorer.preference_boost(matcher, doc) == pytest.approx(PORTFOLIO_BOOST)
+
+        doc["signals"]["investable"] = [{"content": "nothing relevant"}]
+        assert scorer.preference_boost(matcher, doc) == 0.0
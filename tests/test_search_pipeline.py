@@ -0,0 +1,69 @@
+"""
+Tests for the pipelined search handler (synthesis overlaps context expansion)
+"""
+import asyncio
+
+import pytest
+
+from api import search_lightweight_768d as search
+from api.search_lightweight_768d import AnswerObject, SearchRequest, search_handler_lightweight_768d
+
+HITS = [
+    {"_id": f"id{i}", "episode_id": f"ep{i}", "episode_title": "Ep", "podcast_title": "Pod",
+     "text": f"chunk {i}", "score": 0.9 - i * 0.1, "start_time": 10, "end_time": 20}
+    for i in range(3)
+]
+
+
+class FakeHybrid:
+    async def search(self, query, **kwargs):
+        return [dict(h) for h in HITS]
+
+
+@pytest.fixture
+def pipeline(monkeypatch):
+    events = []
+
+    async def embed(text, session_id=None, return_timing=False):
+        return [0.1] * 768, 0.01
+
+    async def hybrid():
+        return FakeHybrid()
+
+    async def expand(chunk, context_seconds=20.0):
+        events.append(("expand_start", chunk["episode_id"]))
+        await asyncio.sleep(0.2)
+        return "expanded " + chunk["text"]
+
+    async def synthesize(chunks, query):
+        events.append(("synthesis_start", [c["_id"] for c in chunks]))
+        await asyncio.sleep(0.2)
+        return AnswerObject(text="• answer¹", citations=[])
+
+    monkeypatch.setattr(search, "generate_embedding_768d_local", embed)
+    monkeypatch.setattr(search, "get_hybrid_search_handler", hybrid)
+    monkeypatch.setattr(search, "expand_chunk_context", expand)
+    monkeypatch.setattr(search, "synthesize_answer_object", synthesize)
+    return events
+
+
+@pytest.mark.asyncio
+async def test_synthesis_overlaps_expansion(pipeline):
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    response = await search_handler_lightweight_768d(SearchRequest(query="acme", limit=2))
+    elapsed = loop.time() - started
+
+    # Serial would be expansion (0.2s) + synthesis (0.2s)
+    assert elapsed < 0.35
+    assert pipeline[0] == ("synthesis_start", ["id0", "id1", "id2"])
+    assert response.answer.text == "• answer¹"
+    assert [r.excerpt for r in response.results] == ["expanded chunk 0", "expanded chunk 1"]
+
+
+def test_synthesis_chunks_are_serializable():
+    from bson import ObjectId
+
+    chunks = search.prepare_synthesis_chunks([{"_id": ObjectId(), "text": "t"}] * 12)
+    assert len(chunks) == 10
+    assert all(isinstance(c["_id"], str) for c in chunks)
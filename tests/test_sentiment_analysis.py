@@ -0,0 +1,59 @@
+"""
+Tests for the on-demand sentiment fallback (single $facet aggregation)
+"""
+from datetime import datetime, timezone
+
+from lib import sentiment_analysis
+from lib.sentiment_analysis import build_sentiment_pipeline, handler
+
+
+class FakeChunks:
+    def __init__(self, facets):
+        self.facets = facets
+        self.calls = []
+
+    def aggregate(self, pipeline, **kwargs):
+        self.calls.append((pipeline, kwargs))
+        return iter([self.facets])
+
+
+def calculate(monkeypatch, facets, weeks, topics):
+    chunks = FakeChunks(facets)
+    monkeypatch.setattr(sentiment_analysis, "get_mongo_db", lambda: {"transcript_chunks_768d": chunks})
+    return handler.__new__(handler)._calculate_sentiment(weeks, topics), chunks
+
+
+def test_pipeline_is_bounded_by_date_and_topics():
+    start, end = datetime(2025, 6, 1, tzinfo=timezone.utc), datetime(2025, 6, 29, tzinfo=timezone.utc)
+    pipeline = build_sentiment_pipeline(["AI Agents", "Crypto/Web3"], start, end)
+
+    match = pipeline[0]["$match"]
+    assert match["created_at"] == {"$gte": start, "$lt": end}
+    assert match["text"]["$regex"] == "AI\\ Agents|Crypto/Web3"
+    assert set(pipeline[-1]["$facet"]) == {"t0", "t1"}
+    group = pipeline[-1]["$facet"]["t1"][-1]["$group"]
+    assert group["samples"]["$firstN"]["n"] == sentiment_analysis.SAMPLE_SIZE
+
+
+def test_one_round_trip_for_all_cells(monkeypatch):
+    facets = {
+        "t0": [{"_id": 1.0, "chunk_count": 61, "samples": [
+            "AI Agents are amazing", "ai agents: a terrible disaster", "no keywords about ai agents"
+        ]}],
+        "t1": []
+    }
+    results, chunks = calculate(monkeypatch, facets, 3, ["AI Agents", "DePIN"])
+
+    assert len(chunks.calls) == 1
+    assert chunks.calls[0][1]["maxTimeMS"] == sentiment_analysis.AGGREGATION_TIMEOUT_MS
+    assert len(results) == 6
+
+    cell = next(r for r in results if r["topic"] == "AI Agents" and r["week"] == "W2")
+    assert cell["episodeCount"] == 2
+    assert cell["sentiment"] == round((1.0 + (-0.8 + -1.0) / 2) / 2, 2)
+    assert all(r["sentiment"] == 0.0 and r["episodeCount"] == 0 for r in results if r is not cell)
+
+
+def test_empty_result(monkeypatch):
+    results, _ = calculate(monkeypatch, {}, 2, ["DePIN"])
+    assert [r["week"] for r in results] == ["W1", "W2"]
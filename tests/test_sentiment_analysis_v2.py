@@ -0,0 +1,88 @@
+"""
+Tests for the cached, bounded pre-computed sentiment reads (API v2)
+"""
+from datetime import datetime
+
+import pytest
+
+from api import sentiment_analysis_v2
+from api.sentiment_analysis_v2 import handler, requested_week_labels
+
+
+class FakeResults:
+    def __init__(self, docs):
+        self.docs = docs
+        self.queries = []
+
+    def find_one(self, query, projection=None, sort=None):
+        if not self.docs:
+            return None
+        return {"computed_at": max(d["computed_at"] for d in self.docs)}
+
+    def find(self, query, projection=None):
+        self.queries.append((query, projection))
+        return [
+            d for d in self.docs
+            if d["topic"] in query["topic"]["$in"]
+            and d["week"] in query["week"]["$in"]
+            and d["year"] in query["year"]["$in"]
+        ]
+
+
+def result(topic, week, score, computed_at, year=None):
+    return {
+        "topic": topic, "week": week, "year": year or datetime.now().year, "sentiment_score": score,
+        "episode_count": 3, "chunk_count": 9, "computed_at": computed_at
+    }
+
+
+@pytest.fixture
+def results(monkeypatch):
+    sentiment_analysis_v2._response_cache.clear()
+    collection = FakeResults([])
+    monkeypatch.setattr(sentiment_analysis_v2, "get_mongo_db", lambda: {"sentiment_results": collection})
+    return collection
+
+
+def fetch(weeks, topics):
+    return handler.__new__(handler)._get_precomputed_sentiment(weeks, topics)
+
+
+def test_week_labels_are_most_recent():
+    assert requested_week_labels(4) == ["W9", "W10", "W11", "W12"]
+    assert requested_week_labels(12)[0] == "W1"
+    assert requested_week_labels(14)[-1] == "W14"
+
+
+def test_bounded_query_and_projection(results):
+    results.docs = [result("DePIN", "W12", 0.4, datetime(2025, 6, 2))]
+    data = fetch(4, ["DePIN"])
+
+    query, projection = results.queries[0]
+    assert query["week"] == {"$in": ["W9", "W10", "W11", "W12"]}
+    assert query["year"]["$in"]
+    assert "_id" in projection and projection["_id"] == 0
+    assert len(data) == 4
+    assert next(d for d in data if d["week"] == "W12")["sentiment"] == 0.4
+
+
+def test_cache_until_new_batch_run(results):
+    results.docs = [result("DePIN", "W12", 0.4, datetime(2025, 6, 2))]
+    fetch(12, ["DePIN"])
+    fetch(12, ["DePIN"])
+    assert len(results.queries) == 1
+
+    results.docs = [result("DePIN", "W12", -0.2, datetime(2025, 6, 3))]
+    data = fetch(12, ["DePIN"])
+    assert len(results.queries) == 2
+    assert next(d for d in data if d["week"] == "W12")["sentiment"] == -0.2
+
+
+def test_latest_run_wins_for_duplicate_labels(results):
+    year = datetime.now().year
+    results.docs = [
+        result("DePIN", "W1", 0.9, datetime(2025, 1, 1), year=year - 1),
+        result("DePIN", "W1", 0.1, datetime(2025, 1, 8), year=year)
+    ]
+    data = fetch(12, ["DePIN"])
+    assert [d["sentiment"] for d in data if d["week"] == "W1"] == [0.1]
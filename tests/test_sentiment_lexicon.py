@@ -0,0 +1,84 @@
+"""
+Golden tests for the shared sentiment lexicon
+Scores must be identical to the per-keyword substring scan it replaced
+"""
+import random
+import re
+
+import pytest
+
+from lib.sentiment_analysis import SENTIMENT_KEYWORDS as API_KEYWORDS
+from lib.sentiment_lexicon import SentimentLexicon
+
+BATCH_KEYWORDS = {
+    'amazing': 1.0, 'great': 0.7, 'good': 0.4, 'bad': -0.4, 'problem': -0.5, 'problems': -0.5,
+    'issue': -0.3, 'issues': -0.3, 'failing': -0.6, 'failed': -0.6, 'failure': -0.8, 'worst': -0.8
+}
+
+WORDS = [
+    "ai", "agents", "agent", "burn", "rate", "runway", "depin", "the", "and", "we", "think",
+    "amazing", "great", "greatest", "good", "goodbye", "badge", "bad", "problem", "problems",
+    "issue", "issues", "tissues", "failing", "failed", "failure", "worst", "unsuccessful",
+    "successful", "threatened", "wonderfully", "love", "glove", "catastrophe", "café", "naïve",
+    "don't", "co-pilot", "2024", "x"
+]
+SEPARATORS = [" ", " ", " ", ", ", ". ", "\n", "-", "'", "—", ""]
+
+
+def reference_score(weights, content, spans, context_chars, max_contexts):
+    """The original loop: substring containment per keyword per context"""
+    context_sentiments = []
+    chunk_keywords = []
+    for start, end in spans[:max_contexts]:
+        context = content[max(0, start - context_chars):min(len(content), end + context_chars)]
+        sentiment_score = 0
+        keyword_hits = 0
+        for keyword, weight in weights.items():
+            if keyword in context:
+                sentiment_score += weight
+                keyword_hits += 1
+                chunk_keywords.append(keyword)
+        if keyword_hits > 0:
+            context_sentiments.append(sentiment_score / keyword_hits)
+    if not context_sentiments:
+        return None, []
+    return sum(context_sentiments) / len(context_sentiments), chunk_keywords
+
+
+def random_chunk(rng):
+    parts = []
+    for _ in range(rng.randint(0, 120)):
+        parts.append(rng.choice(WORDS))
+        parts.append(rng.choice(SEPARATORS))
+    return "".join(parts).lower()
+
+
+@pytest.mark.parametrize("weights", [BATCH_KEYWORDS, API_KEYWORDS], ids=["batch", "api"])
+@pytest.mark.parametrize("context_chars,max_contexts", [(200, 3), (200, 5), (15, 3), (0, 2)])
+def test_identical_to_substring_scan(weights, context_chars, max_contexts):
+    rng = random.Random(context_chars * 31 + max_contexts)
+    lexicon = SentimentLexicon(weights)
+    topic = re.compile(r"\b(ai agents?|burn rate|depin)\b")
+
+    items = []
+    for _ in range(400):
+        content = random_chunk(rng)
+        spans = [m.span() for m in topic.finditer(content)]
+        if rng.random() < 0.3:
+            # Arbitrary spans, including ones cutting through words
+            spans = sorted((p, p + rng.randint(0, 4)) for p in rng.sample(range(len(content) + 1), min(3, len(content) + 1)))
+        items.append((content, spans))
+
+    batch = lexicon.score_many(items, context_chars, max_contexts)
+    for (content, spans), scored in zip(items, batch):
+        assert scored == reference_score(weights, content, spans, context_chars, max_contexts)
+        assert lexicon.score(content, spans, context_chars, max_contexts) == scored
+
+
+def test_window_edges_and_overlapping_keywords():
+    lexicon = SentimentLexicon(BATCH_KEYWORDS)
+    content = "problems here " + "x" * 30 + " ai agents " + "y" * 30 + " goodbye"
+    start = content.index("ai agents")
+    spans = [(start, start + 9)]
+    for chars in range(0, 60):
+        assert lexicon.score(content, spans, chars, 3) == reference_score(BATCH_KEYWORDS, content, spans, chars, 3)
@@ -0,0 +1,111 @@
+"""
+Tests for the synthesized-answer cache
+"""
+import pytest
+
+from lib import synthesis
+from lib.synthesis import SynthesizedAnswer, synthesize_with_retry
+from lib.synthesis_cache import SynthesisCache, synthesis_cache_key
+
+CHUNKS = [
+    {"_id": "a1", "episode_id": "ep1", "chunk_index": 3, "text": "Acme raised a $20M Series A", "score": 0.9},
+    {"episode_id": "ep2", "chunk_index": 7, "text": "Beta Labs grew 3x", "score": 0.8}
+]
+
+
+def answer(text="• Acme raised $20M¹"):
+    return SynthesizedAnswer(text=text, citations=[], cited_indices=[1], synthesis_time_ms=900, confidence=0.9)
+
+
+class FakeMongoCollection:
+    def __init__(self):
+        self.docs = {}
+
+    async def create_index(self, *args, **kwargs):
+        pass
+
+    async def find_one(self, query, projection=None):
+        return self.docs.get(query["_id"])
+
+    async def replace_one(self, query, doc, upsert=False):
+        self.docs[query["_id"]] = doc
+
+
+class TestCacheKey:
+    def test_normalizes_query(self):
+        assert synthesis_cache_key("What did Acme raise?", CHUNKS, "m", "v") == \
+            synthesis_cache_key("  what did   acme raise ", CHUNKS, "m", "v")
+
+    def test_evidence_model_and_prompt_change_the_key(self):
+        key = synthesis_cache_key("acme", CHUNKS, "m", "v")
+        assert synthesis_cache_key("acme", CHUNKS[::-1], "m", "v") != key
+        assert synthesis_cache_key("acme", CHUNKS[:1], "m", "v") != key
+        assert synthesis_cache_key("acme", CHUNKS, "other", "v") != key
+        assert synthesis_cache_key("acme", CHUNKS, "m", "v2") != key
+
+
+class TestSynthesisWithCache:
+    @pytest.mark.asyncio
+    async def test_repeat_query_skips_openai(self, monkeypatch):
+        monkeypatch.setattr(synthesis, "get_synthesis_cache", lambda cache=SynthesisCache(use_mongo=False): cache)
+        calls = []
+
+        async def fake_v2(chunks, query):
+            calls.append(query)
+            return answer()
+
+        monkeypatch.setattr(synthesis, "synthesize_answer_v2", fake_v2)
+
+        first = await synthesize_with_retry(CHUNKS, "What did Acme raise?")
+        second = await synthesize_with_retry(CHUNKS, "what did acme raise")
+        assert calls == ["What did Acme raise?"]
+        assert second.text == first.text
+        assert second.cited_indices == [1]
+
+        await synthesize_with_retry(CHUNKS[:1], "what did acme raise")
+        assert len(calls) == 2
+
+    @pytest.mark.asyncio
+    async def test_mongo_tier_shared_across_instances(self, monkeypatch):
+        monkeypatch.setenv("MONGODB_URI", "mongodb://example")
+        collection = FakeMongoCollection()
+        writer, reader = SynthesisCache(use_mongo=True), SynthesisCache(use_mongo=True)
+        for cache in (writer, reader):
+            monkeypatch.setattr(cache, "_get_collection", lambda: collection)
+
+        await writer.set("k", answer().model_dump())
+        cached = await reader.get("k")
+        assert SynthesizedAnswer.model_validate(cached).text == answer().text
+        assert reader.get_stats()["mongo_hits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_mongo_failure_is_a_miss(self, monkeypatch):
+        monkeypatch.setenv("MONGODB_URI", "mongodb://example")
+        cache = SynthesisCache(use_mongo=True)
+
+        def broken():
+            raise RuntimeError("atlas down")
+
+        monkeypatch.setattr(cache, "_get_collection", broken)
+        assert await cache.get("k") is None
+        await cache.set("k", {"text": "x"})
+        assert cache.get_stats()["mongo_errors"] == 2
+
+    @pytest.mark.asyncio
+    async def test_mongo_failures_do_not_open_search_breaker(self, monkeypatch):
+        from lib.circuit_breaker import CLOSED, OPEN, get_circuit_breaker
+
+        monkeypatch.setenv("MONGODB_URI", "mongodb://example")
+        cache = SynthesisCache(use_mongo=True)
+        collection = FakeMongoCollection()
+
+        async def denied(*args, **kwargs):
+            raise RuntimeError("not authorized to create index")
+
+        collection.create_index = denied
+        monkeypatch.setattr(cache, "_get_collection", lambda: collection)
+
+        for i in range(10):
+            await cache.set(f"k{i}", {"text": "x"})
+        assert get_circuit_breaker("mongodb").get_state()["state"] == CLOSED
+        assert cache.get_stats()["mongo_breaker"]["state"] == OPEN
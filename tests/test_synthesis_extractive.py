@@ -0,0 +1,89 @@
+"""
+Tests for the local extractive answer fallback
+"""
+import asyncio
+
+import pytest
+
+from lib import synthesis
+from lib.synthesis import SynthesizedAnswer, extractive_answer, synthesize_with_retry
+from lib.synthesis_cache import SynthesisCache
+
+CHUNKS = [
+    {"episode_id": "ep1", "chunk_index": 3, "score": 0.9, "start_time": 65,
+     "text": "We talked about the weather for a while. Acme raised a $20M Series A led by Sequoia last month. Then we moved on."},
+    {"episode_id": "ep2", "chunk_index": 7, "score": 0.7, "start_time": 10,
+     "text": "Beta Labs grew revenue 3x growth after its seed round. Nobody expected that."},
+    {"episode_id": "ep3", "chunk_index": 1, "score": 0.5, "text": "Short. Bits."}
+]
+
+
+@pytest.fixture
+def memory_cache(monkeypatch):
+    cache = SynthesisCache(use_mongo=False)
+    monkeypatch.setattr(synthesis, "get_synthesis_cache", lambda: cache)
+    return cache
+
+
+def test_bulleted_cited_answer():
+    answer = extractive_answer(CHUNKS, "How much did Acme raise in its Series A?")
+
+    lines = answer.text.split("\n")
+    assert lines[0] == "• Acme raised a $20M Series A led by Sequoia last month.¹"
+    assert lines[1].startswith("• Beta Labs grew revenue")
+    assert answer.cited_indices == [1, 2]
+    assert [c.episode_id for c in answer.citations] == ["ep1", "ep2"]
+    assert answer.citations[0].timestamp == "1:05"
+    assert answer.source == "extractive"
+    assert not answer.show_confidence
+
+
+def test_low_relevance_gives_no_answer():
+    low = [dict(c, score=0.2) for c in CHUNKS]
+    assert extractive_answer(low, "acme") is None
+    assert extractive_answer([], "acme") is None
+
+
+@pytest.mark.asyncio
+async def test_slow_llm_falls_back_within_deadline(monkeypatch, memory_cache):
+    async def slow_v2(chunks, query):
+        await asyncio.sleep(5)
+
+    monkeypatch.setattr(synthesis, "synthesize_answer_v2", slow_v2)
+
+    answer = await synthesize_with_retry(CHUNKS, "acme series a", deadline=0.05)
+    assert answer.source == "extractive"
+    assert answer.cited_indices[0] == 1
+    # Only LLM answers are cached
+    assert memory_cache.get_stats()["size"] == 0
+
+
+@pytest.mark.asyncio
+async def test_llm_answer_wins_when_on_time(monkeypatch, memory_cache):
+    async def fast_v2(chunks, query):
+        return SynthesizedAnswer(text="• Acme raised $20M¹", citations=[], cited_indices=[1], synthesis_time_ms=5)
+
+    monkeypatch.setattr(synthesis, "synthesize_answer_v2", fast_v2)
+
+    answer = await synthesize_with_retry(CHUNKS, "acme series a", deadline=1)
+    assert answer.source == "openai"
+    assert answer.text == "• Acme raised $20M¹"
+
+
+@pytest.mark.asyncio
+async def test_low_relevance_skips_llm_and_breaker(monkeypatch, memory_cache):
+    from lib.circuit_breaker import CLOSED, CircuitBreaker
+
+    breaker = CircuitBreaker("openai", min_calls=5)
+    monkeypatch.setattr(synthesis, "get_circuit_breaker", lambda name: breaker)
+
+    async def unexpected_v2(chunks, query):
+        raise AssertionError("OpenAI should not be called")
+
+    monkeypatch.setattr(synthesis, "synthesize_answer_v2", unexpected_v2)
+
+    low = [dict(c, score=0.2) for c in CHUNKS]
+    for _ in range(6):
+        assert await synthesize_with_retry(low, "acme series a") is None
+    assert breaker.get_state()["state"] == CLOSED
+    assert breaker.get_state()["window_calls"] == 0
@@ -0,0 +1,196 @@
+"""
+Tests for the topic signal engine
+"""
+from datetime import date, timedelta
+
+import pytest
+from unittest.mock import MagicMock
+
+from lib.topic_signals import TopicIncidence, diff_signals, run_topic_signals
+
+LATEST_MONDAY = date(2025, 6, 23)
+
+
+def mention(topic, episode_id, weeks_ago=0, created_at="2025-06-25T00:00:00"):
+    published = LATEST_MONDAY - timedelta(weeks=weeks_ago) + timedelta(days=1)
+    return {
+        "topic_name": topic,
+        "episode_id": episode_id,
+        "mention_date": published.isoformat(),
+        "created_at": created_at,
+        "episodes": {"published_at": f"{published.isoformat()}T12:00:00+00:00"}
+    }
+
+
+def episode(episode_id, topics, weeks_ago=0, created_at="2025-06-25T00:00:00"):
+    return [mention(t, episode_id, weeks_ago, created_at) for t in topics]
+
+
+class TestComputeSignals:
+    def test_correlation(self):
+        rows = []
+        for i in range(4):
+            rows += episode(f"both{i}", ["DePIN", "AI Agents"])
+        rows += episode("agents", ["AI Agents"])
+        rows += episode("depin", ["DePIN"])
+        signals = TopicIncidence.from_rows(rows).compute_signals()
+
+        signal_type, data = signals["correlation:AI Agents|DePIN"]
+        assert signal_type == "correlation"
+        assert data == {"topics": ["AI Agents", "DePIN"], "co_occurrence_percent": 66.7, "episode_count": 4}
+
+    def test_spike(self):
+        rows = []
+        for week in range(1, 5):
+            rows += episode(f"old{week}", ["Crypto/Web3"], weeks_ago=week)
+        for i in range(4):
+            rows += episode(f"new{i}", ["Crypto/Web3"])
+        signals = TopicIncidence.from_rows(rows).compute_signals()
+
+        _, data = signals["spike:Crypto/Web3"]
+        assert data["spike_factor"] == 4.0
+        assert data["current_week_mentions"] == 4
+
+    def test_trending_combo(self):
+        rows = []
+        for i in range(2):
+            rows += episode(f"base{i}", ["B2B SaaS", "AI Agents"], weeks_ago=5)
+        for i in range(5):
+            rows += episode(f"cur{i}", ["B2B SaaS", "AI Agents"], weeks_ago=i % 3)
+        signals = TopicIncidence.from_rows(rows).compute_signals()
+
+        _, data = signals["trending_combo:AI Agents|B2B SaaS"]
+        assert data == {
+            "topics": ["AI Agents", "B2B SaaS"],
+            "growth_rate": 150.0,
+            "current_period_mentions": 5,
+            "base_period_mentions": 2
+        }
+
+    def test_incremental_merge_matches_full_build(self):
+        old = episode("e1", ["AI Agents", "DePIN"], 2, "2025-06-01") + episode("e2", ["DePIN"], 1, "2025-06-10")
+        new = episode("e2", ["Capital Efficiency"], 0, "2025-06-20") + episode("e3", ["AI Agents"], 0, "2025-06-20")
+
+        incremental = TopicIncidence.from_rows(old).merge_rows(old[-1:] + new)
+        full = TopicIncidence.from_rows(old + new)
+        assert incremental.compute_signals() == full.compute_signals()
+        assert incremental.mention_count == 5
+        assert incremental.watermark == "2025-06-20"
+
+    def test_diff_signals(self):
+        stored = {
+            "spike:A": ("spike", {"topic": "A", "spike_factor": 3.0}),
+            "spike:B": ("spike", {"topic": "B", "spike_factor": 2.0}),
+            "spike:C": ("spike", {"topic": "C", "spike_factor": 5.0})
+        }
+        computed = {
+            "spike:A": ("spike", {"topic": "A", "spike_factor": 3.0}),
+            "spike:B": ("spike", {"topic": "B", "spike_factor": 2.5}),
+            "spike:D": ("spike", {"topic": "D", "spike_factor": 2.0})
+        }
+        changed, removed = diff_signals(stored, computed)
+        assert sorted(changed) == ["spike:B", "spike:D"]
+        assert removed == ["spike:C"]
+
+
+class FakeSupabase:
+    def __init__(self, mentions):
+        self.mentions = mentions
+        self.signals = {}
+        self.since = []
+        self.upserted = []
+        self.state = None
+
+    def pool(self):
+        pool = MagicMock()
+
+        async def execute_with_retry(query_func, name=None):
+            return query_func(self.client())
+
+        pool.execute_with_retry = execute_with_retry
+        return pool
+
+    def client(self):
+        client = MagicMock()
+
+        def table(name):
+            query = MagicMock()
+            query.select.return_value = query
+            query.order.return_value = query
+            query.gte.side_effect = lambda column, value: self.since.append(value) or query
+            if name == "topic_signal_state":
+                query.eq.return_value = query
+                query.limit.return_value.execute.return_value.data = [self.state] if self.state else []
+
+                def save(row, on_conflict=None):
+                    self.state = row
+                    return MagicMock()
+
+                query.upsert.side_effect = save
+            elif name == "topic_mentions":
+                rows = self.mentions
+                if self.since:
+                    rows = [r for r in rows if r["created_at"] >= self.since[-1]]
+                query.range.return_value.execute.return_value.data = rows
+            else:
+                query.range.return_value.execute.return_value.data = [
+                    {"signal_key": key, "signal_type": t, "signal_data": d} for key, (t, d) in self.signals.items()
+                ]
+
+                def upsert(rows, on_conflict=None):
+                    self.upserted.extend(row["signal_key"] for row in rows)
+                    self.signals.update({row["signal_key"]: (row["signal_type"], row["signal_data"]) for row in rows})
+                    return MagicMock()
+
+                query.upsert.side_effect = upsert
+            return query
+
+        client.table.side_effect = table
+        return client
+
+
+class TestRunTopicSignals:
+    @pytest.mark.asyncio
+    async def test_incremental_run_only_writes_changes(self, tmp_path):
+        mentions = []
+        for i in range(3):
+            mentions += episode(f"e{i}", ["AI Agents", "DePIN"], weeks_ago=1, created_at="2025-06-01")
+        supabase = FakeSupabase(mentions)
+        state_path = str(tmp_path / "signals.npz")
+
+        first = await run_topic_signals(supabase.pool(), state_path=state_path)
+        assert first["mode"] == "full"
+        assert supabase.upserted == ["correlation:AI Agents|DePIN"]
+
+        # Nothing new: nothing written
+        supabase.upserted.clear()
+        second = await run_topic_signals(supabase.pool(), state_path=state_path)
+        assert second["mode"] == "incremental"
+        assert supabase.since == ["2025-06-01"]
+        assert second["upserted"] == 0 and supabase.upserted == []
+
+        # A new episode changes the correlation
+        supabase.mentions += episode("e9", ["AI Agents", "DePIN"], created_at="2025-06-20")
+        third = await run_topic_signals(supabase.pool(), state_path=state_path)
+        assert third["watermark"] == "2025-06-20"
+        assert supabase.upserted == ["correlation:AI Agents|DePIN"]
+        assert supabase.signals["correlation:AI Agents|DePIN"][1]["episode_count"] == 4
+
+    @pytest.mark.asyncio
+    async def test_state_kept_in_supabase_by_default(self, caplog):
+        mentions = []
+        for i in range(3):
+            mentions += episode(f"e{i}", ["AI Agents", "DePIN"], created_at="2025-06-01")
+        supabase = FakeSupabase(mentions)
+
+        with caplog.at_level("WARNING", logger="lib.topic_signals"):
+            first = await run_topic_signals(supabase.pool(), state_path=None)
+        assert first["mode"] == "full"
+        assert "No topic signal state" in caplog.text
+        assert supabase.state["watermark"] == "2025-06-01"
+
+        # A fresh process (no local files) resumes from the stored row
+        second = await run_topic_signals(supabase.pool(), state_path=None)
+        assert second["mode"] == "incremental"
+        assert supabase.since == ["2025-06-01"]
+        assert second["episodes"] == 3
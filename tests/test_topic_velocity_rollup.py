@@ -0,0 +1,137 @@
+"""
+Tests for the weekly topic-mention rollup used by /api/topic-velocity
+"""
+import pytest
+from datetime import datetime
+from unittest.mock import MagicMock
+
+from postgrest.exceptions import APIError
+
+from api.topic_velocity import (
+    velocity_week_keys,
+    fetch_weekly_counts,
+    count_weekly_mentions_from_raw
+)
+
+
+def make_pool(*results):
+    """Pool whose execute_with_retry returns results in order (exceptions are raised)"""
+    pool = MagicMock()
+    queue = list(results)
+
+    async def execute_with_retry(query_func, name=None):
+        result = queue.pop(0)
+        if isinstance(result, Exception):
+            raise result
+        response = MagicMock()
+        response.data = result
+        return response
+
+    pool.execute_with_retry = execute_with_retry
+    return pool
+
+
+def missing_relation(table):
+    return APIError({"code": "42P01", "message": f'relation "{table}" does not exist'})
+
+
+class FakeQuery:
+    """Chainable PostgREST query; the rollup table does not exist"""
+
+    def __init__(self, table, raw):
+        self.table_name = table
+        self.raw = raw
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self
+
+    def execute(self):
+        if self.table_name == "topic_mention_weekly":
+            raise missing_relation(self.table_name)
+        return MagicMock(data=self.raw)
+
+
+class TestWeekKeys:
+    def test_covers_window_oldest_first(self):
+        keys = velocity_week_keys(datetime(2025, 5, 1), datetime(2025, 6, 1))
+        assert keys[0] == "2025-W18"
+        assert keys[-1] == "2025-W22"
+        assert keys == sorted(keys)
+
+    def test_year_boundary_uses_iso_year(self):
+        keys = velocity_week_keys(datetime(2024, 12, 20), datetime(2025, 1, 3))
+        assert keys == ["2024-W51", "2024-W52", "2025-W01"]
+
+
+class TestWeeklyCounts:
+    @pytest.mark.asyncio
+    async def test_reads_rollup_and_drops_cells_outside_window(self):
+        pool = make_pool([
+            {"topic_name": "AI Agents", "iso_year": 2025, "iso_week": 1, "mention_count": 4},
+            {"topic_name": "DePIN", "iso_year": 2025, "iso_week": 2, "mention_count": 2},
+            {"topic_name": "DePIN", "iso_year": 2024, "iso_week": 1, "mention_count": 9}
+        ])
+        counts = await fetch_weekly_counts(pool, ["AI Agents", "DePIN"], ["2024-W52", "2025-W01", "2025-W02"])
+        assert counts == {"2025-W01": {"AI Agents": 4}, "2025-W02": {"DePIN": 2}}
+
+    @pytest.mark.asyncio
+    async def test_falls_back_to_raw_mentions(self):
+        raw = [
+            {"topic_name": "AI Agents", "week_number": "1", "episodes": {"published_at": "2025-01-02T10:00:00Z"}},
+            {"topic_name": "AI Agents", "week_number": "1", "episodes": {"published_at": "2025-01-03T10:00:00Z"}}
+        ]
+        pool = make_pool(missing_relation("topic_mention_weekly"), raw)
+        counts = await fetch_weekly_counts(pool, ["AI Agents"], ["2025-W01"])
+        assert counts == {"2025-W01": {"AI Agents": 2}}
+
+    @pytest.mark.asyncio
+    async def test_other_errors_are_not_masked(self):
+        with pytest.raises(RuntimeError):
+            await fetch_weekly_counts(make_pool(RuntimeError("boom")), ["AI Agents"], ["2025-W01"])
+
+    @pytest.mark.asyncio
+    async def test_open_breaker_propagates(self):
+        from lib.circuit_breaker import CircuitOpenError
+
+        # The raw fallback would go through the same open breaker
+        pool = make_pool(CircuitOpenError("supabase", 10), [])
+        with pytest.raises(CircuitOpenError):
+            await fetch_weekly_counts(pool, ["AI Agents"], ["2025-W01"])
+
+    @pytest.mark.asyncio
+    async def test_missing_rollup_falls_back_on_every_call(self, monkeypatch):
+        from lib.circuit_breaker import CLOSED, CircuitBreaker
+        from lib.database import SupabasePool
+
+        breaker = CircuitBreaker("supabase", min_calls=1, open_seconds=60)
+        monkeypatch.setattr("lib.database.get_circuit_breaker", lambda name: breaker)
+        raw = [{"topic_name": "AI Agents", "week_number": "1", "episodes": {"published_at": "2025-01-02T10:00:00Z"}}]
+        client = MagicMock()
+        client.table.side_effect = lambda name: FakeQuery(name, raw)
+        pool = SupabasePool(max_connections=2)
+        pool._create_client = lambda: client
+
+        try:
+            for _ in range(4):
+                counts = await fetch_weekly_counts(pool, ["AI Agents"], ["2025-W01"])
+                assert counts == {"2025-W01": {"AI Agents": 1}}
+            assert breaker.state == CLOSED
+            # One rollup attempt per call: the missing relation is not retried
+            assert [c.args[0] for c in client.table.call_args_list].count("topic_mention_weekly") == 4
+        finally:
+            pool.close()
+
+    @pytest.mark.asyncio
+    async def test_rollup_matches_raw_bucketing(self):
+        raw = [
+            {"topic_name": "B2B SaaS", "week_number": "22", "episodes": {"published_at": "2025-05-28T00:00:00Z"}},
+            {"topic_name": "B2B SaaS", "week_number": "22", "episodes": {"published_at": "2025-05-29T00:00:00Z"}},
+            {"topic_name": "DePIN", "week_number": "21", "episodes": {"published_at": "2025-05-20T00:00:00Z"}}
+        ]
+        rollup = [
+            {"topic_name": "B2B SaaS", "iso_year": 2025, "iso_week": 22, "mention_count": 2},
+            {"topic_name": "DePIN", "iso_year": 2025, "iso_week": 21, "mention_count": 1}
+        ]
+        from_raw = await count_weekly_mentions_from_raw(make_pool(raw), ["B2B SaaS", "DePIN"])
+        from_rollup = await fetch_weekly_counts(make_pool(rollup), ["B2B SaaS", "DePIN"], ["2025-W21", "2025-W22"])
+        assert from_rollup == from_raw